@@ -27,11 +27,15 @@ from src.utils.translation_keys import (
     RECTANGULAR_DISTRIBUTION,
     TRIANGULAR_DISTRIBUTION,
     U_DISTRIBUTION,
+    TRAPEZOIDAL_DISTRIBUTION,
+    CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION,
+    LOGNORMAL_DISTRIBUTION,
 )
 from src.utils.variable_utils import (
     create_empty_value_dict,
     get_distribution_divisor,
     get_distribution_translation_key,
+    is_divisor_editable,
 )
 
 
@@ -78,6 +82,9 @@ class BulkInputDialog(QDialog):
             (RECTANGULAR_DISTRIBUTION, self.tr(RECTANGULAR_DISTRIBUTION)),
             (TRIANGULAR_DISTRIBUTION, self.tr(TRIANGULAR_DISTRIBUTION)),
             (U_DISTRIBUTION, self.tr(U_DISTRIBUTION)),
+            (TRAPEZOIDAL_DISTRIBUTION, self.tr(TRAPEZOIDAL_DISTRIBUTION)),
+            (CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION, self.tr(CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION)),
+            (LOGNORMAL_DISTRIBUTION, self.tr(LOGNORMAL_DISTRIBUTION)),
         ]
 
     def _build_row_specs(self):
@@ -226,10 +233,12 @@ class BulkInputDialog(QDialog):
                     if new_distribution != old_distribution:
                         var_info["distribution"] = new_distribution
                         value_info["degrees_of_freedom"] = "inf"
-                        if new_distribution == NORMAL_DISTRIBUTION:
+                        if is_divisor_editable(new_distribution):
                             value_info["divisor"] = "2"
                         else:
-                            divisor = get_distribution_divisor(new_distribution) or ""
+                            divisor = get_distribution_divisor(
+                                new_distribution, var_info.get("distribution_parameter", "")
+                            ) or ""
                             value_info["divisor"] = str(divisor)
                         var_info["divisor"] = value_info.get("divisor", "")
                     continue
@@ -253,10 +262,10 @@ class BulkInputDialog(QDialog):
                 distribution = get_distribution_translation_key(
                     var_info.get("distribution", NORMAL_DISTRIBUTION)
                 ) or NORMAL_DISTRIBUTION
-                if distribution == NORMAL_DISTRIBUTION:
+                if is_divisor_editable(distribution):
                     divisor = "2"
                 else:
-                    divisor = str(get_distribution_divisor(distribution) or "")
+                    divisor = str(get_distribution_divisor(distribution, var_info.get("distribution_parameter", "")) or "")
                 value_info["divisor"] = divisor
                 var_info["divisor"] = divisor
 
@@ -30,7 +30,11 @@ class SettingsDialog(QDialog):
         calculation_layout = QFormLayout(self.calculation_group)
         self.precision_spin = QSpinBox(self)
         self.precision_spin.setRange(1, 200)
+        self.numeric_engine_combo = QComboBox(self)
+        self.numeric_engine_combo.addItem("", "float64")
+        self.numeric_engine_combo.addItem("", "high_precision")
         calculation_layout.addRow(QLabel(self), self.precision_spin)
+        calculation_layout.addRow(QLabel(self), self.numeric_engine_combo)
 
         self.rounding_group = QGroupBox(self)
         rounding_layout = QFormLayout(self.rounding_group)
@@ -76,6 +80,7 @@ class SettingsDialog(QDialog):
         root_layout.addWidget(self.button_box)
 
         self.precision_label = self.calculation_group.layout().labelForField(self.precision_spin)
+        self.numeric_engine_label = self.calculation_group.layout().labelForField(self.numeric_engine_combo)
         self.significant_digits_label = self.rounding_group.layout().labelForField(self.significant_digits_spin)
         self.rounding_mode_label = self.rounding_group.layout().labelForField(self.rounding_mode_combo)
         self.language_label = self.language_group.layout().labelForField(self.language_combo)
@@ -87,6 +92,9 @@ class SettingsDialog(QDialog):
         config = self.config_loader.config
 
         self.precision_spin.setValue(config.getint("Calculation", "precision", fallback=28))
+        engine = config.get("Calculation", "numeric_engine", fallback="float64").strip()
+        engine_index = self.numeric_engine_combo.findData(engine)
+        self.numeric_engine_combo.setCurrentIndex(engine_index if engine_index >= 0 else 0)
         self.significant_digits_spin.setValue(
             config.getint("UncertaintyRounding", "significant_digits", fallback=2)
         )
@@ -131,6 +139,7 @@ class SettingsDialog(QDialog):
         self.calibration_group.setTitle("校正点の制限" if ja else "Calibration Point Limits")
 
         self.precision_label.setText("計算精度 (precision):" if ja else "Calculation precision:")
+        self.numeric_engine_label.setText("数値計算エンジン:" if ja else "Numeric engine:")
         self.significant_digits_label.setText("有効数字:" if ja else "Significant digits:")
         self.rounding_mode_label.setText("丸めモード:" if ja else "Rounding mode:")
         self.language_label.setText("表示言語:" if ja else "UI language:")
@@ -138,6 +147,11 @@ class SettingsDialog(QDialog):
         self.min_points_label.setText("最小校正点数:" if ja else "Minimum points:")
         self.max_points_label.setText("最大校正点数:" if ja else "Maximum points:")
 
+        self.numeric_engine_combo.setItemText(
+            0, "float64（桁落ち時は高精度で再計算）" if ja else "float64 (high precision on loss of digits)"
+        )
+        self.numeric_engine_combo.setItemText(1, "常に高精度" if ja else "Always high precision")
+
         current_mode = self.rounding_mode_combo.currentData()
         self.rounding_mode_combo.setItemText(0, "常に切り上げ" if ja else "Always round up")
         self.rounding_mode_combo.setItemText(1, "5%ルール" if ja else "5% rule")
@@ -156,6 +170,7 @@ class SettingsDialog(QDialog):
     def get_values(self):
         return {
             "calculation_precision": str(self.precision_spin.value()),
+            "calculation_numeric_engine": self.numeric_engine_combo.currentData(),
             "rounding_significant_digits": str(self.significant_digits_spin.value()),
             "rounding_mode": self.rounding_mode_combo.currentData(),
             "language_current": self.language_combo.currentData(),
@@ -80,14 +80,40 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': 'Warning',
                    'MONTE_CARLO_RUN': 'Run Simulation',
                    'MONTE_CARLO_MEAN': 'Mean',
                    'MONTE_CARLO_STD': 'Standard Deviation',
-                   'MONTE_CARLO_INTERVAL_95': '95% Interval (mean ± 1.96σ)',
-                   'MONTE_CARLO_INTERVAL_95_EMPIRICAL': '95% Interval (empirical percentile)',
+                   'MONTE_CARLO_INTERVAL_95': '{p}% Interval (mean ± {k}σ)',
+                   'MONTE_CARLO_INTERVAL_95_EMPIRICAL': '{p}% Interval (probabilistically symmetric)',
+                   'MONTE_CARLO_INTERVAL_SHORTEST': '{p}% Interval (shortest)',
                    'MONTE_CARLO_MIN': 'Minimum',
                    'MONTE_CARLO_MAX': 'Maximum',
                    'MONTE_CARLO_NORMAL_CURVE': 'Normal Curve',
                    'MONTE_CARLO_MEDIAN': 'Median',
                    'MONTE_CARLO_NO_DATA': 'No simulation data',
-                   'MONTE_CARLO_INVALID_INPUT': 'Invalid input for Monte Carlo simulation'},
+                   'MONTE_CARLO_INVALID_INPUT': 'Invalid input for Monte Carlo simulation',
+                   'MONTE_CARLO_SEED': 'Seed',
+                   'MONTE_CARLO_SEED_AUTO': 'Random (new seed each run)',
+                   'MONTE_CARLO_ADAPTIVE': 'Adaptive (stop at numerical tolerance)',
+                   'MONTE_CARLO_SIGNIFICANT_DIGITS': 'Significant digits',
+                   'MONTE_CARLO_COVERAGE_PROBABILITY': 'Coverage probability',
+                   'MONTE_CARLO_TRIALS': 'Trials',
+                   'MONTE_CARLO_ELAPSED': 'Time',
+                   'MONTE_CARLO_TOLERANCE': 'Numerical tolerance',
+                   'MONTE_CARLO_NOT_CONVERGED': 'not reached within the trial limit',
+                   'MONTE_CARLO_RUN_ALL': 'Run All Points',
+                   'MONTE_CARLO_BATCH_RESULTS': 'Results for All Points (common random numbers)',
+                   'MONTE_CARLO_CANCEL': 'Cancel',
+                   'MONTE_CARLO_AUTO_RUN': 'Run automatically when this tab is opened',
+                   'MONTE_CARLO_SAMPLING': 'Sampling',
+                   'MONTE_CARLO_SAMPLING_RANDOM': 'Pseudo-random',
+                   'MONTE_CARLO_SAMPLING_SOBOL': 'Scrambled Sobol (quasi-Monte Carlo)',
+                   'MONTE_CARLO_SAMPLING_LHS': 'Latin hypercube',
+                   'MONTE_CARLO_REPLICATES': 'Randomized replicates',
+                   'MONTE_CARLO_STANDARD_ERROR': 'Standard error of y / u(y)',
+                   'MONTE_CARLO_CONTROL_VARIATE': 'Use the GUM linearization as a control variate',
+                   'MONTE_CARLO_ANTITHETIC': 'Antithetic pairs (pseudo-random only)',
+                   'MONTE_CARLO_KEEP_SAMPLES': 'Keep samples on disk (inputs and output)',
+                   'MONTE_CARLO_EXPORT_SAMPLES': 'Export samples (CSV)...',
+                   'MONTE_CARLO_CONTROLLED_ESTIMATE': 'Variance-reduced y / u(y)',
+                   'MONTE_CARLO_CORRELATION_ADJUSTMENT': 'Correlation matrix adjustment'},
  'PartialDerivativeTab': {'LABEL_EQUATION': 'Equation',
                           'ERROR_OCCURRED': 'An error occurred.',
                           'PARTIAL_DERIVATIVE_TITLE': 'Partial Derivative',
@@ -206,7 +232,11 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': 'Warning',
                'REVISION_APPROVER': 'Approver',
                'REVISION_DATE': 'Revised Date',
                'REPORT_DOCUMENT_INFO': 'Document Information',
-               'REPORT_REVISION_HISTORY': 'Revision History'},
+               'REPORT_REVISION_HISTORY': 'Revision History',
+               'REPORT_MONTE_CARLO': 'Monte Carlo Method (GUM Supplement 1)',
+               'REPORT_MONTE_CARLO_CONDITIONS': 'Trials per point: {trials}, seed: {seed} (common random numbers across points)',
+               'REPORT_MONTE_CARLO_INTERVAL': '{p}% Coverage Interval (probabilistically symmetric)',
+               'REPORT_MONTE_CARLO_SHORTEST_INTERVAL': '{p}% Shortest Coverage Interval'},
  'SettingsDialog': {'BUTTON_SAVE': 'Save', 'BUTTON_CANCEL': 'Cancel'},
  'UncertaintyCalculationTab': {'DEGREES_OF_FREEDOM': 'Degrees of Freedom',
                                'CENTRAL_VALUE': 'Central Value',
@@ -224,7 +254,12 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': 'Warning',
                                'COMBINED_STANDARD_UNCERTAINTY': 'Combined Standard Uncertainty',
                                'EFFECTIVE_DEGREES_OF_FREEDOM': 'Effective Degrees of Freedom',
                                'COVERAGE_FACTOR': 'Coverage Factor k',
-                               'EXPANDED_UNCERTAINTY': 'Expanded Uncertainty U'},
+                               'EXPANDED_UNCERTAINTY': 'Expanded Uncertainty U',
+                               'SENSITIVITY_METHOD': 'Sensitivity Method',
+                               'SENSITIVITY_METHOD_SYMBOLIC': 'Symbolic differentiation',
+                               'SENSITIVITY_METHOD_COMPLEX_STEP': 'Complex-step differentiation',
+                               'SENSITIVITY_METHOD_RICHARDSON': 'Richardson extrapolation',
+                               'SENSITIVITY_ERROR_ESTIMATE': 'Estimated error'},
  'VariablesTab': {'LABEL_UNIT': 'Unit',
                   'LABEL_DEFINITION': 'Definition',
                   'CALIBRATION_POINT_SELECTION': 'Select Calibration Point',
@@ -253,6 +288,11 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': 'Warning',
                   'RECTANGULAR_DISTRIBUTION': 'Rectangular Distribution',
                   'TRIANGULAR_DISTRIBUTION': 'Triangular Distribution',
                   'U_DISTRIBUTION': 'U-shaped Distribution',
+                  'TRAPEZOIDAL_DISTRIBUTION': 'Trapezoidal Distribution',
+                  'CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION': 'Curvilinear Trapezoidal Distribution',
+                  'LOGNORMAL_DISTRIBUTION': 'Lognormal Distribution',
+                  'STUDENT_T_DISTRIBUTION': 't-Distribution',
+                  'DISTRIBUTION_PARAMETER': 'Shape Parameter',
                   'DIVISOR': 'Divisor',
                   'HALF_WIDTH': 'Half-width',
                   'CALCULATION_FORMULA': 'Calculation Formula',
@@ -78,14 +78,40 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': '警告',
                    'MONTE_CARLO_RUN': 'シミュレーション実行',
                    'MONTE_CARLO_MEAN': '平均',
                    'MONTE_CARLO_STD': '標準偏差',
-                   'MONTE_CARLO_INTERVAL_95': '95%区間 (平均 ± 1.96σ)',
-                   'MONTE_CARLO_INTERVAL_95_EMPIRICAL': '95%区間 (実測パーセンタイル)',
+                   'MONTE_CARLO_INTERVAL_95': '{p}%区間 (平均 ± {k}σ)',
+                   'MONTE_CARLO_INTERVAL_95_EMPIRICAL': '{p}%区間 (確率的に対称)',
+                   'MONTE_CARLO_INTERVAL_SHORTEST': '{p}%区間 (最短)',
                    'MONTE_CARLO_MIN': '最小値',
                    'MONTE_CARLO_MAX': '最大値',
                    'MONTE_CARLO_NORMAL_CURVE': '正規分布曲線',
                    'MONTE_CARLO_MEDIAN': '中央値',
                    'MONTE_CARLO_NO_DATA': 'シミュレーションデータがありません',
-                   'MONTE_CARLO_INVALID_INPUT': 'モンテカルロ計算の入力値が不正です'},
+                   'MONTE_CARLO_INVALID_INPUT': 'モンテカルロ計算の入力値が不正です',
+                   'MONTE_CARLO_SEED': 'シード',
+                   'MONTE_CARLO_SEED_AUTO': '空欄で実行ごとに自動設定',
+                   'MONTE_CARLO_ADAPTIVE': '数値許容差に達するまで試行する（適応的）',
+                   'MONTE_CARLO_SIGNIFICANT_DIGITS': '有効数字の桁数',
+                   'MONTE_CARLO_COVERAGE_PROBABILITY': '包含確率',
+                   'MONTE_CARLO_TRIALS': '試行回数',
+                   'MONTE_CARLO_ELAPSED': '計算時間',
+                   'MONTE_CARLO_TOLERANCE': '数値許容差',
+                   'MONTE_CARLO_NOT_CONVERGED': '上限の試行回数までに未達',
+                   'MONTE_CARLO_RUN_ALL': '全校正点を実行',
+                   'MONTE_CARLO_BATCH_RESULTS': '全校正点の結果（共通乱数）',
+                   'MONTE_CARLO_CANCEL': '中止',
+                   'MONTE_CARLO_AUTO_RUN': 'タブを開いたときに自動で実行する',
+                   'MONTE_CARLO_SAMPLING': '抽出方法',
+                   'MONTE_CARLO_SAMPLING_RANDOM': '擬似乱数',
+                   'MONTE_CARLO_SAMPLING_SOBOL': 'スクランブル Sobol 列（準モンテカルロ）',
+                   'MONTE_CARLO_SAMPLING_LHS': 'ラテン超方格',
+                   'MONTE_CARLO_REPLICATES': '乱択化の反復数',
+                   'MONTE_CARLO_STANDARD_ERROR': 'y / u(y) の標準誤差',
+                   'MONTE_CARLO_CONTROL_VARIATE': 'GUM の線形化モデルを制御変量に使う',
+                   'MONTE_CARLO_ANTITHETIC': '対称な対で抽出する（擬似乱数のみ）',
+                   'MONTE_CARLO_KEEP_SAMPLES': '標本をディスクに保存（入力量と出力）',
+                   'MONTE_CARLO_EXPORT_SAMPLES': '標本を書き出し（CSV）...',
+                   'MONTE_CARLO_CONTROLLED_ESTIMATE': '分散を減らした y / u(y)',
+                   'MONTE_CARLO_CORRELATION_ADJUSTMENT': '相関行列の補正'},
  'PartialDerivativeTab': {'LABEL_EQUATION': '数式',
                           'ERROR_OCCURRED': 'エラーが発生しました。',
                           'PARTIAL_DERIVATIVE_TITLE': '偏微分',
@@ -204,7 +230,11 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': '警告',
                'REVISION_APPROVER': '承認者',
                'REVISION_DATE': '改定日',
                'REPORT_DOCUMENT_INFO': '文書情報',
-               'REPORT_REVISION_HISTORY': '改訂履歴'},
+               'REPORT_REVISION_HISTORY': '改訂履歴',
+               'REPORT_MONTE_CARLO': 'モンテカルロ法（GUM補遺1）',
+               'REPORT_MONTE_CARLO_CONDITIONS': '試行回数（各校正点）: {trials}、シード: {seed}（校正点間で共通乱数）',
+               'REPORT_MONTE_CARLO_INTERVAL': '{p}%包含区間（確率的に対称）',
+               'REPORT_MONTE_CARLO_SHORTEST_INTERVAL': '{p}%最短包含区間'},
  'SettingsDialog': {'BUTTON_SAVE': '保存', 'BUTTON_CANCEL': 'キャンセル'},
  'UncertaintyCalculationTab': {'DEGREES_OF_FREEDOM': '自由度',
                                'CENTRAL_VALUE': '中央値',
@@ -222,7 +252,12 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': '警告',
                                'COMBINED_STANDARD_UNCERTAINTY': '合成標準不確かさ',
                                'EFFECTIVE_DEGREES_OF_FREEDOM': '有効自由度',
                                'COVERAGE_FACTOR': '包含係数',
-                               'EXPANDED_UNCERTAINTY': '拡張不確かさ'},
+                               'EXPANDED_UNCERTAINTY': '拡張不確かさ',
+                               'SENSITIVITY_METHOD': '感度係数の計算方法',
+                               'SENSITIVITY_METHOD_SYMBOLIC': '記号微分',
+                               'SENSITIVITY_METHOD_COMPLEX_STEP': '複素ステップ微分',
+                               'SENSITIVITY_METHOD_RICHARDSON': 'Richardson外挿',
+                               'SENSITIVITY_ERROR_ESTIMATE': '誤差の見積もり'},
  'VariablesTab': {'LABEL_UNIT': '単位',
                   'LABEL_DEFINITION': '定義',
                   'CALIBRATION_POINT_SELECTION': '校正点の選択',
@@ -251,6 +286,11 @@ translations = {'CorrelationTab': {'MESSAGE_WARNING': '警告',
                   'RECTANGULAR_DISTRIBUTION': '矩形分布',
                   'TRIANGULAR_DISTRIBUTION': '三角分布',
                   'U_DISTRIBUTION': 'U字型分布',
+                  'TRAPEZOIDAL_DISTRIBUTION': '台形分布',
+                  'CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION': '曲線台形分布',
+                  'LOGNORMAL_DISTRIBUTION': '対数正規分布',
+                  'STUDENT_T_DISTRIBUTION': 't 分布',
+                  'DISTRIBUTION_PARAMETER': '形状パラメータ',
                   'DIVISOR': '除数',
                   'HALF_WIDTH': '半値幅',
                   'CALCULATION_FORMULA': '計算式',
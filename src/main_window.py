@@ -25,14 +25,23 @@ from src.dialogs.settings_dialog import SettingsDialog
 from src.dialogs.bulk_input_dialog import BulkInputDialog
 from src.utils.language_manager import LanguageManager
 from src.utils.config_loader import ConfigLoader
+from src.utils.change_bus import (
+    ChangeBus,
+    CORRELATION_CHANGED,
+    EQUATION_CHANGED,
+    POINTS_CHANGED,
+    VALUES_CHANGED,
+    VARIABLES_CHANGED,
+)
 
 from src.utils.translation_keys import *
 from src.utils.variable_utils import create_empty_value_dict, get_distribution_translation_key
+from src.utils.numeric_derivatives import SYMBOLIC, normalize_derivative_backend
 
 class MainWindow(QMainWindow):
     _SAVE_ALLOWED_VAR_KEYS = {
         'A': ('unit', 'definition', 'type', 'values'),
-        'B': ('unit', 'definition', 'type', 'distribution', 'divisor', 'values'),
+        'B': ('unit', 'definition', 'type', 'distribution', 'distribution_parameter', 'divisor', 'values'),
         'fixed': ('unit', 'definition', 'type', 'values'),
     }
     _SAVE_ALLOWED_VALUE_KEYS = {
@@ -67,7 +76,11 @@ class MainWindow(QMainWindow):
         self.variables = []
         self.result_variables = []
         self.correlation_coefficients = {}
+        # 相関係数を変更したら進める（相関行列キャッシュの判定に使う）
+        self.correlation_version = 0
         self.variable_values = {}
+        # 感度係数の計算方法（symbolic / complex_step / richardson）
+        self.derivative_backend = SYMBOLIC
         self.last_equation = ""
         self.value_count = 1
         self.current_value_index = 0
@@ -82,9 +95,13 @@ class MainWindow(QMainWindow):
             'revision_history': ''
         }
         
+        # 編集内容の通知をまとめて、各タブの更新を1周回に1回にする
+        self.change_bus = ChangeBus(self)
+
         # UIの初期化
         self.setup_ui()
         self.create_menu_bar()
+        self._subscribe_refreshes()
 
     def set_current_file_path(self, file_path):
         """現在開いているファイルパスを設定して、タイトルを更新する"""
@@ -117,7 +134,10 @@ class MainWindow(QMainWindow):
         self.variables_tab = VariablesTab(self)
         self.correlation_tab = CorrelationTab(self)
         self.uncertainty_calculation_tab = UncertaintyCalculationTab(self)
+        # バジェットはワーカースレッドで計算してGUIを止めない
+        self.uncertainty_calculation_tab.run_in_background = True
         self.monte_carlo_tab = MonteCarloTab(self)
+        self.monte_carlo_tab.run_in_background = True
         self.partial_derivative_tab = PartialDerivativeTab(self)
         self.report_tab = ReportTab(self)
         self.unit_validation_tab = UnitValidationTab(self)
@@ -143,6 +163,63 @@ class MainWindow(QMainWindow):
 
         layout.addWidget(self.tab_widget)
 
+    def _subscribe_refreshes(self):
+        """変更の種類ごとに、更新が必要なタブを登録する"""
+        bus = self.change_bus
+        bus.subscribe(
+            'variables_tab',
+            (VARIABLES_CHANGED, POINTS_CHANGED, VALUES_CHANGED),
+            self._refresh_variables_tab,
+        )
+        bus.subscribe(
+            'correlation_tab',
+            (VARIABLES_CHANGED, CORRELATION_CHANGED),
+            lambda events: self.correlation_tab.refresh_matrix(),
+        )
+        bus.subscribe(
+            'uncertainty_calculation_tab',
+            (VARIABLES_CHANGED, EQUATION_CHANGED, POINTS_CHANGED, VALUES_CHANGED),
+            self._refresh_uncertainty_calculation_tab,
+        )
+        bus.subscribe(
+            'partial_derivative_tab',
+            (EQUATION_CHANGED,),
+            lambda events: self.partial_derivative_tab.update_equation_display(),
+        )
+        bus.subscribe(
+            'monte_carlo_tab',
+            (VARIABLES_CHANGED, EQUATION_CHANGED, POINTS_CHANGED, VALUES_CHANGED, CORRELATION_CHANGED),
+            self.monte_carlo_tab.on_inputs_changed,
+        )
+        bus.subscribe(
+            'report_tab',
+            (VARIABLES_CHANGED, EQUATION_CHANGED, POINTS_CHANGED, VALUES_CHANGED),
+            self._refresh_report_tab,
+        )
+
+    def _refresh_variables_tab(self, events):
+        kinds = {event.kind for event in events}
+        if VARIABLES_CHANGED in kinds:
+            self.variables_tab.update_variable_list(self.variables, self.result_variables)
+        if POINTS_CHANGED in kinds:
+            self.variables_tab.update_value_combo()
+        if VALUES_CHANGED in kinds:
+            self.variables_tab.restore_selection_state()
+
+    def _refresh_uncertainty_calculation_tab(self, events):
+        kinds = {event.kind for event in events}
+        if kinds & {VARIABLES_CHANGED, EQUATION_CHANGED}:
+            self.uncertainty_calculation_tab.update_result_combo()
+        if kinds & {EQUATION_CHANGED, POINTS_CHANGED, VALUES_CHANGED}:
+            self.uncertainty_calculation_tab.update_value_combo()
+
+    def _refresh_report_tab(self, events):
+        if any(event.kind == VARIABLES_CHANGED for event in events):
+            # 変数一覧の更新でレポートも作り直される
+            self.report_tab.update_variable_list(self.variables, self.result_variables)
+        else:
+            self.report_tab.update_report()
+
     @Slot()
     def on_points_changed(self):
         """
@@ -154,11 +231,7 @@ class MainWindow(QMainWindow):
         if self.current_value_index >= self.value_count:
             self.current_value_index = self.value_count - 1
         self.sync_variable_values_with_points()
-        self.variables_tab.update_value_combo()
-        self.uncertainty_calculation_tab.update_value_combo()
-        if hasattr(self, 'monte_carlo_tab'):
-            self.monte_carlo_tab.refresh_controls()
-        self.report_tab.update_report()
+        self.change_bus.post(POINTS_CHANGED)
 
     def update_menu_bar_text(self):
         """メニューバーのテキストを現在の言語で更新"""
@@ -244,12 +317,7 @@ class MainWindow(QMainWindow):
 
         # 値反映後に関連タブを更新
         self.sync_variable_values_with_points()
-        if hasattr(self, 'variables_tab'):
-            self.variables_tab.restore_selection_state()
-        if hasattr(self, 'uncertainty_calculation_tab'):
-            self.uncertainty_calculation_tab.update_value_combo()
-        if hasattr(self, 'report_tab'):
-            self.report_tab.update_report()
+        self.change_bus.post(VALUES_CHANGED)
         
     def get_save_data(self):
         """保存するデータを辞書にまとめる"""
@@ -262,7 +330,7 @@ class MainWindow(QMainWindow):
             cleaned_info = self._normalize_variable_for_save(var_info)
 
             # 保存時の可読性と差分安定化のため、主要キーの順序を固定する。
-            preferred_key_order = ('unit', 'definition', 'type', 'distribution', 'divisor', 'values')
+            preferred_key_order = ('unit', 'definition', 'type', 'distribution', 'distribution_parameter', 'divisor', 'values')
             ordered_info = {}
             for key in preferred_key_order:
                 if key in cleaned_info:
@@ -294,6 +362,9 @@ class MainWindow(QMainWindow):
             'result_variables': self.result_variables,
             'correlation_coefficients': self.correlation_coefficients,
             'variable_values': save_variable_values,
+
+            # UncertaintyCalculationTab
+            'derivative_backend': self.derivative_backend,
         }
         if hasattr(self, 'regression_tab') and hasattr(self.regression_tab, 'add_to_save_data'):
             self.regression_tab.add_to_save_data(save_data)
@@ -332,6 +403,9 @@ class MainWindow(QMainWindow):
                         self._normalize_value_entry_for_save(value_info, allowed_value_keys)
                         for value_info in values
                     ]
+                elif key == 'distribution_parameter' and not cleaned_info.get(key):
+                    # 形状パラメータのない分布では保存しない
+                    continue
                 else:
                     normalized_info[key] = cleaned_info.get(key, '')
             return normalized_info
@@ -342,14 +416,26 @@ class MainWindow(QMainWindow):
         cleaned_info['values'] = values
         return cleaned_info
         
+    def notify_correlation_changed(self, post=True):
+        """
+        相関係数の変更を通知し、相関行列のキャッシュを無効にする。
+
+        post=False は表示用の正規化など値の意味が変わらない場合で、キャッシュだけを無効にする。
+        """
+        self.correlation_version += 1
+        if post:
+            self.change_bus.post(CORRELATION_CHANGED)
+
     def load_data(self, data, show_message=True):
         """読み込んだデータでアプリケーションの状態を更新"""
         try:
             self.variables = data.get('variables', [])
             self.result_variables = data.get('result_variables', [])
             self.correlation_coefficients = data.get('correlation_coefficients', {})
+            self.notify_correlation_changed()
             self.variable_values = data.get('variable_values', {})
             self.last_equation = data.get('last_equation', "")
+            self.derivative_backend = normalize_derivative_backend(data.get('derivative_backend', SYMBOLIC))
             self.value_count = data.get('value_count', 1)
             self.current_value_index = data.get('current_value_index', 0)
             self.value_names = data.get('value_names', [f"{self.tr(CALIBRATION_POINT_NAME)} {i+1}" for i in range(self.value_count)])
@@ -364,18 +450,6 @@ class MainWindow(QMainWindow):
             if hasattr(self, 'variables_tab') and hasattr(self.variables_tab, 'handlers'):
                 self.variables_tab.handlers.last_selected_variable = None
                 self.variables_tab.handlers.last_selected_value_index = self.current_value_index
-            # UIの更新
-            if hasattr(self, 'variables_tab'):
-                self.variables_tab.update_variable_list(self.variables, self.result_variables)
-                self.variables_tab.restore_selection_state()  # 選択状態と詳細表示をリフレッシュ
-            if hasattr(self, 'correlation_tab'):
-                self.correlation_tab.refresh_matrix()
-            if hasattr(self, 'model_equation_tab'):
-                self.model_equation_tab.set_equation(self.last_equation)
-            if hasattr(self, 'regression_tab'):
-                if hasattr(self.regression_tab, 'load_from_data'):
-                    self.regression_tab.load_from_data(data)
-                self.regression_tab.refresh_model_list()
 
             # 結果変数を含め、すべての変数に必須フィールドを補完
             for var in self.result_variables:
@@ -393,10 +467,22 @@ class MainWindow(QMainWindow):
                     if normalized:
                         var_data['distribution'] = normalized
 
+            # UIの更新（各タブの更新はバスでまとめ、読み込み完了までに実行する）
+            for kind in (VARIABLES_CHANGED, POINTS_CHANGED, CORRELATION_CHANGED, EQUATION_CHANGED):
+                self.change_bus.post(kind)
+            if hasattr(self, 'model_equation_tab'):
+                self.model_equation_tab.set_equation(self.last_equation)
+            if hasattr(self, 'regression_tab'):
+                if hasattr(self.regression_tab, 'load_from_data'):
+                    self.regression_tab.load_from_data(data)
+                self.regression_tab.refresh_model_list()
+            self.change_bus.flush()
+            if hasattr(self, 'variables_tab'):
+                self.variables_tab.restore_selection_state()  # 選択状態と詳細表示をリフレッシュ
+
             # 不確かさ計算タブの計算・テーブル再構築
             if hasattr(self, 'uncertainty_calculation_tab'):
-                self.uncertainty_calculation_tab.update_result_combo()
-                self.uncertainty_calculation_tab.update_value_combo()
+                self.uncertainty_calculation_tab.sync_sensitivity_method()
                 # 選択状態を復元し、計算を実行
                 if self.uncertainty_calculation_tab.result_combo.count() > 0:
                     self.uncertainty_calculation_tab.result_combo.setCurrentIndex(0)
@@ -404,14 +490,6 @@ class MainWindow(QMainWindow):
                 if self.uncertainty_calculation_tab.value_combo.count() > 0:
                     self.uncertainty_calculation_tab.value_combo.setCurrentIndex(0)
                     self.uncertainty_calculation_tab.on_value_changed(0)
-            if hasattr(self, 'monte_carlo_tab'):
-                self.monte_carlo_tab.refresh_controls()
-            if hasattr(self, 'correlation_tab'):
-                self.correlation_tab.refresh_matrix()
-            # レポートタブも必ずリフレッシュ
-            if hasattr(self, 'report_tab'):
-                self.report_tab.update_variable_list(self.variables, self.result_variables)
-                self.report_tab.update_report()
             if show_message:
                 QMessageBox.information(self, self.tr(MESSAGE_SUCCESS), self.tr(FILE_LOADED))
              
@@ -449,6 +527,7 @@ class MainWindow(QMainWindow):
             'result_variables': [],
             'correlation_coefficients': {},
             'variable_values': {},
+            'derivative_backend': SYMBOLIC,
             'regressions': {},
         }
         self.load_data(empty_data, show_message=False)
@@ -629,22 +708,7 @@ class MainWindow(QMainWindow):
         """変数の検出と変数タブの更新"""
         try:
             self.prune_variable_values()
-            if hasattr(self, 'variables_tab'):
-                self.variables_tab.update_variable_list(
-                    self.variables,
-                    self.result_variables
-                )
-            if hasattr(self, 'correlation_tab'):
-                self.correlation_tab.refresh_matrix()
-            if hasattr(self, 'uncertainty_calculation_tab'):
-                self.uncertainty_calculation_tab.update_result_combo()
-            if hasattr(self, 'monte_carlo_tab'):
-                self.monte_carlo_tab.refresh_controls()
-            if hasattr(self, 'report_tab'):
-                self.report_tab.update_variable_list(
-                    self.variables,
-                    self.result_variables
-                )
+            self.change_bus.post(VARIABLES_CHANGED)
         except Exception as e:
             self.log_error(f"変数の検出エラー: {str(e)}", "変数検出エラー", details=traceback.format_exc())
              
@@ -672,6 +736,7 @@ class MainWindow(QMainWindow):
             config_loader.config.add_section("CalibrationPoints")
 
         config_loader.config.set("Calculation", "precision", values["calculation_precision"])
+        config_loader.config.set("Calculation", "numeric_engine", values["calculation_numeric_engine"])
         config_loader.config.set("UncertaintyRounding", "significant_digits", values["rounding_significant_digits"])
         config_loader.config.set("UncertaintyRounding", "rounding_mode", values["rounding_mode"])
         config_loader.config.set("Language", "current", values["language_current"])
@@ -722,6 +787,14 @@ class MainWindow(QMainWindow):
     
 
     
+    def closeEvent(self, event):
+        """終了時に実行中のバックグラウンド計算を取り消して完了を待つ"""
+        for tab in (self.uncertainty_calculation_tab, self.report_tab):
+            tab.budget_runner.cancel()
+        self.monte_carlo_tab.cancel_simulation()
+        self.uncertainty_calculation_tab.budget_runner.wait()
+        super().closeEvent(event)
+
     def changeEvent(self, event):
         """イベント処理（言語変更イベントを検知）"""
         if event.type() == QEvent.LanguageChange:
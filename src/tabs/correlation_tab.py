@@ -92,8 +92,15 @@ class CorrelationTab(BaseTab):
                 normalized_matrix[col_var][row_var] = symmetric_value
 
         self.parent.correlation_coefficients = normalized_matrix
+        # 欠けた要素を埋めただけで相関の値は変わらないので、更新の通知は出さない
+        # （出すと、通知を受けたこの表示の更新とで繰り返しになる）
+        self._notify_correlation_changed(post=False)
         return normalized_matrix
 
+    def _notify_correlation_changed(self, post=True):
+        if hasattr(self.parent, "notify_correlation_changed"):
+            self.parent.notify_correlation_changed(post=post)
+
     def refresh_matrix(self):
         self._updating_table = True
         input_variables = self._get_input_variables()
@@ -186,6 +193,7 @@ class CorrelationTab(BaseTab):
             matrix[row_var][col_var] = value
             matrix[col_var][row_var] = value
             self.parent.correlation_coefficients = matrix
+            self._notify_correlation_changed()
 
             item.setText(f"{value:g}")
             mirror_item = self.matrix_table.item(col_index, row_index)
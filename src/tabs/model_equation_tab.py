@@ -12,8 +12,10 @@ from src.utils.equation_formatter import EquationFormatter
 from src.tabs.base_tab import BaseTab
 from src.utils.translation_keys import *
 from src.utils.equation_handler import EquationHandler
+from src.utils.equation_graph import EquationGraph
 from src.utils.equation_normalizer import normalize_equation_text, normalize_variable_name
 from src.utils.app_logger import log_debug, log_error
+from src.utils.change_bus import EQUATION_CHANGED
 
 class DraggableListWidget(QListWidget):
     order_changed = Signal(list)  # 並び順変更時に新しい順序を通知するシグナル
@@ -195,23 +197,16 @@ class ModelEquationTab(BaseTab):
             return
 
         try:
+            # 循環参照のあるモデル式は適用しない
+            EquationGraph.from_text(current_equation)
             applied = self.check_equation_changes(current_equation)
             if not applied:
                 self.update_html_display(self.parent.last_equation)
                 return
 
-            # 偏微分タブを更新
-            if hasattr(self.parent, 'partial_derivative_tab'):
-                self.parent.partial_derivative_tab.update_equation_display()
-
-            # レポートタブを更新
-            if hasattr(self.parent, 'report_tab'):
-                self.parent.report_tab.update_report()
-
-            # 不確かさ計算タブを更新
-            if hasattr(self.parent, 'uncertainty_calculation_tab'):
-                self.parent.uncertainty_calculation_tab.update_result_combo()
-                self.parent.uncertainty_calculation_tab.update_value_combo()
+            # 偏微分・レポート・不確かさ計算タブの更新を通知
+            if hasattr(self.parent, 'change_bus'):
+                self.parent.change_bus.post(EQUATION_CHANGED)
                 
         except Exception as e:
             log_error(f"方程式処理エラー: {str(e)}", details=traceback.format_exc())
@@ -360,19 +355,11 @@ class ModelEquationTab(BaseTab):
                             del self.parent.variable_values[var]
 
                     
-                    # 必要なら親側の変数検出処理も再実行
+                    # 必要なら親側の変数検出処理も再実行（Variables タブなどの一覧も更新される）
                     if hasattr(self.parent, 'detect_variables'):
 
                         self.parent.detect_variables()
                     
-                    # Variables タブの一覧を更新
-                    if hasattr(self.parent, 'variables_tab'):
-
-                        self.parent.variables_tab.update_variable_list(
-                            self.parent.variables, 
-                            self.parent.result_variables
-                        )
-                    
                     # このタブの変数一覧を更新
                     self.update_variable_list()
                     
@@ -407,17 +394,10 @@ class ModelEquationTab(BaseTab):
                     for var in added_vars:
                         self.parent.ensure_variable_initialized(var, is_result=var in result_vars)
                     
-                    # 必要なら親側の変数検出処理も再実行
+                    # 必要なら親側の変数検出処理も再実行（Variables タブなどの一覧も更新される）
                     if hasattr(self.parent, 'detect_variables'):
                         self.parent.detect_variables()
                     
-                    # Variables タブの一覧を更新
-                    if hasattr(self.parent, 'variables_tab'):
-                        self.parent.variables_tab.update_variable_list(
-                            self.parent.variables, 
-                            self.parent.result_variables
-                        )
-                    
                     # このタブの変数一覧を更新
                     self.update_variable_list()
                 
@@ -450,55 +430,11 @@ class ModelEquationTab(BaseTab):
             str: 展開済みの式。例: 'W = (V_MEAS + V_CAL) * (I_MEAS + I_CAL)'
         """
         try:
-            # 左辺をキー、右辺を値とする辞書へ変換
-            eq_dict = {}
-            for eq in equations:
-                if '=' not in eq:
-                    continue
-                left, right = eq.split('=', 1)
-                eq_dict[left.strip()] = right.strip()
-            
-            # 対象変数の式を取得
-            if target_var not in eq_dict:
+            graph = EquationGraph(equations)
+            if target_var not in graph:
                 return None
-            
-            # 右辺を再帰的に展開
-            def expand_expression(expr):
-                # 文字列を演算子単位で分解
-                terms = []
-                current_term = ''
-                i = 0
-                while i < len(expr):
-                    char = expr[i]
-                    if char in '+-*/^()':
-                        if current_term:
-                            terms.append(current_term.strip())
-                            current_term = ''
-                        terms.append(char)
-                    else:
-                        current_term += char
-                    i += 1
-                if current_term:
-                    terms.append(current_term.strip())
-                
-                # 各項を再帰的に展開
-                expanded_terms = []
-                for term in terms:
-                    if term in '+-*/^()':
-                        expanded_terms.append(term)
-                    else:
-                        # 他の式で定義されていればさらに展開
-                        if term in eq_dict:
-                            expanded_terms.append(f"({expand_expression(eq_dict[term])})")
-                        else:
-                            expanded_terms.append(term)
-                
-                return ''.join(expanded_terms)
-            
-            # 対象変数の右辺を展開
-            expanded_right = expand_expression(eq_dict[target_var])
-            return f"{target_var} = {expanded_right}"
-            
+            return f"{target_var} = {graph.expand(target_var)}"
+
         except Exception as e:
             log_error(f"式展開エラー: {str(e)}", details=traceback.format_exc())
             return None
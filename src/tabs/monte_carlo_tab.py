@@ -1,26 +1,50 @@
+import time
 import traceback
-import math
 
 import numpy as np
-import sympy as sp
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QCoreApplication, Qt
 from PySide6.QtGui import QColor, QPainter, QPen
 from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QCheckBox,
     QComboBox,
+    QDoubleSpinBox,
+    QFileDialog,
     QFormLayout,
     QGroupBox,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
+    QProgressBar,
     QPushButton,
     QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
 
 from src.tabs.base_tab import BaseTab
 from src.utils.app_logger import log_error
+from src.utils.background_jobs import BackgroundJobRunner
+from src.utils.correlation_matrix import factorize_correlation, get_correlation_matrix
+from src.utils.distributions import get_distribution, has_shape_parameter
 from src.utils.equation_handler import EquationHandler
-from src.utils.equation_normalizer import normalize_equation_text
+from src.utils.config_loader import get_config
+from src.utils.monte_carlo import (
+    DEFAULT_COVERAGE_PROBABILITY,
+    MonteCarloInput,
+    MonteCarloModel,
+    SAMPLING_LATIN_HYPERCUBE,
+    SAMPLING_RANDOM,
+    SAMPLING_SOBOL,
+    run_adaptive_monte_carlo,
+    run_monte_carlo,
+    run_monte_carlo_batch,
+    run_replicated_monte_carlo,
+)
+from src.utils.sample_store import prune_sample_stores
+from src.utils.special_functions import ndtri
 from src.utils.translation_keys import *
 from src.utils.value_handler import ValueHandler
 from src.utils.variable_utils import get_distribution_translation_key
@@ -31,7 +55,7 @@ class HistogramWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._samples = np.array([], dtype=float)
+        self._total_count = 0.0
         self._counts = np.array([], dtype=float)
         self._bins = np.array([], dtype=float)
         self._sigma_bounds = None
@@ -53,7 +77,7 @@ class HistogramWidget(QWidget):
         self.update()
 
     def clear_data(self):
-        self._samples = np.array([], dtype=float)
+        self._total_count = 0.0
         self._counts = np.array([], dtype=float)
         self._bins = np.array([], dtype=float)
         self._sigma_bounds = None
@@ -71,10 +95,19 @@ class HistogramWidget(QWidget):
             self.clear_data()
             return
 
-        self._samples = array
         counts, bins = np.histogram(array, bins=self.DEFAULT_BINS)
-        self._counts = counts.astype(float)
-        self._bins = bins.astype(float)
+        self.set_histogram(counts, bins)
+
+    def set_histogram(self, counts, bins):
+        """集計済みのヒストグラム（度数とビン境界）を表示する"""
+        counts = np.asarray(counts, dtype=float)
+        if counts.size == 0 or float(np.sum(counts)) <= 0:
+            self.clear_data()
+            return
+
+        self._counts = counts
+        self._bins = np.asarray(bins, dtype=float)
+        self._total_count = float(np.sum(counts))
         self.update()
 
     def set_reference_lines(self, sigma_bounds, interval95_bounds, empirical_interval95_bounds=None):
@@ -178,7 +211,7 @@ class HistogramWidget(QWidget):
             mean = self._normal_curve_mean
             coeff = 1.0 / (std * np.sqrt(2.0 * np.pi))
             pdf = coeff * np.exp(-0.5 * ((xs - mean) / std) ** 2)
-            ys = pdf * max(len(self._samples), 1) * max(bin_width, 1e-12)
+            ys = pdf * max(self._total_count, 1.0) * max(bin_width, 1e-12)
 
             curve_pen = QPen(QColor(255, 140, 0))
             curve_pen.setWidth(2)
@@ -289,10 +322,128 @@ class HistogramWidget(QWidget):
         painter.drawText(8, plot_rect.top() + 5, y_text)
 
 
+class _SimulationRequest:
+    """1回分の実行内容（ワーカースレッドに渡す）"""
+
+    # 途中経過を画面に送る間隔（秒）
+    LIVE_UPDATE_INTERVAL = 0.2
+
+    def __init__(self, model, sample_count, adaptive_digits, max_sample_count, seed, workers, selection_key,
+                 replicates=1, coverage_probability=DEFAULT_COVERAGE_PROBABILITY, store_root=None,
+                 max_stored_runs=1):
+        self.model = model
+        self.sample_count = sample_count
+        self.adaptive_digits = adaptive_digits
+        self.replicates = replicates
+        self.coverage_probability = coverage_probability
+        # 標本を保存する場所（保存しないときは None）
+        self.store_root = store_root
+        self.max_stored_runs = max_stored_runs
+        self.max_sample_count = max_sample_count
+        self.seed = seed
+        self.workers = workers
+        self.selection_key = selection_key
+        correlation = None if model.correlation is None else model.correlation.tobytes()
+        # 入力が同じなら同じ値になる（結果の使い回しの判定に使う）
+        self.fingerprint = (selection_key, model.expression, model.variables, model.inputs, correlation, model.sampling)
+
+    def execute(self, is_cancelled=None, partial=None):
+        if self.adaptive_digits is not None:
+            return run_adaptive_monte_carlo(
+                self.model,
+                significant_digits=self.adaptive_digits,
+                coverage_probability=self.coverage_probability,
+                seed=self.seed,
+                workers=self.workers,
+                max_sample_count=self.max_sample_count,
+                is_cancelled=is_cancelled,
+                partial=partial,
+            )
+        if self.replicates > 1:
+            return run_replicated_monte_carlo(
+                self.model,
+                self.sample_count,
+                self.replicates,
+                seed=self.seed,
+                workers=self.workers,
+                is_cancelled=is_cancelled,
+                partial=partial,
+            )
+        run = run_monte_carlo(
+            self.model,
+            self.sample_count,
+            seed=self.seed,
+            workers=self.workers,
+            is_cancelled=is_cancelled,
+            partial=partial,
+            store_root=self.store_root,
+        )
+        if self.store_root is not None:
+            # 並べ替えとヒストグラムは標本全体を読むので、表示側ではなくここで作る
+            run.prepare_stored_results(self.coverage_probability, HistogramWidget.DEFAULT_BINS)
+            prune_sample_stores(self.store_root, self.max_stored_runs)
+        return run
+
+
+def _execute_in_background(request, context):
+    """ワーカースレッドで実行し、途中経過の要約とヒストグラムを間引いて送る"""
+    last_update = [float('-inf')]
+
+    def partial(done, total, accumulator):
+        now = time.perf_counter()
+        if now - last_update[0] < request.LIVE_UPDATE_INTERVAL:
+            return
+        last_update[0] = now
+        counts, bins = accumulator.display_histogram(HistogramWidget.DEFAULT_BINS)
+        context.report((done, total, accumulator.summary(request.coverage_probability), counts, bins))
+
+    return request.execute(is_cancelled=context.is_cancelled, partial=partial)
+
+
+class _BatchRequest:
+    """全結果量×全校正点の一括実行の内容（ワーカースレッドに渡す）"""
+
+    def __init__(self, models, sample_count, seed, workers, result_variables, point_names, failed):
+        self.models = models
+        self.sample_count = sample_count
+        self.seed = seed
+        self.workers = workers
+        self.result_variables = result_variables
+        self.point_names = point_names
+        # モデルを作れなかった (結果量, 校正点番号)
+        self.failed = failed
+
+    def execute(self, is_cancelled=None, progress=None):
+        return run_monte_carlo_batch(
+            self.models,
+            self.sample_count,
+            seed=self.seed,
+            workers=self.workers,
+            progress=progress,
+            is_cancelled=is_cancelled,
+        )
+
+
+def _execute_batch_in_background(request, context):
+    """ワーカースレッドで一括実行し、全モデル通しの進捗を間引いて送る"""
+    last_update = [float('-inf')]
+
+    def progress(done, total):
+        now = time.perf_counter()
+        if now - last_update[0] < _SimulationRequest.LIVE_UPDATE_INTERVAL:
+            return
+        last_update[0] = now
+        context.report((done, total))
+
+    return request.execute(is_cancelled=context.is_cancelled, progress=progress)
+
+
 class MonteCarloTab(BaseTab):
     DEFAULT_SAMPLE_COUNT = 100000
-    _SQRT2 = math.sqrt(2.0)
-    _EPSILON = 1e-12
+    # 出力はチャンクごとに集計するので、試行回数を増やしてもメモリは増えない
+    MAX_SAMPLE_COUNT = 100000000
+    DEFAULT_SIGNIFICANT_DIGITS = 2
+    MAX_REPLICATES = 100
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -301,6 +452,23 @@ class MonteCarloTab(BaseTab):
         self.equation_handler = EquationHandler(parent)
         self._has_simulation_result = False
         self._last_simulation_key = None
+        self._last_fingerprint = None
+        self._pending_request = None
+        # True のときはワーカースレッドで実行する（メインウィンドウで有効にする）
+        self.run_in_background = False
+        self.simulation_runner = BackgroundJobRunner(self)
+        self.simulation_runner.item_partial.connect(self._on_simulation_partial)
+        self.simulation_runner.item_ready.connect(self._on_simulation_ready)
+        self.simulation_runner.item_failed.connect(self._on_simulation_failed)
+        self.simulation_runner.finished.connect(self._on_simulation_finished)
+        # 直近の実行記録（シードを含む）
+        self.last_run = None
+        # 全校正点一括実行の結果（(結果量, 校正点名, 要約 or None) のリスト）
+        self.batch_results = []
+        self.last_batch = None
+        self._batch_layout = ([], [])
+        # 一括実行でモデルを作れなかった (結果量, 校正点番号)
+        self.batch_failed = set()
         self.setup_ui()
         self.refresh_controls()
 
@@ -321,20 +489,90 @@ class MonteCarloTab(BaseTab):
         settings_layout.addRow(self.variable_label, self.variable_combo)
 
         self.samples_spin = QSpinBox()
-        self.samples_spin.setRange(100, 500000)
+        self.samples_spin.setRange(100, self.MAX_SAMPLE_COUNT)
         self.samples_spin.setValue(self.DEFAULT_SAMPLE_COUNT)
         self.samples_spin.setSingleStep(1000)
         self.samples_spin.valueChanged.connect(self.on_selection_changed)
         self.samples_label = QLabel()
         settings_layout.addRow(self.samples_label, self.samples_spin)
 
+        self.adaptive_check = QCheckBox()
+        self.adaptive_check.toggled.connect(self.on_adaptive_toggled)
+        settings_layout.addRow(self.adaptive_check)
+
+        self.digits_spin = QSpinBox()
+        self.digits_spin.setRange(1, 4)
+        self.digits_spin.setValue(self.DEFAULT_SIGNIFICANT_DIGITS)
+        self.digits_spin.setEnabled(False)
+        self.digits_spin.valueChanged.connect(self.on_selection_changed)
+        self.digits_label = QLabel()
+        settings_layout.addRow(self.digits_label, self.digits_spin)
+
+        self.coverage_spin = QDoubleSpinBox()
+        self.coverage_spin.setRange(50.0, 99.9)
+        self.coverage_spin.setDecimals(1)
+        self.coverage_spin.setSingleStep(0.5)
+        self.coverage_spin.setSuffix(" %")
+        self.coverage_spin.setValue(100.0 * DEFAULT_COVERAGE_PROBABILITY)
+        self.coverage_spin.valueChanged.connect(self.on_coverage_changed)
+        self.coverage_label = QLabel()
+        settings_layout.addRow(self.coverage_label, self.coverage_spin)
+
+        self.sampling_combo = QComboBox()
+        for sampling in (SAMPLING_RANDOM, SAMPLING_SOBOL, SAMPLING_LATIN_HYPERCUBE):
+            self.sampling_combo.addItem("", sampling)
+        self.sampling_combo.currentIndexChanged.connect(self.on_selection_changed)
+        self.sampling_label = QLabel()
+        settings_layout.addRow(self.sampling_label, self.sampling_combo)
+
+        self.replicates_spin = QSpinBox()
+        self.replicates_spin.setRange(1, self.MAX_REPLICATES)
+        self.replicates_spin.setValue(1)
+        self.replicates_spin.valueChanged.connect(self.on_selection_changed)
+        self.replicates_label = QLabel()
+        settings_layout.addRow(self.replicates_label, self.replicates_spin)
+
+        self.control_variate_check = QCheckBox()
+        self.control_variate_check.toggled.connect(self.on_selection_changed)
+        settings_layout.addRow(self.control_variate_check)
+
+        self.antithetic_check = QCheckBox()
+        self.antithetic_check.toggled.connect(self.on_selection_changed)
+        settings_layout.addRow(self.antithetic_check)
+        self.sampling_combo.currentIndexChanged.connect(self._update_sampling_controls)
+
+        self.keep_samples_check = QCheckBox()
+        self.keep_samples_check.toggled.connect(self.on_selection_changed)
+        settings_layout.addRow(self.keep_samples_check)
+        self.replicates_spin.valueChanged.connect(self._update_sampling_controls)
+
+        self.seed_edit = QLineEdit()
+        self.seed_edit.textChanged.connect(self.on_selection_changed)
+        self.seed_label = QLabel()
+        settings_layout.addRow(self.seed_label, self.seed_edit)
+
         self.run_button = QPushButton()
         self.run_button.clicked.connect(self.run_simulation)
         run_layout = QHBoxLayout()
         run_layout.addWidget(self.run_button)
+        self.run_all_button = QPushButton()
+        self.run_all_button.clicked.connect(self.run_all_simulations)
+        run_layout.addWidget(self.run_all_button)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        run_layout.addWidget(self.progress_bar, 1)
+        self.cancel_button = QPushButton()
+        self.cancel_button.clicked.connect(self.cancel_simulation)
+        self.cancel_button.hide()
+        run_layout.addWidget(self.cancel_button)
         run_layout.addStretch(1)
         settings_layout.addRow(run_layout)
 
+        self.auto_run_check = QCheckBox()
+        self.auto_run_check.setChecked(get_config().get_monte_carlo_auto_run())
+        settings_layout.addRow(self.auto_run_check)
+
         self.settings_group.setLayout(settings_layout)
         layout.addWidget(self.settings_group)
 
@@ -351,23 +589,61 @@ class MonteCarloTab(BaseTab):
         self.std_text = QLabel("--")
         self.interval95_text = QLabel("--")
         self.interval95_empirical_text = QLabel("--")
+        self.shortest_interval_text = QLabel("--")
         self.min_text = QLabel("--")
         self.max_text = QLabel("--")
+        self.seed_text = QLabel("--")
+        self.trials_text = QLabel("--")
+        self.elapsed_text = QLabel("--")
+        self.tolerance_text = QLabel("--")
+        self.standard_error_text = QLabel("--")
+        self.controlled_text = QLabel("--")
+        self.correlation_adjustment_text = QLabel("--")
         self.mean_label = QLabel()
         self.std_label = QLabel()
         self.interval95_label = QLabel()
         self.interval95_empirical_label = QLabel()
+        self.shortest_interval_label = QLabel()
         self.min_label = QLabel()
         self.max_label = QLabel()
+        self.seed_result_label = QLabel()
+        self.trials_label = QLabel()
+        self.elapsed_label = QLabel()
+        self.tolerance_label = QLabel()
+        self.standard_error_label = QLabel()
+        self.controlled_label = QLabel()
+        self.correlation_adjustment_label = QLabel()
         stats_layout.addRow(self.mean_label, self.mean_text)
         stats_layout.addRow(self.std_label, self.std_text)
         stats_layout.addRow(self.interval95_label, self.interval95_text)
         stats_layout.addRow(self.interval95_empirical_label, self.interval95_empirical_text)
+        stats_layout.addRow(self.shortest_interval_label, self.shortest_interval_text)
         stats_layout.addRow(self.min_label, self.min_text)
         stats_layout.addRow(self.max_label, self.max_text)
+        stats_layout.addRow(self.seed_result_label, self.seed_text)
+        stats_layout.addRow(self.trials_label, self.trials_text)
+        stats_layout.addRow(self.elapsed_label, self.elapsed_text)
+        stats_layout.addRow(self.tolerance_label, self.tolerance_text)
+        stats_layout.addRow(self.standard_error_label, self.standard_error_text)
+        stats_layout.addRow(self.controlled_label, self.controlled_text)
+        stats_layout.addRow(self.correlation_adjustment_label, self.correlation_adjustment_text)
+        self.export_samples_button = QPushButton()
+        self.export_samples_button.setEnabled(False)
+        self.export_samples_button.clicked.connect(self.export_samples)
+        stats_layout.addRow(self.export_samples_button)
         self.stats_group.setLayout(stats_layout)
         layout.addWidget(self.stats_group)
 
+        self.batch_group = QGroupBox()
+        batch_layout = QVBoxLayout()
+        self.batch_table = QTableWidget(0, 7)
+        self.batch_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.batch_table.verticalHeader().setVisible(False)
+        batch_layout.addWidget(self.batch_table)
+        self.batch_group.setLayout(batch_layout)
+        self.batch_group.setVisible(False)
+        layout.addWidget(self.batch_group)
+
         self.retranslate_ui()
 
     def retranslate_ui(self):
@@ -377,26 +653,71 @@ class MonteCarloTab(BaseTab):
         self.value_label.setText(self.tr(CALIBRATION_POINT) + ":")
         self.variable_label.setText(self.tr(RESULT_VARIABLE) + ":")
         self.samples_label.setText(self.tr(MONTE_CARLO_SAMPLES) + ":")
+        self.adaptive_check.setText(self.tr(MONTE_CARLO_ADAPTIVE))
+        self.sampling_label.setText(self.tr(MONTE_CARLO_SAMPLING) + ":")
+        for index, key in enumerate((MONTE_CARLO_SAMPLING_RANDOM, MONTE_CARLO_SAMPLING_SOBOL, MONTE_CARLO_SAMPLING_LHS)):
+            self.sampling_combo.setItemText(index, self.tr(key))
+        self.replicates_label.setText(self.tr(MONTE_CARLO_REPLICATES) + ":")
+        self.control_variate_check.setText(self.tr(MONTE_CARLO_CONTROL_VARIATE))
+        self.antithetic_check.setText(self.tr(MONTE_CARLO_ANTITHETIC))
+        self.keep_samples_check.setText(self.tr(MONTE_CARLO_KEEP_SAMPLES))
+        self.export_samples_button.setText(self.tr(MONTE_CARLO_EXPORT_SAMPLES))
+        self.digits_label.setText(self.tr(MONTE_CARLO_SIGNIFICANT_DIGITS) + ":")
+        self.coverage_label.setText(self.tr(MONTE_CARLO_COVERAGE_PROBABILITY) + ":")
+        self.seed_label.setText(self.tr(MONTE_CARLO_SEED) + ":")
+        self.seed_edit.setPlaceholderText(self.tr(MONTE_CARLO_SEED_AUTO))
         self.run_button.setText(self.tr(MONTE_CARLO_RUN))
+        self.run_all_button.setText(self.tr(MONTE_CARLO_RUN_ALL))
+        self.cancel_button.setText(self.tr(MONTE_CARLO_CANCEL))
+        self.auto_run_check.setText(self.tr(MONTE_CARLO_AUTO_RUN))
+        self.batch_group.setTitle(self.tr(MONTE_CARLO_BATCH_RESULTS))
         self.mean_label.setText(self.tr(MONTE_CARLO_MEAN) + ":")
         self.std_label.setText(self.tr(MONTE_CARLO_STD) + ":")
-        self.interval95_label.setText(self.tr(MONTE_CARLO_INTERVAL_95) + ":")
-        self.interval95_empirical_label.setText(self.tr(MONTE_CARLO_INTERVAL_95_EMPIRICAL) + ":")
         self.min_label.setText(self.tr(MONTE_CARLO_MIN) + ":")
         self.max_label.setText(self.tr(MONTE_CARLO_MAX) + ":")
+        self.seed_result_label.setText(self.tr(MONTE_CARLO_SEED) + ":")
+        self.trials_label.setText(self.tr(MONTE_CARLO_TRIALS) + ":")
+        self.elapsed_label.setText(self.tr(MONTE_CARLO_ELAPSED) + ":")
+        self.tolerance_label.setText(self.tr(MONTE_CARLO_TOLERANCE) + ":")
+        self.standard_error_label.setText(self.tr(MONTE_CARLO_STANDARD_ERROR) + ":")
+        self.controlled_label.setText(self.tr(MONTE_CARLO_CONTROLLED_ESTIMATE) + ":")
+        self.correlation_adjustment_label.setText(self.tr(MONTE_CARLO_CORRELATION_ADJUSTMENT) + ":")
         self.histogram_widget.set_empty_text(self.tr(MONTE_CARLO_NO_DATA))
+        self._update_interval_labels()
+        self.refresh_controls()
+
+    def _update_interval_labels(self):
+        """包含確率を入れた区間の見出し"""
+        probability = self._coverage_probability()
+        percent = self._format_percent(probability)
+        factor = f"{self._coverage_factor(probability):.3g}"
+        normal_text = self.tr(MONTE_CARLO_INTERVAL_95).format(p=percent, k=factor)
+        symmetric_text = self.tr(MONTE_CARLO_INTERVAL_95_EMPIRICAL).format(p=percent)
+        shortest_text = self.tr(MONTE_CARLO_INTERVAL_SHORTEST).format(p=percent)
+        self.interval95_label.setText(normal_text + ":")
+        self.interval95_empirical_label.setText(symmetric_text + ":")
+        self.shortest_interval_label.setText(shortest_text + ":")
+        self.batch_table.setHorizontalHeaderLabels([
+            self.tr(RESULT_VARIABLE),
+            self.tr(CALIBRATION_POINT),
+            self.tr(MONTE_CARLO_MEAN),
+            self.tr(MONTE_CARLO_STD),
+            symmetric_text,
+            shortest_text,
+            self.tr(MONTE_CARLO_TRIALS),
+        ])
         self.histogram_widget.set_legend_labels(
             "1σ",
-            "95%",
-            self.tr(MONTE_CARLO_INTERVAL_95_EMPIRICAL),
+            f"{percent}%",
+            symmetric_text,
             self.tr(MONTE_CARLO_NORMAL_CURVE),
             self.tr(MONTE_CARLO_MEDIAN),
         )
-        self.refresh_controls()
 
     def showEvent(self, event):
         self.refresh_controls()
-        self.run_simulation()
+        if self.auto_run_check.isChecked():
+            self._run_if_stale()
         super().showEvent(event)
 
     def refresh_controls(self):
@@ -444,17 +765,70 @@ class MonteCarloTab(BaseTab):
     def on_selection_changed(self, *_):
         self._invalidate_results(clear_display=True)
 
+    def on_inputs_changed(self, events=None):
+        """入力が変わったときの更新（一括実行の結果は古くなるので消す）"""
+        self.refresh_controls()
+        self.clear_batch_results()
+
+    def on_adaptive_toggled(self, checked):
+        # 適応的手順では試行回数は自動で決まる
+        self.samples_spin.setEnabled(not checked)
+        self.digits_spin.setEnabled(checked)
+        # 適応的手順はバッチが独立である必要があるので、擬似乱数だけで行う
+        self.sampling_combo.setEnabled(not checked)
+        self.replicates_spin.setEnabled(not checked)
+        self._update_sampling_controls()
+        self.on_selection_changed()
+
+    def on_coverage_changed(self, *_):
+        """包含確率だけが変わったときは、集計済みの結果から区間を求め直す"""
+        self._update_interval_labels()
+        if self.adaptive_check.isChecked():
+            self.on_selection_changed()
+            return
+        if self._has_simulation_result and self.last_run is not None:
+            summary = self.last_run.summary(self._coverage_probability())
+            if summary is not None:
+                counts, bins = self.last_run.display_histogram(HistogramWidget.DEFAULT_BINS)
+                self._display_summary(summary, counts, bins)
+        if self.last_batch is not None and self.batch_results:
+            self.batch_results = self._batch_summaries(self.last_batch)
+            self._show_batch_results()
+
+    def _update_sampling_controls(self, *_):
+        # 対称な対（z, -z）は擬似乱数のときだけ使う
+        self.antithetic_check.setEnabled(self._sampling_method() == SAMPLING_RANDOM)
+        # 標本を保存できるのは1回の実行（適応的手順・レプリケートでない）ときだけ
+        self.keep_samples_check.setEnabled(
+            not self.adaptive_check.isChecked() and int(self.replicates_spin.value()) == 1
+        )
+
     def _current_selection_key(self):
         result_variable = self.variable_combo.currentText().strip()
         value_index = self.value_combo.currentIndex()
         if not result_variable or value_index < 0:
             return None
-        sample_count = int(self.samples_spin.value())
-        return (result_variable, value_index, sample_count)
+        if self.adaptive_check.isChecked():
+            # 適応的手順では包含確率でバッチの大きさと停止条件が変わる
+            sample_setting = ('adaptive', int(self.digits_spin.value()), self._coverage_probability())
+        else:
+            sample_setting = (int(self.samples_spin.value()), self._sampling_method(), int(self.replicates_spin.value()))
+        variance_reduction = (self.control_variate_check.isChecked(), self._use_antithetic())
+        return (
+            result_variable,
+            value_index,
+            sample_setting,
+            variance_reduction,
+            self._keep_samples(),
+            self.seed_edit.text().strip(),
+        )
 
     def _invalidate_results(self, clear_display=True):
+        if self._pending_request is not None:
+            self.cancel_simulation()
         self._has_simulation_result = False
         self._last_simulation_key = None
+        self._last_fingerprint = None
         if clear_display:
             self._clear_result()
 
@@ -463,8 +837,17 @@ class MonteCarloTab(BaseTab):
         self.std_text.setText("--")
         self.interval95_text.setText("--")
         self.interval95_empirical_text.setText("--")
+        self.shortest_interval_text.setText("--")
         self.min_text.setText("--")
         self.max_text.setText("--")
+        self.seed_text.setText("--")
+        self.trials_text.setText("--")
+        self.elapsed_text.setText("--")
+        self.tolerance_text.setText("--")
+        self.standard_error_text.setText("--")
+        self.controlled_text.setText("--")
+        self.correlation_adjustment_text.setText("--")
+        self.export_samples_button.setEnabled(False)
         self.histogram_widget.set_normal_curve(None, None)
         self.histogram_widget.set_median_line(None)
         self.histogram_widget.clear_data()
@@ -473,6 +856,23 @@ class MonteCarloTab(BaseTab):
     def _format_number(value):
         return f"{value:.6g}"
 
+    @staticmethod
+    def _format_percent(probability):
+        return f"{100.0 * probability:g}"
+
+    def _format_interval(self, interval):
+        if interval is None:
+            return "--"
+        return f"[{self._format_number(float(interval[0]))}, {self._format_number(float(interval[1]))}]"
+
+    @staticmethod
+    def _coverage_factor(probability):
+        """正規分布で確率 probability の区間になる包含係数（0.95 なら 1.96）"""
+        return float(ndtri(0.5 * (1.0 + probability)))
+
+    def _coverage_probability(self):
+        return round(self.coverage_spin.value(), 1) / 100.0
+
     def _resolve_distribution_key(self, variable):
         distribution = self.value_handler.get_distribution(variable)
         distribution_key = get_distribution_translation_key(distribution) or distribution
@@ -487,144 +887,17 @@ class MonteCarloTab(BaseTab):
                 return normalized
         return NORMAL_DISTRIBUTION
 
-    def _generate_samples(self, central, standard_uncertainty, distribution_key, sample_count):
-        if sample_count <= 0:
-            return np.array([], dtype=float)
-
-        if standard_uncertainty == 0:
-            return np.full(sample_count, central, dtype=float)
-
-        key = get_distribution_translation_key(distribution_key) or distribution_key
-
-        if key == RECTANGULAR_DISTRIBUTION:
-            half_width = standard_uncertainty * np.sqrt(3.0)
-            return np.random.uniform(central - half_width, central + half_width, sample_count)
-
-        if key == TRIANGULAR_DISTRIBUTION:
-            half_width = standard_uncertainty * np.sqrt(6.0)
-            return np.random.triangular(
-                central - half_width,
-                central,
-                central + half_width,
-                sample_count,
-            )
-
-        if key == U_DISTRIBUTION:
-            half_width = standard_uncertainty * np.sqrt(2.0)
-            beta_values = np.random.beta(0.5, 0.5, sample_count)
-            return central + (2.0 * beta_values - 1.0) * half_width
-
-        return np.random.normal(central, standard_uncertainty, sample_count)
-
-    def _read_correlation_value(self, matrix, var_i, var_j):
-        if not isinstance(matrix, dict):
-            return 0.0
-        try:
-            row = matrix.get(var_i, {})
-            if isinstance(row, dict) and var_j in row:
-                return float(row.get(var_j, 0.0))
-            reverse_row = matrix.get(var_j, {})
-            if isinstance(reverse_row, dict):
-                return float(reverse_row.get(var_i, 0.0))
-        except (TypeError, ValueError):
-            return 0.0
-        return 0.0
-
     def _build_correlation_matrix(self, variables):
-        size = len(variables)
-        correlation_matrix = np.eye(size, dtype=float)
-        matrix = getattr(self.parent, "correlation_coefficients", {})
-
-        for row_index in range(size):
-            for col_index in range(row_index + 1, size):
-                value = self._read_correlation_value(
-                    matrix,
-                    variables[row_index],
-                    variables[col_index],
-                )
-                value = float(np.clip(value, -1.0, 1.0))
-                correlation_matrix[row_index, col_index] = value
-                correlation_matrix[col_index, row_index] = value
+        correlation_matrix = np.clip(get_correlation_matrix(self.parent).submatrix(variables), -1.0, 1.0)
+        np.fill_diagonal(correlation_matrix, 1.0)
         return correlation_matrix
 
-    def _normalize_to_correlation_matrix(self, matrix):
-        sym_matrix = 0.5 * (matrix + matrix.T)
-        eigenvalues, eigenvectors = np.linalg.eigh(sym_matrix)
-        clipped = np.clip(eigenvalues, self._EPSILON, None)
-        psd_matrix = eigenvectors @ np.diag(clipped) @ eigenvectors.T
-
-        diagonal = np.sqrt(np.clip(np.diag(psd_matrix), self._EPSILON, None))
-        normalized = psd_matrix / np.outer(diagonal, diagonal)
-        np.fill_diagonal(normalized, 1.0)
-        return normalized
-
-    def _generate_correlated_normal_scores(self, correlation_matrix, sample_count):
-        matrix = correlation_matrix
-        try:
-            cholesky = np.linalg.cholesky(matrix)
-        except np.linalg.LinAlgError:
-            matrix = self._normalize_to_correlation_matrix(matrix)
-            try:
-                cholesky = np.linalg.cholesky(matrix)
-            except np.linalg.LinAlgError:
-                eigenvalues, eigenvectors = np.linalg.eigh(matrix)
-                clipped = np.clip(eigenvalues, self._EPSILON, None)
-                transform = eigenvectors @ np.diag(np.sqrt(clipped))
-                independent = np.random.normal(size=(sample_count, len(matrix)))
-                return independent @ transform.T
-
-        independent = np.random.normal(size=(sample_count, matrix.shape[0]))
-        return independent @ cholesky.T
-
-    @staticmethod
-    def _standard_normal_cdf(values):
-        flat = np.asarray(values, dtype=float).reshape(-1)
-        cdf_flat = np.fromiter(
-            (0.5 * (1.0 + math.erf(float(value) / MonteCarloTab._SQRT2)) for value in flat),
-            dtype=float,
-            count=flat.size,
-        )
-        return cdf_flat.reshape(np.asarray(values).shape)
-
-    def _transform_from_normal_scores(
-        self,
-        normal_scores,
-        central,
-        standard_uncertainty,
-        distribution_key,
-    ):
-        if standard_uncertainty == 0:
-            return np.full(normal_scores.shape[0], central, dtype=float)
-
-        key = get_distribution_translation_key(distribution_key) or distribution_key
-        probabilities = np.clip(self._standard_normal_cdf(normal_scores), self._EPSILON, 1.0 - self._EPSILON)
-
-        if key == RECTANGULAR_DISTRIBUTION:
-            half_width = standard_uncertainty * np.sqrt(3.0)
-            return central + (2.0 * probabilities - 1.0) * half_width
-
-        if key == TRIANGULAR_DISTRIBUTION:
-            half_width = standard_uncertainty * np.sqrt(6.0)
-            triangular = np.where(
-                probabilities < 0.5,
-                np.sqrt(2.0 * probabilities) - 1.0,
-                1.0 - np.sqrt(2.0 * (1.0 - probabilities)),
-            )
-            return central + triangular * half_width
-
-        if key == U_DISTRIBUTION:
-            half_width = standard_uncertainty * np.sqrt(2.0)
-            return central + half_width * np.sin(np.pi * (probabilities - 0.5))
-
-        return central + standard_uncertainty * normal_scores
-
-    def _sample_input_variable(self, variable, sample_count):
+    def _read_input(self, variable):
         central_raw = self.value_handler.get_central_value(variable)
         uncertainty_raw = self.value_handler.get_standard_uncertainty(variable)
 
         if central_raw in ("", None):
             raise ValueError(f"Missing central value: {variable}")
-
         try:
             central = float(central_raw)
         except (TypeError, ValueError) as exc:
@@ -637,145 +910,437 @@ class MonteCarloTab(BaseTab):
                 standard_uncertainty = float(uncertainty_raw)
             except (TypeError, ValueError) as exc:
                 raise ValueError(f"Invalid uncertainty: {variable}") from exc
-
         if standard_uncertainty < 0:
             raise ValueError(self.tr(MONTE_CARLO_INVALID_INPUT))
 
-        distribution_key = self._resolve_distribution_key(variable)
-        return self._generate_samples(
+        distribution, parameter = self._resolve_distribution(variable)
+        if standard_uncertainty > 0:
+            get_distribution(distribution).check_parameter(parameter, central)
+        return MonteCarloInput(
+            name=variable,
             central=central,
             standard_uncertainty=standard_uncertainty,
-            distribution_key=distribution_key,
-            sample_count=sample_count,
+            distribution=distribution,
+            parameter=parameter,
         )
 
-    def _sample_input_variables(self, variables, sample_count):
-        if not variables:
-            return []
-
-        if len(variables) == 1:
-            return [self._sample_input_variable(variables[0], sample_count)]
-
-        sampled_info = []
-        for variable in variables:
-            central_raw = self.value_handler.get_central_value(variable)
-            uncertainty_raw = self.value_handler.get_standard_uncertainty(variable)
+    def _resolve_distribution(self, variable):
+        """
+        分布のキーと形状パラメータ。
 
-            if central_raw in ("", None):
-                raise ValueError(f"Missing central value: {variable}")
+        Type A は GUM-S1 6.4.9 に従い、自由度 n - 1 の t 分布（尺度は標準不確かさ）にする。
+        """
+        var_info = getattr(self.parent, "variable_values", {}).get(variable, {})
+        if not isinstance(var_info, dict):
+            var_info = {}
+        if var_info.get("type") == "A":
             try:
-                central = float(central_raw)
-            except (TypeError, ValueError) as exc:
-                raise ValueError(f"Invalid central value: {variable}") from exc
-
-            if uncertainty_raw in ("", None):
-                standard_uncertainty = 0.0
-            else:
-                try:
-                    standard_uncertainty = float(uncertainty_raw)
-                except (TypeError, ValueError) as exc:
-                    raise ValueError(f"Invalid uncertainty: {variable}") from exc
-            if standard_uncertainty < 0:
-                raise ValueError(self.tr(MONTE_CARLO_INVALID_INPUT))
-
-            sampled_info.append(
-                (
-                    central,
-                    standard_uncertainty,
-                    self._resolve_distribution_key(variable),
-                )
-            )
-
-        correlation_matrix = self._build_correlation_matrix(variables)
-        normal_scores = self._generate_correlated_normal_scores(correlation_matrix, sample_count)
-
-        sampled_values = []
-        for index, (central, standard_uncertainty, distribution_key) in enumerate(sampled_info):
-            sampled_values.append(
-                self._transform_from_normal_scores(
-                    normal_scores[:, index],
-                    central=central,
-                    standard_uncertainty=standard_uncertainty,
-                    distribution_key=distribution_key,
-                )
-            )
-        return sampled_values
+                degrees_of_freedom = float(self.value_handler.get_degrees_of_freedom(variable))
+            except (TypeError, ValueError):
+                degrees_of_freedom = None
+            if degrees_of_freedom is not None and 0 < degrees_of_freedom < float("inf"):
+                return STUDENT_T_DISTRIBUTION, degrees_of_freedom
+            return NORMAL_DISTRIBUTION, None
+
+        distribution = self._resolve_distribution_key(variable)
+        if not has_shape_parameter(distribution):
+            return distribution, None
+        try:
+            return distribution, float(var_info.get("distribution_parameter", ""))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid shape parameter: {variable}") from exc
 
-    def _evaluate_result_samples(self, result_variable, sample_count):
-        equation = self.equation_handler.get_target_equation(result_variable)
-        if not equation or "=" not in equation:
+    def _compile_result(self, result_variable):
+        """結果量の式をコンパイルする（誤りがあれば実行前に分かるようにする）"""
+        model, variables = self.equation_handler.get_result_model(result_variable)
+        if variables is None:
             raise ValueError(f"No equation: {result_variable}")
-
-        _, right_side = equation.split("=", 1)
-        right_side = right_side.strip()
-        variables = self.equation_handler.get_variables_from_equation(right_side)
         if not variables:
             raise ValueError(f"No input variables: {result_variable}")
+        return model
+
+    def _build_model(self, result_variable, compiled=None, correlation=None):
+        """現在の校正点の入力から、ワーカーに渡せるモデル定義を作る"""
+        if compiled is None:
+            compiled = self._compile_result(result_variable)
+            variables = list(compiled.variables)
+            correlation = self._build_correlation_matrix(variables) if len(variables) > 1 else None
+        inputs = tuple(self._read_input(variable) for variable in compiled.variables)
+        return MonteCarloModel(
+            expression=compiled.expression_text,
+            variables=tuple(compiled.variables),
+            inputs=inputs,
+            correlation=correlation,
+            sampling=self._sampling_method(),
+            control_variate=self.control_variate_check.isChecked(),
+            antithetic=self._use_antithetic(),
+        )
+
+    def _keep_samples(self):
+        return self.keep_samples_check.isEnabled() and self.keep_samples_check.isChecked()
+
+    def _use_antithetic(self):
+        return self.antithetic_check.isChecked() and self._sampling_method() == SAMPLING_RANDOM
+
+    def _sampling_method(self):
+        if self.adaptive_check.isChecked():
+            return SAMPLING_RANDOM
+        return self.sampling_combo.currentData() or SAMPLING_RANDOM
+
+    def _evaluate_result_samples(self, result_variable, sample_count, seed=None):
+        model = self._build_model(result_variable)
+        return model.evaluate(np.random.default_rng(seed), sample_count)
+
+    def _format_tolerance(self, run):
+        if run.tolerance is None:
+            return "--"
+        text = self._format_number(run.tolerance)
+        if not run.converged:
+            text += f" ({self.tr(MONTE_CARLO_NOT_CONVERGED)})"
+        return text
+
+    def _format_standard_errors(self, run):
+        """レプリケートから見積もった y と u(y) の標準誤差"""
+        if run.standard_errors is None:
+            return "--"
+        mean_error, std_error, _, _ = run.standard_errors
+        return f"{self._format_number(mean_error)} / {self._format_number(std_error)}"
+
+    def _format_controlled_estimate(self, summary):
+        """制御変量で分散を減らした y と u(y)（生の値は平均・標準偏差の欄）"""
+        if summary.controlled_standard_deviation is None:
+            return "--"
+        return (
+            f"{self._format_number(summary.controlled_mean)} / "
+            f"{self._format_number(summary.controlled_standard_deviation)}"
+        )
 
-        symbols = {var: sp.Symbol(var) for var in variables}
-        expression = normalize_equation_text(right_side).replace("^", "**")
-        sympy_expr = sp.sympify(expression, locals=symbols)
-        ordered_symbols = [symbols[var] for var in variables]
+    def _format_correlation_adjustment(self, correlation):
+        """半正定値でない相関行列を直したときの、入力した行列からの距離"""
+        if correlation is None:
+            return "--"
+        factorization = factorize_correlation(correlation)
+        if not factorization.repaired:
+            return "--"
+        return (
+            f"‖ΔR‖F = {self._format_number(factorization.distance)}, "
+            f"max |Δr| = {self._format_number(factorization.max_deviation)}"
+        )
 
-        sampled_values = self._sample_input_variables(variables, sample_count)
-        evaluator = sp.lambdify(ordered_symbols, sympy_expr, modules="numpy")
-        result = evaluator(*sampled_values)
+    def _requested_seed(self):
+        """シード欄の値（空欄なら None で、実行ごとに新しいシードを使う）"""
+        text = self.seed_edit.text().strip()
+        if not text:
+            return None
+        try:
+            seed = int(text)
+        except ValueError as exc:
+            raise ValueError(self.tr(MONTE_CARLO_INVALID_INPUT)) from exc
+        if seed < 0:
+            raise ValueError(self.tr(MONTE_CARLO_INVALID_INPUT))
+        return seed
+
+    def _prepare_request(self):
+        """現在の選択と入力から実行内容を作る（選択がなければ None）"""
+        result_variable = self.variable_combo.currentText().strip()
+        value_index = self.value_combo.currentIndex()
+        if not result_variable or value_index < 0:
+            return None
 
-        result_array = np.asarray(result, dtype=float)
-        if result_array.ndim == 0:
-            result_array = np.full(sample_count, float(result_array), dtype=float)
-        return result_array.reshape(-1)
+        self.value_handler.current_value_index = value_index
+        model = self._build_model(result_variable)
+        adaptive_digits = int(self.digits_spin.value()) if self.adaptive_check.isChecked() else None
+        return _SimulationRequest(
+            model=model,
+            sample_count=int(self.samples_spin.value()),
+            adaptive_digits=adaptive_digits,
+            max_sample_count=self.MAX_SAMPLE_COUNT,
+            seed=self._requested_seed(),
+            workers=get_config().get_monte_carlo_workers(),
+            selection_key=self._current_selection_key(),
+            replicates=1 if adaptive_digits is not None else int(self.replicates_spin.value()),
+            coverage_probability=self._coverage_probability(),
+            store_root=get_config().get_monte_carlo_sample_directory() if self._keep_samples() else None,
+            max_stored_runs=get_config().get_monte_carlo_max_stored_runs(),
+        )
 
     def run_simulation(self):
         try:
-            result_variable = self.variable_combo.currentText().strip()
-            value_index = self.value_combo.currentIndex()
-            if not result_variable or value_index < 0:
+            request = self._prepare_request()
+            if request is None:
                 self._invalidate_results(clear_display=True)
                 return
+            self._run_request(request)
+        except Exception as e:
+            self._invalidate_results(clear_display=True)
+            log_error(
+                f"Monte Carlo simulation error: {str(e)}",
+                details=traceback.format_exc(),
+            )
 
-            self.value_handler.current_value_index = value_index
-            sample_count = int(self.samples_spin.value())
-            samples = self._evaluate_result_samples(result_variable, sample_count)
-
-            finite_samples = samples[np.isfinite(samples)]
-            if finite_samples.size == 0:
+    def _run_if_stale(self):
+        """入力が前回の実行から変わっていなければ結果を使い回し、変わっていれば実行する"""
+        try:
+            request = self._prepare_request()
+            if request is None:
                 self._invalidate_results(clear_display=True)
                 return
-
-            mean_value = float(np.mean(finite_samples))
-            std_value = float(np.std(finite_samples, ddof=1)) if finite_samples.size > 1 else 0.0
-            sigma_bounds = (mean_value - std_value, mean_value + std_value)
-            interval95_bounds = (
-                mean_value - 1.96 * std_value,
-                mean_value + 1.96 * std_value,
+            if self._has_simulation_result and request.fingerprint == self._last_fingerprint:
+                return
+            if self._pending_request is not None and request.fingerprint == self._pending_request.fingerprint:
+                return
+            self._run_request(request)
+        except Exception as e:
+            self._invalidate_results(clear_display=True)
+            log_error(
+                f"Monte Carlo simulation error: {str(e)}",
+                details=traceback.format_exc(),
             )
-            empirical_interval95_bounds = np.percentile(finite_samples, [2.5, 97.5])
 
-            self.histogram_widget.set_data(finite_samples)
-            self.histogram_widget.set_reference_lines(
-                sigma_bounds,
-                interval95_bounds,
-                empirical_interval95_bounds,
-            )
-            self.histogram_widget.set_normal_curve(mean_value, std_value)
-            self.histogram_widget.set_median_line(float(np.median(finite_samples)))
-            self.mean_text.setText(self._format_number(mean_value))
-            self.std_text.setText(self._format_number(std_value))
-            self.interval95_text.setText(
-                f"[{self._format_number(interval95_bounds[0])}, {self._format_number(interval95_bounds[1])}]"
+    def _run_request(self, request):
+        if not self.run_in_background:
+            self._show_run(request, request.execute())
+            return
+
+        self.cancel_simulation()
+        self._pending_request = request
+        if request.adaptive_digits is None:
+            self.progress_bar.setRange(0, 1000)
+        else:
+            # 適応的手順は終わりが分からないので進行中の表示だけにする
+            self.progress_bar.setRange(0, 0)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self.cancel_button.show()
+        self.simulation_runner.submit([request], _execute_in_background, with_context=True)
+
+    def cancel_simulation(self):
+        """実行中のシミュレーションを取り消す（途中までの表示は残す）"""
+        self.simulation_runner.cancel()
+        self._pending_request = None
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+
+    def wait_for_simulation(self, msecs=-1):
+        """バックグラウンド実行の完了を待って結果を表示する"""
+        self.simulation_runner.wait(msecs)
+        QCoreApplication.processEvents()
+
+    def _on_simulation_partial(self, request, update):
+        if request is not self._pending_request:
+            return
+        if isinstance(request, _BatchRequest):
+            done, total = update
+            if total > 0:
+                self.progress_bar.setValue(int(1000 * done / total))
+            return
+        done, total, summary, counts, bins = update
+        if request.adaptive_digits is None and total > 0:
+            self.progress_bar.setValue(int(1000 * done / total))
+        self.trials_text.setText(f"{done:,}")
+        if summary is not None:
+            self._display_summary(summary, counts, bins)
+
+    def _on_simulation_ready(self, request, run):
+        if request is not self._pending_request:
+            return
+        if isinstance(request, _BatchRequest):
+            self._show_batch(request, run)
+        else:
+            self._show_run(request, run)
+
+    def _on_simulation_failed(self, request, message):
+        if request is not self._pending_request:
+            return
+        if isinstance(request, _BatchRequest):
+            self.clear_batch_results()
+        else:
+            self._invalidate_results(clear_display=True)
+
+    def _on_simulation_finished(self):
+        self._pending_request = None
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+
+    def _show_run(self, request, run):
+        self.last_run = run
+        summary = run.summary(self._coverage_probability())
+        if summary is None:
+            self._invalidate_results(clear_display=True)
+            return
+
+        counts, bins = run.display_histogram(HistogramWidget.DEFAULT_BINS)
+        self._display_summary(summary, counts, bins)
+        self.seed_text.setText(str(run.seed))
+        self.trials_text.setText(f"{run.completed_count:,}")
+        self.elapsed_text.setText(f"{run.elapsed:.2f} s")
+        self.tolerance_text.setText(self._format_tolerance(run))
+        self.standard_error_text.setText(self._format_standard_errors(run))
+        self.controlled_text.setText(self._format_controlled_estimate(summary))
+        self.correlation_adjustment_text.setText(self._format_correlation_adjustment(request.model.correlation))
+        self.export_samples_button.setEnabled(self._stored_samples() is not None)
+        self._has_simulation_result = True
+        self._last_simulation_key = request.selection_key
+        self._last_fingerprint = request.fingerprint
+
+    def _display_summary(self, summary, counts, bins):
+        mean_value = summary.mean
+        std_value = summary.standard_deviation
+        sigma_bounds = (mean_value - std_value, mean_value + std_value)
+        factor = self._coverage_factor(summary.coverage_probability)
+        interval95_bounds = (
+            mean_value - factor * std_value,
+            mean_value + factor * std_value,
+        )
+        empirical_interval95_bounds = summary.interval
+
+        self.histogram_widget.set_histogram(counts, bins)
+        self.histogram_widget.set_reference_lines(
+            sigma_bounds,
+            interval95_bounds,
+            empirical_interval95_bounds,
+        )
+        self.histogram_widget.set_normal_curve(mean_value, std_value)
+        self.histogram_widget.set_median_line(summary.median)
+        self.mean_text.setText(self._format_number(mean_value))
+        self.std_text.setText(self._format_number(std_value))
+        self.interval95_text.setText(self._format_interval(interval95_bounds))
+        self.interval95_empirical_text.setText(self._format_interval(empirical_interval95_bounds))
+        self.shortest_interval_text.setText(self._format_interval(summary.shortest_interval))
+        self.min_text.setText(self._format_number(summary.minimum))
+        self.max_text.setText(self._format_number(summary.maximum))
+
+    def _stored_samples(self):
+        """直近の実行で保存した標本（保存していなければ None）"""
+        store = getattr(self.last_run, "sample_store", None)
+        if store is None or not store.is_complete():
+            return None
+        return store
+
+    def export_samples(self):
+        """保存した入力量と出力の標本を CSV に書き出す"""
+        store = self._stored_samples()
+        if store is None:
+            return
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, self.tr(MONTE_CARLO_EXPORT_SAMPLES), "", "CSV File (*.csv);;All Files (*)"
+        )
+        if not file_name:
+            return
+        try:
+            store.export_csv(file_name, self.variable_combo.currentText().strip() or "y")
+        except Exception as e:
+            log_error(
+                f"Monte Carlo sample export error: {str(e)}",
+                details=traceback.format_exc(),
             )
-            self.interval95_empirical_text.setText(
-                f"[{self._format_number(float(empirical_interval95_bounds[0]))}, {self._format_number(float(empirical_interval95_bounds[1]))}]"
+
+    def run_all_simulations(self):
+        """全結果量×全校正点を同じシード（共通乱数）で実行し、一覧表に表示する"""
+        try:
+            point_names = list(getattr(self.parent, "value_names", []))
+            result_variables = list(getattr(self.parent, "result_variables", []))
+            models = {}
+            failed = set()
+            for result_variable in result_variables:
+                # 式のコンパイルと相関行列は結果量ごとに1回だけ
+                try:
+                    compiled = self._compile_result(result_variable)
+                except Exception as e:
+                    log_error(f"Monte Carlo model error ({result_variable}): {str(e)}", details=traceback.format_exc())
+                    failed.update((result_variable, index) for index in range(len(point_names)))
+                    continue
+                variables = list(compiled.variables)
+                correlation = self._build_correlation_matrix(variables) if len(variables) > 1 else None
+                for index in range(len(point_names)):
+                    self.value_handler.current_value_index = index
+                    try:
+                        models[(result_variable, index)] = self._build_model(result_variable, compiled, correlation)
+                    except Exception as e:
+                        log_error(
+                            f"Monte Carlo input error ({result_variable}, {point_names[index]}): {str(e)}",
+                            details=traceback.format_exc(),
+                        )
+                        failed.add((result_variable, index))
+
+            request = _BatchRequest(
+                models,
+                int(self.samples_spin.value()),
+                self._requested_seed(),
+                get_config().get_monte_carlo_workers(),
+                result_variables,
+                point_names,
+                failed,
             )
-            self.min_text.setText(self._format_number(float(np.min(finite_samples))))
-            self.max_text.setText(self._format_number(float(np.max(finite_samples))))
-            self._has_simulation_result = True
-            self._last_simulation_key = (result_variable, value_index, sample_count)
+            if not self.run_in_background:
+                self._show_batch(request, request.execute())
+                return
 
+            self.cancel_simulation()
+            self._pending_request = request
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(0)
+            self.progress_bar.show()
+            self.cancel_button.show()
+            self.simulation_runner.submit([request], _execute_batch_in_background, with_context=True)
         except Exception as e:
-            self._invalidate_results(clear_display=True)
+            self.clear_batch_results()
             log_error(
-                f"Monte Carlo simulation error: {str(e)}",
+                f"Monte Carlo batch error: {str(e)}",
                 details=traceback.format_exc(),
             )
+        finally:
+            self.value_handler.current_value_index = max(self.value_combo.currentIndex(), 0)
+
+    def _show_batch(self, request, batch):
+        self.last_batch = batch
+        self._batch_layout = (request.result_variables, request.point_names)
+        self.batch_failed = set(request.failed)
+        self.batch_results = self._batch_summaries(batch)
+        self._show_batch_results()
+
+    def _batch_summaries(self, batch):
+        """一括実行の結果を (結果量, 校正点名, 要約 or None) の一覧にする"""
+        result_variables, point_names = self._batch_layout
+        coverage_probability = self._coverage_probability()
+        results = []
+        for result_variable in result_variables:
+            for index, point_name in enumerate(point_names):
+                run = batch.runs.get((result_variable, index))
+                summary = run.summary(coverage_probability) if run is not None else None
+                results.append((result_variable, point_name, summary))
+        return results
+
+    def clear_batch_results(self):
+        self.batch_results = []
+        self.last_batch = None
+        self.batch_failed = set()
+        self.batch_table.setRowCount(0)
+        self.batch_group.setVisible(False)
+
+    def _show_batch_results(self):
+        point_count = max(len(self._batch_layout[1]), 1)
+        self.batch_table.setRowCount(len(self.batch_results))
+        for row, (result_variable, point_name, summary) in enumerate(self.batch_results):
+            # モデルを作れなかった行は、未実行の行と区別できるように印を付ける
+            failed = (result_variable, row % point_count) in self.batch_failed
+            if summary is None:
+                cells = [result_variable, point_name, "--", "--", "--", "--", "--"]
+            else:
+                cells = [
+                    result_variable,
+                    point_name,
+                    self._format_number(summary.mean),
+                    self._format_number(summary.standard_deviation),
+                    self._format_interval(summary.interval),
+                    self._format_interval(summary.shortest_interval),
+                    f"{summary.count:,}",
+                ]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(str(text))
+                if failed:
+                    item.setForeground(QColor(200, 0, 0))
+                    item.setToolTip(self.tr(MONTE_CARLO_INVALID_INPUT))
+                self.batch_table.setItem(row, column, item)
+        self.batch_table.resizeColumnsToContents()
+        self.batch_group.setVisible(bool(self.batch_results))
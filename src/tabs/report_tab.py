@@ -8,8 +8,10 @@ import numpy as np
 import html as html_lib
 import textwrap
 import re
+from contextlib import nullcontext
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, 
-                             QPushButton, QFileDialog, QTextEdit, QLabel, QMessageBox)
+                             QPushButton, QFileDialog, QTextEdit, QLabel, QMessageBox,
+                             QProgressBar)
 from PySide6.QtCore import Qt, Signal, Slot
 from src.utils.equation_handler import EquationHandler
 from src.utils.value_handler import ValueHandler
@@ -19,6 +21,8 @@ from src.utils.translation_keys import *
 from src.utils.variable_utils import get_distribution_translation_key
 from src.utils.equation_formatter import EquationFormatter
 from src.utils.app_logger import log_error
+from src.utils.correlation_matrix import get_correlation_matrix
+from src.utils.background_jobs import BackgroundJobRunner
 
 class ReportTab(BaseTab):
     UNIT_PLACEHOLDER = '-'
@@ -40,6 +44,7 @@ class ReportTab(BaseTab):
         super().__init__(parent)
         self.parent = parent
         self._last_generated_html = None
+        self._pending_equation = None
 
         
         # 繝ｦ繝ｼ繝・ぅ繝ｪ繝・ぅ繧ｯ繝ｩ繧ｹ縺ｮ蛻晄悄蛹・
@@ -50,6 +55,11 @@ class ReportTab(BaseTab):
 
         self.setup_ui()
 
+        # 全校正点のバジェットを先にワーカーで計算しておく
+        self.budget_runner = BackgroundJobRunner(self)
+        self.budget_runner.progress.connect(self._on_prefetch_progress)
+        self.budget_runner.finished.connect(self._on_prefetch_finished)
+
     def _get_unit(self, var_name):
         """Get unit for a variable."""
         try:
@@ -172,6 +182,10 @@ class ReportTab(BaseTab):
         
         selection_layout.addStretch()
         main_layout.addLayout(selection_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.hide()
+        main_layout.addWidget(self.progress_bar)
         
         # 繝ｬ繝昴・繝郁｡ｨ遉ｺ驛ｨ蛻・
         self.report_display = QTextEdit()
@@ -234,16 +248,73 @@ class ReportTab(BaseTab):
                 return
                 
             # 繝ｬ繝昴・繝医・HTML繧堤函謌・
-            html = self.generate_report_html(equation)
-            self._last_generated_html = html
-            
-            # 繝ｬ繝昴・繝医ｒ陦ｨ遉ｺ
-            self.report_display.setHtml(html)
+            calc_tab = getattr(self.parent, 'uncertainty_calculation_tab', None)
+            if calc_tab is not None and getattr(calc_tab, 'run_in_background', False):
+                self._prefetch_budgets(calc_tab, equation)
+                return
+
+            self._render_report(equation)
 
-            
         except Exception as e:
             log_error(f"繝ｬ繝昴・繝育函謌舌お繝ｩ繝ｼ: {str(e)}", details=traceback.format_exc())
             QMessageBox.warning(self, self.tr(SAVE_ERROR), self.tr(REPORT_SAVE_ERROR))
+
+    def _render_report(self, equation):
+        """レポートのHTMLを作って表示する"""
+        calc_tab = getattr(self.parent, 'uncertainty_calculation_tab', None)
+        # 計算タブの表示を校正点ごとに読み取るので、その間は同期計算にする
+        if calc_tab is not None and hasattr(calc_tab, 'synchronous_calculation'):
+            context = calc_tab.synchronous_calculation()
+        else:
+            context = nullcontext()
+        with context:
+            previous_index = calc_tab.value_combo.currentIndex() if calc_tab is not None else -1
+            html = self.generate_report_html(equation)
+            # 計算タブの表示をレポート作成前の校正点に戻す
+            if previous_index >= 0 and calc_tab.value_combo.currentIndex() != previous_index:
+                calc_tab.value_combo.setCurrentIndex(previous_index)
+        self._last_generated_html = html
+        self.report_display.setHtml(html)
+
+    def _prefetch_budgets(self, calc_tab, equation):
+        """
+        レポートに載せる全校正点のバジェットをワーカーで計算してキャッシュに載せる。
+
+        完了後のHTML作成はキャッシュを読むだけになる。
+        """
+        equations = [equation]
+        calc_result_var = calc_tab.result_combo.currentText()
+        calc_equation = calc_tab.equation_handler.get_target_equation(calc_result_var) if calc_result_var else None
+        if calc_equation and calc_equation not in equations:
+            equations.append(calc_equation)
+        point_names = getattr(self.parent, 'value_names', [])
+        items = [
+            (eq, idx, point_name)
+            for eq in equations
+            for idx, point_name in enumerate(point_names)
+        ]
+        self._pending_equation = equation
+        self.progress_bar.setRange(0, max(len(items), 1))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(len(items) > 1)
+        self.budget_runner.submit(
+            items,
+            lambda item: calc_tab.budget_cache.get(item[0], item[1], point_name=item[2]),
+        )
+
+    def _on_prefetch_progress(self, done, total):
+        self.progress_bar.setValue(done)
+
+    def _on_prefetch_finished(self):
+        self.progress_bar.hide()
+        equation = self._pending_equation
+        self._pending_equation = None
+        if not equation:
+            return
+        try:
+            self._render_report(equation)
+        except Exception as e:
+            log_error(f"レポート生成エラー: {str(e)}", details=traceback.format_exc())
             
 
 
@@ -296,25 +367,6 @@ class ReportTab(BaseTab):
             variable_names = []
         return [name for name in variable_names if name not in result_variables]
 
-    @staticmethod
-    def _read_correlation_value(matrix, row_var, col_var):
-        if not isinstance(matrix, dict):
-            return 0.0
-        row_data = matrix.get(row_var, {})
-        if not isinstance(row_data, dict):
-            row_data = {}
-        raw = row_data.get(col_var, None)
-        if raw is None:
-            reverse_row = matrix.get(col_var, {})
-            if isinstance(reverse_row, dict):
-                raw = reverse_row.get(row_var, 0.0)
-            else:
-                raw = 0.0
-        try:
-            return float(raw)
-        except Exception:
-            return 0.0
-
     @staticmethod
     def _format_matrix_number(value):
         return format(float(value), ".12g")
@@ -324,7 +376,7 @@ class ReportTab(BaseTab):
         if len(input_variables) < 2:
             return ""
 
-        matrix = getattr(self.parent, 'correlation_coefficients', {})
+        correlation = get_correlation_matrix(self.parent).submatrix(input_variables)
         has_non_default_off_diagonal = False
 
         header_cells = "".join(
@@ -338,7 +390,7 @@ class ReportTab(BaseTab):
                 if row_index == col_index:
                     value = 1.0
                 else:
-                    value = self._read_correlation_value(matrix, row_var, col_var)
+                    value = correlation[row_index, col_index]
                     if not np.isclose(value, 0.0):
                         has_non_default_off_diagonal = True
                 data_cells.append(f"<td>{self._format_matrix_number(value)}</td>")
@@ -353,6 +405,61 @@ class ReportTab(BaseTab):
             f"<table><tbody><tr><th></th>{header_cells}</tr>{''.join(rows)}</tbody></table>"
         )
 
+    @staticmethod
+    def _format_monte_carlo_number(value):
+        return format(float(value), ".6g")
+
+    @classmethod
+    def _format_monte_carlo_interval(cls, interval):
+        if interval is None:
+            return "-"
+        return f"[{cls._format_monte_carlo_number(interval[0])}, {cls._format_monte_carlo_number(interval[1])}]"
+
+    def _build_monte_carlo_html(self):
+        """モンテカルロ法タブで全校正点を一括実行した結果があれば表にする"""
+        mc_tab = getattr(self.parent, 'monte_carlo_tab', None)
+        batch = getattr(mc_tab, 'last_batch', None)
+        results = getattr(mc_tab, 'batch_results', None)
+        if batch is None or not results:
+            return ""
+
+        summaries = [summary for _, _, summary in results if summary is not None]
+        probability = summaries[0].coverage_probability if summaries else 0.95
+        percent = f"{100.0 * probability:g}"
+
+        html = f'<div class="title">{self.tr(REPORT_MONTE_CARLO)}</div>'
+        conditions = self.tr(REPORT_MONTE_CARLO_CONDITIONS).format(trials=f"{batch.sample_count:,}", seed=batch.seed)
+        html += f"<div>{html_lib.escape(conditions)}</div>"
+        html += "<table><tr>"
+        html += f"<th>{self.tr(RESULT_VARIABLE)}</th>"
+        html += f"<th>{self.tr(REPORT_CALIBRATION_POINT)}</th>"
+        html += f"<th>{self.tr(REPORT_CENTRAL_VALUE)}</th>"
+        html += f"<th>{self.tr(REPORT_STANDARD_UNCERTAINTY)}</th>"
+        html += f"<th>{self.tr(REPORT_MONTE_CARLO_INTERVAL).format(p=percent)}</th>"
+        html += f"<th>{self.tr(REPORT_MONTE_CARLO_SHORTEST_INTERVAL).format(p=percent)}</th>"
+        html += "</tr>"
+        for result_variable, point_name, summary in results:
+            if summary is None:
+                cells = ["-", "-", "-", "-"]
+            else:
+                cells = [
+                    self._format_monte_carlo_number(summary.mean),
+                    self._format_monte_carlo_number(summary.standard_deviation),
+                    self._format_monte_carlo_interval(summary.interval),
+                    self._format_monte_carlo_interval(summary.shortest_interval),
+                ]
+            unit = self._get_unit(result_variable)
+            html += "<tr>"
+            html += f"<td>{html_lib.escape(str(result_variable))}</td>"
+            html += f"<td>{html_lib.escape(str(point_name))}</td>"
+            html += f"<td>{self._format_with_unit(cells[0], unit)}</td>"
+            html += f"<td>{self._format_with_unit(cells[1], unit)}</td>"
+            html += f"<td>{html_lib.escape(cells[2])}</td>"
+            html += f"<td>{html_lib.escape(cells[3])}</td>"
+            html += "</tr>"
+        html += "</table>"
+        return html
+
     def generate_report_html(self, equation):
         """Build report HTML content."""
         try:
@@ -574,6 +681,8 @@ class ReportTab(BaseTab):
                         html += f"<tr><td>{self.tr(REPORT_EXPANDED_UNCERTAINTY)}</td><td>{calc_tab.expanded_uncertainty_label.text()}</td></tr>"
                         html += f"</table>"
 
+            html += self._build_monte_carlo_html()
+
             html += f'<div class="title">{self.tr(REPORT_REVISION_HISTORY)}</div>'
             html += "<table class=\"revision-table\">"
             html += "<tr>"
@@ -641,6 +750,8 @@ class ReportTab(BaseTab):
         if self.result_combo.count() > 0:
             self.generate_report()
         else:
+            self.budget_runner.cancel()
+            self.progress_bar.hide()
             self._last_generated_html = ""
             self.report_display.clear()
 
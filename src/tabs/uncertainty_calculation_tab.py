@@ -1,13 +1,17 @@
 ﻿from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QComboBox, QTableWidget, QTableWidgetItem, QHeaderView,
                              QGroupBox, QFormLayout, QDoubleSpinBox,
-                             QAbstractItemView)
-from PySide6.QtCore import Qt, Signal, Slot
+                             QAbstractItemView, QProgressBar)
+from PySide6.QtCore import Qt, Signal, Slot, QCoreApplication
 import traceback
+from contextlib import contextmanager
 
 from src.utils.equation_handler import EquationHandler
 from src.utils.value_handler import ValueHandler
 from src.utils.uncertainty_calculator import UncertaintyCalculator
+from src.utils.budget_engine import BudgetEngine
+from src.utils.budget_cache import BudgetCache
+from src.utils.background_jobs import BackgroundJobRunner
 from src.utils.number_formatter import (
     format_central_value_with_uncertainty,
     format_standard_uncertainty,
@@ -15,16 +19,18 @@ from src.utils.number_formatter import (
     format_contribution_rate,
     format_coverage_factor,
     format_number_str,
+    BatchNumberFormatter,
 )
 from src.tabs.base_tab import BaseTab
 from src.utils.translation_keys import *
 from src.utils.variable_utils import get_distribution_translation_key
 from src.utils.app_logger import log_error
-from src.utils.budget_error_utils import (
-    to_budget_float,
-    summarize_budget_issues,
-    detect_zero_denominator_terms,
-    build_zero_denominator_hint,
+from src.utils.budget_error_utils import summarize_budget_issues
+from src.utils.numeric_derivatives import (
+    COMPLEX_STEP,
+    RICHARDSON,
+    SYMBOLIC,
+    normalize_derivative_backend,
 )
 
 class UncertaintyCalculationTab(BaseTab):
@@ -43,9 +49,23 @@ class UncertaintyCalculationTab(BaseTab):
         self.equation_handler = EquationHandler(parent)
         self.value_handler = ValueHandler(parent)
         self.uncertainty_calculator = UncertaintyCalculator(parent)
+        self.budget_engine = BudgetEngine(parent)
+        # 入力の変更箇所だけを計算し直すためのキャッシュ
+        self.budget_cache = BudgetCache(self.budget_engine)
+
+        # Trueのときバジェットをワーカースレッドで計算する（MainWindowが有効にする）
+        self.run_in_background = False
+        self._pending_key = None
+        self._displayed_key = None
 
         self.setup_ui()
 
+        self.budget_runner = BackgroundJobRunner(self)
+        self.budget_runner.item_ready.connect(self._on_budget_ready)
+        self.budget_runner.item_failed.connect(self._on_budget_failed)
+        self.budget_runner.progress.connect(self._on_budget_progress)
+        self.budget_runner.finished.connect(self._on_budget_finished)
+
     def _get_unit(self, var_name):
         """変数の単位を取得（校正点ごとの単位があればそれも参照）"""
         try:
@@ -122,6 +142,8 @@ class UncertaintyCalculationTab(BaseTab):
         self.result_group.setTitle(self.tr(RESULT_SELECTION))
         self.result_variable_label.setText(self.tr(RESULT_VARIABLE) + ":")
         self.calibration_point_label.setText(self.tr(CALIBRATION_POINT) + ":")
+        self.sensitivity_method_label.setText(self.tr(SENSITIVITY_METHOD) + ":")
+        self._populate_sensitivity_methods()
         self.calibration_group.setTitle(self.tr(CALIBRATION_VALUE))
         self.headers = [
             self.tr(VARIABLE),
@@ -170,23 +192,25 @@ class UncertaintyCalculationTab(BaseTab):
                 edit_value = item.data(Qt.EditRole)
                 value_to_save = str(edit_value) if edit_value is not None else item.text()
 
-                if item.column() == 1:  # Central value
-                    value_handler.update_variable_value(var, 'central_value', value_to_save)
-                elif item.column() == 2:  # Standard uncertainty
-                    value_handler.update_variable_value(var, 'standard_uncertainty', value_to_save)
-                elif item.column() == 3:  # Degrees of freedom
-                    value_handler.update_variable_value(var, 'degrees_of_freedom', value_to_save)
-                elif item.column() == 4:  # Distribution
-                    value_handler.update_variable_value(var, 'distribution', get_distribution_translation_key(value_to_save))
-                
+                field_name = {
+                    1: 'central_value',
+                    2: 'standard_uncertainty',
+                    3: 'degrees_of_freedom',
+                    4: 'distribution',
+                }[item.column()]
+                if field_name == 'distribution':
+                    value_to_save = get_distribution_translation_key(value_to_save)
+                value_handler.update_variable_value(var, field_name, value_to_save)
+                # 変更した入力に依存する結果だけを再計算対象にする
+                self.budget_cache.invalidate(var, value_handler.current_value_index, field_name)
+
                 # Recalculate to update everything
                 result_var = self.result_combo.currentText()
                 if result_var:
                     equation = self.equation_handler.get_target_equation(result_var)
                     if equation:
-                        self._updating_table = True
+                        # calculate_sensitivity_coefficients 自身が更新中フラグを立てる
                         self.calculate_sensitivity_coefficients(equation)
-                        self._updating_table = False
                         
             except Exception as e:
                 log_error(f"テーブル値更新エラー: {str(e)}", details=traceback.format_exc())
@@ -203,7 +227,7 @@ class UncertaintyCalculationTab(BaseTab):
         
         # 計算結果選択
         self.result_group = QGroupBox(self.tr(RESULT_SELECTION))
-        self.result_group.setMaximumHeight(200)
+        self.result_group.setMaximumHeight(260)
         result_layout = QVBoxLayout()
                 
         self.result_combo = QComboBox()
@@ -218,9 +242,22 @@ class UncertaintyCalculationTab(BaseTab):
         self.calibration_point_label = QLabel(self.tr(CALIBRATION_POINT) + ":")
         result_layout.addWidget(self.calibration_point_label)
         result_layout.addWidget(self.value_combo)
+
+        # 感度係数の計算方法
+        self.sensitivity_method_combo = QComboBox()
+        self.sensitivity_method_label = QLabel(self.tr(SENSITIVITY_METHOD) + ":")
+        self._populate_sensitivity_methods()
+        self.sensitivity_method_combo.currentIndexChanged.connect(self.on_sensitivity_method_changed)
+        result_layout.addWidget(self.sensitivity_method_label)
+        result_layout.addWidget(self.sensitivity_method_combo)
         
         self.result_group.setLayout(result_layout)
         left_layout.addWidget(self.result_group)
+
+        # 複数校正点の計算中の進捗
+        self.progress_bar = QProgressBar()
+        self.progress_bar.hide()
+        left_layout.addWidget(self.progress_bar)
         
         left_layout.addStretch(1)
         
@@ -352,6 +389,37 @@ class UncertaintyCalculationTab(BaseTab):
         except Exception as e:
             log_error(f"校正点選択肢更新エラー: {str(e)}", details=traceback.format_exc())
             
+    def _populate_sensitivity_methods(self):
+        """感度係数の計算方法の選択肢を現在の言語で設定"""
+        self.sensitivity_method_combo.blockSignals(True)
+        self.sensitivity_method_combo.clear()
+        for backend, key in (
+            (SYMBOLIC, SENSITIVITY_METHOD_SYMBOLIC),
+            (COMPLEX_STEP, SENSITIVITY_METHOD_COMPLEX_STEP),
+            (RICHARDSON, SENSITIVITY_METHOD_RICHARDSON),
+        ):
+            self.sensitivity_method_combo.addItem(self.tr(key), backend)
+        self.sync_sensitivity_method()
+        self.sensitivity_method_combo.blockSignals(False)
+
+    def sync_sensitivity_method(self):
+        """プロジェクトの設定を選択肢に反映"""
+        backend = normalize_derivative_backend(getattr(self.parent, 'derivative_backend', SYMBOLIC))
+        index = self.sensitivity_method_combo.findData(backend)
+        self.sensitivity_method_combo.blockSignals(True)
+        self.sensitivity_method_combo.setCurrentIndex(max(index, 0))
+        self.sensitivity_method_combo.blockSignals(False)
+
+    def on_sensitivity_method_changed(self, index):
+        """感度係数の計算方法が変更されたときの処理"""
+        if index < 0 or self.parent is None:
+            return
+        try:
+            self.parent.derivative_backend = self.sensitivity_method_combo.itemData(index)
+            self.on_result_changed(self.result_combo.currentText())
+        except Exception as e:
+            log_error(f"感度係数の計算方法変更エラー: {str(e)}", details=traceback.format_exc())
+
     def on_result_changed(self, result_var):
         """計算結果が変更されたときの処理"""
         if not result_var:
@@ -404,235 +472,255 @@ class UncertaintyCalculationTab(BaseTab):
         if self._updating_table:
             return
 
+        if self.run_in_background:
+            self._submit_budget_job(equation)
+            return
+
         try:
             # Set updating flag
             self._updating_table = True
             self._clear_calculation_display()
 
-            # 式を解析
-            left_side, right_side = equation.split('=', 1)
-            left_side = left_side.strip()
-            right_side = right_side.strip()
-            result_var = left_side
-            result_unit = self._get_unit(result_var)
-            
-            # 変数を抽出
-            variables = self.equation_handler.get_variables_from_equation(right_side)
-
-            
-            # 親ウィンドウの変数リストの順序に合わせる
-            ordered_variables = []
-            for var in self.parent.variables:
-                if var in variables:
-                    ordered_variables.append(var)
-            
-            # テーブルを更新
-            self.calibration_table.setRowCount(len(ordered_variables))
-            
-            # 各変数について処理
-            contributions = []  # 寄与不確かさを保存するリスト
-            degrees_of_freedom_list = []
-            budget_issues = []
             point_name = self.value_combo.currentText() or f"index={self.value_handler.current_value_index}"
-            zero_denominator_terms = detect_zero_denominator_terms(
-                right_side, variables, self.value_handler
+            result = self.budget_cache.get(
+                equation,
+                self.value_handler.current_value_index,
+                point_name=point_name,
             )
-            zero_denominator_hint = build_zero_denominator_hint(zero_denominator_terms)
+            self._display_budget_result(result)
+            self._displayed_key = (equation, self.value_handler.current_value_index)
 
-            for i, var in enumerate(ordered_variables):
+        except Exception as e:
+            log_error(f"感度係数計算エラー: {str(e)}", details=traceback.format_exc())
+            self._clear_calculation_display()
+            self._displayed_key = None
+        finally:
+            # Always reset the updating flag
+            self._updating_table = False
 
-                unit = self._get_unit(var)
-                var_info = self.parent.variable_values.get(var, {}) if self.parent else {}
+    def _point_names(self):
+        return [self.value_combo.itemText(i) for i in range(self.value_combo.count())]
+
+    def _submit_budget_job(self, equation):
+        """
+        バジェット計算をワーカーに投入する（実行中の古いジョブは取り消す）。
+
+        表示中の校正点を先に計算し、続けて残りの校正点もキャッシュに載せておく。
+        """
+        current = self.value_handler.current_value_index
+        point_names = self._point_names()
+        point_count = len(point_names)
+        points = [current] + [i for i in range(point_count) if i != current]
+        items = [
+            (equation, i, point_names[i] if i < point_count and point_names[i] else f"index={i}")
+            for i in points
+        ]
+        self._pending_key = (equation, current)
+        if self._displayed_key != self._pending_key:
+            self._clear_calculation_display()
+            self._displayed_key = None
+
+        self.progress_bar.setRange(0, len(items))
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(len(items) > 1)
+        # キャッシュはコピーを返すので、表示側とワーカーが同じ結果オブジェクトを触ることはない
+        self.budget_runner.submit(
+            items,
+            lambda item: self.budget_cache.get(item[0], item[1], point_name=item[2]),
+        )
+
+    def _on_budget_ready(self, item, result):
+        equation, point_index, _ = item
+        if (equation, point_index) != self._pending_key:
+            return
+        if self._updating_table:
+            return
+        try:
+            self._updating_table = True
+            self._clear_calculation_display()
+            self._display_budget_result(result)
+            self._displayed_key = self._pending_key
+        except Exception as e:
+            log_error(f"感度係数計算エラー: {str(e)}", details=traceback.format_exc())
+            self._clear_calculation_display()
+            self._displayed_key = None
+        finally:
+            self._updating_table = False
 
-                # 変数名
-                self.calibration_table.setItem(i, 0, QTableWidgetItem(var))
-                
-                # 中央値
-                central_value = self.value_handler.get_central_value(var)
-                if (
-                    central_value is None
-                    or (isinstance(central_value, str) and central_value.strip() == "")
-                ):
-                    self._set_display_only_item(i, 1, "--", unit)
-                    self._set_display_only_item(i, 2, "--", unit)  # 標準不確かさ
-                    self.calibration_table.setItem(i, 3, QTableWidgetItem('--'))  # 自由度
-                    self.calibration_table.setItem(i, 4, QTableWidgetItem('--'))  # 分布
-                    self.calibration_table.setItem(i, 5, QTableWidgetItem('--'))  # 感度係数
-                    self._set_display_only_item(i, 6, "--", result_unit)  # 寄与不確かさ
-                    contributions.append(0)
-                    degrees_of_freedom_list.append(0)
-                    continue
-
-                try:
-                    central_value_float = float(central_value)
-                except (TypeError, ValueError):
-                    self._set_display_only_item(i, 1, "--", unit)
-                    self._set_display_only_item(i, 2, "--", unit)  # 標準不確かさ
-                    self.calibration_table.setItem(i, 3, QTableWidgetItem('--'))  # 自由度
-                    self.calibration_table.setItem(i, 4, QTableWidgetItem('--'))  # 分布
-                    self.calibration_table.setItem(i, 5, QTableWidgetItem('--'))  # 感度係数
-                    self._set_display_only_item(i, 6, "--", result_unit)  # 寄与不確かさ
-                    contributions.append(0)
-                    degrees_of_freedom_list.append(0)
-                    continue
-
-                self._set_display_only_item(i, 1, str(central_value), unit)
-
-                # 標準不確かさ
-                standard_uncertainty = self.value_handler.get_standard_uncertainty(var)
-                standard_uncertainty_display = format_standard_uncertainty(standard_uncertainty)
-                self._set_display_only_item(i, 2, standard_uncertainty_display, unit)
-                
-                # 自由度
-                degrees_of_freedom = self.value_handler.get_degrees_of_freedom(var)
-                df_item = QTableWidgetItem(str(degrees_of_freedom))
-                self.calibration_table.setItem(i, 3, df_item)
-                degrees_of_freedom_list.append(degrees_of_freedom)
-                
-                # 分布
-                distribution_key = get_distribution_translation_key(self.value_handler.get_distribution(var))
-                distribution_label = self.tr(distribution_key) if distribution_key else '--'
-                distribution_item = QTableWidgetItem(distribution_label)
-                self.calibration_table.setItem(i, 4, distribution_item)
-                
-                # 感度係数
-                sensitivity = self.equation_handler.calculate_sensitivity(right_side, var, variables, self.value_handler)
-                sensitivity_float, sensitivity_issue = to_budget_float(
-                    sensitivity,
-                    field_name="Sensitivity",
-                    variable_name=var,
-                    point_name=point_name,
+    def _on_budget_failed(self, item, message):
+        equation, point_index, _ = item
+        if (equation, point_index) == self._pending_key:
+            self._clear_calculation_display()
+            self._displayed_key = None
+
+    def _on_budget_progress(self, done, total):
+        self.progress_bar.setValue(done)
+
+    def _on_budget_finished(self):
+        self.progress_bar.hide()
+
+    def wait_for_calculation(self, msecs=-1):
+        """バックグラウンド計算の完了を待って結果を表示する"""
+        self.budget_runner.wait(msecs)
+        QCoreApplication.processEvents()
+
+    @contextmanager
+    def synchronous_calculation(self):
+        """
+        この間は校正点を切り替えるとその場で計算する。
+
+        レポート作成のように、切り替え直後の表示内容を読み取る処理で使う。
+        """
+        previous = self.run_in_background
+        self.budget_runner.cancel()
+        self.progress_bar.hide()
+        self.run_in_background = False
+        try:
+            yield
+        finally:
+            self.run_in_background = previous
+
+    def _display_budget_result(self, result):
+        """バジェット計算結果をテーブルと結果ラベルに表示"""
+        result_var = result.result_variable
+        result_unit = self._get_unit(result_var)
+
+        # 表示文字列は同じ丸め設定でまとめて作る
+        formatter = BatchNumberFormatter()
+        rows = result.rows
+        measured = [i for i, row in enumerate(rows) if row.has_central_value]
+        with_sensitivity = [i for i in measured if rows[i].sensitivity is not None]
+        with_contribution = [i for i in with_sensitivity if rows[i].contribution is not None]
+        with_error = [i for i in with_sensitivity if rows[i].sensitivity_error is not None]
+        standard_uncertainty_texts = dict(zip(
+            measured, formatter.standard_uncertainties([rows[i].standard_uncertainty_text for i in measured])
+        ))
+        sensitivity_texts = dict(zip(
+            with_sensitivity, formatter.numbers([rows[i].sensitivity for i in with_sensitivity])
+        ))
+        sensitivity_error_texts = dict(zip(
+            with_error, formatter.numbers([rows[i].sensitivity_error for i in with_error])
+        ))
+        contribution_texts = dict(zip(
+            with_contribution, formatter.standard_uncertainties([rows[i].contribution for i in with_contribution])
+        ))
+
+        # テーブルを更新
+        self.calibration_table.setRowCount(len(result.rows))
+        budget = []
+        for i, row in enumerate(result.rows):
+            var = row.variable
+            unit = self._get_unit(var)
+
+            # 変数名
+            self.calibration_table.setItem(i, 0, QTableWidgetItem(var))
+
+            entry = {
+                'variable': var,
+                'central_value': self._format_with_unit('--', unit),
+                'standard_uncertainty': self._format_with_unit('--', unit),
+                'dof': '--',
+                'distribution': row.distribution,
+                'sensitivity': '--',
+                'contribution': self._format_with_unit('--', result_unit),
+                'contribution_rate': round(float(row.contribution_rate), 2),
+            }
+            budget.append(entry)
+
+            # 中央値
+            if not row.has_central_value:
+                self._set_display_only_item(i, 1, "--", unit)
+                self._set_display_only_item(i, 2, "--", unit)  # 標準不確かさ
+                self.calibration_table.setItem(i, 3, QTableWidgetItem('--'))  # 自由度
+                self.calibration_table.setItem(i, 4, QTableWidgetItem('--'))  # 分布
+                self.calibration_table.setItem(i, 5, QTableWidgetItem('--'))  # 感度係数
+                self._set_display_only_item(i, 6, "--", result_unit)  # 寄与不確かさ
+                continue
+
+            self._set_display_only_item(i, 1, row.central_value_text, unit)
+            entry['central_value'] = self.calibration_table.item(i, 1).text()
+
+            # 標準不確かさ
+            self._set_display_only_item(i, 2, standard_uncertainty_texts[i], unit)
+            entry['standard_uncertainty'] = self.calibration_table.item(i, 2).text()
+
+            # 自由度
+            self.calibration_table.setItem(i, 3, QTableWidgetItem(row.degrees_of_freedom_text))
+            entry['dof'] = row.degrees_of_freedom_text
+
+            # 分布
+            distribution_label = self.tr(row.distribution) if row.distribution else '--'
+            self.calibration_table.setItem(i, 4, QTableWidgetItem(distribution_label))
+
+            # 感度係数
+            if row.sensitivity is None:
+                self.calibration_table.setItem(i, 5, QTableWidgetItem('--'))
+                self._set_display_only_item(i, 6, "--", result_unit)
+                continue
+            entry['sensitivity'] = sensitivity_texts[i]
+            sensitivity_item = QTableWidgetItem(entry['sensitivity'])
+            if i in sensitivity_error_texts:
+                sensitivity_item.setToolTip(
+                    f"{self.tr(SENSITIVITY_ERROR_ESTIMATE)}: {sensitivity_error_texts[i]}"
                 )
-                if sensitivity_issue:
-                    if zero_denominator_hint and (
-                        "0除算" in sensitivity_issue.reason
-                        or "無限大" in sensitivity_issue.reason
-                        or "複素無限大" in sensitivity_issue.reason
-                    ):
-                        sensitivity_issue.hint = zero_denominator_hint
-                    budget_issues.append(sensitivity_issue)
-                    self.calibration_table.setItem(i, 5, QTableWidgetItem('--'))
-                    self._set_display_only_item(i, 6, "--", result_unit)
-                    contributions.append(0)
-                    continue
-                self.calibration_table.setItem(i, 5, QTableWidgetItem(format_number_str(sensitivity_float)))
-                
-                # 寄与不確かさ
-                try:
-                    if standard_uncertainty and sensitivity_float:
-                        contribution = float(standard_uncertainty) * sensitivity_float
-                        contribution_display = format_standard_uncertainty(contribution)
-                        self._set_display_only_item(i, 6, contribution_display, result_unit)
-                        contributions.append(contribution)
-                    else:
-                        self._set_display_only_item(i, 6, "--", result_unit)
-                        contributions.append(0)
-                except (ValueError, TypeError) as e:
-                    self._set_display_only_item(i, 6, "--", result_unit)
-                    contributions.append(0)
-            
-            # 合成標準不確かさの計算
-            result_standard_uncertainty = self.uncertainty_calculator.calculate_combined_uncertainty_with_correlation(
-                contributions,
-                ordered_variables,
-                getattr(self.parent, "correlation_coefficients", {}),
+            self.calibration_table.setItem(i, 5, sensitivity_item)
+
+            # 寄与不確かさ
+            if i in contribution_texts:
+                self._set_display_only_item(i, 6, contribution_texts[i], result_unit)
+            else:
+                self._set_display_only_item(i, 6, "--", result_unit)
+            entry['contribution'] = self.calibration_table.item(i, 6).text()
+
+        # 寄与率の表示
+        for i, row in enumerate(result.rows):
+            self.calibration_table.setItem(i, 7, QTableWidgetItem(format_contribution_rate(row.contribution_rate)))
+
+        if not result.is_valid:
+            self._clear_calculation_display()
+            self._show_budget_error_message(result.issues)
+            return
+
+        try:
+            # 合成標準不確かさの表示
+            standard_uncertainty_display = format_standard_uncertainty(result.standard_uncertainty)
+            self.standard_uncertainty_label.setText(self._format_with_unit(standard_uncertainty_display, result_unit))
+
+            # 有効自由度
+            self.effective_degrees_of_freedom_label.setText(
+                format_number_str(float(result.effective_degrees_of_freedom))
             )
-            
-            # 寄与率の計算と表示
-            contribution_rates = self.uncertainty_calculator.calculate_contribution_rates(contributions)
-            for i, rate in enumerate(contribution_rates):
-                self.calibration_table.setItem(i, 7, QTableWidgetItem(format_contribution_rate(rate)))
-            
-            # 計算結果を表示
-            try:
-                # 中央値の計算
-                result_central_value = self.equation_handler.calculate_result_central_value(
-                    right_side, variables, self.value_handler
-                )
-                result_central_value, result_issue = to_budget_float(
-                    result_central_value,
-                    field_name="Result central value",
-                    variable_name=result_var,
-                    point_name=point_name,
-                )
-                if result_issue:
-                    if zero_denominator_hint and (
-                        "0除算" in result_issue.reason
-                        or "無限大" in result_issue.reason
-                        or "複素無限大" in result_issue.reason
-                    ):
-                        result_issue.hint = zero_denominator_hint
-                    budget_issues.append(result_issue)
-                    self._clear_calculation_display()
-                    self._show_budget_error_message(budget_issues)
-                    return
 
-                result_unit = self._get_unit(result_var)
+            # 包含係数
+            self.coverage_factor_label.setText(format_coverage_factor(float(result.coverage_factor)))
 
-                # 合成標準不確かさの表示
-                standard_uncertainty_display = format_standard_uncertainty(result_standard_uncertainty)
-                self.standard_uncertainty_label.setText(self._format_with_unit(standard_uncertainty_display, result_unit))
-                
-                # 有効自由度の計算
-                effective_df = self.uncertainty_calculator.calculate_effective_degrees_of_freedom(
-                    result_standard_uncertainty, contributions, degrees_of_freedom_list
-                )
-                self.effective_degrees_of_freedom_label.setText(format_number_str(float(effective_df)))
-                
-                # 包含係数の計算
-                coverage_factor = self.uncertainty_calculator.get_coverage_factor(effective_df)
-                self.coverage_factor_label.setText(format_coverage_factor(float(coverage_factor)))
-                
-                # 拡張不確かさの計算
-                expanded_uncertainty = coverage_factor * result_standard_uncertainty
-                expanded_uncertainty_display = format_expanded_uncertainty(expanded_uncertainty)
-                self.expanded_uncertainty_label.setText(self._format_with_unit(expanded_uncertainty_display, result_unit))
+            # 拡張不確かさ
+            expanded_uncertainty_display = format_expanded_uncertainty(result.expanded_uncertainty)
+            self.expanded_uncertainty_label.setText(self._format_with_unit(expanded_uncertainty_display, result_unit))
 
-                # 拡張不確かさの桁に合わせて中央値を更新
-                central_value_display = format_central_value_with_uncertainty(result_central_value, expanded_uncertainty)
-                self.central_value_label.setText(self._format_with_unit(central_value_display, result_unit))
+            # 拡張不確かさの桁に合わせて中央値を更新
+            central_value_display = format_central_value_with_uncertainty(
+                result.central_value, result.expanded_uncertainty
+            )
+            self.central_value_label.setText(self._format_with_unit(central_value_display, result_unit))
 
-                # --- ここで計算結果をMainWindowに保存 ---
-                result_var = self.result_combo.currentText()
-                point_name = self.value_combo.currentText()
-                # バジェット情報を作成
-                budget = []
-                for i, var in enumerate(ordered_variables):
-                    budget.append({
-                        'variable': var,
-                        'central_value': self.calibration_table.item(i, 1).text() if self.calibration_table.item(i, 1) else '',
-                        'standard_uncertainty': self.calibration_table.item(i, 2).text() if self.calibration_table.item(i, 2) else '',
-                        'dof': self.calibration_table.item(i, 3).text() if self.calibration_table.item(i, 3) else '',
-                        'distribution': (
-                            get_distribution_translation_key(self.value_handler.get_distribution(var))
-                            or ''
-                        ),
-                        'sensitivity': self.calibration_table.item(i, 5).text() if self.calibration_table.item(i, 5) else '',
-                        'contribution': self.calibration_table.item(i, 6).text() if self.calibration_table.item(i, 6) else '',
-                        'contribution_rate': float(self.calibration_table.item(i, 7).text().replace('%','')) if self.calibration_table.item(i, 7) and self.calibration_table.item(i, 7).text().replace('%','').replace('.','',1).isdigit() else 0.0
-                    })
-                # MainWindowに保存
-                if not hasattr(self.parent, 'calculation_results'):
-                    self.parent.calculation_results = {}
-                if result_var not in self.parent.calculation_results:
-                    self.parent.calculation_results[result_var] = {}
-                self.parent.calculation_results[result_var][point_name] = {
-                    'budget': budget,
-                    'result_central_value': result_central_value,
-                    'result_standard_uncertainty': result_standard_uncertainty,
-                    'effective_df': effective_df,
-                    'coverage_factor': coverage_factor,
-                    'expanded_uncertainty': expanded_uncertainty,
-                }
-                # --- ここまで ---
-
-                self._show_budget_error_message(budget_issues)
-            except Exception as e:
-                log_error(f"計算結果表示エラー: {str(e)}", details=traceback.format_exc())
-                
+            # --- ここで計算結果をMainWindowに保存 ---
+            result_var = self.result_combo.currentText()
+            point_name = self.value_combo.currentText()
+            if not hasattr(self.parent, 'calculation_results'):
+                self.parent.calculation_results = {}
+            if result_var not in self.parent.calculation_results:
+                self.parent.calculation_results[result_var] = {}
+            self.parent.calculation_results[result_var][point_name] = {
+                'budget': budget,
+                'result_central_value': result.central_value,
+                'result_standard_uncertainty': result.standard_uncertainty,
+                'effective_df': result.effective_degrees_of_freedom,
+                'coverage_factor': result.coverage_factor,
+                'expanded_uncertainty': result.expanded_uncertainty,
+            }
+            # --- ここまで ---
+
+            self._show_budget_error_message(result.issues)
         except Exception as e:
-            log_error(f"感度係数計算エラー: {str(e)}", details=traceback.format_exc())
-            self._clear_calculation_display()
-        finally:
-            # Always reset the updating flag
-            self._updating_table = False
+            log_error(f"計算結果表示エラー: {str(e)}", details=traceback.format_exc())
@@ -15,8 +15,10 @@ from ..utils.variable_utils import (
     get_distribution_divisor,
     get_distribution_translation_key,
     create_empty_value_dict,
-    find_variable_item
+    find_variable_item,
+    is_divisor_editable,
 )
+from ..utils.distributions import has_shape_parameter
 from ..utils.calculation_utils import evaluate_formula
 from .variables_tab_handlers import VariablesTabHandlers
 from .base_tab import BaseTab
@@ -82,6 +84,7 @@ class VariablesTab(BaseTab):
             self.type_b_widgets['distribution'].setCurrentIndex(0)
         
         self.distribution_label.setText(self.tr(DISTRIBUTION) + ":")
+        self.distribution_parameter_label.setText(self.tr(DISTRIBUTION_PARAMETER) + ":")
         self.divisor_label.setText(self.tr(DIVISOR) + ":")
         self.degrees_of_freedom_label_b.setText(self.tr(DEGREES_OF_FREEDOM) + ":")
         self.central_value_label_b.setText(self.tr(CENTRAL_VALUE) + ":")
@@ -268,6 +271,12 @@ class VariablesTab(BaseTab):
         self.type_b_widgets['distribution'].currentIndexChanged.connect(self.handlers.on_distribution_changed)
         self.distribution_label = QLabel(self.tr(DISTRIBUTION) + ":")
         settings_layout.addRow(self.distribution_label, self.type_b_widgets['distribution'])
+
+        # 台形分布の β、曲線台形分布の d/w（0〜1）
+        self.type_b_widgets['distribution_parameter'] = QLineEdit()
+        self.type_b_widgets['distribution_parameter'].textChanged.connect(self.handlers.on_distribution_parameter_changed)
+        self.distribution_parameter_label = QLabel(self.tr(DISTRIBUTION_PARAMETER) + ":")
+        settings_layout.addRow(self.distribution_parameter_label, self.type_b_widgets['distribution_parameter'])
         
         self.type_b_widgets['divisor'] = QLineEdit()
         self.type_b_widgets['divisor'].textChanged.connect(self.handlers.on_divisor_changed)
@@ -516,6 +525,12 @@ class VariablesTab(BaseTab):
                 else:
                     self.type_b_widgets['distribution'].setCurrentIndex(0)
                 self.type_b_widgets['distribution'].blockSignals(False)
+                parameter = var_info.get('distribution_parameter', '')
+                self._set_signals_blocked([self.type_b_widgets['distribution_parameter']], True)
+                try:
+                    self.type_b_widgets['distribution_parameter'].setText(str(parameter))
+                finally:
+                    self._set_signals_blocked([self.type_b_widgets['distribution_parameter']], False)
 
                 # 分布に応じた除数を設定（正規分布は保存済みの値を優先）
                 values = var_info.get('values', []) if isinstance(var_info.get('values', []), list) else []
@@ -523,13 +538,13 @@ class VariablesTab(BaseTab):
                 divisor = ''
                 if 0 <= value_index < len(values):
                     divisor = values[value_index].get('divisor', '')
-                if distribution != NORMAL_DISTRIBUTION and not divisor:
+                if not is_divisor_editable(distribution) and not divisor:
                     divisor = var_info.get('divisor', '')
-                if distribution != NORMAL_DISTRIBUTION and not divisor:
-                    divisor = get_distribution_divisor(distribution)
+                if not is_divisor_editable(distribution) and not divisor:
+                    divisor = get_distribution_divisor(distribution, parameter)
 
                 self.type_b_widgets['divisor'].setText(divisor)
-                self.type_b_widgets['divisor'].setReadOnly(distribution != NORMAL_DISTRIBUTION)
+                self.type_b_widgets['divisor'].setReadOnly(not is_divisor_editable(distribution))
 
 
             # 不確かさ種類に応じたウィジェットの表示を更新
@@ -660,10 +675,10 @@ class VariablesTab(BaseTab):
                 var_info['distribution'] = distribution
 
                 divisor = value_info.get('divisor', '')
-                if distribution != NORMAL_DISTRIBUTION and not divisor:
+                if not is_divisor_editable(distribution) and not divisor:
                     divisor = var_info.get('divisor', '')
-                if distribution != NORMAL_DISTRIBUTION and not divisor:
-                    divisor = get_distribution_divisor(distribution)
+                if not is_divisor_editable(distribution) and not divisor:
+                    divisor = get_distribution_divisor(distribution, var_info.get('distribution_parameter', ''))
                 if degrees_of_freedom in ('', None, 0, '0', '0.0'):
                     degrees_of_freedom = 'inf'
                     value_info['degrees_of_freedom'] = degrees_of_freedom
@@ -706,7 +721,7 @@ class VariablesTab(BaseTab):
                 finally:
                     self._set_signals_blocked(type_b_signal_widgets, False)
 
-                self.type_b_widgets['divisor'].setReadOnly(distribution != NORMAL_DISTRIBUTION)
+                self.type_b_widgets['divisor'].setReadOnly(not is_divisor_editable(distribution))
                 
                 log_debug(
                     f"[DEBUG] TypeB復元: central_value='{central_value}', half_width='{half_width}', degrees_of_freedom='{degrees_of_freedom}', description='{description}', divisor='{divisor}'"
@@ -819,8 +834,18 @@ class VariablesTab(BaseTab):
             (RECTANGULAR_DISTRIBUTION, self.tr(RECTANGULAR_DISTRIBUTION)),
             (TRIANGULAR_DISTRIBUTION, self.tr(TRIANGULAR_DISTRIBUTION)),
             (U_DISTRIBUTION, self.tr(U_DISTRIBUTION)),
+            (TRAPEZOIDAL_DISTRIBUTION, self.tr(TRAPEZOIDAL_DISTRIBUTION)),
+            (CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION, self.tr(CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION)),
+            (LOGNORMAL_DISTRIBUTION, self.tr(LOGNORMAL_DISTRIBUTION)),
         ]
 
+    def update_distribution_parameter_visibility(self):
+        """形状パラメータの欄は、形状パラメータのある分布（台形・曲線台形）のときだけ表示する"""
+        widget = self.type_b_widgets['distribution_parameter']
+        show = widget.isEnabled() and has_shape_parameter(self.type_b_widgets['distribution'].currentData())
+        widget.setVisible(show)
+        self.distribution_parameter_label.setVisible(show)
+
     def showEvent(self, event):
         """タブが表示されたときのイベントハンドラ"""
         super().showEvent(event)
@@ -7,7 +7,8 @@ from ..utils.variable_utils import (
     calculate_type_b_uncertainty,
     get_distribution_divisor,
     create_empty_value_dict,
-    find_variable_item
+    find_variable_item,
+    is_divisor_editable,
 )
 from ..utils.translation_keys import NORMAL_DISTRIBUTION, MESSAGE_CONFIRM, TYPE_CHANGE_DATA_RESET_WARNING
 from ..utils.calculation_utils import evaluate_formula
@@ -68,6 +69,7 @@ class VariablesTabHandlers:
             for widget in self.parent.type_b_widgets.values():
                 widget.setVisible(True)
                 widget.setEnabled(True)
+            self.parent.update_distribution_parameter_visibility()
             # 固定値用のウィジェットを非表示・無効化
             for widget in self.parent.fixed_value_widgets.values():
                 widget.setVisible(False)
@@ -373,25 +375,28 @@ class VariablesTabHandlers:
                 distribution = NORMAL_DISTRIBUTION
 
             # 分布の種類に応じて除数を設定
-            default_divisor = get_distribution_divisor(distribution)
             divisor = ''
+            parameter = ''
             value_index = self.parent.value_combo.currentIndex()
             if self.current_variable:
                 var_info = self.parent.parent.variable_values.get(self.current_variable, {})
                 if isinstance(var_info, dict):
+                    parameter = var_info.get('distribution_parameter', '')
                     values = var_info.get('values', [])
                     if isinstance(values, list) and 0 <= value_index < len(values):
                         divisor = values[value_index].get('divisor', '') or ''
-                    if distribution != NORMAL_DISTRIBUTION and not divisor:
+                    if not is_divisor_editable(distribution) and not divisor:
                         divisor = var_info.get('divisor', '') or ''
+            default_divisor = get_distribution_divisor(distribution, parameter)
 
-            if distribution == NORMAL_DISTRIBUTION:
+            if is_divisor_editable(distribution):
                 divisor = divisor or ''
             else:
                 divisor = default_divisor
 
             self.parent.type_b_widgets['divisor'].setText(divisor)
-            self.parent.type_b_widgets['divisor'].setReadOnly(distribution != NORMAL_DISTRIBUTION)
+            self.parent.type_b_widgets['divisor'].setReadOnly(not is_divisor_editable(distribution))
+            self.parent.update_distribution_parameter_visibility()
 
             degrees_of_freedom = self.parent.type_b_widgets['degrees_of_freedom'].text().strip()
             if degrees_of_freedom in {'', '0', '0.0'}:
@@ -426,6 +431,17 @@ class VariablesTabHandlers:
         except Exception as e:
             log_error(f"分布変更エラー: {str(e)}", details=traceback.format_exc())
 
+    def on_distribution_parameter_changed(self):
+        """形状パラメータが変更されたときの処理（除数と標準不確かさを計算し直す）"""
+        try:
+            if not self.current_variable:
+                return
+            parameter = self.parent.type_b_widgets['distribution_parameter'].text().strip()
+            self.parent.parent.variable_values[self.current_variable]['distribution_parameter'] = parameter
+            self.on_distribution_changed(self.parent.type_b_widgets['distribution'].currentIndex())
+        except Exception as e:
+            log_error(f"形状パラメータ変更エラー: {str(e)}", details=traceback.format_exc())
+
     def on_half_width_focus_lost(self, event):
         """半値幅の入力欄からフォーカスが外れたときの処理"""
         try:
@@ -440,8 +456,9 @@ class VariablesTabHandlers:
             distribution = self.parent.type_b_widgets['distribution'].currentData()
             if not distribution:
                 distribution = NORMAL_DISTRIBUTION
-            if distribution != NORMAL_DISTRIBUTION:
-                divisor_str = get_distribution_divisor(distribution)
+            if not is_divisor_editable(distribution):
+                parameter = self.parent.type_b_widgets['distribution_parameter'].text().strip()
+                divisor_str = get_distribution_divisor(distribution, parameter)
                 self.parent.type_b_widgets['divisor'].setText(divisor_str)
             
             # 標準不確かさを計算
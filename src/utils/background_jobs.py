@@ -0,0 +1,153 @@
+"""
+バックグラウンド計算
+
+重い計算（バジェットなど）を QThreadPool のワーカーで実行し、結果をシグナルで
+GUIスレッドに返す。新しいジョブを投入すると実行中の古いジョブは取り消され、
+古いジョブの結果は捨てられる。
+
+with_context=True で投入すると func(item, context) の形で呼ばれ、長い計算の
+途中経過の通知（context.report）と取り消しの確認（context.is_cancelled）ができる。
+"""
+
+import threading
+import traceback
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from .app_logger import log_error
+
+
+class _JobSignals(QObject):
+    item_ready = Signal(int, object, object)
+    item_partial = Signal(int, object, object)
+    progress = Signal(int, int, int)
+    finished = Signal(int)
+    failed = Signal(int, object, str)
+
+
+class JobContext:
+    """実行中の1件から途中経過を通知し、取り消しを確認するための窓口"""
+
+    def __init__(self, job_id, item, signals, cancel_event):
+        self.job_id = job_id
+        self.item = item
+        self.signals = signals
+        self.cancel_event = cancel_event
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report(self, value):
+        if not self.cancel_event.is_set():
+            self.signals.item_partial.emit(self.job_id, self.item, value)
+
+
+class _Job(QRunnable):
+    """items を順に func に渡し、1件ごとに結果と進捗を通知する"""
+
+    def __init__(self, job_id, items, func, signals, cancel_event, with_context=False):
+        super().__init__()
+        self.job_id = job_id
+        self.items = items
+        self.func = func
+        self.signals = signals
+        self.cancel_event = cancel_event
+        self.with_context = with_context
+
+    def run(self):
+        total = len(self.items)
+        for done, item in enumerate(self.items, start=1):
+            if self.cancel_event.is_set():
+                return
+            try:
+                if self.with_context:
+                    value = self.func(item, JobContext(self.job_id, item, self.signals, self.cancel_event))
+                else:
+                    value = self.func(item)
+            except Exception as e:
+                log_error(f"バックグラウンド計算エラー: {str(e)}", details=traceback.format_exc())
+                if not self.cancel_event.is_set():
+                    self.signals.failed.emit(self.job_id, item, str(e))
+                    self.signals.progress.emit(self.job_id, done, total)
+                continue
+            if self.cancel_event.is_set():
+                return
+            self.signals.item_ready.emit(self.job_id, item, value)
+            self.signals.progress.emit(self.job_id, done, total)
+        if not self.cancel_event.is_set():
+            self.signals.finished.emit(self.job_id)
+
+
+class BackgroundJobRunner(QObject):
+    """
+    1つの画面用のジョブ投入口。
+
+    同時に有効なジョブは1つだけで、submit() するたびに前のジョブは取り消される。
+    シグナルは最新のジョブの分だけGUIスレッドで発行される。
+    """
+
+    item_ready = Signal(object, object)
+    item_partial = Signal(object, object)
+    item_failed = Signal(object, str)
+    progress = Signal(int, int)
+    finished = Signal()
+
+    def __init__(self, parent=None, thread_pool=None):
+        super().__init__(parent)
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._job_id = 0
+        self._cancel_event = None
+        self._running = False
+        self._signals = _JobSignals()
+        self._signals.item_ready.connect(self._on_item_ready)
+        self._signals.item_partial.connect(self._on_item_partial)
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+
+    def submit(self, items, func, with_context=False):
+        """items の各要素について func(item)（with_context なら func(item, context)）をワーカーで実行する"""
+        self.cancel()
+        self._job_id += 1
+        self._cancel_event = threading.Event()
+        self._running = True
+        job = _Job(self._job_id, list(items), func, self._signals, self._cancel_event, with_context)
+        self.thread_pool.start(job)
+        return self._job_id
+
+    def cancel(self):
+        """実行中のジョブを取り消す（結果は通知されない）"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        self._running = False
+
+    def is_running(self):
+        return self._running
+
+    def wait(self, msecs=-1):
+        """スレッドプールの完了を待つ（保留中のシグナルは呼び出し側でイベント処理する）"""
+        return self.thread_pool.waitForDone(msecs)
+
+    def _is_current(self, job_id):
+        return job_id == self._job_id and self._running
+
+    def _on_item_ready(self, job_id, item, value):
+        if self._is_current(job_id):
+            self.item_ready.emit(item, value)
+
+    def _on_item_partial(self, job_id, item, value):
+        if self._is_current(job_id):
+            self.item_partial.emit(item, value)
+
+    def _on_failed(self, job_id, item, message):
+        if self._is_current(job_id):
+            self.item_failed.emit(item, message)
+
+    def _on_progress(self, job_id, done, total):
+        if self._is_current(job_id):
+            self.progress.emit(done, total)
+
+    def _on_finished(self, job_id):
+        if self._is_current(job_id):
+            self._running = False
+            self.finished.emit()
@@ -0,0 +1,210 @@
+"""
+バジェットの差分再計算
+
+(入力変数, 校正点) から影響を受ける (式, 校正点) への依存インデックスと
+ダーティフラグを持ち、変更のあった部分だけを計算し直す。
+
+- 中心値が変わった場合: 感度係数が変わるため、その校正点のバジェットを作り直す
+- 標準不確かさ・自由度・分布が変わった場合: その行の寄与だけを計算し直し、
+  合成標準不確かさ・寄与率・有効自由度・包含係数はキャッシュ済みの行から再集計する
+- 相関係数が変わった場合: 行はそのままで再集計だけを行う
+
+get はキャッシュ内の結果のコピーを返す。キャッシュ内の結果は差分再計算で書き換わるので、
+ワーカーと表示側が同じオブジェクトを同時に触らないようにする。
+"""
+
+import copy
+import threading
+import traceback
+from dataclasses import dataclass, field
+
+from .app_logger import log_error
+from .budget_engine import _to_float_or_none
+from .config_loader import get_config
+from .variable_utils import get_distribution_translation_key
+
+FULL = 'full'
+ROW = 'row'
+
+# 入力のどの項目が変わったら、どこまで計算し直すか
+FIELD_SCOPES = {
+    'central_value': FULL,
+    'standard_uncertainty': ROW,
+    'degrees_of_freedom': ROW,
+    'distribution': ROW,
+}
+
+
+@dataclass
+class _CacheEntry:
+    result: object
+    variables: list
+    central_values: dict
+    row_inputs: dict
+    correlation_version: object
+    full_dirty: bool = False
+    dirty_rows: set = field(default_factory=set)
+
+
+class BudgetCache:
+    """BudgetEngine の計算結果を (式, 校正点) ごとに保持し、差分だけを再計算する"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._entries = {}
+        self._dependencies = {}
+        self._context = None
+        self._lock = threading.RLock()
+        self.full_calculations = 0
+        self.row_updates = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def project(self):
+        return self.engine.project
+
+    def _current_context(self):
+        """これが変わったらキャッシュ全体を破棄する（モデル式・微分方法・設定）"""
+        return (
+            getattr(self.project, 'last_equation', ''),
+            getattr(self.project, 'derivative_backend', None),
+            get_config().version,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependencies.clear()
+
+    def affected(self, variable, point_index):
+        """(変数, 校正点) の変更で影響を受ける (式, 校正点) の一覧"""
+        with self._lock:
+            return set(self._dependencies.get((variable, point_index), ()))
+
+    def invalidate(self, variable, point_index=None, field_name=None):
+        """
+        入力の変更を通知してダーティフラグを立てる。
+
+        point_index が None の場合は全校正点、field_name が不明な場合は作り直しとする。
+        """
+        scope = FIELD_SCOPES.get(field_name, FULL)
+        with self._lock:
+            for (var, point), keys in self._dependencies.items():
+                if var != variable or (point_index is not None and point != point_index):
+                    continue
+                for key in keys:
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        continue
+                    if scope == FULL:
+                        entry.full_dirty = True
+                    else:
+                        entry.dirty_rows.add(variable)
+
+    def invalidate_all(self):
+        with self._lock:
+            for entry in self._entries.values():
+                entry.full_dirty = True
+
+    def _read_row_input(self, value_handler, var):
+        return (
+            value_handler.get_standard_uncertainty(var),
+            value_handler.get_degrees_of_freedom(var),
+            get_distribution_translation_key(value_handler.get_distribution(var)) or "",
+        )
+
+    def _snapshot(self, equation, point_index):
+        """計算に使う入力の (変数, 中心値, 行の入力, 相関のバージョン)"""
+        right_side = equation.split('=', 1)[1].strip() if '=' in equation else equation
+        variables, ordered_variables = self.engine.get_ordered_input_variables(right_side)
+        value_handler = self.engine.make_value_handler(point_index)
+        central_values = {var: value_handler.get_central_value(var) for var in variables}
+        row_inputs = {var: self._read_row_input(value_handler, var) for var in ordered_variables}
+        return variables, central_values, row_inputs, getattr(self.project, 'correlation_version', None)
+
+    def _store(self, key, point_index, result, snapshot):
+        variables, central_values, row_inputs, correlation_version = snapshot
+        self._entries[key] = _CacheEntry(
+            result=result,
+            variables=variables,
+            central_values=central_values,
+            row_inputs=row_inputs,
+            correlation_version=correlation_version,
+        )
+        for var in variables:
+            self._dependencies.setdefault((var, point_index), set()).add(key)
+
+    def _detect_changes(self, entry, point_index):
+        """フラグ以外の経路（変数タブなど）で変わった入力を検出してフラグを立てる"""
+        value_handler = self.engine.make_value_handler(point_index)
+        for var in entry.variables:
+            if value_handler.get_central_value(var) != entry.central_values.get(var):
+                entry.full_dirty = True
+                return
+        for var, previous in entry.row_inputs.items():
+            if self._read_row_input(value_handler, var) != previous:
+                entry.dirty_rows.add(var)
+
+    def get(self, equation, point_index, point_name=None):
+        """(式, 校正点) のバジェットのコピーを返す（必要な部分だけ計算し直す）"""
+        with self._lock:
+            context = self._current_context()
+            if context != self._context:
+                self.clear()
+                self._context = context
+
+            key = (equation, point_index)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._detect_changes(entry, point_index)
+                correlation_version = getattr(self.project, 'correlation_version', None)
+                if not entry.full_dirty and (entry.dirty_rows or correlation_version != entry.correlation_version):
+                    if self._update_rows(entry, point_index):
+                        entry.correlation_version = correlation_version
+                if not entry.full_dirty:
+                    if point_name is not None:
+                        entry.result.point_name = point_name
+                    return copy.deepcopy(entry.result)
+
+            # 入力は計算の前に読む。計算中に入力が編集されたら、古い入力での結果を
+            # 新しい入力のものとして残さないよう、キャッシュには載せない
+            snapshot = self._snapshot(equation, point_index)
+            result = self.engine.calculate_equation(equation, point_index, point_name=point_name)
+            self.full_calculations += 1
+            if self._snapshot(equation, point_index) == snapshot:
+                self._store(key, point_index, result, snapshot)
+                return copy.deepcopy(result)
+            self._entries.pop(key, None)
+            return result
+
+    def _update_rows(self, entry, point_index):
+        """ダーティな行の寄与を計算し直し、キャッシュ済みの行から結果を再集計する"""
+        result = entry.result
+        value_handler = self.engine.make_value_handler(point_index)
+        try:
+            for row in result.rows:
+                if row.variable not in entry.dirty_rows:
+                    continue
+                row_input = self._read_row_input(value_handler, row.variable)
+                entry.row_inputs[row.variable] = row_input
+                if row.central_value is None:
+                    continue
+                standard_uncertainty, degrees_of_freedom, distribution = row_input
+                row.standard_uncertainty_text = "" if standard_uncertainty is None else str(standard_uncertainty)
+                row.degrees_of_freedom_text = "" if degrees_of_freedom is None else str(degrees_of_freedom)
+                row.standard_uncertainty = _to_float_or_none(standard_uncertainty)
+                row.distribution = distribution
+                if row.sensitivity is not None and row.standard_uncertainty and row.sensitivity:
+                    row.contribution = row.standard_uncertainty * row.sensitivity
+                else:
+                    row.contribution = None
+                self.row_updates += 1
+            self.engine.aggregate_result(result, value_handler)
+        except Exception as e:
+            log_error(f"バジェット差分再計算エラー: {str(e)}", details=traceback.format_exc())
+            entry.full_dirty = True
+            return False
+        entry.dirty_rows.clear()
+        return True
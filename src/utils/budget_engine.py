@@ -0,0 +1,546 @@
+"""
+Qtに依存しない不確かさバジェット計算エンジン
+
+MainWindow.get_save_data() と同じ構造のプロジェクト辞書（またはMainWindow互換の
+オブジェクト）から、全計算結果変数・全校正点のバジェットを数値として計算する。
+"""
+
+import traceback
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from .app_logger import log_error
+from .budget_error_utils import (
+    BudgetCalculationIssue,
+    build_zero_denominator_hint,
+    detect_zero_denominator_terms,
+    to_budget_float,
+)
+from .compiled_model import FLOAT64_DIGITS
+from .config_loader import get_config
+from .correlation_matrix import get_correlation_matrix
+from .equation_handler import EquationHandler
+from .numeric_derivatives import SYMBOLIC
+from .uncertainty_calculator import UncertaintyCalculator
+from .value_handler import ValueHandler
+from .variable_utils import get_distribution_translation_key
+
+
+class ProjectState:
+    """バジェット計算に必要なMainWindowの属性だけを持つプロジェクト状態"""
+
+    def __init__(self, data=None):
+        data = data if isinstance(data, dict) else {}
+        self.variables = list(data.get('variables', []) or [])
+        self.result_variables = list(data.get('result_variables', []) or [])
+        self.correlation_coefficients = data.get('correlation_coefficients', {}) or {}
+        self.correlation_version = 0
+        self.derivative_backend = data.get('derivative_backend', SYMBOLIC) or SYMBOLIC
+        self.variable_values = data.get('variable_values', {}) or {}
+        self.last_equation = data.get('last_equation', '') or ''
+
+        value_count = data.get('value_count', 1) or 1
+        value_names = data.get('value_names') or [f"Point {i + 1}" for i in range(value_count)]
+        self.value_names = list(value_names)
+        self.value_count = max(1, len(self.value_names))
+        self.current_value_index = 0
+
+
+@dataclass
+class BudgetRow:
+    variable: str
+    central_value_text: str = ""
+    standard_uncertainty_text: str = ""
+    degrees_of_freedom_text: str = ""
+    distribution: str = ""
+    central_value: Optional[float] = None
+    standard_uncertainty: Optional[float] = None
+    sensitivity: Optional[float] = None
+    contribution: Optional[float] = None
+    contribution_rate: float = 0.0
+    sensitivity_error: Optional[float] = None
+
+    @property
+    def has_central_value(self) -> bool:
+        return self.central_value is not None
+
+
+@dataclass
+class BudgetResult:
+    result_variable: str
+    point_index: int
+    point_name: str
+    equation: str
+    rows: List[BudgetRow] = field(default_factory=list)
+    central_value: Optional[float] = None
+    standard_uncertainty: Optional[float] = None
+    effective_degrees_of_freedom: Optional[float] = None
+    coverage_factor: Optional[float] = None
+    expanded_uncertainty: Optional[float] = None
+    issues: List[BudgetCalculationIssue] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return self.central_value is not None
+
+
+@dataclass
+class OutputCovarianceResult:
+    """全計算結果変数の共分散（GUM Supplement 2 のヤコビアンによる伝播）"""
+    point_index: int
+    point_name: str
+    result_variables: List[str]
+    input_variables: List[str]
+    central_values: np.ndarray
+    jacobian: np.ndarray
+    input_covariance: np.ndarray
+    covariance: np.ndarray
+
+    @property
+    def standard_uncertainties(self) -> np.ndarray:
+        return np.sqrt(np.clip(np.diag(self.covariance), 0.0, None))
+
+    @property
+    def correlation(self) -> np.ndarray:
+        """計算結果変数間の相関係数行列"""
+        u = self.standard_uncertainties
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = self.covariance / np.outer(u, u)
+        correlation = np.where(np.outer(u, u) > 0, correlation, 0.0)
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+    @property
+    def is_valid(self) -> bool:
+        return bool(np.all(np.isfinite(self.central_values)) and np.all(np.isfinite(self.covariance)))
+
+
+def _is_zero_denominator_issue(issue) -> bool:
+    return (
+        "0除算" in issue.reason
+        or "無限大" in issue.reason
+        or "複素無限大" in issue.reason
+    )
+
+
+def _to_float_or_none(value):
+    if value is None or (isinstance(value, str) and value.strip() == ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _nan_if_none(value):
+    return np.nan if value is None else value
+
+
+class BudgetEngine:
+    """プロジェクト全体の不確かさバジェットをウィジェットなしで計算する"""
+
+    def __init__(self, project):
+        self.project = project
+        self.equation_handler = EquationHandler(project)
+        self.uncertainty_calculator = UncertaintyCalculator(project)
+
+    @classmethod
+    def from_project_data(cls, data):
+        """保存データ（辞書）からエンジンを生成"""
+        return cls(ProjectState(data))
+
+    def get_point_names(self):
+        return list(getattr(self.project, 'value_names', []) or [])
+
+    def get_point_name(self, point_index):
+        point_names = self.get_point_names()
+        if 0 <= point_index < len(point_names):
+            return point_names[point_index]
+        return f"index={point_index}"
+
+    def get_result_variables(self):
+        return list(getattr(self.project, 'result_variables', []) or [])
+
+    def get_ordered_input_variables(self, right_side):
+        """右辺の変数をプロジェクトの変数リスト順に並べて返す"""
+        variables = self.equation_handler.get_variables_from_equation(right_side)
+        project_variables = getattr(self.project, 'variables', []) or []
+        return variables, [var for var in project_variables if var in variables]
+
+    def calculate(self, result_var, point_index):
+        """計算結果変数と校正点を指定してバジェットを計算"""
+        equation = self.equation_handler.get_target_equation(result_var)
+        if not equation or '=' not in equation:
+            return None
+        return self.calculate_equation(equation, point_index)
+
+    def calculate_all(self):
+        """全計算結果変数・全校正点のバジェットを計算（{結果変数: [校正点ごとの結果]}）"""
+        results = {}
+        point_count = max(1, len(self.get_point_names()))
+        for result_var in self.get_result_variables():
+            equation = self.equation_handler.get_target_equation(result_var)
+            if not equation or '=' not in equation:
+                continue
+            results[result_var] = self.calculate_equation_points(equation, range(point_count))
+        return results
+
+    def _collect_point_inputs(self, variables, ordered_variables, point_indices):
+        """全校正点の入力値を読み出し、数値配列と表示用テキストをまとめる"""
+        texts = []
+        central_values = np.full((len(point_indices), len(variables)), np.nan)
+        standard_uncertainties = np.full((len(point_indices), len(ordered_variables)), np.nan)
+        degrees_of_freedom = np.empty((len(point_indices), len(ordered_variables)), dtype=object)
+        column = {var: i for i, var in enumerate(variables)}
+
+        for p, point_index in enumerate(point_indices):
+            value_handler = ValueHandler(self.project, point_index)
+            for var in variables:
+                central_values[p, column[var]] = _nan_if_none(_to_float_or_none(value_handler.get_central_value(var)))
+
+            point_texts = []
+            for j, var in enumerate(ordered_variables):
+                central_value = value_handler.get_central_value(var)
+                standard_uncertainty = value_handler.get_standard_uncertainty(var)
+                dof = value_handler.get_degrees_of_freedom(var)
+                standard_uncertainties[p, j] = _nan_if_none(_to_float_or_none(standard_uncertainty))
+                degrees_of_freedom[p, j] = dof
+                point_texts.append((
+                    "" if central_value is None else str(central_value),
+                    "" if standard_uncertainty is None else str(standard_uncertainty),
+                    "" if dof is None else str(dof),
+                    get_distribution_translation_key(value_handler.get_distribution(var)) or "",
+                ))
+            texts.append(point_texts)
+
+        return central_values, standard_uncertainties, degrees_of_freedom, texts
+
+    def calculate_equation_points(self, equation, point_indices):
+        """
+        展開済みの式について、複数の校正点のバジェットを一括計算する。
+
+        感度係数・寄与・合成標準不確かさ・有効自由度・包含係数を
+        （校正点 × 変数）の配列で float64 により一度に評価する。中心値の欠落や
+        0除算、桁落ちなど数値評価で扱えない校正点は、calculate_equation による
+        設定精度での計算へ回す。
+        """
+        point_indices = list(point_indices)
+        if not point_indices:
+            return []
+
+        config = get_config()
+        if config.get_numeric_engine() != 'float64':
+            return [self.calculate_equation(equation, i) for i in point_indices]
+
+        right_side = equation.split('=', 1)[1].strip()
+        try:
+            variables, ordered_variables = self.get_ordered_input_variables(right_side)
+            model = self.equation_handler.get_compiled_model(right_side, variables)
+            if model is None or not ordered_variables:
+                return [self.calculate_equation(equation, i) for i in point_indices]
+
+            central_values, standard_uncertainties, degrees_of_freedom, texts = self._collect_point_inputs(
+                variables, ordered_variables, point_indices
+            )
+            ordered_columns = [variables.index(var) for var in ordered_variables]
+            columns = [central_values[:, i] for i in range(len(variables))]
+
+            backend = self.equation_handler.get_derivative_backend(model)
+            gradient_errors = None
+            with np.errstate(all='ignore'):
+                if backend == SYMBOLIC:
+                    result_values, gradient, lost_digits = model.evaluate_float64(*columns)
+                    gradient = gradient[ordered_columns].T
+                else:
+                    result_values, _, lost_digits = model.evaluate_float64(*columns, with_gradient=False)
+                    numeric_result = model.evaluate_numeric_gradient(*columns, method=backend)
+                    gradient = numeric_result.gradient[:, ordered_columns]
+                    gradient_errors = numeric_result.error[:, ordered_columns]
+
+            # 桁落ちの見積もりが許容範囲を超える校正点は設定精度で計算し直す
+            fast = (
+                np.all(np.isfinite(central_values), axis=1)
+                & np.all(np.isfinite(gradient), axis=1)
+                & np.isfinite(result_values)
+                & (FLOAT64_DIGITS - lost_digits >= config.get_float64_required_digits())
+            )
+
+            uncertainties = np.where(np.isfinite(standard_uncertainties), standard_uncertainties, 0.0)
+            sensitivities = np.where(np.isfinite(gradient), gradient, 0.0)
+            contributions = uncertainties * sensitivities
+            combined = self.uncertainty_calculator.calculate_combined_uncertainties(
+                contributions,
+                ordered_variables,
+                getattr(self.project, 'correlation_coefficients', {}),
+            )
+            rates = self.uncertainty_calculator.calculate_contribution_rates_batch(contributions)
+            effective_dofs = self.uncertainty_calculator.calculate_effective_degrees_of_freedom_batch(
+                combined,
+                contributions,
+                self.uncertainty_calculator.normalize_degrees_of_freedom_array(degrees_of_freedom),
+            )
+            coverage_factors = self.uncertainty_calculator.get_coverage_factors(effective_dofs)
+        except Exception as e:
+            log_error(f"バジェット一括計算エラー: {str(e)}", details=traceback.format_exc())
+            return [self.calculate_equation(equation, i) for i in point_indices]
+
+        result_var = equation.split('=', 1)[0].strip()
+        results = []
+        for p, point_index in enumerate(point_indices):
+            if not fast[p]:
+                results.append(self.calculate_equation(equation, point_index))
+                continue
+
+            result = BudgetResult(
+                result_variable=result_var,
+                point_index=point_index,
+                point_name=self.get_point_name(point_index),
+                equation=equation,
+                central_value=float(result_values[p]),
+                standard_uncertainty=float(combined[p]),
+                effective_degrees_of_freedom=float(effective_dofs[p]),
+                coverage_factor=float(coverage_factors[p]),
+            )
+            result.expanded_uncertainty = result.coverage_factor * result.standard_uncertainty
+            for j, var in enumerate(ordered_variables):
+                central_text, uncertainty_text, dof_text, distribution = texts[p][j]
+                contribution = float(contributions[p, j])
+                result.rows.append(BudgetRow(
+                    variable=var,
+                    central_value_text=central_text,
+                    standard_uncertainty_text=uncertainty_text,
+                    degrees_of_freedom_text=dof_text,
+                    distribution=distribution,
+                    central_value=float(central_values[p, ordered_columns[j]]),
+                    standard_uncertainty=float(uncertainties[p, j]) if np.isfinite(standard_uncertainties[p, j]) else None,
+                    sensitivity=float(gradient[p, j]),
+                    sensitivity_error=None if gradient_errors is None else float(gradient_errors[p, j]),
+                    contribution=contribution if contribution else None,
+                    contribution_rate=float(rates[p, j]),
+                ))
+            results.append(result)
+        return results
+
+    def calculate_output_covariances(self, point_indices=None, result_variables=None):
+        """
+        全計算結果変数の共分散行列を校正点ごとに計算する（GUM Supplement 2）。
+
+        各計算結果変数の感度係数を共通の入力量に対するヤコビアン J として
+        まとめて一度だけ評価し、U_y = J U_x Jᵀ で出力の共分散を求める。
+        感度係数はバジェットと同じく、プロジェクトの微分方法（記号微分が時間内に
+        終わらなければ数値微分）で求める。今のところ画面には出さず、
+        calculate_project_output_covariances から使う。
+        """
+        if result_variables is None:
+            result_variables = self.get_result_variables()
+        if point_indices is None:
+            point_indices = range(max(1, len(self.get_point_names())))
+        point_indices = list(point_indices)
+
+        equations = []
+        for result_var in result_variables:
+            equation = self.equation_handler.get_target_equation(result_var)
+            if equation and '=' in equation:
+                equations.append((result_var, equation.split('=', 1)[1].strip()))
+
+        output_variables = [result_var for result_var, _ in equations]
+        input_set = set()
+        output_models = []
+        for result_var, right_side in equations:
+            variables, ordered_variables = self.get_ordered_input_variables(right_side)
+            output_models.append((self.equation_handler.get_compiled_model(right_side, variables), variables))
+            input_set.update(ordered_variables)
+        project_variables = getattr(self.project, 'variables', []) or []
+        input_variables = [var for var in project_variables if var in input_set]
+
+        point_count = len(point_indices)
+        central_values, standard_uncertainties, _, _ = self._collect_point_inputs(
+            input_variables, input_variables, point_indices
+        )
+        standard_uncertainties = np.where(np.isfinite(standard_uncertainties), standard_uncertainties, 0.0)
+        column = {var: i for i, var in enumerate(input_variables)}
+
+        values = np.full((point_count, len(output_variables)), np.nan)
+        jacobian = np.zeros((point_count, len(output_variables), len(input_variables)))
+        for k, (model, variables) in enumerate(output_models):
+            if model is None:
+                continue
+            try:
+                arguments = [
+                    central_values[:, column[var]] if var in column else np.full(point_count, np.nan)
+                    for var in variables
+                ]
+                backend = self.equation_handler.get_derivative_backend(model)
+                with np.errstate(all='ignore'):
+                    values[:, k] = model.evaluate_values(*arguments)
+                    if backend == SYMBOLIC:
+                        gradient = model.evaluate_gradient(*arguments)
+                    else:
+                        gradient = model.evaluate_numeric_gradient(*arguments, method=backend).gradient.T
+                for i, var in enumerate(variables):
+                    if var in column:
+                        jacobian[:, k, column[var]] = gradient[i]
+            except Exception as e:
+                log_error(f"出力共分散計算エラー: {str(e)}", details=traceback.format_exc())
+                values[:, k] = np.nan
+                jacobian[:, k, :] = np.nan
+
+        correlation = get_correlation_matrix(self.project).submatrix(input_variables)
+        input_covariance = standard_uncertainties[:, :, None] * correlation[None, :, :] * standard_uncertainties[:, None, :]
+        with np.errstate(all='ignore'):
+            covariance = np.einsum('pki,pij,plj->pkl', jacobian, input_covariance, jacobian)
+
+        return [
+            OutputCovarianceResult(
+                point_index=point_index,
+                point_name=self.get_point_name(point_index),
+                result_variables=list(output_variables),
+                input_variables=list(input_variables),
+                central_values=values[p],
+                jacobian=jacobian[p],
+                input_covariance=input_covariance[p],
+                covariance=covariance[p],
+            )
+            for p, point_index in enumerate(point_indices)
+        ]
+
+    def make_value_handler(self, point_index):
+        return ValueHandler(self.project, point_index)
+
+    def aggregate_result(self, result, value_handler):
+        """
+        各行の寄与から合成標準不確かさ・寄与率・有効自由度・包含係数を集計する。
+
+        中心値が求まっていない結果は合成標準不確かさと寄与率だけを更新する。
+        """
+        contributions = [row.contribution or 0 for row in result.rows]
+        degrees_of_freedom_list = [
+            0 if row.central_value is None else value_handler.get_degrees_of_freedom(row.variable)
+            for row in result.rows
+        ]
+        result.standard_uncertainty = self.uncertainty_calculator.calculate_combined_uncertainty_with_correlation(
+            contributions,
+            [row.variable for row in result.rows],
+            getattr(self.project, 'correlation_coefficients', {}),
+        )
+        contribution_rates = self.uncertainty_calculator.calculate_contribution_rates(contributions)
+        for row, rate in zip(result.rows, contribution_rates):
+            row.contribution_rate = rate
+
+        if result.central_value is None:
+            return result
+        result.effective_degrees_of_freedom = self.uncertainty_calculator.calculate_effective_degrees_of_freedom(
+            result.standard_uncertainty, contributions, degrees_of_freedom_list
+        )
+        result.coverage_factor = self.uncertainty_calculator.get_coverage_factor(
+            result.effective_degrees_of_freedom
+        )
+        result.expanded_uncertainty = result.coverage_factor * result.standard_uncertainty
+        return result
+
+    def calculate_equation(self, equation, point_index, point_name=None):
+        """展開済みの式について、指定した校正点のバジェットを計算"""
+        left_side, right_side = equation.split('=', 1)
+        result_var = left_side.strip()
+        right_side = right_side.strip()
+        if point_name is None:
+            point_name = self.get_point_name(point_index)
+
+        result = BudgetResult(
+            result_variable=result_var,
+            point_index=point_index,
+            point_name=point_name,
+            equation=equation,
+        )
+
+        try:
+            value_handler = self.make_value_handler(point_index)
+            variables, ordered_variables = self.get_ordered_input_variables(right_side)
+
+            compiled_model = self.equation_handler.get_compiled_model(right_side, variables)
+            zero_denominator_terms = detect_zero_denominator_terms(
+                right_side, variables, value_handler, compiled_model=compiled_model
+            )
+            zero_denominator_hint = build_zero_denominator_hint(zero_denominator_terms)
+
+            sensitivity_errors = {}
+            sensitivities = self.equation_handler.calculate_sensitivities(
+                right_side,
+                [var for var in ordered_variables if _to_float_or_none(value_handler.get_central_value(var)) is not None],
+                variables,
+                value_handler,
+                errors=sensitivity_errors,
+            )
+
+            for var in ordered_variables:
+                central_value = value_handler.get_central_value(var)
+                row = BudgetRow(
+                    variable=var,
+                    central_value_text="" if central_value is None else str(central_value),
+                )
+                result.rows.append(row)
+
+                row.central_value = _to_float_or_none(central_value)
+                if row.central_value is None:
+                    continue
+
+                standard_uncertainty = value_handler.get_standard_uncertainty(var)
+                degrees_of_freedom = value_handler.get_degrees_of_freedom(var)
+                row.standard_uncertainty_text = "" if standard_uncertainty is None else str(standard_uncertainty)
+                row.degrees_of_freedom_text = "" if degrees_of_freedom is None else str(degrees_of_freedom)
+                row.standard_uncertainty = _to_float_or_none(standard_uncertainty)
+                row.distribution = get_distribution_translation_key(value_handler.get_distribution(var)) or ""
+
+                sensitivity = sensitivities.get(var, '')
+                sensitivity_float, sensitivity_issue = to_budget_float(
+                    sensitivity,
+                    field_name="Sensitivity",
+                    variable_name=var,
+                    point_name=point_name,
+                )
+                if sensitivity_issue:
+                    if zero_denominator_hint and _is_zero_denominator_issue(sensitivity_issue):
+                        sensitivity_issue.hint = zero_denominator_hint
+                    result.issues.append(sensitivity_issue)
+                    continue
+                row.sensitivity = sensitivity_float
+                row.sensitivity_error = sensitivity_errors.get(var)
+
+                if row.standard_uncertainty and sensitivity_float:
+                    row.contribution = row.standard_uncertainty * sensitivity_float
+
+            result_central_value = self.equation_handler.calculate_result_central_value(
+                right_side, variables, value_handler
+            )
+            result_central_value, result_issue = to_budget_float(
+                result_central_value,
+                field_name="Result central value",
+                variable_name=result_var,
+                point_name=point_name,
+            )
+            if result_issue:
+                if zero_denominator_hint and _is_zero_denominator_issue(result_issue):
+                    result_issue.hint = zero_denominator_hint
+                result.issues.append(result_issue)
+            else:
+                result.central_value = result_central_value
+
+            self.aggregate_result(result, value_handler)
+            return result
+
+        except Exception as e:
+            log_error(f"バジェット計算エラー: {str(e)}", details=traceback.format_exc())
+            result.central_value = None
+            return result
+
+
+def calculate_project_output_covariances(data):
+    """保存データ（辞書）から全校正点の計算結果変数間の共分散を計算"""
+    return BudgetEngine.from_project_data(data).calculate_output_covariances()
+
+
+def calculate_project_budgets(data):
+    """保存データ（辞書）から全計算結果変数・全校正点のバジェットを計算"""
+    return BudgetEngine.from_project_data(data).calculate_all()
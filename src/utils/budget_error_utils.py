@@ -25,11 +25,7 @@ class BudgetCalculationIssue:
         return line
 
 
-def detect_zero_denominator_terms(expression: str, variables, value_handler):
-    """
-    Return [(var_name, raw_value)] where the variable appears in denominator and
-    its central value is numerically zero at the current point.
-    """
+def _denominator_variables(expression: str, variables):
     try:
         symbols = {var: sp.Symbol(var) for var in variables}
         expr = sp.sympify(
@@ -38,15 +34,29 @@ def detect_zero_denominator_terms(expression: str, variables, value_handler):
         )
         denominator = sp.denom(sp.together(expr))
     except Exception:
-        return []
+        return frozenset()
 
     if denominator == 1:
+        return frozenset()
+    return frozenset(var for var, symbol in symbols.items() if symbol in denominator.free_symbols)
+
+
+def detect_zero_denominator_terms(expression: str, variables, value_handler, compiled_model=None):
+    """
+    Return [(var_name, raw_value)] where the variable appears in denominator and
+    its central value is numerically zero at the current point.
+    When compiled_model is given, its cached denominator analysis is reused.
+    """
+    if compiled_model is not None:
+        denominator_variables = compiled_model.denominator_variables()
+    else:
+        denominator_variables = _denominator_variables(expression, variables)
+    if not denominator_variables:
         return []
 
     zero_terms = []
     for var in variables:
-        symbol = symbols.get(var)
-        if symbol is None or symbol not in denominator.free_symbols:
+        if var not in denominator_variables:
             continue
         raw_value = value_handler.get_central_value(var)
         try:
@@ -3,7 +3,7 @@ import math
 import traceback
 import decimal
 from decimal import Decimal, getcontext
-from .config_loader import ConfigLoader
+from .config_loader import get_config
 from .app_logger import log_error
 
 
@@ -25,8 +25,7 @@ def evaluate_formula(formula, variables=None):
         if variables is None:
             variables = {}
 
-        config = ConfigLoader()
-        precision = config.get_precision()
+        precision = get_config().get_precision()
         getcontext().prec = precision
 
         # ^ を Python のべき乗演算子へ変換
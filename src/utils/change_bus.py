@@ -0,0 +1,101 @@
+"""
+変更通知バス
+
+入力の編集は種類付きの変更イベントとして post() し、依存する画面の更新は
+イベントループの次の周回でまとめて実行する。同じ周回に届いたイベントは
+1つのバッチにまとめられ、各更新処理はバッチごとに高々1回しか呼ばれない。
+"""
+
+import traceback
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from PySide6.QtCore import QObject, QTimer
+
+from .app_logger import log_error
+
+# 変更の種類
+VARIABLES_CHANGED = 'variables'
+VALUES_CHANGED = 'values'
+POINTS_CHANGED = 'points'
+CORRELATION_CHANGED = 'correlation'
+EQUATION_CHANGED = 'equation'
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    kind: str
+    variable: Optional[str] = None
+    point_index: Optional[int] = None
+    detail: Any = None
+
+
+@dataclass
+class _Refresh:
+    name: str
+    kinds: frozenset
+    callback: Any
+
+
+class ChangeBus(QObject):
+    """変更イベントを集めて、依存する更新処理を1周回に1回だけ実行する"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._refreshes = {}
+        self._pending = []
+        self._flushing = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+        self.batches = 0
+        self.refresh_counts = {}
+
+    def subscribe(self, name, kinds, callback):
+        """
+        更新処理を登録する。
+
+        callback はバッチ内の該当イベントのリストを受け取る。同じ name で登録し直すと
+        置き換える。実行順は登録順。
+        """
+        self._refreshes[name] = _Refresh(name, frozenset(kinds), callback)
+
+    def unsubscribe(self, name):
+        self._refreshes.pop(name, None)
+
+    def post(self, kind, variable=None, point_index=None, detail=None):
+        """変更イベントを登録し、次の周回での更新を予約する"""
+        self._pending.append(ChangeEvent(kind, variable, point_index, detail))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """溜まっているイベントをすぐに処理する（読み込み処理など同期が必要な場面用）"""
+        if self._flushing:
+            return
+        self._timer.stop()
+        self._flushing = True
+        try:
+            # 更新処理の中で出たイベントは次のバッチとしてこのまま処理する
+            while self._pending:
+                events, self._pending = self._pending, []
+                self._run_batch(events)
+        finally:
+            self._flushing = False
+
+    def _run_batch(self, events):
+        self.batches += 1
+        kinds = {event.kind for event in events}
+        for refresh in list(self._refreshes.values()):
+            if refresh.kinds.isdisjoint(kinds):
+                continue
+            relevant = [event for event in events if event.kind in refresh.kinds]
+            try:
+                refresh.callback(relevant)
+                self.refresh_counts[refresh.name] = self.refresh_counts.get(refresh.name, 0) + 1
+            except Exception as e:
+                log_error(f"画面更新エラー（{refresh.name}）: {str(e)}", details=traceback.format_exc())
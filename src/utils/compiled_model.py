@@ -0,0 +1,316 @@
+"""
+モデル式のコンパイル結果キャッシュ
+
+右辺の式を一度だけ解析・偏微分・lambdify し、正規化した式テキストをキーとして
+再利用する。キャッシュはモデル式（last_equation）が変わったときだけ破棄する。
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import sympy as sp
+
+from .equation_normalizer import normalize_equation_text
+from .numeric_derivatives import COMPLEX_STEP, RICHARDSON, numeric_gradient
+
+
+def normalize_expression_key(expression_text):
+    """キャッシュキー用に式テキストを正規化"""
+    return normalize_equation_text(expression_text or "").replace("^", "**").strip()
+
+
+FLOAT64_DIGITS = 15.95
+NON_ANALYTIC_FUNCTIONS = (sp.Abs, sp.sign, sp.Max, sp.Min, sp.Piecewise, sp.floor, sp.ceiling, sp.re, sp.im, sp.arg)
+
+
+def magnitude_expression(expr):
+    """
+    打ち消しのない大きさの式（和の各項・因子を絶対値に置き換えた式）を作る。
+
+    |magnitude| / |expr| が大きいほど、float64 での評価で桁落ちが起きている。
+    """
+    if expr.is_Atom:
+        return sp.Abs(expr)
+    if expr.is_Add or expr.is_Mul:
+        return expr.func(*[magnitude_expression(arg) for arg in expr.args])
+    if expr.is_Pow and expr.exp.is_number:
+        base_magnitude = magnitude_expression(expr.base)
+        if expr.exp.is_integer and expr.exp.is_positive:
+            return sp.Pow(base_magnitude, expr.exp)
+        # 分母や根号の中の桁落ちは大きさを小さく見せるだけで隠れてしまうので、
+        # 底の条件数（|magnitude| / |底|）を値に掛けて持ち込む
+        return sp.Abs(expr) * base_magnitude / sp.Abs(expr.base)
+    # 関数などは引数の桁落ちの比をそのまま値に掛けて保守的に見積もる
+    factor = sp.Mul(*[magnitude_expression(arg) / sp.Abs(arg) for arg in expr.args])
+    return sp.Abs(expr) * factor
+
+
+def lost_digits(values, magnitudes):
+    """桁落ちで失われた桁数の見積もり（完全に打ち消された場合は inf）"""
+    values = np.abs(np.asarray(values, dtype=float))
+    magnitudes = np.abs(np.asarray(magnitudes, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digits = np.log10(np.maximum(magnitudes / values, 1.0))
+    digits = np.where(magnitudes == 0, 0.0, digits)
+    return np.where(np.isnan(digits), np.inf, digits)
+
+
+class _DerivativeWorker:
+    """モデルの偏微分式を別スレッドで作り、終わったらモデルに格納する"""
+
+    def __init__(self, model, variables):
+        self.finished = threading.Event()
+        self.error = None
+        thread = threading.Thread(
+            target=self._run, args=(model, list(variables)), name='symbolic-derivatives', daemon=True
+        )
+        thread.start()
+
+    def _run(self, model, variables):
+        try:
+            derivatives = {var: sp.diff(model.expression, model.symbols[var]) for var in variables}
+            with model._lock:
+                for var, derivative in derivatives.items():
+                    model._derivatives.setdefault(var, derivative)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished.set()
+
+
+class CompiledModel:
+    """解析済みの式・偏微分式・数値評価関数をまとめて保持する"""
+
+    def __init__(self, expression_text, variables):
+        self.expression_text = normalize_expression_key(expression_text)
+        self.variables = tuple(variables)
+        self.symbols = {var: sp.Symbol(var) for var in self.variables}
+        self.expression = sp.sympify(self.expression_text, locals=self.symbols)
+        self._derivatives = {}
+        self._denominator_variables = None
+        self._value_function = None
+        self._gradient_function = None
+        self._magnitude_functions = {}
+        self.symbolic_timed_out = False
+        # 時間制限付きで偏微分しているスレッド（_DerivativeWorker）
+        self._derivative_worker = None
+        self._lock = threading.RLock()
+
+    @property
+    def ordered_symbols(self):
+        return [self.symbols[var] for var in self.variables]
+
+    def derivative(self, var):
+        """偏微分式を返す（初回のみ sp.diff を実行）"""
+        with self._lock:
+            if var not in self._derivatives:
+                self._derivatives[var] = sp.diff(self.expression, self.symbols[var])
+            return self._derivatives[var]
+
+    def derivatives(self):
+        """全変数の偏微分式を変数順で返す"""
+        return [self.derivative(var) for var in self.variables]
+
+    def substitute(self, expression, values):
+        """{変数名: SymPy数値} を一括代入する（未指定の変数は記号のまま残す）"""
+        mapping = {
+            self.symbols[var]: value
+            for var, value in values.items()
+            if var in self.symbols and value is not None
+        }
+        return expression.xreplace(mapping)
+
+    def evaluate_derivative(self, var, values):
+        return self.substitute(self.derivative(var), values)
+
+    def evaluate_derivatives(self, values):
+        """全変数の偏微分値（{変数名: SymPy数値}）"""
+        return {var: self.evaluate_derivative(var, values) for var in self.variables}
+
+    def evaluate_expression(self, values):
+        return self.substitute(self.expression, values)
+
+    def denominator_variables(self):
+        """分母に現れる変数名の集合"""
+        with self._lock:
+            if self._denominator_variables is None:
+                try:
+                    denominator = sp.denom(sp.together(self.expression))
+                except Exception:
+                    denominator = sp.Integer(1)
+                if denominator == 1:
+                    self._denominator_variables = frozenset()
+                else:
+                    free_symbols = denominator.free_symbols
+                    self._denominator_variables = frozenset(
+                        var for var, symbol in self.symbols.items() if symbol in free_symbols
+                    )
+            return self._denominator_variables
+
+    @property
+    def value_function(self):
+        """NumPy配列に対応した中心値の評価関数 f(*values)"""
+        with self._lock:
+            if self._value_function is None:
+                self._value_function = sp.lambdify(self.ordered_symbols, self.expression, modules="numpy")
+            return self._value_function
+
+    @property
+    def gradient_function(self):
+        """NumPy配列に対応した感度係数の評価関数 g(*values) -> [df/dx_i]"""
+        with self._lock:
+            if self._gradient_function is None:
+                self._gradient_function = sp.lambdify(self.ordered_symbols, self.derivatives(), modules="numpy")
+            return self._gradient_function
+
+    @property
+    def is_analytic(self):
+        """複素ステップ微分が使える（絶対値・場合分けなどを含まない）式か"""
+        return not self.expression.has(*NON_ANALYTIC_FUNCTIONS)
+
+    def prepare_symbolic_derivatives(self, time_budget=None):
+        """
+        全変数の偏微分式を用意する。time_budget（秒）を超えたら打ち切って False を返し、
+        以降は数値微分を使う。
+
+        sp.diff は途中で止められないので、time_budget があるときはモデルごとに1本だけの
+        スレッドで偏微分し、ロックを放してその時間だけ待つ。打ち切った後は新しい
+        スレッドを起こさない（走っている偏微分は終われば結果を残す）。
+        """
+        with self._lock:
+            if self.symbolic_timed_out:
+                return False
+            remaining = [var for var in self.variables if var not in self._derivatives]
+            if not remaining:
+                return True
+            if time_budget is None:
+                self.derivatives()
+                return True
+            if self._derivative_worker is None:
+                self._derivative_worker = _DerivativeWorker(self, remaining)
+            worker = self._derivative_worker
+
+        finished = worker.finished.wait(max(float(time_budget), 0.0))
+        with self._lock:
+            if not finished:
+                self.symbolic_timed_out = True
+                return False
+            if self._derivative_worker is worker:
+                self._derivative_worker = None
+            if worker.error is not None:
+                raise worker.error
+            return True
+
+    def _magnitude_function(self, name, expressions):
+        with self._lock:
+            if name not in self._magnitude_functions:
+                self._magnitude_functions[name] = sp.lambdify(
+                    self.ordered_symbols,
+                    [magnitude_expression(expression) for expression in expressions],
+                    modules="numpy",
+                )
+            return self._magnitude_functions[name]
+
+    def evaluate_float64(self, *values, with_gradient=True):
+        """
+        float64 で中心値と感度係数を評価し、桁落ちの見積もりを添えて返す。
+
+        戻り値は (中心値, 感度係数 (変数数, ...), 失われた桁数)。
+        with_gradient=False の場合は偏微分式を使わず、感度係数は None になる。
+        """
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast(*arrays).shape if arrays else ()
+        with np.errstate(all='ignore'):
+            value = self.evaluate_values(*arrays)
+            value_magnitude = self._magnitude_function('value', [self.expression])(*arrays)[0]
+            digits = lost_digits(value, np.broadcast_to(np.asarray(value_magnitude, dtype=float), shape))
+            if not with_gradient:
+                return value, None, digits
+
+            gradient = self.evaluate_gradient(*arrays)
+            magnitudes = self._magnitude_function('gradient', self.derivatives())(*arrays)
+            for derivative_value, magnitude in zip(gradient, magnitudes):
+                magnitude = np.broadcast_to(np.asarray(magnitude, dtype=float), shape)
+                digits = np.maximum(digits, lost_digits(derivative_value, magnitude))
+        return value, gradient, digits
+
+    def evaluate_raw(self, *values):
+        """型を変換せずに評価（複素ステップ微分用）"""
+        return self.value_function(*values)
+
+    def evaluate_numeric_gradient(self, *values, method=COMPLEX_STEP):
+        """
+        数値微分で感度係数を計算する（NumericDerivativeResult、gradient は (..., 変数数)）。
+
+        絶対値や場合分けを含む式では複素ステップの代わりに中心差分を使う。
+        """
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast(*arrays).shape if arrays else ()
+        x = np.stack([np.broadcast_to(array, shape).reshape(-1) for array in arrays], axis=1)
+        if method == COMPLEX_STEP and not self.is_analytic:
+            method = RICHARDSON
+        return numeric_gradient(self.evaluate_raw, x, method=method)
+
+    def evaluate_values(self, *values):
+        """数値評価（スカラー/配列）を行い、入力と同じ形状の配列で返す"""
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast(*arrays).shape if arrays else ()
+        result = np.asarray(self.value_function(*arrays), dtype=float)
+        return np.broadcast_to(result, shape).copy() if result.shape != shape else result
+
+    def evaluate_gradient(self, *values):
+        """感度係数を数値評価し、(変数数, ...) の配列で返す"""
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast(*arrays).shape if arrays else ()
+        gradient = self.gradient_function(*arrays)
+        return np.stack([np.broadcast_to(np.asarray(item, dtype=float), shape) for item in gradient])
+
+
+class CompiledModelCache:
+    """正規化した式テキストをキーとする CompiledModel のキャッシュ"""
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.source_equation = None
+        self._models = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._models)
+
+    def sync_source(self, equation):
+        """モデル式が変わった場合のみキャッシュを破棄する"""
+        with self._lock:
+            if equation != self.source_equation:
+                self._models.clear()
+                self.source_equation = equation
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self.source_equation = None
+
+    def get(self, expression_text, variables):
+        key = (normalize_expression_key(expression_text), tuple(variables))
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+
+        model = CompiledModel(key[0], key[1])
+        with self._lock:
+            model = self._models.setdefault(key, model)
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_size:
+                self._models.popitem(last=False)
+            return model
+
+
+_model_cache = CompiledModelCache()
+
+
+def get_model_cache():
+    """プロセス共通のモデルキャッシュを返す"""
+    return _model_cache
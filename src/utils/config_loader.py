@@ -1,16 +1,59 @@
 import configparser
 import os
 import re
+import threading
+import time
 
 from .app_logger import log_error, log_warning
 
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config.ini')
+
+# 共有設定のファイル更新日時を確認する間隔（秒）
+_MTIME_CHECK_INTERVAL = 1.0
+
+
+class _ReadOnlyConfigParser(configparser.ConfigParser):
+    """freeze() の後は値を変更できない ConfigParser（共有スナップショット用）"""
+
+    _frozen = False
+
+    def freeze(self):
+        self._frozen = True
+
+    def _check_writable(self):
+        if self._frozen:
+            raise TypeError("共有の設定スナップショットは変更できません。ConfigLoader() で読み込んでください")
+
+    def _read(self, fp, fpname):
+        self._check_writable()
+        super()._read(fp, fpname)
+
+    def set(self, section, option, value=None):
+        self._check_writable()
+        super().set(section, option, value)
+
+    def add_section(self, section):
+        self._check_writable()
+        super().add_section(section)
+
+    def remove_section(self, section):
+        self._check_writable()
+        return super().remove_section(section)
+
+    def remove_option(self, section, option):
+        self._check_writable()
+        return super().remove_option(section, option)
+
+
 class ConfigLoader:
+    _parser_class = configparser.ConfigParser
+
     def __init__(self, config_path: str = None):
         # Support inline comments like: key = value  # comment
         # This avoids accidentally treating commented values as literals.
-        self.config = configparser.ConfigParser(inline_comment_prefixes=("#", ";"))
+        self.config = self._parser_class(inline_comment_prefixes=("#", ";"))
         if config_path is None:
-            config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config.ini')
+            config_path = DEFAULT_CONFIG_PATH
         self.config_path = config_path  # 設定ファイルのパスを保存
 
 
@@ -27,6 +70,52 @@ class ConfigLoader:
             log_warning("Calculationセクションが見つかりません。デフォルト値を使用します。")
             return 28
 
+    def get_numeric_engine(self) -> str:
+        """感度係数・中心値の計算エンジンを取得（float64 / high_precision）"""
+        engine = self.config.get('Calculation', 'numeric_engine', fallback='float64').strip().lower()
+        return engine if engine in ('float64', 'high_precision') else 'float64'
+
+    def get_float64_required_digits(self) -> int:
+        """float64 の結果に求める有効桁数（これを下回ると高精度で再計算）"""
+        try:
+            return int(self.config.get('Calculation', 'float64_required_digits', fallback='10'))
+        except ValueError:
+            return 10
+
+    def get_symbolic_derivative_time_budget(self) -> float:
+        """記号微分にかける時間の上限（秒）。超えた場合は数値微分に切り替える"""
+        try:
+            return float(self.config.get('Calculation', 'symbolic_derivative_time_budget', fallback='5.0'))
+        except ValueError:
+            return 5.0
+
+    def get_monte_carlo_workers(self) -> int:
+        """モンテカルロ法のワーカープロセス数（0以下ならCPU数）"""
+        try:
+            workers = int(self.config.get('MonteCarlo', 'workers', fallback='0'))
+        except ValueError:
+            workers = 0
+        return workers if workers > 0 else max(os.cpu_count() or 1, 1)
+
+    def get_monte_carlo_auto_run(self) -> bool:
+        """モンテカルロ法タブを開いたときに自動で実行するか"""
+        try:
+            return self.config.getboolean('MonteCarlo', 'auto_run', fallback=True)
+        except ValueError:
+            return True
+
+    def get_monte_carlo_sample_directory(self) -> str:
+        """モンテカルロ法の標本の保存先（相対パスは設定ファイルの場所から）"""
+        directory = self.config.get('MonteCarlo', 'sample_directory', fallback='mc_runs').strip() or 'mc_runs'
+        return os.path.join(os.path.dirname(os.path.abspath(self.config_path)), directory)
+
+    def get_monte_carlo_max_stored_runs(self) -> int:
+        """保存しておく標本の実行数（古いものから消す）"""
+        try:
+            return max(int(self.config.get('MonteCarlo', 'max_stored_runs', fallback='5')), 1)
+        except ValueError:
+            return 5
+
     def get_calibration_point_limits(self) -> dict:
         """校正点の制限値を取得"""
         try:
@@ -67,38 +156,6 @@ class ConfigLoader:
                 'u': '1.414213562'
             }
 
-    def get_t_values(self) -> dict:
-        """t分布表を取得"""
-        try:
-            t_values = {}
-            for key, value in self.config.items('TValues'):
-                if key == 'infinity':
-                    t_values[float('inf')] = float(value)
-                else:
-                    t_values[int(key)] = float(value)
-            return t_values
-        except configparser.NoSectionError:
-            log_warning("TValuesセクションが見つかりません。デフォルト値を使用します。")
-            return {
-                1: 12.706,
-                2: 4.303,
-                3: 3.182,
-                4: 2.776,
-                5: 2.571,
-                6: 2.447,
-                7: 2.365,
-                8: 2.306,
-                9: 2.262,
-                10: 2.228,
-                15: 2.131,
-                20: 2.086,
-                30: 2.042,
-                40: 2.021,
-                60: 2.000,
-                120: 1.980,
-                float('inf'): 1.960
-            }
-
     def get_message(self, key: str) -> str:
         """メッセージを取得"""
         return self.config.get('Messages', key)
@@ -111,6 +168,8 @@ class ConfigLoader:
         """設定ファイルに変更を保存する"""
         try:
             self._save_config_preserving_format()
+            if _same_path(self.config_path, _shared_state['path']):
+                reload_config(self.config_path)
             return True
         except Exception as e:
             log_error(f"設定ファイルの保存に失敗しました: {str(e)}")
@@ -200,3 +259,86 @@ class ConfigLoader:
 
         with open(self.config_path, 'w', encoding='utf-8') as config_file:
             config_file.writelines(lines)
+
+
+class FrozenConfig(ConfigLoader):
+    """
+    get_config() が返す共有の設定スナップショット（読み取り専用）。
+
+    config は変更できず、save_config() も使えない。version は読み直すたびに増える番号で、
+    設定が変わったかどうかの判定に使う。
+    """
+
+    _parser_class = _ReadOnlyConfigParser
+
+    def __init__(self, config_path: str = None, version: int = 0):
+        super().__init__(config_path)
+        self.config.freeze()
+        self.version = version
+
+    def save_config(self) -> bool:
+        raise TypeError("共有の設定スナップショットは保存できません。ConfigLoader() で読み込んでください")
+
+
+def _read_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _same_path(path_a, path_b):
+    return path_a is not None and path_b is not None and os.path.abspath(path_a) == os.path.abspath(path_b)
+
+
+_shared_lock = threading.RLock()
+_shared_state = {'path': DEFAULT_CONFIG_PATH, 'config': None, 'mtime': None, 'checked_at': 0.0, 'version': 0}
+_listeners = []
+
+
+def get_config() -> FrozenConfig:
+    """
+    プロセス共通の設定スナップショット（FrozenConfig、読み取り専用）を返す。
+
+    設定ファイルは初回と更新日時が変わったときだけ読み込む。
+    設定を変更する場合は ConfigLoader() で新しく読み込み、save_config() で保存する。
+    """
+    with _shared_lock:
+        config = _shared_state['config']
+        now = time.monotonic()
+        if config is not None and now - _shared_state['checked_at'] < _MTIME_CHECK_INTERVAL:
+            return config
+        _shared_state['checked_at'] = now
+        if config is not None and _read_mtime(_shared_state['path']) == _shared_state['mtime']:
+            return config
+    return reload_config(_shared_state['path'])
+
+
+def reload_config(config_path: str = None) -> FrozenConfig:
+    """設定ファイルを読み直して共有スナップショットを差し替え、変更を通知する"""
+    with _shared_lock:
+        path = config_path or _shared_state['path']
+        mtime = _read_mtime(path)
+        version = _shared_state['version'] + 1
+        config = FrozenConfig(path, version)
+        _shared_state.update(path=path, config=config, mtime=mtime, checked_at=time.monotonic(), version=version)
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(config)
+        except Exception as e:
+            log_error(f"設定変更の通知に失敗しました: {str(e)}")
+    return config
+
+
+def add_config_listener(listener):
+    """設定が読み直されたときに listener(config) を呼び出す"""
+    with _shared_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_config_listener(listener):
+    with _shared_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
@@ -0,0 +1,305 @@
+"""
+相関係数行列の密行列ストア
+
+プロジェクトの相関係数（{変数: {変数: r}} の辞書）を、変数→インデックスの対応表と
+対称なNumPy配列として保持する。内容が変わるたびに version を進めるので、
+行列から派生したデータのキャッシュ判定にも使える。
+
+入力された行列が半正定値でないときは、Higham の交互射影法で最も近い相関行列に
+直してから分解する（factorize_correlation）。分解は行列の内容のハッシュで
+キャッシュするので、同じ行列なら実行ごと・チャンクごとに分解し直さない。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+# 交互射影法の収束判定（‖Y - X‖_F / ‖Y‖_F）と反復回数の上限
+NEAREST_CORRELATION_TOLERANCE = 1e-10
+NEAREST_CORRELATION_MAX_ITERATIONS = 500
+
+
+def read_correlation_value(mapping, var_i, var_j):
+    """辞書形式の相関係数を両方向から読み取る（未設定・不正値は0）"""
+    if not isinstance(mapping, dict):
+        return 0.0
+    row = mapping.get(var_i, {})
+    raw = row.get(var_j) if isinstance(row, dict) else None
+    if raw is None:
+        reverse_row = mapping.get(var_j, {})
+        raw = reverse_row.get(var_i, 0.0) if isinstance(reverse_row, dict) else 0.0
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CorrelationMatrix:
+    """対称な相関係数行列（対角=1）と変数インデックスを保持する"""
+
+    def __init__(self, variables=(), values=None):
+        self._variables = list(variables)
+        self._index = {var: i for i, var in enumerate(self._variables)}
+        size = len(self._variables)
+        if values is None:
+            self._array = np.eye(size, dtype=float)
+        else:
+            self._array = np.array(values, dtype=float).reshape(size, size)
+            np.fill_diagonal(self._array, 1.0)
+        self.version = 0
+
+    @classmethod
+    def from_mapping(cls, mapping, variables=None):
+        """辞書形式の相関係数から行列を作成（変数省略時は辞書に現れる順）"""
+        if variables is None:
+            variables = []
+            if isinstance(mapping, dict):
+                for row_var, row in mapping.items():
+                    variables.append(row_var)
+                    if isinstance(row, dict):
+                        variables.extend(row.keys())
+            variables = list(dict.fromkeys(variables))
+
+        matrix = cls(variables)
+        for i, var_i in enumerate(matrix._variables):
+            for j in range(i + 1, len(matrix._variables)):
+                value = read_correlation_value(mapping, var_i, matrix._variables[j])
+                matrix._array[i, j] = matrix._array[j, i] = value
+        return matrix
+
+    @property
+    def variables(self):
+        return list(self._variables)
+
+    @property
+    def array(self):
+        """読み取り専用の行列ビュー"""
+        view = self._array.view()
+        view.flags.writeable = False
+        return view
+
+    def __contains__(self, var):
+        return var in self._index
+
+    def __len__(self):
+        return len(self._variables)
+
+    def index_of(self, var):
+        return self._index.get(var)
+
+    def get(self, var_i, var_j):
+        if var_i == var_j:
+            return 1.0
+        i, j = self._index.get(var_i), self._index.get(var_j)
+        if i is None or j is None:
+            return 0.0
+        return float(self._array[i, j])
+
+    def set(self, var_i, var_j, value):
+        """相関係数を対称に設定し、versionを進める"""
+        if var_i == var_j:
+            return
+        for var in (var_i, var_j):
+            if var not in self._index:
+                self._add_variable(var)
+        i, j = self._index[var_i], self._index[var_j]
+        self._array[i, j] = self._array[j, i] = float(value)
+        self.version += 1
+
+    def _add_variable(self, var):
+        size = len(self._variables)
+        expanded = np.eye(size + 1, dtype=float)
+        expanded[:size, :size] = self._array
+        self._array = expanded
+        self._index[var] = size
+        self._variables.append(var)
+
+    def submatrix(self, variables):
+        """指定した変数順の部分行列（未登録の変数は無相関）"""
+        variables = list(variables)
+        positions = np.array([self._index.get(var, -1) for var in variables], dtype=int)
+        result = np.eye(len(variables), dtype=float)
+        known = np.flatnonzero(positions >= 0)
+        if known.size:
+            result[np.ix_(known, known)] = self._array[np.ix_(positions[known], positions[known])]
+            np.fill_diagonal(result, 1.0)
+        return result
+
+    def to_mapping(self, variables=None):
+        """保存用の辞書形式に変換"""
+        variables = self._variables if variables is None else list(variables)
+        sub = self.submatrix(variables)
+        return {
+            row_var: {col_var: float(sub[i, j]) for j, col_var in enumerate(variables)}
+            for i, row_var in enumerate(variables)
+        }
+
+    def combined_variance(self, contributions, variables):
+        """
+        寄与 c = u(x_i)·c_i から cᵀRc を計算する。
+
+        contributions は (変数数,) または (校正点数, 変数数) の配列。
+        """
+        c = np.nan_to_num(np.asarray(contributions, dtype=float))
+        correlation = self.submatrix(variables)
+        if c.ndim == 1:
+            return float(c @ correlation @ c)
+        return np.einsum('pi,ij,pj->p', c, correlation, c)
+
+    def combined_standard_uncertainty(self, contributions, variables):
+        """cᵀRc の平方根（負・0の場合は0）"""
+        variance = np.asarray(self.combined_variance(contributions, variables))
+        result = np.sqrt(np.where(variance > 0, variance, 0.0))
+        return float(result) if result.ndim == 0 else result
+
+
+def get_correlation_matrix(owner):
+    """
+    owner.correlation_coefficients に対応する CorrelationMatrix を返す。
+
+    owner が correlation_version を持つ場合は、辞書とversionが変わらない限り
+    同じ行列を再利用する。持たない場合は毎回辞書から作り直す。
+    """
+    mapping = getattr(owner, 'correlation_coefficients', {})
+    version = getattr(owner, 'correlation_version', None)
+    if version is None:
+        return CorrelationMatrix.from_mapping(mapping)
+
+    cached = getattr(owner, '_correlation_matrix_cache', None)
+    if cached is not None and cached[0] is mapping and cached[1] == version:
+        return cached[2]
+
+    matrix = CorrelationMatrix.from_mapping(mapping)
+    try:
+        owner._correlation_matrix_cache = (mapping, version, matrix)
+    except AttributeError:
+        pass
+    return matrix
+
+
+def nearest_correlation_matrix(matrix, tolerance=NEAREST_CORRELATION_TOLERANCE,
+                               max_iterations=NEAREST_CORRELATION_MAX_ITERATIONS):
+    """
+    Frobenius ノルムで matrix に最も近い相関行列（半正定値・対角 1）。
+
+    Higham (2002) の交互射影法。半正定値への射影には Dykstra の補正をかけ、
+    単位対角への射影と交互に繰り返す。
+    """
+    target = np.asarray(matrix, dtype=float)
+    target = 0.5 * (target + target.T)
+    correction = np.zeros_like(target)
+    result = target.copy()
+    for _ in range(int(max_iterations)):
+        shifted = result - correction
+        eigenvalues, eigenvectors = np.linalg.eigh(shifted)
+        projected = (eigenvectors * np.clip(eigenvalues, 0.0, None)) @ eigenvectors.T
+        projected = 0.5 * (projected + projected.T)
+        correction = projected - shifted
+        result = projected.copy()
+        np.fill_diagonal(result, 1.0)
+        if np.linalg.norm(result - projected) <= tolerance * np.linalg.norm(result):
+            break
+    return result
+
+
+@dataclass(frozen=True)
+class CorrelationFactorization:
+    """相関行列の分解（factor @ factor.T == matrix）"""
+    # 分解に使った行列（直さなかったときは入力と同じ）
+    matrix: np.ndarray
+    # 独立な標準正規スコアに右から .T で掛けると相関をもたせる行列
+    factor: np.ndarray
+    # 入力からの距離 ‖matrix - 入力‖_F と最大の要素の差
+    distance: float = 0.0
+    max_deviation: float = 0.0
+
+    @property
+    def repaired(self):
+        return self.distance > 0.0
+
+
+def _factor(matrix):
+    """コレスキー因子（特異に近くて失敗したら固有値分解から作る）"""
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+def _factorize(matrix):
+    try:
+        # 正定値ならそのまま分解できる（ほとんどの場合はここで終わる）
+        return CorrelationFactorization(matrix, np.linalg.cholesky(matrix))
+    except np.linalg.LinAlgError:
+        pass
+    eigenvalues = np.linalg.eigvalsh(matrix)
+    if eigenvalues[0] >= -1e-12 * max(matrix.shape[0], 1):
+        # 半正定値（特異）なら直さずに分解する
+        return CorrelationFactorization(matrix, _factor(matrix))
+    repaired = nearest_correlation_matrix(matrix)
+    difference = repaired - matrix
+    return CorrelationFactorization(
+        repaired,
+        _factor(repaired),
+        distance=float(np.linalg.norm(difference)),
+        max_deviation=float(np.max(np.abs(difference))),
+    )
+
+
+class CorrelationFactorCache:
+    """行列の内容のハッシュをキーとする CorrelationFactorization のキャッシュ"""
+
+    def __init__(self, max_size=32):
+        self.max_size = max_size
+        self._factorizations = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._factorizations)
+
+    def clear(self):
+        with self._lock:
+            self._factorizations.clear()
+
+    @staticmethod
+    def key(matrix):
+        digest = hashlib.blake2b(np.ascontiguousarray(matrix).tobytes(), digest_size=16)
+        digest.update(str(matrix.shape).encode())
+        return digest.hexdigest()
+
+    def get(self, matrix):
+        matrix = np.asarray(matrix, dtype=float)
+        key = self.key(matrix)
+        with self._lock:
+            factorization = self._factorizations.get(key)
+            if factorization is not None:
+                self._factorizations.move_to_end(key)
+                return factorization
+
+        matrix = matrix.copy()
+        matrix.flags.writeable = False
+        factorization = _factorize(matrix)
+        for array in (factorization.matrix, factorization.factor):
+            array.flags.writeable = False
+        with self._lock:
+            factorization = self._factorizations.setdefault(key, factorization)
+            self._factorizations.move_to_end(key)
+            while len(self._factorizations) > self.max_size:
+                self._factorizations.popitem(last=False)
+            return factorization
+
+
+_factor_cache = CorrelationFactorCache()
+
+
+def factorize_correlation(matrix):
+    """
+    相関行列を分解する（必要なら最も近い相関行列に直してから）。
+
+    同じ内容の行列にはプロセス内で同じ結果を返す。結果の配列は読み取り専用。
+    """
+    return _factor_cache.get(matrix)
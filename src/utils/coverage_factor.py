@@ -0,0 +1,52 @@
+"""
+t分布による包含係数
+
+両側の包含確率 p に対する t 分布の分位点を、不完全ベータ関数の逆関数から
+厳密に求める（t表の線形補間は使わない）。計算は special_functions.t_ppf で行い、
+自由度が小数でもよく、結果は (自由度, 包含確率) ごとにメモ化する。
+NumPy配列の自由度もまとめて扱える。
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from .special_functions import t_ppf
+
+DEFAULT_COVERAGE_PROBABILITY = 0.95
+
+
+@lru_cache(maxsize=4096)
+def t_coverage_factor(degrees_of_freedom, coverage_probability=DEFAULT_COVERAGE_PROBABILITY):
+    """
+    両側の包含確率 coverage_probability に対する包含係数 k = t_p(ν)。
+
+    自由度は正の実数（inf可）。t 分布の (1 + p)/2 分位点を special_functions.t_ppf で求める。
+    """
+    nu = float(degrees_of_freedom)
+    p = float(coverage_probability)
+    if not 0.0 < p < 1.0:
+        raise ValueError(f"包含確率は0と1の間で指定してください: {coverage_probability}")
+    if math.isnan(nu) or nu <= 0.0:
+        raise ValueError(f"自由度は正の値で指定してください: {degrees_of_freedom}")
+
+    return float(t_ppf(0.5 + p / 2.0, nu))
+
+
+def t_coverage_factors(degrees_of_freedom, coverage_probability=DEFAULT_COVERAGE_PROBABILITY):
+    """
+    自由度の配列に対する包含係数をまとめて求める。
+
+    同じ自由度は一度だけ計算し、不正な自由度（NaN・0以下）は NaN を返す。
+    """
+    dofs = np.asarray(degrees_of_freedom, dtype=float)
+    factors = np.full(dofs.shape, np.nan)
+    valid = dofs > 0
+    if np.any(valid):
+        unique_dofs, inverse = np.unique(dofs[valid], return_inverse=True)
+        unique_factors = np.array(
+            [t_coverage_factor(float(df), coverage_probability) for df in unique_dofs]
+        )
+        factors[valid] = unique_factors[inverse.reshape(-1)]
+    return factors
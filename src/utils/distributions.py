@@ -0,0 +1,239 @@
+"""
+入力量の確率分布
+
+モンテカルロ法で使う分布を、中心値（期待値）・標準不確かさ・形状パラメータから
+逆累積分布関数で作れるようにまとめたもの。逆累積分布関数があれば、相関のある
+入力量もガウスコピュラ（正規スコア → 累積確率 → 各分布）で抽出できる。
+
+- 正規分布・矩形分布・三角分布
+- U字分布: 中心値 ± 半値幅を端点とする逆正弦分布（端点は任意に置ける）
+- t 分布: GUM-S1 6.4.9 の Type A 用。標準不確かさ s/√n を尺度、
+  自由度 ν = n - 1 とする（分散は u²ν/(ν-2) で u² より大きい）
+- 台形分布: 形状パラメータは上底と下底の半値幅の比 β（0 で三角、1 で矩形）
+- 曲線台形分布: GUM-S1 6.4.3。矩形分布の半値幅 w が w ± d の範囲で不確かなもの。
+  形状パラメータは d/w
+- 対数正規分布: 期待値と標準偏差が中心値と標準不確かさに一致するもの（中心値 > 0）
+
+t 分布以外は標準偏差が標準不確かさに一致する。
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+from .special_functions import ndtr, ndtri, t_ppf
+from .translation_keys import (
+    CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION,
+    LOGNORMAL_DISTRIBUTION,
+    NORMAL_DISTRIBUTION,
+    RECTANGULAR_DISTRIBUTION,
+    STUDENT_T_DISTRIBUTION,
+    TRAPEZOIDAL_DISTRIBUTION,
+    TRIANGULAR_DISTRIBUTION,
+    U_DISTRIBUTION,
+)
+
+_EPSILON = 1e-12
+# 曲線台形分布の逆関数を二分法で解く回数（区間幅 2d の 2^-60 倍まで詰める）
+_BISECTION_STEPS = 60
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    分布1つ分の定義。
+
+    ppf(probabilities, central, standard_uncertainty, parameter) が値を返す。
+    variance_ratio(parameter) は分散 / 標準不確かさ²（有限でなければ inf）。
+    """
+    key: str
+    ppf: Callable
+    variance_ratio: Callable = lambda parameter: 1.0
+    # 形状パラメータの範囲（None なら形状パラメータなし）
+    parameter_range: Optional[tuple] = None
+    # 半値幅 / 標準不確かさ（形状パラメータの関数。None なら除数は手入力）
+    divisor: Optional[Callable] = None
+    # 期待値が中心値に一致するか（t 分布は ν > 1 のときだけ）
+    has_mean: Callable = lambda parameter: True
+    # 中心値が正でなければならないか（対数正規分布）
+    positive_central: bool = False
+
+    def check_parameter(self, parameter, central=0.0):
+        """形状パラメータ（と中心値）が分布の条件を満たさなければ ValueError"""
+        if self.positive_central and not central > 0.0:
+            raise ValueError(f"{self.key} needs a positive central value: {central}")
+        if self.parameter_range is None:
+            return
+        low, high = self.parameter_range
+        if parameter is None or not (low <= float(parameter) <= high):
+            raise ValueError(f"Invalid shape parameter for {self.key}: {parameter}")
+
+    def from_normal_scores(self, normal_scores, central, standard_uncertainty, parameter=None):
+        """標準正規スコアを累積確率経由でこの分布の値にする"""
+        if self.key == NORMAL_DISTRIBUTION:
+            return central + standard_uncertainty * normal_scores
+        if self.key == LOGNORMAL_DISTRIBUTION:
+            return _lognormal_from_scores(normal_scores, central, standard_uncertainty)
+        probabilities = np.clip(ndtr(normal_scores), _EPSILON, 1.0 - _EPSILON)
+        return self.ppf(probabilities, central, standard_uncertainty, parameter)
+
+
+def _normal_ppf(probabilities, central, standard_uncertainty, parameter):
+    return central + standard_uncertainty * ndtri(probabilities)
+
+
+def _rectangular_ppf(probabilities, central, standard_uncertainty, parameter):
+    half_width = standard_uncertainty * math.sqrt(3.0)
+    return central + (2.0 * probabilities - 1.0) * half_width
+
+
+def _triangular_ppf(probabilities, central, standard_uncertainty, parameter):
+    half_width = standard_uncertainty * math.sqrt(6.0)
+    triangular = np.where(
+        probabilities < 0.5,
+        np.sqrt(2.0 * probabilities) - 1.0,
+        1.0 - np.sqrt(2.0 * (1.0 - probabilities)),
+    )
+    return central + triangular * half_width
+
+
+def _arcsine_ppf(probabilities, central, standard_uncertainty, parameter):
+    half_width = standard_uncertainty * math.sqrt(2.0)
+    return central + half_width * np.sin(np.pi * (probabilities - 0.5))
+
+
+def _student_t_ppf(probabilities, central, standard_uncertainty, parameter):
+    return central + standard_uncertainty * t_ppf(probabilities, parameter)
+
+
+def _student_t_variance_ratio(parameter):
+    nu = float(parameter)
+    return nu / (nu - 2.0) if nu > 2.0 else math.inf
+
+
+def _trapezoidal_divisor(parameter):
+    return math.sqrt(6.0 / (1.0 + float(parameter) ** 2))
+
+
+def _trapezoidal_ppf(probabilities, central, standard_uncertainty, parameter):
+    """下底の半値幅 a、上底の半値幅 βa の台形分布"""
+    beta = float(parameter)
+    half_width = standard_uncertainty * _trapezoidal_divisor(beta)
+    top = beta * half_width
+    # 斜辺の部分に入る確率
+    edge = (half_width - top) / (2.0 * (half_width + top))
+    lower = np.minimum(probabilities, 1.0 - probabilities)
+    sloped = -half_width + np.sqrt(2.0 * lower * (half_width * half_width - top * top))
+    flat = -top + (lower - edge) * (half_width + top)
+    magnitude = np.where(lower < edge, sloped, flat)
+    return central + np.where(probabilities < 0.5, magnitude, -magnitude)
+
+
+def _curvilinear_divisor(parameter):
+    return math.sqrt(3.0 / (1.0 + float(parameter) ** 2 / 3.0))
+
+
+def _curvilinear_trapezoidal_ppf(probabilities, central, standard_uncertainty, parameter):
+    """
+    半値幅が [w - d, w + d] で一様に不確かな矩形分布。
+
+    x >= 0 の累積確率は、|x| <= w - d では 1/2 + x L / (4d)（L = ln((w+d)/(w-d))）、
+    その外側では 1/2 + (x (ln((w+d)/x) + 1) - (w - d)) / (4d)。
+    """
+    ratio = float(parameter)
+    half_width = standard_uncertainty * _curvilinear_divisor(ratio)
+    if ratio == 0.0:
+        return central + (2.0 * probabilities - 1.0) * half_width
+    spread = ratio * half_width
+    outer = half_width + spread
+    inner = half_width - spread
+    upper = np.abs(np.asarray(probabilities, dtype=float) - 0.5)
+
+    magnitude = np.zeros_like(upper)
+    knee = 0.0
+    if inner > 0.0:
+        # 内側（|x| <= w - d）は密度が一定
+        density = math.log(outer / inner) / (4.0 * spread)
+        knee = inner * density
+        flat = upper <= knee
+        magnitude[flat] = upper[flat] / density
+
+    # 外側は単調増加な x (ln(outer/x) + 1) = 4d q + (w - d) を二分法で解く
+    curved = upper > knee
+    if np.any(curved):
+        target = 4.0 * spread * upper[curved] + inner
+        low = np.full(target.shape, inner)
+        high = np.full(target.shape, outer)
+        for _ in range(_BISECTION_STEPS):
+            middle = 0.5 * (low + high)
+            below = middle * (np.log(outer / middle) + 1.0) < target
+            low = np.where(below, middle, low)
+            high = np.where(below, high, middle)
+        magnitude[curved] = 0.5 * (low + high)
+    return central + np.where(probabilities < 0.5, -magnitude, magnitude)
+
+
+def _lognormal_shape(central, standard_uncertainty):
+    sigma_squared = math.log1p((standard_uncertainty / central) ** 2)
+    return math.log(central) - 0.5 * sigma_squared, math.sqrt(sigma_squared)
+
+
+def _lognormal_from_scores(normal_scores, central, standard_uncertainty):
+    mu, sigma = _lognormal_shape(central, standard_uncertainty)
+    return np.exp(mu + sigma * normal_scores)
+
+
+def _lognormal_ppf(probabilities, central, standard_uncertainty, parameter):
+    return _lognormal_from_scores(ndtri(probabilities), central, standard_uncertainty)
+
+
+DISTRIBUTIONS = {
+    NORMAL_DISTRIBUTION: Distribution(NORMAL_DISTRIBUTION, _normal_ppf),
+    RECTANGULAR_DISTRIBUTION: Distribution(
+        RECTANGULAR_DISTRIBUTION, _rectangular_ppf, divisor=lambda parameter: math.sqrt(3.0)
+    ),
+    TRIANGULAR_DISTRIBUTION: Distribution(
+        TRIANGULAR_DISTRIBUTION, _triangular_ppf, divisor=lambda parameter: math.sqrt(6.0)
+    ),
+    U_DISTRIBUTION: Distribution(U_DISTRIBUTION, _arcsine_ppf, divisor=lambda parameter: math.sqrt(2.0)),
+    STUDENT_T_DISTRIBUTION: Distribution(
+        STUDENT_T_DISTRIBUTION,
+        _student_t_ppf,
+        variance_ratio=_student_t_variance_ratio,
+        parameter_range=(1e-6, math.inf),
+        has_mean=lambda parameter: float(parameter) > 1.0,
+    ),
+    TRAPEZOIDAL_DISTRIBUTION: Distribution(
+        TRAPEZOIDAL_DISTRIBUTION, _trapezoidal_ppf, parameter_range=(0.0, 1.0), divisor=_trapezoidal_divisor
+    ),
+    CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION: Distribution(
+        CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION,
+        _curvilinear_trapezoidal_ppf,
+        parameter_range=(0.0, 1.0),
+        divisor=_curvilinear_divisor,
+    ),
+    LOGNORMAL_DISTRIBUTION: Distribution(LOGNORMAL_DISTRIBUTION, _lognormal_ppf, positive_central=True),
+}
+
+
+def get_distribution(key):
+    """翻訳キーに対応する分布（未知のキーは正規分布として扱う）"""
+    return DISTRIBUTIONS.get(key, DISTRIBUTIONS[NORMAL_DISTRIBUTION])
+
+
+def has_shape_parameter(key):
+    return get_distribution(key).parameter_range is not None
+
+
+def distribution_divisor(key, parameter=None):
+    """半値幅から標準不確かさを求める除数（手入力の分布や形状パラメータが不正なら None）"""
+    distribution = get_distribution(key)
+    if distribution.divisor is None:
+        return None
+    try:
+        distribution.check_parameter(parameter, central=1.0)
+    except (TypeError, ValueError):
+        return None
+    return distribution.divisor(parameter)
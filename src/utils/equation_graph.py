@@ -0,0 +1,324 @@
+"""
+連立したモデル式の依存グラフ（DAG）
+
+中間変数を文字列展開せず、式ごとの部分モデルとして保持する。各中間変数は
+校正点ごとに一度だけ評価し、感度係数は部分モデルの偏微分を連鎖律で合成する。
+循環参照はグラフ作成時に検出する。
+"""
+
+import re
+import time
+
+import numpy as np
+
+from .compiled_model import get_model_cache, lost_digits
+from .equation_normalizer import normalize_equation_text, normalize_variable_name
+from .numeric_derivatives import COMPLEX_STEP, RICHARDSON, numeric_gradient
+
+OPERATOR_CHARS = '+-*/^()'
+IDENTIFIER_PATTERN = r"[A-Za-z\u03B1-\u03C9\u0391-\u03A9][A-Za-z0-9_\u03B1-\u03C9\u0391-\u03A9]*"
+
+
+class EquationCycleError(ValueError):
+    """モデル式に循環参照がある"""
+
+    def __init__(self, cycle):
+        self.cycle = list(cycle)
+        super().__init__(f"モデル式に循環参照があります: {' -> '.join(self.cycle)}")
+
+
+def split_equations(text):
+    """カンマ・改行・セミコロンで式を分割"""
+    if not text:
+        return []
+    return [part.strip() for part in re.split(r"[,\r\n;]+", text) if part.strip()]
+
+
+def extract_identifiers(expr):
+    """式に現れる変数名を出現順に重複なく返す"""
+    identifiers = re.findall(IDENTIFIER_PATTERN, normalize_equation_text(expr or ""))
+    normalized = [normalize_variable_name(var) for var in identifiers]
+    return list(dict.fromkeys(var for var in normalized if var))
+
+
+def tokenize_expression(expr):
+    """式を演算子と項に分割（項の前後の空白は除く）"""
+    tokens = []
+    current = ''
+    for char in expr:
+        if char in OPERATOR_CHARS:
+            if current.strip():
+                tokens.append(current.strip())
+            current = ''
+            tokens.append(char)
+        else:
+            current += char
+    if current.strip():
+        tokens.append(current.strip())
+    return tokens
+
+
+class EquationGraph:
+    """左辺の変数をノード、右辺で参照する変数を辺とする依存グラフ"""
+
+    def __init__(self, equations):
+        self.right_sides = {}
+        for eq in equations:
+            if '=' not in eq:
+                continue
+            left, right = eq.split('=', 1)
+            self.right_sides[normalize_variable_name(left)] = right.strip()
+
+        self.dependencies = {
+            name: [var for var in extract_identifiers(right) if var in self.right_sides]
+            for name, right in self.right_sides.items()
+        }
+        self._expanded = {}
+        self._leaves = {}
+        self._models = {}
+        self._rhs_index = None
+        self.check_cycles()
+
+    @classmethod
+    def from_text(cls, equation_text):
+        return cls(split_equations(normalize_equation_text(equation_text or "")))
+
+    def __contains__(self, name):
+        return name in self.right_sides
+
+    def check_cycles(self):
+        """循環参照があれば EquationCycleError を送出"""
+        state = {}
+
+        def visit(name, path):
+            state[name] = 'visiting'
+            for dependency in self.dependencies[name]:
+                if state.get(dependency) == 'visiting':
+                    start = path.index(dependency)
+                    raise EquationCycleError(path[start:] + [dependency])
+                if dependency not in state:
+                    visit(dependency, path + [dependency])
+            state[name] = 'done'
+
+        for name in self.right_sides:
+            if name not in state:
+                visit(name, [name])
+
+    def evaluation_order(self, target):
+        """target の評価に必要な中間変数をトポロジカル順で返す（target を含む）"""
+        order = []
+        seen = set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dependency in self.dependencies[name]:
+                visit(dependency)
+            order.append(name)
+
+        visit(target)
+        return order
+
+    def has_intermediates(self, target):
+        return bool(self.dependencies.get(target))
+
+    def expand(self, target):
+        """中間変数を括弧付きで展開した右辺（表示・互換用、ノードごとにメモ化）"""
+        if target in self._expanded:
+            return self._expanded[target]
+        for name in self.evaluation_order(target):
+            if name in self._expanded:
+                continue
+            tokens = [
+                f"({self._expanded[token]})" if token not in OPERATOR_CHARS and token in self._expanded else token
+                for token in tokenize_expression(self.right_sides[name])
+            ]
+            self._expanded[name] = ''.join(tokens)
+        return self._expanded[target]
+
+    def leaf_variables(self, target):
+        """target が最終的に依存する入力変数（展開した式での出現順、ノードごとにメモ化）"""
+        if target in self._leaves:
+            return self._leaves[target]
+        for name in self.evaluation_order(target):
+            if name in self._leaves:
+                continue
+            leaves = []
+            for var in extract_identifiers(self.right_sides[name]):
+                leaves.extend(self._leaves[var] if var in self._leaves else [var])
+            self._leaves[name] = list(dict.fromkeys(leaves))
+        return self._leaves[target]
+
+    def find_target(self, rhs_text):
+        """右辺テキストに対応する左辺の変数（中間変数を含む式のみ）"""
+        if self._rhs_index is None:
+            self._rhs_index = {}
+            for name, right in self.right_sides.items():
+                if self.has_intermediates(name):
+                    self._rhs_index.setdefault(_rhs_key(right), name)
+        return self._rhs_index.get(_rhs_key(rhs_text))
+
+    def model_for(self, target, variables):
+        """target の連鎖モデル（CompiledModel と同じ評価インターフェース）"""
+        key = (target, tuple(variables))
+        if key not in self._models:
+            self._models[key] = ChainedModel(self, target, variables)
+        return self._models[key]
+
+
+def _rhs_key(text):
+    return re.sub(r"\s+", "", normalize_equation_text(text or "").replace("^", "**"))
+
+
+class ChainedModel:
+    """部分モデルを連鎖律で合成して評価するモデル"""
+
+    def __init__(self, graph, target, variables):
+        self.target = target
+        self.variables = tuple(variables)
+        cache = get_model_cache()
+        self.nodes = []
+        for name in graph.evaluation_order(target):
+            right_side = graph.right_sides[name]
+            self.nodes.append((name, cache.get(right_side, extract_identifiers(right_side))))
+
+    def _leaf_index(self):
+        return {var: i for i, var in enumerate(self.variables)}
+
+    def evaluate_expression(self, values):
+        """{変数名: SymPy数値} を代入した結果（中間変数は一度ずつ評価）"""
+        env = dict(values)
+        for name, model in self.nodes:
+            env[name] = model.evaluate_expression(env)
+        return env[self.target]
+
+    def evaluate_derivatives(self, values):
+        """全入力変数の偏微分値を連鎖律で計算（{変数名: SymPy数値}）"""
+        env = dict(values)
+        gradients = {var: {var: 1} for var in self.variables}
+        for name, model in self.nodes:
+            total = {}
+            for var in model.variables:
+                partial = model.evaluate_derivative(var, env)
+                for leaf, factor in gradients.get(var, {}).items():
+                    term = partial * factor
+                    total[leaf] = total[leaf] + term if leaf in total else term
+            gradients[name] = total
+            env[name] = model.evaluate_expression(env)
+        target_gradient = gradients[self.target]
+        return {var: target_gradient.get(var, 0) for var in self.variables}
+
+    def evaluate_derivative(self, var, values):
+        return self.evaluate_derivatives(values)[var]
+
+    def denominator_variables(self):
+        """いずれかの部分モデルの分母に直接現れる入力変数"""
+        result = set()
+        for _, model in self.nodes:
+            result.update(var for var in model.denominator_variables() if var in self.variables)
+        return frozenset(result)
+
+    def _numeric_environment(self, values):
+        arrays = [np.asarray(value, dtype=float) for value in values]
+        shape = np.broadcast(*arrays).shape if arrays else ()
+        env = {var: np.broadcast_to(array, shape) for var, array in zip(self.variables, arrays)}
+        return env, shape
+
+    def evaluate_values(self, *values):
+        """数値評価（スカラー/配列）。中間変数の値は一度だけ計算する"""
+        env, _ = self._numeric_environment(values)
+        for name, model in self.nodes:
+            env[name] = model.evaluate_values(*[env[var] for var in model.variables])
+        return env[self.target]
+
+    def evaluate_gradient(self, *values):
+        """感度係数を連鎖律で数値評価し、(変数数, ...) の配列で返す"""
+        env, shape = self._numeric_environment(values)
+        leaf_index = self._leaf_index()
+        gradients = {}
+        for var, i in leaf_index.items():
+            gradient = np.zeros((len(self.variables),) + shape)
+            gradient[i] = 1.0
+            gradients[var] = gradient
+        for name, model in self.nodes:
+            arguments = [env[var] for var in model.variables]
+            partials = model.evaluate_gradient(*arguments)
+            total = np.zeros((len(self.variables),) + shape)
+            for partial, var in zip(partials, model.variables):
+                if var in gradients:
+                    total += partial * gradients[var]
+            gradients[name] = total
+            env[name] = model.evaluate_values(*arguments)
+        return gradients[self.target]
+
+    @property
+    def is_analytic(self):
+        return all(model.is_analytic for _, model in self.nodes)
+
+    @property
+    def symbolic_timed_out(self):
+        return any(model.symbolic_timed_out for _, model in self.nodes)
+
+    def prepare_symbolic_derivatives(self, time_budget=None):
+        """全部分モデルの偏微分式を用意する（合計が time_budget 秒を超えたら False）"""
+        started = time.perf_counter()
+        for _, model in self.nodes:
+            remaining = None if time_budget is None else max(time_budget - (time.perf_counter() - started), 0.0)
+            if not model.prepare_symbolic_derivatives(remaining):
+                return False
+        return True
+
+    def evaluate_raw(self, *values):
+        """型を変換せずに評価（複素ステップ微分用）"""
+        env = dict(zip(self.variables, values))
+        for name, model in self.nodes:
+            env[name] = model.evaluate_raw(*[env[var] for var in model.variables])
+        return env[self.target]
+
+    def evaluate_numeric_gradient(self, *values, method=COMPLEX_STEP):
+        """連鎖したモデル全体を数値微分する（gradient は (..., 変数数)）"""
+        env, shape = self._numeric_environment(values)
+        x = np.stack([env[var].reshape(-1) for var in self.variables], axis=1)
+        if method == COMPLEX_STEP and not self.is_analytic:
+            method = RICHARDSON
+        return numeric_gradient(self.evaluate_raw, x, method=method)
+
+    def evaluate_float64(self, *values, with_gradient=True):
+        """float64 で評価し、部分モデルと連鎖律の和の桁落ちの見積もりを添えて返す"""
+        if not with_gradient:
+            env, shape = self._numeric_environment(values)
+            digits = np.zeros(shape)
+            for name, model in self.nodes:
+                value, _, node_digits = model.evaluate_float64(
+                    *[env[var] for var in model.variables], with_gradient=False
+                )
+                digits = np.maximum(digits, node_digits)
+                env[name] = value
+            return env[self.target], None, digits
+
+        env, shape = self._numeric_environment(values)
+        leaf_index = self._leaf_index()
+        gradients = {}
+        for var, i in leaf_index.items():
+            gradient = np.zeros((len(self.variables),) + shape)
+            gradient[i] = 1.0
+            gradients[var] = gradient
+        digits = np.zeros(shape)
+        for name, model in self.nodes:
+            arguments = [env[var] for var in model.variables]
+            value, partials, node_digits = model.evaluate_float64(*arguments)
+            digits = np.maximum(digits, node_digits)
+            total = np.zeros((len(self.variables),) + shape)
+            magnitude = np.zeros((len(self.variables),) + shape)
+            with np.errstate(all='ignore'):
+                for partial, var in zip(partials, model.variables):
+                    if var in gradients:
+                        term = partial * gradients[var]
+                        total += term
+                        magnitude += np.abs(term)
+                for row_total, row_magnitude in zip(total, magnitude):
+                    digits = np.maximum(digits, lost_digits(row_total, row_magnitude))
+            gradients[name] = total
+            env[name] = value
+        return env[self.target], gradients[self.target], digits
@@ -1,9 +1,13 @@
 ﻿import sympy as sp
 import traceback
 import re
+import math
 from decimal import Decimal, InvalidOperation
 from .equation_normalizer import normalize_equation_text, normalize_variable_name
-from .config_loader import ConfigLoader
+from .config_loader import get_config
+from .compiled_model import FLOAT64_DIGITS, get_model_cache
+from .equation_graph import EquationGraph, split_equations
+from .numeric_derivatives import COMPLEX_STEP, SYMBOLIC, normalize_derivative_backend
 from .app_logger import log_error
 
 class EquationHandler:
@@ -26,9 +30,10 @@ class EquationHandler:
             normalized_result_var = normalize_variable_name(result_var)
             equations = self._split_equations(normalized_equation)
 
-            resolved_equation = self.resolve_equation(normalized_result_var, equations)
-            if resolved_equation:
-                return resolved_equation
+            # 中間変数は展開せずに返す（評価は get_compiled_model が依存グラフで行う）
+            graph = self.get_equation_graph(equation)
+            if normalized_result_var in graph:
+                return f"{normalized_result_var} = {graph.right_sides[normalized_result_var]}"
 
             for eq in equations:
                 if "=" not in eq:
@@ -43,9 +48,16 @@ class EquationHandler:
 
     def _split_equations(self, text):
         """Split equation text by comma/newline/semicolon."""
-        if not text:
-            return []
-        return [part.strip() for part in re.split(r"[,\r\n;]+", text) if part.strip()]
+        return split_equations(text)
+
+    def get_equation_graph(self, equation=None):
+        """モデル式の依存グラフを返す（式が変わったときだけ作り直す）。循環参照は EquationCycleError。"""
+        if equation is None:
+            equation = getattr(self.main_window, "last_equation", "") or ""
+        if getattr(self, "_graph_source", None) != equation:
+            self._graph = EquationGraph.from_text(equation)
+            self._graph_source = equation
+        return self._graph
 
     def _extract_rhs_expression(self, expression_text):
         """Extract a safe RHS expression for sympy parsing."""
@@ -69,63 +81,19 @@ class EquationHandler:
 
 
     def resolve_equation(self, target_var, equations):
-        """騾｣遶区婿遞句ｼ上ｒ謨ｴ逅・＠縺ｦ縲∫岼讓吝､画焚縺ｮ蠑上ｒ蜈･蜉帛､画焚縺縺代・蠑上↓螟画鋤"""
+        """連立したモデル式から、目標変数の式を入力変数だけの式に展開する"""
         try:
             target_var = normalize_variable_name(target_var)
-            # 蠑上ｒ霎樊嶌縺ｫ螟画鋤・亥ｷｦ霎ｺ繧偵く繝ｼ縲∝承霎ｺ繧貞､縺ｨ縺吶ｋ・・
-            eq_dict = {}
-            for eq in equations:
-                if '=' not in eq:
-                    continue
-                left, right = eq.split('=', 1)
-                eq_dict[normalize_variable_name(left)] = right.strip()
-            
-            # 逶ｮ讓吝､画焚縺ｮ蠑上ｒ蜿門ｾ・
-            if target_var not in eq_dict:
+            graph = EquationGraph(equations)
+            if target_var not in graph:
                 return None
-            
-            # 蠑上ｒ蜀榊ｸｰ逧・↓螻暮幕
-            def expand_expression(expr):
-                # 蠑上ｒ蛻・牡
-                terms = []
-                current_term = ''
-                i = 0
-                while i < len(expr):
-                    char = expr[i]
-                    if char in '+-*/^()':
-                        if current_term:
-                            terms.append(current_term.strip())
-                            current_term = ''
-                        terms.append(char)
-                    else:
-                        current_term += char
-                    i += 1
-                if current_term:
-                    terms.append(current_term.strip())
-                
-                # 蜷・・ｒ螻暮幕
-                expanded_terms = []
-                for term in terms:
-                    if term in '+-*/^()':
-                        expanded_terms.append(term)
-                    else:
-                        # 螟画焚縺悟ｮ夂ｾｩ蠑上↓蜷ｫ縺ｾ繧後※縺・ｋ蝣ｴ蜷医・螻暮幕
-                        if term in eq_dict:
-                            expanded_terms.append(f"({expand_expression(eq_dict[term])})")
-                        else:
-                            expanded_terms.append(term)
-                
-                return ''.join(expanded_terms)
-            
-            # 蠑上ｒ螻暮幕
-            expanded_right = expand_expression(eq_dict[target_var])
-            return f"{target_var} = {expanded_right}"
-            
+            return f"{target_var} = {graph.expand(target_var)}"
+
         except Exception as e:
-            log_error(f"蠑上・謨ｴ逅・お繝ｩ繝ｼ: {str(e)}", details=traceback.format_exc())
+            log_error(f"式の展開エラー: {str(e)}", details=traceback.format_exc())
             return None
 
-    def _to_sympy_number(self, value):
+    def _to_sympy_number(self, value, precision=None):
         """蜈･蜉帛､繧奪ecimal邨檎罰縺ｧSymPy謨ｰ蛟､縺ｸ螟画鋤縺吶ｋ"""
         if value == '':
             return None
@@ -134,7 +102,7 @@ class EquationHandler:
         except (InvalidOperation, TypeError, ValueError):
             return None
 
-        precision = ConfigLoader().get_precision()
+        precision = precision or get_config().get_precision()
         return sp.Float(str(decimal_value), precision)
 
     def get_variables_from_equation(self, equation):
@@ -149,72 +117,184 @@ class EquationHandler:
             )
             # 驥崎､・ｒ髯､蜴ｻ
             normalized = [normalize_variable_name(var) for var in variables]
-            return list(dict.fromkeys([var for var in normalized if var]))
+            normalized = list(dict.fromkeys([var for var in normalized if var]))
+            # 中間変数は依存グラフでたどった入力変数に置き換える
+            graph = self.get_equation_graph()
+            inputs = []
+            for var in normalized:
+                inputs.extend(graph.leaf_variables(var) if var in graph else [var])
+            return list(dict.fromkeys(inputs))
             
         except Exception as e:
             log_error(f"螟画焚謚ｽ蜃ｺ繧ｨ繝ｩ繝ｼ: {str(e)}", details=traceback.format_exc())
             return []
 
+    def get_compiled_model(self, equation, variables):
+        """右辺の式に対応するコンパイル済みモデルをキャッシュから取得する。"""
+        expr_str = self._extract_rhs_expression(equation)
+        if not expr_str:
+            return None
+        cache = get_model_cache()
+        # モデル式が変わったときだけキャッシュを破棄する
+        cache.sync_source(getattr(self.main_window, "last_equation", None))
+        # 中間変数を含む式は、展開後の式ではなく依存グラフの部分モデルで評価する
+        graph = self.get_equation_graph()
+        target = graph.find_target(expr_str)
+        if target is not None:
+            return graph.model_for(target, variables)
+        return cache.get(expr_str, variables)
+
+    def get_result_model(self, result_var):
+        """
+        計算結果変数のモデルと入力変数を返す（(モデル, 入力変数のリスト)、式がなければ (None, None)）。
+
+        式が依存グラフにあれば、そのノードの連鎖モデルと末端の入力変数を直接使う。
+        """
+        equation = self.get_target_equation(result_var)
+        if not equation or "=" not in equation:
+            return None, None
+        graph = self.get_equation_graph()
+        target = normalize_variable_name(result_var)
+        if target in graph and graph.has_intermediates(target):
+            get_model_cache().sync_source(getattr(self.main_window, "last_equation", None))
+            variables = graph.leaf_variables(target)
+            return graph.model_for(target, variables), variables
+        right_side = equation.split("=", 1)[1].strip()
+        variables = self.get_variables_from_equation(right_side)
+        return self.get_compiled_model(right_side, variables), variables
+
+    def build_value_map(self, variables, value_handler):
+        """各変数の中心値をSymPy数値に変換する（不正な値があればNone）。"""
+        precision = get_config().get_precision()
+        values = {}
+        for var in variables:
+            central_value = value_handler.get_central_value(var)
+            if central_value == '':
+                continue
+            sympy_value = self._to_sympy_number(central_value, precision)
+            if sympy_value is None:
+                return None
+            values[var] = sympy_value
+        return values
+
+    def get_derivative_backend(self, model):
+        """
+        プロジェクトで選択された感度係数の計算方法を返す。
+
+        記号微分が設定時間内に終わらないモデルは複素ステップ微分に切り替える。
+        """
+        backend = normalize_derivative_backend(getattr(self.main_window, "derivative_backend", SYMBOLIC))
+        if backend == SYMBOLIC:
+            time_budget = get_config().get_symbolic_derivative_time_budget()
+            if not model.prepare_symbolic_derivatives(time_budget):
+                return COMPLEX_STEP
+        return backend
+
+    def _read_float_values(self, model, value_handler):
+        values = []
+        for var in model.variables:
+            try:
+                values.append(float(Decimal(value_handler.get_central_value(var))))
+            except (InvalidOperation, TypeError, ValueError):
+                return None
+        return values
+
+    def evaluate_numeric_derivatives(self, model, value_handler, method):
+        """数値微分で感度係数と誤差の見積もりを計算する（({変数名: 係数}, {変数名: 誤差})）。"""
+        values = self._read_float_values(model, value_handler)
+        if values is None:
+            return None
+        result = model.evaluate_numeric_gradient(*values, method=method)
+        gradient = {}
+        errors = {}
+        for var, coefficient, error in zip(model.variables, result.gradient[0], result.error[0]):
+            gradient[var] = float(coefficient) if math.isfinite(coefficient) else sp.nan
+            errors[var] = float(error)
+        return gradient, errors
+
+    def evaluate_float64(self, model, value_handler, with_gradient=True):
+        """
+        float64 で中心値と感度係数を評価する。
+
+        float64 エンジンが選択されていない場合、中心値が数値でない場合、
+        または桁落ちの見積もりが許容範囲を超えた場合は None を返し、
+        呼び出し側で設定精度（Decimal/SymPy）による計算をやり直す。
+        """
+        config = get_config()
+        if config.get_numeric_engine() != 'float64':
+            return None
+
+        values = self._read_float_values(model, value_handler)
+        if values is None:
+            return None
+
+        value, gradient, lost_digits = model.evaluate_float64(*values, with_gradient=with_gradient)
+        value = float(value)
+        gradient = [float(item) for item in gradient] if with_gradient else []
+        if not math.isfinite(value) or not all(math.isfinite(item) for item in gradient):
+            return None
+        if FLOAT64_DIGITS - float(lost_digits) < config.get_float64_required_digits():
+            return None
+        return value, dict(zip(model.variables, gradient))
+
     def calculate_sensitivity(self, equation, target_var, variables, value_handler):
         """感度係数を計算する。"""
+        return self.calculate_sensitivities(equation, [target_var], variables, value_handler)[target_var]
+
+    def calculate_sensitivities(self, equation, target_vars, variables, value_handler, errors=None):
+        """
+        複数の変数の感度係数をまとめて計算する（{変数名: 感度係数}）。
+
+        数値微分を使った場合は、errors（辞書）に係数ごとの誤差の見積もりを格納する。
+        """
         try:
-            # 螟画焚繧担ymbol縺ｨ縺励※螳夂ｾｩ
-            symbols = {}
-            for var in variables:
-                symbols[var] = sp.Symbol(var)
-            
-            # 蠑上ｒ隗｣譫撰ｼ・繧・*縺ｫ螟画鋤・・
-            expr_str = self._extract_rhs_expression(equation)
-            if not expr_str:
-                return ''
-            expr = sp.sympify(expr_str, locals=symbols)
-            
-            # 蛛丞ｾｮ蛻・ｒ險育ｮ・
-            derivative = sp.diff(expr, symbols[target_var])
-            
-            # 蜷・､画焚縺ｫ荳ｭ螟ｮ蛟､繧剃ｻ｣蜈･
-            for var in variables:
-                central_value = value_handler.get_central_value(var)
-                if central_value == '':
-                    continue
-                sympy_value = self._to_sympy_number(central_value)
-                if sympy_value is None:
-                    return ''
-                derivative = derivative.subs(symbols[var], sympy_value)
-            
-            return derivative
-            
+            model = self.get_compiled_model(equation, variables)
+            if model is None:
+                return {var: '' for var in target_vars}
+
+            backend = self.get_derivative_backend(model)
+            if backend != SYMBOLIC:
+                numeric_result = self.evaluate_numeric_derivatives(model, value_handler, backend)
+                if numeric_result is None:
+                    return {var: '' for var in target_vars}
+                gradient, gradient_errors = numeric_result
+                if errors is not None:
+                    errors.update({var: gradient_errors[var] for var in target_vars if var in gradient_errors})
+                return {var: gradient.get(var, '') for var in target_vars}
+
+            fast_result = self.evaluate_float64(model, value_handler)
+            if fast_result is not None:
+                return {var: fast_result[1].get(var, '') for var in target_vars}
+
+            values = self.build_value_map(variables, value_handler)
+            if values is None:
+                return {var: '' for var in target_vars}
+            derivatives = model.evaluate_derivatives(values)
+            return {var: derivatives.get(var, '') for var in target_vars}
+
         except Exception as e:
-            log_error(f"諢溷ｺｦ菫よ焚險育ｮ励お繝ｩ繝ｼ: {str(e)}", details=traceback.format_exc())
-            return ''
+            log_error(f"感度係数計算エラー: {str(e)}", details=traceback.format_exc())
+            return {var: '' for var in target_vars}
 
     def calculate_result_central_value(self, equation, variables, value_handler):
         """計算結果変数の中心値を計算する。"""
         try:
-            # 螟画焚繧担ymbol縺ｨ縺励※螳夂ｾｩ
-            symbols = {}
-            for var in variables:
-                symbols[var] = sp.Symbol(var)
-            
-            # 蠑上ｒ隗｣譫撰ｼ・繧・*縺ｫ螟画鋤・・
-            expr_str = self._extract_rhs_expression(equation)
-            if not expr_str:
+            model = self.get_compiled_model(equation, variables)
+            if model is None:
                 return ''
-            expr = sp.sympify(expr_str, locals=symbols)
-            
-            # 蜷・､画焚縺ｫ荳ｭ螟ｮ蛟､繧剃ｻ｣蜈･
-            for var in variables:
-                central_value = value_handler.get_central_value(var)
-                if central_value == '':
-                    continue
-                sympy_value = self._to_sympy_number(central_value)
-                if sympy_value is None:
-                    return ''
-                expr = expr.subs(symbols[var], sympy_value)
+
+            fast_result = self.evaluate_float64(model, value_handler, with_gradient=False)
+            if fast_result is not None:
+                return fast_result[0]
+
+            values = self.build_value_map(variables, value_handler)
+            if values is None:
+                return ''
+            expr = model.evaluate_expression(values)
             try:
                 return expr.evalf()
             except (TypeError, ValueError):
                 return ''
         except Exception as e:
-            log_error(f"荳ｭ螟ｮ蛟､險育ｮ励お繝ｩ繝ｼ: {str(e)}", details=traceback.format_exc())
-            return '' 
+            log_error(f"中央値計算エラー: {str(e)}", details=traceback.format_exc())
+            return ''
@@ -0,0 +1,1309 @@
+"""
+モンテカルロ法の逐次集計
+
+試行をチャンク単位で生成・評価し、出力を保持せずに統計量だけを積み上げる。
+メモリ使用量はチャンクの大きさで決まり、試行回数（10^7〜10^8）によらない。
+
+- 平均・分散: チャンクごとの2パス計算を Welford/Chan の式で併合
+- 分位点: 併合可能な分位点スケッチ（t-digest 形式のセントロイド列）。
+  確率的に対称な包含区間と最短包含区間はここから求める
+- ヒストグラム: 2のべき乗幅の格子上のヒストグラム（併合しても格子がずれない）
+
+いずれも merge() で部分結果を併合でき、併合の順序を固定すれば結果は再現する。
+
+乱数はチャンクごとに SeedSequence(seed, spawn_key=(チャンク番号,)) から作る。
+チャンクの区切りとブロック（ワーカーに渡す単位）の区切りは試行回数だけで決まり、
+部分結果はブロック番号順に併合するので、同じ seed と試行回数なら
+ワーカー数（コア数）によらず同じ結果になる。
+
+run_adaptive_monte_carlo は GUM-S1 7.9 の適応的手順で、指定した有効数字の
+数値許容差に達するまでバッチを追加する。
+
+入力量の分布は distributions.py の一覧から選び、相関はガウスコピュラで入れる。
+相関行列の分解は correlation_matrix.py のキャッシュを使う。
+入力の抽出は擬似乱数のほか、スクランブル Sobol 列とラテン超方格を選べる
+（quasi_monte_carlo.py）。run_replicated_monte_carlo はシード違いの反復から誤差を見積もる。
+
+標本は既定では保持しないが、run_monte_carlo に store_root を渡すと入力量と出力を
+メモリマップした .npy に書き出し（sample_store.py）、あとから正確な分位点や
+書き出しに使える。
+"""
+
+import atexit
+import copy
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .compiled_model import get_model_cache
+from .correlation_matrix import factorize_correlation
+from .distributions import get_distribution
+from .quasi_monte_carlo import get_scrambled_sobol, latin_hypercube
+from .sample_store import SampleStore
+from .special_functions import ndtri
+from .translation_keys import (
+    NORMAL_DISTRIBUTION,
+    RECTANGULAR_DISTRIBUTION,
+    STUDENT_T_DISTRIBUTION,
+    TRIANGULAR_DISTRIBUTION,
+    U_DISTRIBUTION,
+)
+from .variable_utils import get_distribution_translation_key
+
+DEFAULT_CHUNK_SIZE = 65536
+# 1つのワーカーにまとめて渡すチャンク数の上限
+CHUNKS_PER_BLOCK = 16
+# ワーカー数に関係なく、試行回数が許す限りこの数以上のブロックに分ける
+MIN_BLOCK_COUNT = 64
+DEFAULT_COVERAGE_PROBABILITY = 0.95
+DEFAULT_DIGEST_COMPRESSION = 5000
+DEFAULT_HISTOGRAM_BINS = 4096
+
+# ヒストグラムの格子番号を float64 で正確に表せる範囲に収める
+_MAX_INDEX_BITS = 52
+
+# 入力の抽出方法
+SAMPLING_RANDOM = 'random'
+SAMPLING_SOBOL = 'sobol'
+SAMPLING_LATIN_HYPERCUBE = 'latin_hypercube'
+
+
+class RunningMoments:
+    """件数・平均・偏差平方和・最小値・最大値を併合しながら保持する"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).reshape(-1)
+        if values.size == 0:
+            return
+        chunk_mean = float(np.mean(values))
+        chunk = RunningMoments()
+        chunk.count = int(values.size)
+        chunk.mean = chunk_mean
+        chunk.m2 = float(np.sum((values - chunk_mean) ** 2))
+        chunk.minimum = float(np.min(values))
+        chunk.maximum = float(np.max(values))
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean = other.mean
+            self.m2 = other.m2
+            self.minimum = other.minimum
+            self.maximum = other.maximum
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def standard_deviation(self):
+        return math.sqrt(max(self.variance, 0.0))
+
+
+class ControlVariateMoments:
+    """
+    出力 y と制御変量 l（線形化したモデルの値）の平均・偏差平方和・偏差積和。
+
+    RunningMoments と同じく Chan の式で併合できる。
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean_y = 0.0
+        self.mean_l = 0.0
+        self.m2_y = 0.0
+        self.m2_l = 0.0
+        self.c_yl = 0.0
+
+    def update(self, outputs, controls):
+        other = ControlVariateMoments()
+        other.count = int(outputs.size)
+        if other.count == 0:
+            return
+        other.mean_y = float(np.mean(outputs))
+        other.mean_l = float(np.mean(controls))
+        dy = outputs - other.mean_y
+        dl = controls - other.mean_l
+        other.m2_y = float(np.dot(dy, dy))
+        other.m2_l = float(np.dot(dl, dl))
+        other.c_yl = float(np.dot(dy, dl))
+        self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean_y, self.mean_l = other.mean_y, other.mean_l
+            self.m2_y, self.m2_l, self.c_yl = other.m2_y, other.m2_l, other.c_yl
+            return
+        total = self.count + other.count
+        weight = self.count * other.count / total
+        delta_y = other.mean_y - self.mean_y
+        delta_l = other.mean_l - self.mean_l
+        self.mean_y += delta_y * other.count / total
+        self.mean_l += delta_l * other.count / total
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.m2_l += other.m2_l + delta_l * delta_l * weight
+        self.c_yl += other.c_yl + delta_y * delta_l * weight
+        self.count = total
+
+    def estimates(self, expected_mean, expected_variance):
+        """
+        制御変量で分散を減らした y の平均と標準偏差。
+
+        l の期待値と分散は既知なので、回帰係数 β = Cov(y, l) / Var(l) を使って
+        mean = ȳ - β (l̄ - E[l])、var = s_y² + β² (Var[l] - s_l²) とする。
+        """
+        if self.count < 2 or self.m2_l <= 0.0:
+            return None
+        beta = self.c_yl / self.m2_l
+        mean = self.mean_y - beta * (self.mean_l - expected_mean)
+        variance = (self.m2_y + beta * beta * ((self.count - 1) * expected_variance - self.m2_l)) / (self.count - 1)
+        return mean, math.sqrt(max(variance, 0.0))
+
+
+class QuantileDigest:
+    """
+    併合可能な分位点スケッチ（t-digest）。
+
+    値を重み付きのセントロイドにまとめ、分布の裾ほど細かく保つ。
+    セントロイドの数は compression 程度で頭打ちになる。
+    """
+
+    def __init__(self, compression=DEFAULT_DIGEST_COMPRESSION):
+        self.compression = float(compression)
+        self.means = np.empty(0, dtype=float)
+        self.weights = np.empty(0, dtype=float)
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def __len__(self):
+        return int(self.means.size)
+
+    @property
+    def count(self):
+        return float(np.sum(self.weights))
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).reshape(-1)
+        if values.size == 0:
+            return
+        self.minimum = min(self.minimum, float(np.min(values)))
+        self.maximum = max(self.maximum, float(np.max(values)))
+        self._compress(values, np.ones(values.size, dtype=float))
+
+    def merge(self, other):
+        if other.means.size == 0:
+            return
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress(other.means, other.weights)
+
+    def _scale(self, q):
+        """k1 スケール関数（裾で分解能が上がる）"""
+        return self.compression / (2.0 * math.pi) * np.arcsin(2.0 * np.clip(q, 0.0, 1.0) - 1.0)
+
+    def _compress(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='mergesort')
+        means = means[order]
+        weights = weights[order]
+
+        total = float(np.sum(weights))
+        cumulative = np.cumsum(weights)
+        # セントロイドの中点位置のスケール値でクラスタを決める（単調なので連続区間になる）
+        k = self._scale((cumulative - 0.5 * weights) / total)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.means = merged_means
+        self.weights = merged_weights
+
+    def _knots(self):
+        """分位点関数の折れ点（累積確率, 値）。最小値・最大値を両端に置く"""
+        total = float(np.sum(self.weights))
+        centers = np.cumsum(self.weights) - 0.5 * self.weights
+        positions = np.concatenate([[0.0], centers / total, [1.0]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return positions, values
+
+    def quantile(self, probabilities):
+        """分位点（probabilities はスカラーでも配列でもよい）"""
+        p = np.asarray(probabilities, dtype=float)
+        if self.means.size == 0:
+            return np.full(p.shape, np.nan) if p.ndim else math.nan
+        positions, values = self._knots()
+        result = np.interp(np.clip(p, 0.0, 1.0), positions, values)
+        return float(result) if p.ndim == 0 else result
+
+    def shortest_interval(self, coverage_probability):
+        """
+        確率 coverage_probability の最短包含区間。
+
+        分位点関数は折れ線なので、幅 Q(a + p) - Q(a) も a について折れ線になる。
+        最小になるのは a か a + p が折れ点に来るところだけなので、そこだけ調べる。
+        """
+        if self.means.size == 0:
+            return math.nan, math.nan
+        p = min(max(float(coverage_probability), 0.0), 1.0)
+        positions, values = self._knots()
+        starts = np.concatenate([positions, positions - p])
+        starts = starts[(starts >= 0.0) & (starts <= 1.0 - p)]
+        lows = np.interp(starts, positions, values)
+        highs = np.interp(starts + p, positions, values)
+        best = int(np.argmin(highs - lows))
+        return float(lows[best]), float(highs[best])
+
+
+class StreamingHistogram:
+    """
+    幅 2^e の格子に揃えたヒストグラム。
+
+    ビン数が max_bins を超えたら隣り合うビンを2つずつまとめて幅を倍にする。
+    格子が揃っているので、どの順に併合しても同じ結果になる。
+    """
+
+    def __init__(self, max_bins=DEFAULT_HISTOGRAM_BINS):
+        self.max_bins = int(max_bins)
+        self.exponent = None
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(np.sum(self.counts))
+
+    @property
+    def width(self):
+        return math.ldexp(1.0, self.exponent) if self.exponent is not None else math.nan
+
+    def edges(self):
+        return (self.offset + np.arange(self.counts.size + 1)) * self.width
+
+    @classmethod
+    def from_values(cls, values, max_bins=DEFAULT_HISTOGRAM_BINS):
+        histogram = cls(max_bins)
+        values = np.asarray(values, dtype=float).reshape(-1)
+        if values.size == 0:
+            return histogram
+        low = float(np.min(values))
+        high = float(np.max(values))
+        magnitude = max(abs(low), abs(high))
+        exponent = math.frexp(magnitude)[1] - _MAX_INDEX_BITS if magnitude > 0 else -_MAX_INDEX_BITS
+        if high > low:
+            exponent = max(exponent, math.frexp((high - low) / max(histogram.max_bins - 1, 1))[1])
+        while True:
+            width = math.ldexp(1.0, exponent)
+            indices = np.floor(values / width).astype(np.int64)
+            offset = int(indices.min())
+            if int(indices.max()) - offset < histogram.max_bins:
+                break
+            exponent += 1
+        histogram.exponent = exponent
+        histogram.offset = offset
+        histogram.counts = np.bincount(indices - offset).astype(np.int64)
+        return histogram
+
+    def add(self, values):
+        self.merge(StreamingHistogram.from_values(values, self.max_bins))
+
+    def _coarsened(self, exponent):
+        """幅を 2^exponent に広げた (offset, counts)"""
+        shift = exponent - self.exponent
+        if shift == 0:
+            return self.offset, self.counts
+        indices = self.offset + np.arange(self.counts.size, dtype=np.int64)
+        new_offset = self.offset >> shift
+        # 64bitを超えるシフトは分けて行う（floor(floor(a/b)/c) = floor(a/bc)）
+        while shift > 0:
+            step = min(shift, 62)
+            indices = indices >> step
+            shift -= step
+        positions = indices - new_offset
+        counts = np.bincount(positions, weights=self.counts).astype(np.int64)
+        return new_offset, counts
+
+    def merge(self, other):
+        if other.exponent is None:
+            return
+        if self.exponent is None:
+            self.exponent = other.exponent
+            self.offset = other.offset
+            self.counts = other.counts.copy()
+            return
+        exponent = max(self.exponent, other.exponent)
+        while True:
+            self_offset, self_counts = self._coarsened(exponent)
+            other_offset, other_counts = other._coarsened(exponent)
+            start = min(self_offset, other_offset)
+            stop = max(self_offset + self_counts.size, other_offset + other_counts.size)
+            if stop - start <= self.max_bins:
+                break
+            exponent += 1
+        counts = np.zeros(stop - start, dtype=np.int64)
+        counts[self_offset - start:self_offset - start + self_counts.size] += self_counts
+        counts[other_offset - start:other_offset - start + other_counts.size] += other_counts
+        self.exponent = exponent
+        self.offset = start
+        self.counts = counts
+
+    def rebin(self, bins, low, high):
+        """[low, high] を bins 等分したヒストグラムに引き直す（ビン内は一様とみなす）"""
+        edges = np.linspace(low, high, int(bins) + 1)
+        if self.exponent is None:
+            return np.zeros(int(bins)), edges
+        cumulative = np.concatenate([[0.0], np.cumsum(self.counts, dtype=float)])
+        at_edges = np.interp(edges, self.edges(), cumulative)
+        counts = np.diff(at_edges)
+        # 端点の丸めで落ちた分は端のビンに入れて総数を保つ
+        counts[0] += at_edges[0]
+        counts[-1] += cumulative[-1] - at_edges[-1]
+        return counts, edges
+
+
+@dataclass
+class MonteCarloSummary:
+    """モンテカルロ法の出力の要約"""
+    count: int
+    non_finite_count: int
+    mean: float
+    standard_deviation: float
+    minimum: float
+    maximum: float
+    median: float
+    coverage_probability: float
+    interval: Tuple[float, float]
+    # 最短包含区間（GUM-S1 7.7.2）
+    shortest_interval: Optional[Tuple[float, float]] = None
+    # 線形化したモデルを制御変量にしたときの推定値
+    controlled_mean: Optional[float] = None
+    controlled_standard_deviation: Optional[float] = None
+
+
+class MonteCarloAccumulator:
+    """出力をチャンク単位で受け取り、要約に必要な量だけを積み上げる"""
+
+    def __init__(self, compression=DEFAULT_DIGEST_COMPRESSION, histogram_bins=DEFAULT_HISTOGRAM_BINS):
+        self.moments = RunningMoments()
+        self.digest = QuantileDigest(compression)
+        self.histogram = StreamingHistogram(histogram_bins)
+        self.control = None
+        self.non_finite_count = 0
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def add(self, values, controls=None):
+        """controls は同じ試行の制御変量の値（制御変量を使うときだけ）"""
+        values = np.asarray(values, dtype=float).reshape(-1)
+        mask = np.isfinite(values)
+        finite = values[mask]
+        self.non_finite_count += int(values.size - finite.size)
+        if finite.size == 0:
+            return
+        self.moments.update(finite)
+        self.digest.add(finite)
+        self.histogram.add(finite)
+        if controls is not None:
+            if self.control is None:
+                self.control = ControlVariateMoments()
+            self.control.update(finite, np.asarray(controls, dtype=float).reshape(-1)[mask])
+
+    def merge(self, other):
+        self.non_finite_count += other.non_finite_count
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.histogram.merge(other.histogram)
+        if other.control is not None:
+            if self.control is None:
+                self.control = ControlVariateMoments()
+            self.control.merge(other.control)
+
+    def quantile(self, probabilities):
+        return self.digest.quantile(probabilities)
+
+    def display_range(self):
+        """表示用のヒストグラムの範囲（最小値〜最大値）"""
+        low = self.moments.minimum
+        high = self.moments.maximum
+        if not high > low:
+            high = low + 1.0
+            low = low - 1.0
+        return low, high
+
+    def display_histogram(self, bins):
+        """表示用に最小値〜最大値を bins 等分したヒストグラム"""
+        return self.histogram.rebin(bins, *self.display_range())
+
+    def summary(self, coverage_probability=DEFAULT_COVERAGE_PROBABILITY,
+                control_expectation=None) -> Optional[MonteCarloSummary]:
+        """control_expectation は制御変量の (期待値, 分散)"""
+        if self.count == 0:
+            return None
+        tail = (1.0 - coverage_probability) / 2.0
+        low, median, high = self.quantile([tail, 0.5, 1.0 - tail])
+        controlled = None
+        if self.control is not None and control_expectation is not None:
+            controlled = self.control.estimates(*control_expectation)
+        return MonteCarloSummary(
+            count=self.count,
+            non_finite_count=self.non_finite_count,
+            mean=self.moments.mean,
+            standard_deviation=self.moments.standard_deviation,
+            minimum=self.moments.minimum,
+            maximum=self.moments.maximum,
+            median=float(median),
+            coverage_probability=coverage_probability,
+            interval=(float(low), float(high)),
+            shortest_interval=self.digest.shortest_interval(coverage_probability),
+            controlled_mean=None if controlled is None else controlled[0],
+            controlled_standard_deviation=None if controlled is None else controlled[1],
+        )
+
+
+@dataclass
+class SampleStatistics:
+    """手元にある出力の標本から並べ替えで正確に求めた統計量"""
+    count: int
+    minimum: float
+    maximum: float
+    median: float
+    coverage_probability: float
+    # 確率的に対称な包含区間（GUM-S1 7.7.1）と最短包含区間（7.7.2）
+    interval: Tuple[float, float]
+    shortest_interval: Tuple[float, float]
+
+
+def sample_statistics(values, coverage_probability=DEFAULT_COVERAGE_PROBABILITY) -> Optional[SampleStatistics]:
+    """
+    標本 values の最小値・最大値・中央値と2種類の包含区間。
+
+    並べ替えは1回だけで、最短包含区間は q 個を含む窓をずらして幅が最小のものを探す。
+    有限な値が2個未満なら None。
+    """
+    values = np.asarray(values, dtype=float).reshape(-1)
+    return statistics_from_sorted(np.sort(values[np.isfinite(values)]), coverage_probability)
+
+
+_STATISTICS_CHUNK = 1 << 20
+
+
+def statistics_from_sorted(ordered, coverage_probability=DEFAULT_COVERAGE_PROBABILITY) -> Optional[SampleStatistics]:
+    """昇順に並べた有限な値（メモリマップでもよい）から sample_statistics と同じ統計量を求める"""
+    count = int(ordered.shape[0])
+    if count < 2:
+        return None
+    p = float(coverage_probability)
+    if not 0.0 < p < 1.0:
+        raise ValueError(f"Coverage probability must be between 0 and 1: {coverage_probability}")
+
+    # 区間に含める個数 q（pM が整数でなければ int(pM + 1/2)）
+    product = p * count
+    q = int(product) if float(product).is_integer() else int(product + 0.5)
+    q = min(max(q, 1), count - 1)
+    # 下端は r 番目（1始まり。(M - q)/2 が整数でなければ (M - q + 1)/2）
+    r = max((count - q + 1) // 2, 1)
+    # 幅の配列を一度に作らず、チャンクごとに最小の窓を探す（メモリマップを丸ごと読まない）
+    shortest = 0
+    shortest_width = np.inf
+    for start in range(0, count - q, _STATISTICS_CHUNK):
+        stop = min(start + _STATISTICS_CHUNK, count - q)
+        widths = np.asarray(ordered[start + q:stop + q]) - np.asarray(ordered[start:stop])
+        index = int(np.argmin(widths))
+        if widths[index] < shortest_width:
+            shortest, shortest_width = start + index, widths[index]
+    middle = count // 2
+    median = ordered[middle] if count % 2 else 0.5 * (ordered[middle - 1] + ordered[middle])
+    return SampleStatistics(
+        count=count,
+        minimum=float(ordered[0]),
+        maximum=float(ordered[-1]),
+        median=float(median),
+        coverage_probability=p,
+        interval=(float(ordered[r - 1]), float(ordered[r - 1 + q])),
+        shortest_interval=(float(ordered[shortest]), float(ordered[shortest + q])),
+    )
+
+
+_EPSILON = 1e-12
+
+
+def generate_samples(rng, central, standard_uncertainty, distribution_key, sample_count, parameter=None):
+    """1つの入力量を分布に従って直接サンプリングする（parameter は分布の形状パラメータ）"""
+    if sample_count <= 0:
+        return np.array([], dtype=float)
+
+    if standard_uncertainty == 0:
+        return np.full(sample_count, central, dtype=float)
+
+    key = get_distribution_translation_key(distribution_key) or distribution_key
+
+    if key == RECTANGULAR_DISTRIBUTION:
+        half_width = standard_uncertainty * np.sqrt(3.0)
+        return rng.uniform(central - half_width, central + half_width, sample_count)
+
+    if key == TRIANGULAR_DISTRIBUTION:
+        half_width = standard_uncertainty * np.sqrt(6.0)
+        return rng.triangular(
+            central - half_width,
+            central,
+            central + half_width,
+            sample_count,
+        )
+
+    if key == U_DISTRIBUTION:
+        half_width = standard_uncertainty * np.sqrt(2.0)
+        beta_values = rng.beta(0.5, 0.5, sample_count)
+        return central + (2.0 * beta_values - 1.0) * half_width
+
+    if key == STUDENT_T_DISTRIBUTION:
+        return central + standard_uncertainty * rng.standard_t(parameter, sample_count)
+
+    if key == NORMAL_DISTRIBUTION or get_distribution(key).key == NORMAL_DISTRIBUTION:
+        return rng.normal(central, standard_uncertainty, sample_count)
+
+    return transform_from_uniform(rng.random(sample_count), central, standard_uncertainty, key, parameter)
+
+
+def correlation_factor(correlation_matrix):
+    """
+    独立な標準正規スコアに右から .T で掛けると相関をもたせる行列。
+
+    半正定値でない行列は最も近い相関行列に直して分解する。分解は行列の内容で
+    キャッシュされるので、チャンクごとに呼んでも分解は1回だけ。
+    """
+    return factorize_correlation(correlation_matrix).factor
+
+
+def generate_correlated_normal_scores(rng, correlation_matrix, sample_count):
+    """相関行列に従う標準正規スコア (sample_count, 変数数)"""
+    factor = correlation_factor(correlation_matrix)
+    independent = rng.standard_normal(size=(sample_count, factor.shape[0]))
+    return independent @ factor.T
+
+
+def transform_from_normal_scores(normal_scores, central, standard_uncertainty, distribution_key, parameter=None):
+    """標準正規スコアを逆累積分布関数で各分布の値に変換する（ガウスコピュラ）"""
+    if standard_uncertainty == 0:
+        return np.full(normal_scores.shape[0], central, dtype=float)
+
+    key = get_distribution_translation_key(distribution_key) or distribution_key
+    return get_distribution(key).from_normal_scores(normal_scores, central, standard_uncertainty, parameter)
+
+
+def transform_from_uniform(probabilities, central, standard_uncertainty, distribution_key, parameter=None):
+    """(0, 1) の一様な値を逆累積分布関数で各分布の値に変換する"""
+    if standard_uncertainty == 0:
+        return np.full(np.shape(probabilities)[0], central, dtype=float)
+
+    key = get_distribution_translation_key(distribution_key) or distribution_key
+    probabilities = np.clip(probabilities, _EPSILON, 1.0 - _EPSILON)
+    return get_distribution(key).ppf(probabilities, central, standard_uncertainty, parameter)
+
+
+_QUADRATURE_NODES, _QUADRATURE_WEIGHTS = np.polynomial.hermite_e.hermegauss(64)
+_QUADRATURE_WEIGHTS = _QUADRATURE_WEIGHTS / math.sqrt(2.0 * math.pi)
+
+
+def _as_input(item):
+    if isinstance(item, MonteCarloInput):
+        return item
+    return MonteCarloInput("", 1.0, 1.0, item)
+
+
+def marginal_correlation(first_input, second_input, normal_correlation):
+    """
+    正規スコアの相関が normal_correlation のとき、各分布に変換したあとの相関係数。
+
+    入力は MonteCarloInput か分布のキー（形状パラメータのない分布だけ）。
+    正規分布どうしなら変わらない。それ以外は2次元の Gauss-Hermite 求積で求める。
+    """
+    normal_correlation = float(normal_correlation)
+    first_input, second_input = _as_input(first_input), _as_input(second_input)
+    keys = [get_distribution_translation_key(item.distribution) or item.distribution
+            for item in (first_input, second_input)]
+    if normal_correlation == 0.0 or all(get_distribution(key).key == NORMAL_DISTRIBUTION for key in keys):
+        return normal_correlation
+
+    first = _QUADRATURE_NODES[:, None]
+    second = normal_correlation * first + math.sqrt(max(1.0 - normal_correlation ** 2, 0.0)) * _QUADRATURE_NODES[None, :]
+    weights = np.outer(_QUADRATURE_WEIGHTS, _QUADRATURE_WEIGHTS).reshape(-1)
+    values = []
+    for item, scores in ((first_input, np.broadcast_to(first, second.shape)), (second_input, second)):
+        transformed = transform_from_normal_scores(
+            scores.reshape(-1), item.central, 1.0 if item.standard_uncertainty == 0 else item.standard_uncertainty,
+            item.distribution, item.parameter,
+        )
+        values.append(transformed - np.dot(weights, transformed))
+    covariance = np.dot(weights, values[0] * values[1])
+    scale = math.sqrt(np.dot(weights, values[0] ** 2) * np.dot(weights, values[1] ** 2))
+    return float(covariance / scale)
+
+
+@dataclass(frozen=True)
+class MonteCarloInput:
+    """入力量1つ分のサンプリング条件"""
+    name: str
+    central: float
+    standard_uncertainty: float
+    distribution: str = NORMAL_DISTRIBUTION
+    # 分布の形状パラメータ（t 分布の自由度、台形分布の β など）
+    parameter: Optional[float] = None
+
+
+@dataclass
+class MonteCarloModel:
+    """
+    ワーカープロセスに渡せる（pickle できる）モデルの定義。
+
+    式は各プロセスでコンパイルしてキャッシュする。
+    """
+    expression: str
+    variables: Tuple[str, ...]
+    inputs: Tuple[MonteCarloInput, ...]
+    correlation: Optional[np.ndarray] = None
+    sampling: str = SAMPLING_RANDOM
+    # 線形化したモデル（GUM の感度係数）を制御変量にする
+    control_variate: bool = False
+    # 正規スコアを z と -z の対にする（擬似乱数のときだけ）
+    antithetic: bool = False
+
+    def sample_inputs(self, rng, sample_count):
+        if len(self.inputs) == 1:
+            item = self.inputs[0]
+            return [generate_samples(rng, item.central, item.standard_uncertainty, item.distribution, sample_count,
+                                     item.parameter)]
+
+        correlation = self.correlation
+        if correlation is None:
+            correlation = np.eye(len(self.inputs))
+        normal_scores = generate_correlated_normal_scores(rng, correlation, sample_count)
+        return [
+            transform_from_normal_scores(
+                normal_scores[:, index],
+                central=item.central,
+                standard_uncertainty=item.standard_uncertainty,
+                distribution_key=item.distribution,
+                parameter=item.parameter,
+            )
+            for index, item in enumerate(self.inputs)
+        ]
+
+    def sample_inputs_from_uniform(self, uniforms):
+        """(試行数, 入力数) の一様な点列を各入力量の値にする（相関はガウスコピュラで入れる）"""
+        correlation = self.correlation
+        if correlation is None or np.allclose(correlation, np.eye(len(self.inputs))):
+            return [
+                transform_from_uniform(uniforms[:, index], item.central, item.standard_uncertainty, item.distribution,
+                                       item.parameter)
+                for index, item in enumerate(self.inputs)
+            ]
+        clipped = np.clip(uniforms, _EPSILON, 1.0 - _EPSILON)
+        normal_scores = ndtri(clipped) @ correlation_factor(correlation).T
+        return [
+            transform_from_normal_scores(normal_scores[:, index], item.central, item.standard_uncertainty,
+                                         item.distribution, item.parameter)
+            for index, item in enumerate(self.inputs)
+        ]
+
+    def sample_antithetic_inputs(self, rng, sample_count):
+        """正規スコアを z, -z の対で使う（対の片方ずつは元の分布に従うので偏りはない）"""
+        correlation = self.correlation
+        if correlation is None:
+            correlation = np.eye(len(self.inputs))
+        half = generate_correlated_normal_scores(rng, correlation, (sample_count + 1) // 2)
+        normal_scores = np.concatenate([half, -half])[:sample_count]
+        return [
+            transform_from_normal_scores(normal_scores[:, index], item.central, item.standard_uncertainty,
+                                         item.distribution, item.parameter)
+            for index, item in enumerate(self.inputs)
+        ]
+
+    def evaluate(self, rng, sample_count):
+        """sample_count 試行分の出力"""
+        return self._evaluate_inputs(self.sample_inputs(rng, sample_count), sample_count)
+
+    def sample_chunk_inputs(self, seed, chunk_index, start, sample_count):
+        """
+        チャンク1つ分の入力量の値（入力量ごとの配列のリスト）。
+
+        乱数はチャンクごとの乱数列、Sobol 列は番号 start からの続き、
+        ラテン超方格はチャンクごとに作る。
+        """
+        if self.sampling == SAMPLING_RANDOM:
+            rng = chunk_generator(seed, chunk_index)
+            if self.antithetic:
+                return self.sample_antithetic_inputs(rng, sample_count)
+            return self.sample_inputs(rng, sample_count)
+        if self.sampling == SAMPLING_SOBOL:
+            uniforms = get_scrambled_sobol(len(self.inputs), seed).points(start, sample_count)
+            return self.sample_inputs_from_uniform(uniforms)
+        if self.sampling == SAMPLING_LATIN_HYPERCUBE:
+            uniforms = latin_hypercube(chunk_generator(seed, chunk_index), sample_count, len(self.inputs))
+            return self.sample_inputs_from_uniform(uniforms)
+        raise ValueError(f"Unknown sampling method: {self.sampling}")
+
+    def evaluate_chunk(self, seed, chunk_index, start, sample_count):
+        """チャンク1つ分の (出力, 制御変量の値 or None)"""
+        return self.evaluate_sampled(self.sample_chunk_inputs(seed, chunk_index, start, sample_count), sample_count)
+
+    def evaluate_sampled(self, values, sample_count):
+        """抽出した入力量の値から (出力, 制御変量の値 or None)"""
+        outputs = self._evaluate_inputs(values, sample_count)
+        linearization = self.linearization() if self.control_variate else None
+        if linearization is None:
+            return outputs, None
+        central_value, gradient = linearization
+        controls = np.full(sample_count, central_value, dtype=float)
+        for coefficient, item, sampled in zip(gradient, self.inputs, values):
+            controls += coefficient * (sampled - item.central)
+        return outputs, controls
+
+    def linearization(self):
+        """中心値でのモデル値と感度係数（数値微分）。有限でなければ None"""
+        if not hasattr(self, '_linearization'):
+            model = get_model_cache().get(self.expression, self.variables)
+            result = model.evaluate_numeric_gradient(*[item.central for item in self.inputs])
+            central_value = float(result.values[0])
+            gradient = np.asarray(result.gradient[0], dtype=float)
+            finite = math.isfinite(central_value) and bool(np.all(np.isfinite(gradient)))
+            self._linearization = (central_value, gradient) if finite else None
+        return self._linearization
+
+    def control_expectation(self):
+        """
+        制御変量 l = y0 + Σ c_i (x_i - μ_i) の (期待値, 分散)。
+
+        どの分布も期待値は中心値なので期待値は y0。分散には各分布の実際の分散と、
+        ガウスコピュラを通したあとの入力量どうしの相関（marginal_correlation）を使う。
+        期待値か分散が有限でない入力量（自由度 2 以下の t 分布）があれば None。
+        """
+        linearization = self.linearization() if self.control_variate else None
+        if linearization is None:
+            return None
+        central_value, gradient = linearization
+        deviations = []
+        for item in self.inputs:
+            distribution = get_distribution(get_distribution_translation_key(item.distribution) or item.distribution)
+            if item.standard_uncertainty == 0:
+                deviations.append(0.0)
+                continue
+            ratio = distribution.variance_ratio(item.parameter)
+            if not distribution.has_mean(item.parameter) or not math.isfinite(ratio):
+                return None
+            deviations.append(item.standard_uncertainty * math.sqrt(ratio))
+        scaled = gradient * np.array(deviations, dtype=float)
+        count = len(self.inputs)
+        correlation = np.eye(count)
+        if self.correlation is not None and count > 1:
+            normal_correlation = factorize_correlation(self.correlation).matrix
+            for i in range(count):
+                for j in range(i + 1, count):
+                    value = marginal_correlation(self.inputs[i], self.inputs[j], normal_correlation[i, j])
+                    correlation[i, j] = correlation[j, i] = value
+        return central_value, float(scaled @ correlation @ scaled)
+
+    def _evaluate_inputs(self, values, sample_count):
+        model = get_model_cache().get(self.expression, self.variables)
+        result = np.asarray(model.evaluate_values(*values), dtype=float)
+        if result.ndim == 0:
+            result = np.full(sample_count, float(result), dtype=float)
+        return result.reshape(-1)
+
+
+def new_seed():
+    """記録用の整数シード（OSのエントロピーから作る）"""
+    return int(np.random.SeedSequence().entropy)
+
+
+def chunk_generator(seed, chunk_index):
+    """チャンク専用の乱数生成器（SeedSequence(seed).spawn の chunk_index 番目と同じ）"""
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(chunk_index,))))
+
+
+def _chunk_size_at(index, sample_count, chunk_size):
+    return min(chunk_size, sample_count - index * chunk_size)
+
+
+def block_ranges(sample_count, chunk_size):
+    """
+    試行をワーカーに渡すブロック（先頭チャンク, 末尾チャンク）に区切る。
+
+    ブロックが大きいと多コアを使い切れないので、MIN_BLOCK_COUNT 個以上に分かれるよう
+    1ブロックのチャンク数を CHUNKS_PER_BLOCK 以下で小さくする。区切りは試行回数と
+    チャンクサイズだけで決まり、ワーカー数によらず併合の順序（結果）は同じになる。
+    """
+    chunk_count = -(-int(sample_count) // int(chunk_size))
+    per_block = max(1, min(CHUNKS_PER_BLOCK, -(-chunk_count // MIN_BLOCK_COUNT)))
+    return [(first, min(first + per_block, chunk_count)) for first in range(0, chunk_count, per_block)]
+
+
+def run_block(model, seed, sample_count, chunk_size, first_chunk, last_chunk, on_chunk=None, store=None):
+    """
+    チャンク first_chunk〜last_chunk-1 を評価し、チャンク順に併合した部分結果を返す。
+
+    on_chunk(次のチャンク番号, ここまでの部分結果) はチャンクごとに呼ばれる（同じプロセス内のみ）。
+    store（SampleStore）があれば、入力量と出力の値を試行番号の位置に書き込む。
+    """
+    block = MonteCarloAccumulator()
+    for index in range(first_chunk, last_chunk):
+        partial = MonteCarloAccumulator()
+        start = index * chunk_size
+        count = _chunk_size_at(index, sample_count, chunk_size)
+        values = model.sample_chunk_inputs(seed, index, start, count)
+        outputs, controls = model.evaluate_sampled(values, count)
+        if store is not None:
+            store.write(start, values, outputs, controls)
+        partial.add(outputs, controls)
+        block.merge(partial)
+        if on_chunk is not None and index + 1 < last_chunk:
+            on_chunk(index + 1, block)
+    return block
+
+
+@dataclass
+class MonteCarloRun:
+    """1回のシミュレーションの記録（seed があれば同じ結果を再現できる）"""
+    seed: int
+    sample_count: int
+    chunk_size: int
+    workers: int
+    accumulator: MonteCarloAccumulator = field(repr=False)
+    completed_count: int = 0
+    elapsed: float = 0.0
+    cancelled: bool = False
+    # 適応的手順のときだけ使う
+    batch_count: int = 0
+    tolerance: Optional[float] = None
+    converged: Optional[bool] = None
+    # レプリケートで実行したときの y, u(y), y_low, y_high の標準誤差
+    replicates: int = 1
+    standard_errors: Optional[Tuple[float, float, float, float]] = None
+    # 制御変量の (期待値, 分散)（制御変量を使わないときは None）
+    control_expectation: Optional[Tuple[float, float]] = None
+    # 標本を保存したときの保存先（sample_store.SampleStore）
+    sample_store: Optional[object] = field(default=None, repr=False)
+    # 保存した標本から求めた統計量（包含確率ごと）とヒストグラム（ビン数ごと）
+    stored_statistics: dict = field(default_factory=dict, repr=False)
+    stored_histograms: dict = field(default_factory=dict, repr=False)
+
+    def prepare_stored_results(self, coverage_probability=DEFAULT_COVERAGE_PROBABILITY, bins=None):
+        """
+        保存した標本の並べ替え・統計量・ヒストグラムを先に作っておく。
+
+        どれも標本全体を読むので、ワーカーで呼んでおけば summary と display_histogram は
+        表示側で標本を読まずに済む。
+        """
+        if self.sample_store is None or not self.sample_store.is_complete():
+            return
+        self._stored_statistics(coverage_probability)
+        if bins is not None:
+            self.display_histogram(bins)
+
+    def _stored_statistics(self, coverage_probability):
+        key = float(coverage_probability)
+        if key not in self.stored_statistics:
+            self.stored_statistics[key] = statistics_from_sorted(self.sample_store.sorted_outputs(), key)
+        return self.stored_statistics[key]
+
+    def summary(self, coverage_probability=DEFAULT_COVERAGE_PROBABILITY):
+        """標本が保存してあれば、中央値と包含区間は並べ替えた標本から正確に求める"""
+        summary = self.accumulator.summary(coverage_probability, self.control_expectation)
+        if summary is None or self.sample_store is None or not self.sample_store.is_complete():
+            return summary
+        statistics = self._stored_statistics(coverage_probability)
+        if statistics is None:
+            return summary
+        summary.median = statistics.median
+        summary.interval = statistics.interval
+        summary.shortest_interval = statistics.shortest_interval
+        return summary
+
+    def display_histogram(self, bins):
+        """表示用のヒストグラム（標本が保存してあれば標本から数え直す）"""
+        if self.sample_store is None or not self.sample_store.is_complete():
+            return self.accumulator.display_histogram(bins)
+        if bins not in self.stored_histograms:
+            self.stored_histograms[bins] = self.sample_store.histogram(bins, *self.accumulator.display_range())
+        return self.stored_histograms[bins]
+
+
+_pool_lock = threading.Lock()
+_process_pool = None
+_process_pool_workers = 0
+
+
+def get_process_pool(workers):
+    """ワーカー数 workers のプロセスプールを返す（同じ数なら使い回す）"""
+    global _process_pool, _process_pool_workers
+    with _pool_lock:
+        if _process_pool is None or _process_pool_workers != workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False, cancel_futures=True)
+            # GUIのスレッドを抱えたまま fork しないよう spawn で起動する
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _process_pool_workers = workers
+        return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool, _process_pool_workers
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+        _process_pool_workers = 0
+
+
+atexit.register(shutdown_process_pool)
+
+
+def _wait_for_block(future, is_cancelled, poll_interval=0.1):
+    """ブロックの結果を待つ（待っている間も取り消しを確認し、取り消されたら None）"""
+    while True:
+        if is_cancelled is not None and is_cancelled():
+            return None
+        try:
+            return future.result(timeout=poll_interval)
+        except FutureTimeoutError:
+            continue
+
+
+def _evaluate_blocks(model, seed, chunk_size, blocks, workers, is_cancelled, on_chunk=None, store=None):
+    """
+    blocks の (サンプル数, 先頭チャンク, 末尾チャンク) を順に評価し、結果をブロック順に返す。
+
+    workers > 1 のときは先読みしてプロセスプールで並行に評価する（先読みは
+    workers の2倍まで）。取り消されたら None を返して終わる。on_chunk は
+    workers == 1 のときだけブロック内のチャンクごとに呼ばれる。
+    """
+    if workers == 1:
+        for sample_count, first, last in blocks:
+            if is_cancelled is not None and is_cancelled():
+                yield None
+                return
+            yield run_block(model, seed, sample_count, chunk_size, first, last, on_chunk, store)
+        return
+
+    pool = get_process_pool(workers)
+    blocks = iter(blocks)
+    pending = []
+    try:
+        while True:
+            while len(pending) < 2 * workers:
+                block = next(blocks, None)
+                if block is None:
+                    break
+                pending.append(pool.submit(run_block, model, seed, block[0], chunk_size, block[1], block[2],
+                                           None, store))
+            if not pending:
+                return
+            # 終わった順ではなくブロック番号順に返す
+            block_result = _wait_for_block(pending.pop(0), is_cancelled)
+            yield block_result
+            if block_result is None:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _snapshot(accumulator, block=None):
+    """途中経過の表示用に、集計中の結果の複製を作る"""
+    snapshot = copy.deepcopy(accumulator)
+    if block is not None:
+        snapshot.merge(block)
+    return snapshot
+
+
+def run_monte_carlo(model, sample_count, seed=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                    progress=None, is_cancelled=None, partial=None, store_root=None):
+    """
+    model の出力を sample_count 試行分集計する。
+
+    workers > 1 のときはブロック単位でプロセスプールに分配する。progress(done, total) は
+    ブロックを併合するたびに呼ばれ、is_cancelled() が真になったらそこまでの結果を返す。
+    partial(done, total, 途中結果) は途中経過の表示用で、ブロックごと（1プロセスで
+    実行するときはチャンクごと）に複製した集計結果を渡す。最終結果には影響しない。
+
+    store_root を指定すると、入力量と出力の標本をその下の実行ごとのディレクトリに
+    保存する（sample_store.py）。同じモデル・シード・試行回数の標本が保存済みなら、
+    モデルを評価せずに保存した標本から集計し直す。
+    """
+    started = time.perf_counter()
+    seed = new_seed() if seed is None else int(seed)
+    sample_count = int(sample_count)
+    chunk_size = max(int(chunk_size), 1)
+    blocks = [(sample_count, first, last) for first, last in block_ranges(sample_count, chunk_size)]
+    workers = max(1, min(int(workers), len(blocks)))
+    run = MonteCarloRun(seed, sample_count, chunk_size, workers, MonteCarloAccumulator(),
+                        control_expectation=model.control_expectation())
+
+    store = None
+    if store_root is not None:
+        store = SampleStore.for_run(store_root, model, seed, sample_count, chunk_size)
+        if store.is_complete():
+            return _run_from_store(run, store, started, progress, is_cancelled)
+        with_controls = model.control_variate and model.linearization() is not None
+        store.allocate(model.variables, sample_count, with_controls=with_controls)
+        run.sample_store = store
+
+    on_chunk = None
+    if partial is not None:
+        def on_chunk(next_chunk, block):
+            partial(min(next_chunk * chunk_size, sample_count), sample_count, _snapshot(run.accumulator, block))
+
+    evaluations = _evaluate_blocks(model, seed, chunk_size, blocks, workers, is_cancelled, on_chunk, store)
+    for block_result, (_, _, last) in zip(evaluations, blocks):
+        if block_result is None:
+            run.cancelled = True
+            break
+        run.accumulator.merge(block_result)
+        run.completed_count = min(last * chunk_size, sample_count)
+        if progress is not None:
+            progress(run.completed_count, sample_count)
+        if partial is not None:
+            partial(run.completed_count, sample_count, _snapshot(run.accumulator))
+
+    if store is not None:
+        # 取り消した実行の標本は途中までしかないので使い回さない
+        store.finish(run.completed_count, complete=not run.cancelled)
+    run.elapsed = time.perf_counter() - started
+    return run
+
+
+def _run_from_store(run, store, started, progress=None, is_cancelled=None):
+    """
+    保存済みの標本を集計し直す（モデルは評価しない）。
+
+    チャンクとブロックの区切りと併合の順序を run_block と揃えるので、評価したときと同じ結果になる。
+    """
+    run.sample_store = store
+    for first, last in block_ranges(run.sample_count, run.chunk_size):
+        if is_cancelled is not None and is_cancelled():
+            run.cancelled = True
+            break
+        block = MonteCarloAccumulator()
+        for index in range(first, last):
+            start = index * run.chunk_size
+            outputs, controls = store.read(start, _chunk_size_at(index, run.sample_count, run.chunk_size))
+            partial = MonteCarloAccumulator()
+            partial.add(outputs, controls)
+            block.merge(partial)
+        run.accumulator.merge(block)
+        run.completed_count = min((index + 1) * run.chunk_size, run.sample_count)
+        if progress is not None:
+            progress(run.completed_count, run.sample_count)
+    run.elapsed = time.perf_counter() - started
+    return run
+
+
+def adaptive_batch_size(coverage_probability, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    適応的手順の1バッチの試行回数（GUM-S1 7.9.4: max(100/(1-p), 10^4)）。
+
+    バッチがチャンクの整数倍になるよう切り上げる。
+    """
+    minimum = max(int(math.ceil(100.0 / (1.0 - coverage_probability))), 10000)
+    chunk_size = min(max(int(chunk_size), 1), minimum)
+    return -(-minimum // chunk_size) * chunk_size, chunk_size
+
+
+def numerical_tolerance(standard_uncertainty, significant_digits):
+    """u(y) を有効数字 significant_digits 桁で表したときの数値許容差 δ = 10^l / 2（GUM-S1 7.9.2）"""
+    if not standard_uncertainty > 0 or not math.isfinite(standard_uncertainty):
+        return 0.0
+    exponent = math.floor(math.log10(standard_uncertainty)) - int(significant_digits) + 1
+    return 0.5 * 10.0 ** exponent
+
+
+def _batch_statistics(batch_summaries):
+    """各バッチの y, u(y), y_low, y_high の平均の標準偏差"""
+    values = np.array(
+        [[item.mean, item.standard_deviation, item.interval[0], item.interval[1]] for item in batch_summaries],
+        dtype=float,
+    )
+    count = values.shape[0]
+    return np.std(values, axis=0, ddof=1) / math.sqrt(count)
+
+
+def run_adaptive_monte_carlo(model, significant_digits=2, coverage_probability=DEFAULT_COVERAGE_PROBABILITY,
+                             seed=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                             max_sample_count=100000000, progress=None, is_cancelled=None, partial=None):
+    """
+    GUM-S1 7.9 の適応的モンテカルロ法。
+
+    バッチを1つずつ追加し、y, u(y) と包含区間の両端それぞれの平均の標準偏差の2倍が
+    数値許容差以下になったら止める。結果は全バッチを併合したもの。バッチ h は
+    チャンク番号を通しで使うので、同じシードなら試行回数の同じ固定回数の実行と
+    同じ乱数列になる。progress(done, total) の total は上限の試行回数。
+    """
+    started = time.perf_counter()
+    seed = new_seed() if seed is None else int(seed)
+    batch_size, chunk_size = adaptive_batch_size(coverage_probability, chunk_size)
+    chunks_per_batch = batch_size // chunk_size
+    max_batches = max(int(max_sample_count) // batch_size, 2)
+    blocks = [
+        ((index + 1) * batch_size, index * chunks_per_batch, (index + 1) * chunks_per_batch)
+        for index in range(max_batches)
+    ]
+    workers = max(1, int(workers))
+    run = MonteCarloRun(seed, 0, chunk_size, workers, MonteCarloAccumulator(),
+                        control_expectation=model.control_expectation())
+    run.converged = False
+    batch_summaries = []
+
+    evaluations = _evaluate_blocks(model, seed, chunk_size, blocks, workers, is_cancelled)
+    try:
+        for block_result in evaluations:
+            if block_result is None:
+                run.cancelled = True
+                break
+            batch_summaries.append(block_result.summary(coverage_probability))
+            run.accumulator.merge(block_result)
+            run.batch_count = len(batch_summaries)
+            run.completed_count = run.sample_count = run.batch_count * batch_size
+            if progress is not None:
+                progress(run.completed_count, max_batches * batch_size)
+            if partial is not None:
+                partial(run.completed_count, max_batches * batch_size, _snapshot(run.accumulator))
+            if run.batch_count < 2:
+                continue
+            run.tolerance = numerical_tolerance(run.accumulator.moments.standard_deviation, significant_digits)
+            if np.all(2.0 * _batch_statistics(batch_summaries) <= run.tolerance):
+                run.converged = True
+                break
+    finally:
+        # 先読みしたバッチは使わずに捨てる
+        evaluations.close()
+
+    run.elapsed = time.perf_counter() - started
+    return run
+
+
+def replicate_seed(seed, replicate):
+    """レプリケート replicate 番目のシード（元のシードから決まる）"""
+    return int(np.random.SeedSequence([int(seed), int(replicate)]).generate_state(1, np.uint64)[0])
+
+
+def run_replicated_monte_carlo(model, sample_count, replicates, seed=None, workers=1,
+                               chunk_size=DEFAULT_CHUNK_SIZE, progress=None, is_cancelled=None, partial=None):
+    """
+    sample_count 試行を replicates 個の独立な乱択化（シード違い）に分けて実行する。
+
+    準モンテカルロ法の点列は試行どうしが独立でないので、誤差は各レプリケートの
+    y, u(y), y_low, y_high のばらつきから見積もる（standard_errors）。結果は全レプリケートを
+    併合したもの。
+    """
+    started = time.perf_counter()
+    seed = new_seed() if seed is None else int(seed)
+    replicates = max(int(replicates), 1)
+    per_replicate = max(-(-int(sample_count) // replicates), 1)
+    total = per_replicate * replicates
+    run = MonteCarloRun(seed, total, chunk_size, max(1, int(workers)), MonteCarloAccumulator(),
+                        replicates=replicates, control_expectation=model.control_expectation())
+    summaries = []
+
+    for replicate in range(replicates):
+        done_before = replicate * per_replicate
+        merged_before = run.accumulator
+        replicate_run = run_monte_carlo(
+            model,
+            per_replicate,
+            seed=replicate_seed(seed, replicate),
+            workers=workers,
+            chunk_size=chunk_size,
+            progress=None if progress is None else (lambda done, _total: progress(done_before + done, total)),
+            is_cancelled=is_cancelled,
+            partial=None if partial is None else (
+                lambda done, _total, snapshot: partial(done_before + done, total, _snapshot(merged_before, snapshot))
+            ),
+        )
+        if replicate_run.cancelled:
+            run.cancelled = True
+            break
+        summaries.append(replicate_run.summary())
+        run.accumulator.merge(replicate_run.accumulator)
+        run.completed_count = done_before + per_replicate
+
+    if len(summaries) >= 2:
+        run.standard_errors = tuple(float(value) for value in _batch_statistics(summaries))
+    run.elapsed = time.perf_counter() - started
+    return run
+
+
+@dataclass
+class MonteCarloBatch:
+    """複数のモデル（結果量×校正点）を同じシードで実行した結果"""
+    seed: int
+    sample_count: int
+    runs: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+
+def run_monte_carlo_batch(models, sample_count, seed=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                          progress=None, is_cancelled=None):
+    """
+    models（キー → MonteCarloModel）をすべて同じシードで sample_count 試行ずつ実行する。
+
+    チャンクの乱数列はシードとチャンク番号だけで決まるので、入力量の並びと分布が
+    同じモデル同士では同じ乱数（共通乱数）を使うことになり、校正点間の差の
+    ばらつきが小さくなる。progress(done, total) は全モデル通しの試行回数。
+    """
+    started = time.perf_counter()
+    seed = new_seed() if seed is None else int(seed)
+    sample_count = int(sample_count)
+    batch = MonteCarloBatch(seed, sample_count)
+    total = sample_count * len(models)
+
+    for offset, (key, model) in enumerate(models.items()):
+        done_before = offset * sample_count
+        run = run_monte_carlo(
+            model,
+            sample_count,
+            seed=seed,
+            workers=workers,
+            chunk_size=chunk_size,
+            progress=None if progress is None else (lambda done, _total: progress(done_before + done, total)),
+            is_cancelled=is_cancelled,
+        )
+        if run.cancelled:
+            batch.cancelled = True
+            break
+        batch.runs[key] = run
+
+    batch.elapsed = time.perf_counter() - started
+    return batch
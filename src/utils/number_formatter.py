@@ -1,5 +1,6 @@
 from decimal import Decimal, ROUND_HALF_UP, ROUND_UP, ROUND_DOWN
-from .config_loader import ConfigLoader
+from functools import lru_cache
+from .config_loader import add_config_listener, get_config
 import traceback
 from .app_logger import log_error
 
@@ -8,17 +9,39 @@ def _to_decimal(value: float | Decimal) -> Decimal:
     return value if isinstance(value, Decimal) else Decimal(str(value))
 
 
+_uncertainty_settings = None
+
+
+def _clear_uncertainty_settings(_config=None):
+    """設定が読み直されたら丸め設定のキャッシュを破棄"""
+    global _uncertainty_settings
+    _uncertainty_settings = None
+
+
+add_config_listener(_clear_uncertainty_settings)
+
+
 def _get_uncertainty_settings() -> tuple[int, str]:
     """有効数字設定と丸めモードを取得"""
-    config = ConfigLoader()
-    if config.config.has_section('UncertaintyRounding'):
-        section = config.config['UncertaintyRounding']
-        digits = int(section.get('significant_digits', 2))
-        mode = section.get('rounding_mode', '5_percent')
-    else:
-        digits = 2
-        mode = '5_percent'
-    return digits, mode
+    global _uncertainty_settings
+    config = get_config()
+    settings = _uncertainty_settings
+    if settings is None:
+        if config.config.has_section('UncertaintyRounding'):
+            section = config.config['UncertaintyRounding']
+            digits = int(section.get('significant_digits', 2))
+            mode = section.get('rounding_mode', '5_percent')
+        else:
+            digits = 2
+            mode = '5_percent'
+        settings = _uncertainty_settings = (digits, mode)
+    return settings
+
+
+@lru_cache(maxsize=512)
+def _quantizer(exponent: int) -> Decimal:
+    """quantize 用の 1eN（指数ごとに使い回す）"""
+    return Decimal(1).scaleb(exponent)
 
 
 def _round_to_significant_digits(value: Decimal, significant_digits: int, rounding_mode=ROUND_HALF_UP) -> Decimal:
@@ -27,40 +50,29 @@ def _round_to_significant_digits(value: Decimal, significant_digits: int, roundi
         return Decimal('0')
 
     exponent = value.adjusted()  # 10進指数
-    quantize_exp = Decimal(f"1e{exponent - significant_digits + 1}")
+    quantize_exp = _quantizer(exponent - significant_digits + 1)
     return value.quantize(quantize_exp, rounding=rounding_mode)
 
 
 def _format_with_exponent(value: Decimal, significant_digits: int) -> str:
     """丸め済みの値を3の倍数の指数表記で返す"""
+    decimals = max(significant_digits - 1, 0)
     if value == 0:
-        decimals = max(significant_digits - 1, 0)
         return f"{Decimal('0'):.{decimals}f}"
+    if not value.is_finite():
+        raise ValueError(f"有限な数値ではありません: {value}")
 
-    abs_value = abs(value)
-    exponent = 0
-
-    while abs_value >= 1000:
-        abs_value /= 1000
-        exponent += 3
-    while abs_value < 1:
-        abs_value *= 1000
-        exponent -= 3
-
-    decimals = max(significant_digits - 1, 0)
-    format_str = f"{{:.{decimals}f}}"
-    if value < 0:
-        abs_value = -abs_value
+    # 仮数部が [1, 1000) に入る3の倍数の指数
+    exponent = (value.adjusted() // 3) * 3
+    mantissa = value.scaleb(-exponent)
 
     if exponent == 0:
-        return format_str.format(abs_value)
-    return f"{format_str.format(abs_value)} E{exponent}"
+        return f"{mantissa:.{decimals}f}"
+    return f"{mantissa:.{decimals}f} E{exponent}"
 
 
-def format_central_value(value) -> str:
-    """校正値（中央値）を有効数字設定で丸めて指数表記に変換"""
+def _format_central_value(value, digits: int) -> str:
     try:
-        digits, _ = _get_uncertainty_settings()
         rounded = _round_to_significant_digits(_to_decimal(value), digits, ROUND_HALF_UP)
         return _format_with_exponent(rounded, digits)
     except Exception as e:
@@ -68,10 +80,8 @@ def format_central_value(value) -> str:
         return "0"
 
 
-def format_standard_uncertainty(value) -> str:
-    """標準不確かさを(有効数字+2)で丸めて指数表記に変換"""
+def _format_standard_uncertainty(value, base_digits: int) -> str:
     try:
-        base_digits, _ = _get_uncertainty_settings()
         digits = base_digits + 2
         rounded = _round_to_significant_digits(_to_decimal(value), digits, ROUND_HALF_UP)
         return _format_with_exponent(rounded, digits)
@@ -80,13 +90,23 @@ def format_standard_uncertainty(value) -> str:
         return "0"
 
 
+def format_central_value(value) -> str:
+    """校正値（中央値）を有効数字設定で丸めて指数表記に変換"""
+    return _format_central_value(value, _get_uncertainty_settings()[0])
+
+
+def format_standard_uncertainty(value) -> str:
+    """標準不確かさを(有効数字+2)で丸めて指数表記に変換"""
+    return _format_standard_uncertainty(value, _get_uncertainty_settings()[0])
+
+
 def _round_with_five_percent_rule(value: Decimal, significant_digits: int) -> Decimal:
     """5%ルールで有効数字丸め"""
     if value == 0:
         return Decimal('0')
 
     exponent = value.adjusted()
-    quantize_exp = Decimal(f"1e{exponent - significant_digits + 1}")
+    quantize_exp = _quantizer(exponent - significant_digits + 1)
 
     rounded_down = value.copy_abs().quantize(quantize_exp, rounding=ROUND_DOWN)
     difference = value.copy_abs() - rounded_down
@@ -106,20 +126,21 @@ def _round_expanded_uncertainty(value: Decimal, digits: int, mode: str) -> Decim
     return _round_with_five_percent_rule(value, digits)
 
 
-def format_expanded_uncertainty(value) -> str:
-    """拡張不確かさを有効数字設定と丸めモードで丸めて指数表記に変換"""
+def _format_expanded_uncertainty(value, digits: int, mode: str) -> str:
     try:
-        digits, mode = _get_uncertainty_settings()
-
-        dec_value = _to_decimal(value)
-        rounded = _round_expanded_uncertainty(dec_value, digits, mode)
-
+        rounded = _round_expanded_uncertainty(_to_decimal(value), digits, mode)
         return _format_with_exponent(rounded, digits)
     except Exception as e:
         log_error(f"拡張不確かさの文字列変換エラー: {str(e)}", details=traceback.format_exc())
         return "0"
 
 
+def format_expanded_uncertainty(value) -> str:
+    """拡張不確かさを有効数字設定と丸めモードで丸めて指数表記に変換"""
+    digits, mode = _get_uncertainty_settings()
+    return _format_expanded_uncertainty(value, digits, mode)
+
+
 def format_contribution_rate(rate: float) -> str:
     """寄与率を小数点以下2桁でパーセント表記に"""
     return f"{rate:.2f} %"
@@ -134,32 +155,80 @@ def format_coverage_factor(value) -> str:
         return "0"
 
 
-def format_central_value_with_uncertainty(value, expanded_uncertainty) -> str:
-    """拡張不確かさの桁に合わせて中央値を表示"""
+def _format_central_value_with_uncertainty(value, expanded_uncertainty, digits: int, mode: str) -> str:
     try:
-        digits, mode = _get_uncertainty_settings()
         rounded_uncertainty = _round_expanded_uncertainty(_to_decimal(expanded_uncertainty), digits, mode)
 
         if rounded_uncertainty == 0:
-            return format_central_value(value)
+            return _format_central_value(value, digits)
 
-        quantize_exp = Decimal(f"1e{rounded_uncertainty.adjusted() - digits + 1}")
-        decimals = max(-quantize_exp.as_tuple().exponent, 0)
-        rounded_value = _to_decimal(value).quantize(quantize_exp, rounding=ROUND_HALF_UP)
+        exponent = rounded_uncertainty.adjusted() - digits + 1
+        decimals = max(-exponent, 0)
+        rounded_value = _to_decimal(value).quantize(_quantizer(exponent), rounding=ROUND_HALF_UP)
         return f"{rounded_value:.{decimals}f}"
     except Exception as e:
         log_error(f"不確かさに合わせた中央値の文字列変換エラー: {str(e)}", details=traceback.format_exc())
-        return format_central_value(value)
+        return _format_central_value(value, digits)
 
 
-def format_number_str(value):
-    """汎用的な指数表記（既存互換用、UncertaintyRoundingの設定を使用）"""
+def format_central_value_with_uncertainty(value, expanded_uncertainty) -> str:
+    """拡張不確かさの桁に合わせて中央値を表示"""
+    digits, mode = _get_uncertainty_settings()
+    return _format_central_value_with_uncertainty(value, expanded_uncertainty, digits, mode)
+
+
+def _format_number_str(value, digits: int) -> str:
     try:
-        digits, _ = _get_uncertainty_settings()
-        dec_value = _to_decimal(value)
         digits = max(digits, 1)
-        rounded = _round_to_significant_digits(dec_value, digits, ROUND_HALF_UP)
+        rounded = _round_to_significant_digits(_to_decimal(value), digits, ROUND_HALF_UP)
         return _format_with_exponent(rounded, digits)
     except Exception as e:
         log_error(f"汎用数値の文字列変換エラー: {str(e)}", details=traceback.format_exc())
         return "0"
+
+
+def format_number_str(value):
+    """汎用的な指数表記（既存互換用、UncertaintyRoundingの設定を使用）"""
+    return _format_number_str(value, _get_uncertainty_settings()[0])
+
+
+def _to_list(values):
+    """配列・リスト・スカラーを Python のリストに揃える"""
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    return values if isinstance(values, (list, tuple)) else [values]
+
+
+class BatchNumberFormatter:
+    """
+    一つの丸め設定のスナップショットで、複数の値をまとめて文字列化する。
+
+    バジェット表やレポートのように同じ設定で多数の値を表示するときに使う。
+    各メソッドは値の配列を受け取り、同じ順序の文字列リストを返す。
+    """
+
+    def __init__(self, settings: tuple[int, str] = None):
+        self.significant_digits, self.rounding_mode = (
+            settings if settings is not None else _get_uncertainty_settings()
+        )
+
+    def central_values(self, values) -> list[str]:
+        return [_format_central_value(value, self.significant_digits) for value in _to_list(values)]
+
+    def standard_uncertainties(self, values) -> list[str]:
+        return [_format_standard_uncertainty(value, self.significant_digits) for value in _to_list(values)]
+
+    def expanded_uncertainties(self, values) -> list[str]:
+        return [
+            _format_expanded_uncertainty(value, self.significant_digits, self.rounding_mode)
+            for value in _to_list(values)
+        ]
+
+    def central_values_with_uncertainty(self, values, expanded_uncertainties) -> list[str]:
+        return [
+            _format_central_value_with_uncertainty(value, uncertainty, self.significant_digits, self.rounding_mode)
+            for value, uncertainty in zip(_to_list(values), _to_list(expanded_uncertainties))
+        ]
+
+    def numbers(self, values) -> list[str]:
+        return [_format_number_str(value, self.significant_digits) for value in _to_list(values)]
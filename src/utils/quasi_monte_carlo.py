@@ -0,0 +1,127 @@
+"""
+準モンテカルロ法の点列
+
+入力量の一様乱数 (0, 1)^d の代わりに使う低食い違い点列。
+
+- スクランブル Sobol 列: Joe-Kuo の方向数に、ランダム線形スクランブル（LMS）と
+  ランダムなデジタルシフトをかけたもの。Gray コードで任意の番号から生成できるので、
+  チャンクに分けても全体で1本の点列になる。
+- ラテン超方格: 各次元を試行回数で等分し、各区間から1点ずつ取る。チャンクごとに
+  独立に作る（チャンク内で層別化される）。
+
+どちらもシードで乱択化してあり、シードを変えた反復（レプリケート）の
+ばらつきから誤差を見積もれる。
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+SOBOL_BITS = 32
+
+# Joe-Kuo（new-joe-kuo-6.21201）の方向数 (s, a, m_1..m_s)。1次元目は m_k = 1。
+_SOBOL_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+
+MAX_SOBOL_DIMENSION = len(_SOBOL_DIRECTIONS) + 1
+
+# スクランブル用の乱数をチャンクの乱数列と分けるための値
+_SCRAMBLE_TAG = 0x536F626F
+
+
+def _direction_numbers(dimension):
+    """各次元の方向数 V_k（上位ビットから詰めた SOBOL_BITS ビット整数）"""
+    directions = np.zeros((dimension, SOBOL_BITS), dtype=np.uint64)
+    for k in range(SOBOL_BITS):
+        directions[0, k] = 1 << (SOBOL_BITS - 1 - k)
+    for index in range(1, dimension):
+        degree, coefficients, initial = _SOBOL_DIRECTIONS[index - 1]
+        values = [0] * SOBOL_BITS
+        for k in range(SOBOL_BITS):
+            if k < degree:
+                values[k] = initial[k] << (SOBOL_BITS - 1 - k)
+                continue
+            value = values[k - degree] ^ (values[k - degree] >> degree)
+            for i in range(1, degree):
+                if (coefficients >> (degree - 1 - i)) & 1:
+                    value ^= values[k - i]
+            values[k] = value
+        directions[index] = values
+    return directions
+
+
+def _bits(values):
+    """整数の配列を上位ビットから並べた 0/1 の配列にする"""
+    shifts = np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    return ((values[..., None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def _pack(bits):
+    weights = np.uint64(1) << np.arange(SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    return (bits.astype(np.uint64) * weights).sum(axis=-1, dtype=np.uint64)
+
+
+class ScrambledSobol:
+    """LMS とデジタルシフトで乱択化した Sobol 列（seed が同じなら同じ点列）"""
+
+    def __init__(self, dimension, seed):
+        if not 1 <= dimension <= MAX_SOBOL_DIMENSION:
+            raise ValueError(f"Sobol sequence supports up to {MAX_SOBOL_DIMENSION} inputs: {dimension}")
+        self.dimension = dimension
+        rng = np.random.default_rng([int(seed), _SCRAMBLE_TAG])
+        directions = _direction_numbers(dimension)
+
+        # 下三角（対角は1）の乱数行列を方向数のビット列に掛ける
+        scrambled = np.empty_like(directions)
+        for index in range(dimension):
+            matrix = np.tril(rng.integers(0, 2, size=(SOBOL_BITS, SOBOL_BITS), dtype=np.uint8), -1)
+            np.fill_diagonal(matrix, 1)
+            bits = _bits(directions[index])
+            scrambled[index] = _pack((bits.astype(np.int64) @ matrix.T.astype(np.int64)) % 2)
+        self.directions = scrambled
+        self.shift = rng.integers(0, 1 << SOBOL_BITS, size=dimension, dtype=np.uint64)
+
+    def points(self, start, count):
+        """番号 start から count 点（形状 (count, dimension)、各成分は (0, 1) の内側）"""
+        indices = np.arange(start, start + count, dtype=np.uint64)
+        gray = indices ^ (indices >> np.uint64(1))
+        values = np.zeros((count, self.dimension), dtype=np.uint64)
+        for bit in range(SOBOL_BITS):
+            selected = ((gray >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+            if selected.any():
+                values[selected] ^= self.directions[:, bit]
+        values ^= self.shift
+        return (values.astype(float) + 0.5) / float(1 << SOBOL_BITS)
+
+
+@lru_cache(maxsize=16)
+def get_scrambled_sobol(dimension, seed):
+    """プロセス内で使い回す ScrambledSobol"""
+    return ScrambledSobol(dimension, seed)
+
+
+def latin_hypercube(rng, count, dimension):
+    """ラテン超方格 (count, dimension)。各次元で count 等分した区間に1点ずつ入る"""
+    strata = np.argsort(rng.random((dimension, count)), axis=1).T
+    return (strata + rng.random((count, dimension))) / count
+
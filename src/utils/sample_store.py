@@ -0,0 +1,284 @@
+"""
+モンテカルロ法の標本の保存先
+
+run_monte_carlo(store_root=...) の入力量と出力の標本を、実行ごとのディレクトリに
+メモリマップした .npy として保存する。ディレクトリ名はモデル・相関行列・抽出方法・
+シード・試行回数・チャンクの大きさのハッシュなので、同じ条件の実行は同じ場所になり、
+保存済みなら評価し直さずに読み込める。
+
+- inputs.npy: 入力量の値 (試行回数, 入力数)
+- outputs.npy: 出力の値 (試行回数,)
+- controls.npy: 制御変量の値（制御変量を使うときだけ）
+- sorted_outputs.npy: 有限な出力を昇順に並べたもの（初めて分位点を求めるときに作る）
+- sorted_runs.tmp.npy: 並べ替えの途中で使う一時ファイル
+- meta.json: 変数名・試行回数・最後まで書き終えたか
+
+読み出しはすべてメモリマップなので、10^7 試行でも標本全体をメモリに載せない。
+並べ替えも、チャンクごとに並べ替えた列をファイル上で併合する外部ソートで行う。
+チャンクごとに書き込む範囲が重ならないので、ワーカープロセスからも並行に書き込める。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+INPUTS_FILE = 'inputs.npy'
+OUTPUTS_FILE = 'outputs.npy'
+CONTROLS_FILE = 'controls.npy'
+SORTED_OUTPUTS_FILE = 'sorted_outputs.npy'
+SORTED_RUNS_FILE = 'sorted_runs.tmp.npy'
+META_FILE = 'meta.json'
+
+# 集計し直しや書き出しで1度に読む試行数
+DEFAULT_READ_CHUNK = 65536
+# 外部ソートで1度にメモリ上で並べ替える試行数
+DEFAULT_SORT_RUN = 1 << 20
+
+
+def sample_store_key(model, seed, sample_count, chunk_size):
+    """標本を決める条件のハッシュ（同じなら同じ標本になる）"""
+    description = (
+        model.expression,
+        tuple(model.variables),
+        tuple(
+            (item.name, item.central, item.standard_uncertainty, item.distribution, item.parameter)
+            for item in model.inputs
+        ),
+        model.sampling,
+        model.control_variate,
+        model.antithetic,
+        int(seed),
+        int(sample_count),
+        int(chunk_size),
+    )
+    digest = hashlib.blake2b(repr(description).encode('utf-8'), digest_size=16)
+    if model.correlation is not None:
+        digest.update(np.ascontiguousarray(model.correlation, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class SampleStore:
+    """1回の実行の標本を保存したディレクトリ"""
+
+    def __init__(self, directory):
+        self.directory = os.fspath(directory)
+        # このプロセスで書き込み用に開いたメモリマップ
+        self._writers = {}
+
+    def __getstate__(self):
+        # ワーカープロセスにはディレクトリだけを渡し、書き込み先はそれぞれで開く
+        return {'directory': self.directory}
+
+    def __setstate__(self, state):
+        self.directory = state['directory']
+        self._writers = {}
+
+    @classmethod
+    def for_run(cls, root, model, seed, sample_count, chunk_size):
+        return cls(os.path.join(os.fspath(root), sample_store_key(model, seed, sample_count, chunk_size)))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def metadata(self):
+        try:
+            with open(self._path(META_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_metadata(self, metadata):
+        temporary = self._path(META_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False)
+        os.replace(temporary, self._path(META_FILE))
+
+    def is_complete(self):
+        """最後まで書き終えた標本があるか"""
+        return self.metadata().get('complete') is True and os.path.exists(self._path(OUTPUTS_FILE))
+
+    @property
+    def sample_count(self):
+        return int(self.metadata().get('completed_count', 0))
+
+    @property
+    def variables(self):
+        return list(self.metadata().get('variables', []))
+
+    def allocate(self, variables, sample_count, with_controls=False):
+        """書き込み用のファイルを確保する（途中までの古い標本は消す）"""
+        self._writers = {}
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory)
+        sample_count = int(sample_count)
+        shapes = {INPUTS_FILE: (sample_count, len(variables)), OUTPUTS_FILE: (sample_count,)}
+        if with_controls:
+            shapes[CONTROLS_FILE] = (sample_count,)
+        for name, shape in shapes.items():
+            array = np.lib.format.open_memmap(self._path(name), mode='w+', dtype=np.float64, shape=shape)
+            del array
+        self._write_metadata({
+            'variables': list(variables),
+            'sample_count': sample_count,
+            'completed_count': 0,
+            'complete': False,
+        })
+
+    def _writer(self, name):
+        array = self._writers.get(name)
+        if array is None:
+            array = np.load(self._path(name), mmap_mode='r+')
+            self._writers[name] = array
+        return array
+
+    def write(self, start, values, outputs, controls=None):
+        """試行番号 start からの1チャンク分（values は入力量ごとの配列のリスト）"""
+        outputs = np.asarray(outputs, dtype=float).reshape(-1)
+        stop = start + outputs.size
+        inputs = self._writer(INPUTS_FILE)
+        for index, sampled in enumerate(values):
+            inputs[start:stop, index] = sampled
+        self._writer(OUTPUTS_FILE)[start:stop] = outputs
+        if controls is not None and os.path.exists(self._path(CONTROLS_FILE)):
+            self._writer(CONTROLS_FILE)[start:stop] = controls
+        for array in self._writers.values():
+            array.flush()
+
+    def finish(self, completed_count, complete=True):
+        """書き込みを終える（complete が偽なら使い回さない）"""
+        for array in self._writers.values():
+            array.flush()
+        self._writers = {}
+        metadata = self.metadata()
+        metadata['completed_count'] = int(completed_count)
+        metadata['complete'] = bool(complete)
+        self._write_metadata(metadata)
+
+    def _load(self, name):
+        if not os.path.exists(self._path(name)):
+            return None
+        return np.load(self._path(name), mmap_mode='r')[:self.sample_count]
+
+    @property
+    def inputs(self):
+        """入力量の値 (試行回数, 入力数)（読み取り専用のメモリマップ）"""
+        return self._load(INPUTS_FILE)
+
+    @property
+    def outputs(self):
+        return self._load(OUTPUTS_FILE)
+
+    @property
+    def controls(self):
+        return self._load(CONTROLS_FILE)
+
+    def read(self, start, count):
+        """試行番号 start から count 個の (出力, 制御変量の値 or None)"""
+        outputs = np.asarray(self.outputs[start:start + count])
+        controls = self.controls
+        return outputs, None if controls is None else np.asarray(controls[start:start + count])
+
+    def sorted_outputs(self, run_size=DEFAULT_SORT_RUN, chunk_size=DEFAULT_READ_CHUNK):
+        """
+        有限な出力を昇順に並べたもの（読み取り専用のメモリマップ）。
+
+        初めて呼ばれたときに1回だけ並べ替えて保存し、以降は包含確率を変えても並べ替えない。
+        run_size 個ずつ並べ替えた列を一時ファイルに書き、chunk_size 個ずつ読みながら
+        併合するので、メモリに載るのは標本全体ではなくその分だけ。
+        """
+        path = self._path(SORTED_OUTPUTS_FILE)
+        if not os.path.exists(path):
+            outputs = self.outputs
+            runs_path = self._path(SORTED_RUNS_FILE)
+            runs = np.lib.format.open_memmap(runs_path, mode='w+', dtype=np.float64, shape=(outputs.shape[0],))
+            bounds = []
+            stop = 0
+            for start in range(0, outputs.shape[0], int(run_size)):
+                chunk = np.asarray(outputs[start:start + int(run_size)])
+                chunk = np.sort(chunk[np.isfinite(chunk)])
+                runs[stop:stop + chunk.size] = chunk
+                bounds.append((stop, stop + chunk.size))
+                stop += chunk.size
+            runs.flush()
+
+            temporary = self._path('sorted_outputs.tmp.npy')
+            ordered = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.float64, shape=(stop,))
+            _merge_sorted_runs(runs, bounds, ordered, int(chunk_size))
+            ordered.flush()
+            del ordered, runs
+            os.replace(temporary, path)
+            os.remove(runs_path)
+        return np.load(path, mmap_mode='r')
+
+    def histogram(self, bins, low, high, chunk_size=DEFAULT_READ_CHUNK):
+        """範囲 [low, high] を bins 等分したヒストグラム（標本を少しずつ読む）"""
+        counts = np.zeros(int(bins), dtype=np.int64)
+        outputs = self.outputs
+        for start in range(0, outputs.shape[0], chunk_size):
+            chunk = np.asarray(outputs[start:start + chunk_size])
+            counts += np.histogram(chunk[np.isfinite(chunk)], bins=int(bins), range=(low, high))[0]
+        return counts, np.linspace(low, high, int(bins) + 1)
+
+    def export_csv(self, file_path, output_name, chunk_size=DEFAULT_READ_CHUNK):
+        """入力量と出力の標本を CSV に書き出す（1行が1試行）"""
+        inputs = self.inputs
+        outputs = self.outputs
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(','.join(self.variables + [output_name]) + '\n')
+            for start in range(0, outputs.shape[0], chunk_size):
+                rows = np.column_stack([inputs[start:start + chunk_size], outputs[start:start + chunk_size]])
+                np.savetxt(f, rows, delimiter=',', fmt='%.17g')
+
+    def remove(self):
+        self._writers = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _merge_sorted_runs(source, bounds, target, chunk_size):
+    """
+    source の昇順の列 bounds=[(開始, 終了), ...] を併合して target に書く。
+
+    列ごとに chunk_size 個ずつ読み、まだ読んでいない値より小さいことが確かな分だけを
+    まとめて書き出す（読み込んだ末尾の最小値以下の値）。メモリは列数 × chunk_size 程度。
+    """
+    positions = [start for start, _ in bounds]
+    buffers = [np.empty(0) for _ in bounds]
+    written = 0
+    while True:
+        for index, (_, stop) in enumerate(bounds):
+            if buffers[index].size == 0 and positions[index] < stop:
+                end = min(positions[index] + chunk_size, stop)
+                buffers[index] = np.asarray(source[positions[index]:end])
+                positions[index] = end
+        # 読み残しのある列の、読み込んだ末尾の値の最小値までは順序が確定している
+        pending = [buffers[index][-1] for index, (_, stop) in enumerate(bounds) if positions[index] < stop]
+        threshold = min(pending) if pending else np.inf
+        ready = []
+        for index, buffer in enumerate(buffers):
+            split = int(np.searchsorted(buffer, threshold, side='right'))
+            ready.append(buffer[:split])
+            buffers[index] = buffer[split:]
+        merged = np.sort(np.concatenate(ready)) if ready else np.empty(0)
+        target[written:written + merged.size] = merged
+        written += merged.size
+        if not pending and all(buffer.size == 0 for buffer in buffers):
+            return written
+
+
+def prune_sample_stores(root, keep):
+    """root の下の標本を新しい順に keep 個だけ残す"""
+    root = os.fspath(root)
+    if not os.path.isdir(root):
+        return
+    stores = []
+    for name in os.listdir(root):
+        meta_path = os.path.join(root, name, META_FILE)
+        if os.path.exists(meta_path):
+            stores.append((os.path.getmtime(meta_path), name))
+    stores.sort(reverse=True)
+    for _, name in stores[max(int(keep), 0):]:
+        SampleStore(os.path.join(root, name)).remove()
@@ -0,0 +1,290 @@
+"""
+NumPy配列用の特殊関数
+
+モンテカルロ法のサンプリングで使う誤差関数・正規分布・t 分布・ベータ分布の
+累積分布関数と分位点を、SciPy を使わずに配列のまま計算する。
+
+- erf / erfc / ndtr: Cephes の有理近似（倍精度の丸め誤差程度）
+- ndtri: Acklam の近似を Halley 法で1回補正
+- betainc / betaincinv: 連分数（修正 Lentz 法）と Halley 法
+- t_ppf / beta_ppf: 不完全ベータ関数の逆関数から求める（自由度が大きい t は漸近展開）
+
+包含係数（coverage_factor.py）もこの t_ppf から求める。
+"""
+
+import math
+
+import numpy as np
+
+_SQRT_HALF = math.sqrt(0.5)
+_TINY = 1e-300
+_EPSILON = 1e-15
+_MAX_ITERATIONS = 500
+# これ以上の自由度では t 分位点に正規分布からの漸近展開を使う（打ち切り誤差は1e-12未満）
+_ASYMPTOTIC_DEGREES_OF_FREEDOM = 1e4
+
+# Cephes ndtr.c の係数
+_ERFC_P = (2.46196981473530512524e-10, 5.64189564831068821977e-1, 7.46321056442269912687e0,
+           4.86371970985681366614e1, 1.96520832956077098242e2, 5.26445194995477358631e2,
+           9.34528527171957607540e2, 1.02755188689515710272e3, 5.57535335369399327526e2)
+_ERFC_Q = (1.32281951154744992508e1, 8.67072140885989742329e1, 3.54937778887819891062e2,
+           9.75708501743205489753e2, 1.82390916687909736289e3, 2.24633760818710981792e3,
+           1.65666309194161350182e3, 5.57535340817727675546e2)
+_ERFC_R = (5.64189583547755073984e-1, 1.27536670759978104416e0, 5.01905042251180477414e0,
+           6.16021097993053585195e0, 7.40974269950448939160e0, 2.97886665372100240670e0)
+_ERFC_S = (2.26052863220117276590e0, 9.39603524938001434673e0, 1.20489539808096656605e1,
+           1.70814450747565897222e1, 9.60896809063285878198e0, 3.36907645100081516050e0)
+_ERF_T = (9.60497373987051638749e0, 9.00260197203842689217e1, 2.23200534594684319226e3,
+          7.00332514112805075473e3, 5.55923013010394962768e4)
+_ERF_U = (3.35617141647503099647e1, 5.21357949780152679795e2, 4.59432382970980127987e3,
+          2.26290000613890934246e4, 4.92673942608635921086e4)
+
+# Acklam の有理近似の係数
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+          1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+          6.680131188771972e+01, -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+          -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+          3.754408661907416e+00)
+_PPF_LOW = 0.02425
+
+
+def _polevl(x, coefficients):
+    """係数を次数の高い順に並べた多項式"""
+    result = np.zeros_like(x)
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+def _p1evl(x, coefficients):
+    """最高次の係数が1の多項式（係数はそれを除いて並べる）"""
+    result = np.ones_like(x)
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+def _erf_small(x):
+    """|x| < 1 の erf(x)"""
+    z = x * x
+    return x * _polevl(z, _ERF_T) / _p1evl(z, _ERF_U)
+
+
+def _erfc_positive(x):
+    """x >= 1 の erfc(x)"""
+    result = np.exp(-x * x)
+    near = x < 8.0
+    result[near] *= _polevl(x[near], _ERFC_P) / _p1evl(x[near], _ERFC_Q)
+    far = ~near
+    result[far] *= _polevl(x[far], _ERFC_R) / _p1evl(x[far], _ERFC_S)
+    return result
+
+
+def erf(values):
+    """誤差関数"""
+    x = np.asarray(values, dtype=float)
+    flat = x.reshape(-1)
+    result = np.empty_like(flat)
+    small = np.abs(flat) < 1.0
+    result[small] = _erf_small(flat[small])
+    large = ~small
+    result[large] = np.sign(flat[large]) * (1.0 - _erfc_positive(np.abs(flat[large])))
+    return result.reshape(x.shape)
+
+
+def erfc(values):
+    """相補誤差関数（裾で桁落ちしない）"""
+    x = np.asarray(values, dtype=float)
+    flat = x.reshape(-1)
+    result = np.empty_like(flat)
+    small = np.abs(flat) < 1.0
+    result[small] = 1.0 - _erf_small(flat[small])
+    large = ~small
+    tail = _erfc_positive(np.abs(flat[large]))
+    result[large] = np.where(flat[large] < 0.0, 2.0 - tail, tail)
+    return result.reshape(x.shape)
+
+
+def ndtr(values):
+    """標準正規分布の累積分布関数"""
+    return 0.5 * erfc(-np.asarray(values, dtype=float) * _SQRT_HALF)
+
+
+def ndtri(probabilities):
+    """標準正規分布の分位点（0 と 1 は ∓inf、範囲外は NaN）"""
+    p = np.asarray(probabilities, dtype=float)
+    # 下側の確率で解いて符号を戻す（上側の裾で 1 - p の桁落ちを避ける）
+    lower = np.where(p > 0.5, 1.0 - p, p)
+    inside = (lower > 0.0) & (lower <= 0.5)
+    q = np.where(inside, lower, 0.25)
+
+    tail = q < _PPF_LOW
+    r = np.sqrt(-2.0 * np.log(np.where(tail, q, _PPF_LOW)))
+    tail_value = _polevl(r, _PPF_C) / (_polevl(r, _PPF_D) * r + 1.0)
+    centered = q - 0.5
+    square = centered * centered
+    central_value = centered * _polevl(square, _PPF_A) / (_polevl(square, _PPF_B) * square + 1.0)
+    x = np.where(tail, tail_value, central_value)
+
+    # Halley 法で1回補正して倍精度まで上げる
+    error = 0.5 * erfc(-x * _SQRT_HALF) - q
+    u = error * math.sqrt(2.0 * math.pi) * np.exp(0.5 * x * x)
+    x = x - u / (1.0 + 0.5 * x * u)
+
+    result = np.where(p > 0.5, -x, x)
+    result = np.where(lower == 0.0, np.where(p > 0.5, np.inf, -np.inf), result)
+    return np.where(inside | (lower == 0.0), result, np.nan)
+
+
+def _beta_continued_fraction(a, b, x):
+    """不完全ベータ関数の連分数（要素ごとに a, b が違ってよい）"""
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = 1.0 / np.where(np.abs(d) < _TINY, _TINY, d)
+    h = d
+    for m in range(1, _MAX_ITERATIONS):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / np.where(np.abs(d) < _TINY, _TINY, d)
+        c = 1.0 + aa / c
+        c = np.where(np.abs(c) < _TINY, _TINY, c)
+        h = h * d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / np.where(np.abs(d) < _TINY, _TINY, d)
+        c = 1.0 + aa / c
+        c = np.where(np.abs(c) < _TINY, _TINY, c)
+        delta = d * c
+        h = h * delta
+        if np.all(np.abs(delta - 1.0) < _EPSILON):
+            break
+    return h
+
+
+def _log_beta(a, b):
+    return math.lgamma(a) + math.lgamma(b) - math.lgamma(a + b)
+
+
+def betainc(a, b, values):
+    """正則化不完全ベータ関数 I_x(a, b)（a, b は正のスカラー）"""
+    a = float(a)
+    b = float(b)
+    x = np.asarray(values, dtype=float)
+    inside = (x > 0.0) & (x < 1.0)
+    xs = np.where(inside, x, 0.5)
+    front = np.exp(a * np.log(xs) + b * np.log1p(-xs) - _log_beta(a, b))
+    # 連分数が速く収束する側で計算する
+    direct = xs < (a + 1.0) / (a + b + 2.0)
+    first = np.where(direct, a, b)
+    second = np.where(direct, b, a)
+    argument = np.where(direct, xs, 1.0 - xs)
+    fraction = front * _beta_continued_fraction(first, second, argument) / first
+    result = np.where(direct, fraction, 1.0 - fraction)
+    return np.where(inside, result, np.where(x >= 1.0, 1.0, 0.0))
+
+
+def betaincinv(a, b, probabilities):
+    """I_x(a, b) = p となる x（a, b は正のスカラー）"""
+    a = float(a)
+    b = float(b)
+    p = np.asarray(probabilities, dtype=float)
+    inside = (p > 0.0) & (p < 1.0)
+    ps = np.where(inside, p, 0.5)
+
+    a1 = a - 1.0
+    b1 = b - 1.0
+    if a >= 1.0 and b >= 1.0:
+        pp = np.where(ps < 0.5, ps, 1.0 - ps)
+        t = np.sqrt(-2.0 * np.log(pp))
+        x = (2.30753 + t * 0.27061) / (1.0 + t * (0.99229 + t * 0.04481)) - t
+        x = np.where(ps < 0.5, -x, x)
+        al = (x * x - 3.0) / 6.0
+        h = 2.0 / (1.0 / (2.0 * a - 1.0) + 1.0 / (2.0 * b - 1.0))
+        w = x * np.sqrt(al + h) / h - (1.0 / (2.0 * b - 1.0) - 1.0 / (2.0 * a - 1.0)) * (al + 5.0 / 6.0 - 2.0 / (3.0 * h))
+        x = a / (a + b * np.exp(2.0 * w))
+    else:
+        t = math.exp(a * math.log(a / (a + b))) / a
+        u = math.exp(b * math.log(b / (a + b))) / b
+        w = t + u
+        x = np.where(ps < t / w, (a * w * ps) ** (1.0 / a), 1.0 - (b * w * (1.0 - ps)) ** (1.0 / b))
+
+    # 収束していない要素だけ Halley 法で更新する
+    log_norm = -_log_beta(a, b)
+    x = np.clip(np.asarray(x, dtype=float).reshape(-1), _TINY, 1.0 - 1e-16)
+    targets = ps.reshape(-1)
+    active = np.arange(x.size)
+    for iteration in range(100):
+        current = x[active]
+        error = betainc(a, b, current) - targets[active]
+        density = np.exp(a1 * np.log(current) + b1 * np.log1p(-current) + log_norm)
+        u = error / density
+        step = u / (1.0 - 0.5 * np.minimum(1.0, u * (a1 / current - b1 / (1.0 - current))))
+        updated = current - step
+        updated = np.where(updated <= 0.0, 0.5 * current, updated)
+        updated = np.where(updated >= 1.0, 0.5 * (current + 1.0), updated)
+        x[active] = np.clip(updated, _TINY, 1.0 - 1e-16)
+        if iteration > 0:
+            active = active[np.abs(step) >= 1e-14 * updated]
+            if active.size == 0:
+                break
+    x = x.reshape(p.shape)
+    return np.where(inside, x, np.where(p >= 1.0, 1.0, np.where(p <= 0.0, 0.0, np.nan)))
+
+
+def beta_ppf(probabilities, a, b):
+    """ベータ分布 Beta(a, b) の分位点"""
+    return betaincinv(a, b, probabilities)
+
+
+def t_cdf(values, degrees_of_freedom):
+    """自由度 ν の t 分布の累積分布関数"""
+    nu = float(degrees_of_freedom)
+    t = np.asarray(values, dtype=float)
+    tail = 0.5 * betainc(nu / 2.0, 0.5, nu / (nu + t * t))
+    return np.where(t < 0.0, tail, 1.0 - tail)
+
+
+def _asymptotic_t_quantile(z, nu):
+    """自由度が大きい場合の t 分位点（Cornish-Fisher展開）"""
+    z2 = z * z
+    g1 = (z2 + 1.0) * z / 4.0
+    g2 = ((5.0 * z2 + 16.0) * z2 + 3.0) * z / 96.0
+    g3 = (((3.0 * z2 + 19.0) * z2 + 17.0) * z2 - 15.0) * z / 384.0
+    return z + g1 / nu + g2 / nu ** 2 + g3 / nu ** 3
+
+
+def t_ppf(probabilities, degrees_of_freedom):
+    """
+    自由度 ν（正の実数、inf可）の t 分布の分位点。
+
+    中央寄りでは 1 - x の桁落ちを避けるため、t²/(ν+t²) ~ Beta(1/2, ν/2) の側で解く。
+    ν が大きいとベータ関数の側が精度を失うので、正規分位点からの漸近展開に切り替える。
+    """
+    nu = float(degrees_of_freedom)
+    if math.isnan(nu) or nu <= 0.0:
+        raise ValueError(f"自由度は正の値で指定してください: {degrees_of_freedom}")
+    p = np.asarray(probabilities, dtype=float)
+    if math.isinf(nu):
+        return ndtri(p)
+    if nu >= _ASYMPTOTIC_DEGREES_OF_FREEDOM:
+        return _asymptotic_t_quantile(ndtri(p), nu)
+
+    # 両側の裾確率 2 min(p, 1-p)
+    two_sided = 2.0 * np.where(p < 0.5, p, 1.0 - p)
+    squared = np.full(p.shape, np.nan)
+    tail = (two_sided >= 0.0) & (two_sided < 0.5)
+    x = betaincinv(nu / 2.0, 0.5, two_sided[tail])
+    with np.errstate(divide='ignore'):
+        squared[tail] = nu * (1.0 - x) / x
+    central = (two_sided >= 0.5) & (two_sided <= 1.0)
+    y = betaincinv(0.5, nu / 2.0, 1.0 - two_sided[central])
+    squared[central] = nu * y / (1.0 - y)
+    magnitude = np.sqrt(squared)
+    return np.where(p < 0.5, -magnitude, magnitude)
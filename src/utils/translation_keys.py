@@ -138,6 +138,11 @@ NORMAL_DISTRIBUTION = 'NORMAL_DISTRIBUTION'
 RECTANGULAR_DISTRIBUTION = 'RECTANGULAR_DISTRIBUTION'
 TRIANGULAR_DISTRIBUTION = 'TRIANGULAR_DISTRIBUTION'
 U_DISTRIBUTION = 'U_DISTRIBUTION'
+TRAPEZOIDAL_DISTRIBUTION = 'TRAPEZOIDAL_DISTRIBUTION'
+CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION = 'CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION'
+LOGNORMAL_DISTRIBUTION = 'LOGNORMAL_DISTRIBUTION'
+STUDENT_T_DISTRIBUTION = 'STUDENT_T_DISTRIBUTION'
+DISTRIBUTION_PARAMETER = 'DISTRIBUTION_PARAMETER'
 DIVISOR = 'DIVISOR'
 HALF_WIDTH = 'HALF_WIDTH'
 CALCULATION_FORMULA = 'CALCULATION_FORMULA'
@@ -216,6 +221,11 @@ COMBINED_STANDARD_UNCERTAINTY = 'COMBINED_STANDARD_UNCERTAINTY'
 EFFECTIVE_DEGREES_OF_FREEDOM = 'EFFECTIVE_DEGREES_OF_FREEDOM'
 COVERAGE_FACTOR = 'COVERAGE_FACTOR'
 EXPANDED_UNCERTAINTY = 'EXPANDED_UNCERTAINTY'
+SENSITIVITY_METHOD = 'SENSITIVITY_METHOD'
+SENSITIVITY_METHOD_SYMBOLIC = 'SENSITIVITY_METHOD_SYMBOLIC'
+SENSITIVITY_METHOD_COMPLEX_STEP = 'SENSITIVITY_METHOD_COMPLEX_STEP'
+SENSITIVITY_METHOD_RICHARDSON = 'SENSITIVITY_METHOD_RICHARDSON'
+SENSITIVITY_ERROR_ESTIMATE = 'SENSITIVITY_ERROR_ESTIMATE'
 MONTE_CARLO_SETTINGS = 'MONTE_CARLO_SETTINGS'
 MONTE_CARLO_PLOT = 'MONTE_CARLO_PLOT'
 MONTE_CARLO_STATS = 'MONTE_CARLO_STATS'
@@ -225,12 +235,38 @@ MONTE_CARLO_MEAN = 'MONTE_CARLO_MEAN'
 MONTE_CARLO_STD = 'MONTE_CARLO_STD'
 MONTE_CARLO_INTERVAL_95 = 'MONTE_CARLO_INTERVAL_95'
 MONTE_CARLO_INTERVAL_95_EMPIRICAL = 'MONTE_CARLO_INTERVAL_95_EMPIRICAL'
+MONTE_CARLO_INTERVAL_SHORTEST = 'MONTE_CARLO_INTERVAL_SHORTEST'
 MONTE_CARLO_MIN = 'MONTE_CARLO_MIN'
 MONTE_CARLO_MAX = 'MONTE_CARLO_MAX'
 MONTE_CARLO_NORMAL_CURVE = 'MONTE_CARLO_NORMAL_CURVE'
 MONTE_CARLO_MEDIAN = 'MONTE_CARLO_MEDIAN'
 MONTE_CARLO_NO_DATA = 'MONTE_CARLO_NO_DATA'
 MONTE_CARLO_INVALID_INPUT = 'MONTE_CARLO_INVALID_INPUT'
+MONTE_CARLO_SEED = 'MONTE_CARLO_SEED'
+MONTE_CARLO_SEED_AUTO = 'MONTE_CARLO_SEED_AUTO'
+MONTE_CARLO_ADAPTIVE = 'MONTE_CARLO_ADAPTIVE'
+MONTE_CARLO_SIGNIFICANT_DIGITS = 'MONTE_CARLO_SIGNIFICANT_DIGITS'
+MONTE_CARLO_COVERAGE_PROBABILITY = 'MONTE_CARLO_COVERAGE_PROBABILITY'
+MONTE_CARLO_TRIALS = 'MONTE_CARLO_TRIALS'
+MONTE_CARLO_ELAPSED = 'MONTE_CARLO_ELAPSED'
+MONTE_CARLO_TOLERANCE = 'MONTE_CARLO_TOLERANCE'
+MONTE_CARLO_NOT_CONVERGED = 'MONTE_CARLO_NOT_CONVERGED'
+MONTE_CARLO_RUN_ALL = 'MONTE_CARLO_RUN_ALL'
+MONTE_CARLO_BATCH_RESULTS = 'MONTE_CARLO_BATCH_RESULTS'
+MONTE_CARLO_CANCEL = 'MONTE_CARLO_CANCEL'
+MONTE_CARLO_AUTO_RUN = 'MONTE_CARLO_AUTO_RUN'
+MONTE_CARLO_SAMPLING = 'MONTE_CARLO_SAMPLING'
+MONTE_CARLO_SAMPLING_RANDOM = 'MONTE_CARLO_SAMPLING_RANDOM'
+MONTE_CARLO_SAMPLING_SOBOL = 'MONTE_CARLO_SAMPLING_SOBOL'
+MONTE_CARLO_SAMPLING_LHS = 'MONTE_CARLO_SAMPLING_LHS'
+MONTE_CARLO_REPLICATES = 'MONTE_CARLO_REPLICATES'
+MONTE_CARLO_STANDARD_ERROR = 'MONTE_CARLO_STANDARD_ERROR'
+MONTE_CARLO_CONTROL_VARIATE = 'MONTE_CARLO_CONTROL_VARIATE'
+MONTE_CARLO_ANTITHETIC = 'MONTE_CARLO_ANTITHETIC'
+MONTE_CARLO_KEEP_SAMPLES = 'MONTE_CARLO_KEEP_SAMPLES'
+MONTE_CARLO_EXPORT_SAMPLES = 'MONTE_CARLO_EXPORT_SAMPLES'
+MONTE_CARLO_CONTROLLED_ESTIMATE = 'MONTE_CARLO_CONTROLLED_ESTIMATE'
+MONTE_CARLO_CORRELATION_ADJUSTMENT = 'MONTE_CARLO_CORRELATION_ADJUSTMENT'
 GENERATE_REPORT = 'GENERATE_REPORT'
 SAVE_REPORT = 'SAVE_REPORT'
 SAVE_REPORT_DIALOG_TITLE = 'SAVE_REPORT_DIALOG_TITLE'
@@ -320,6 +356,10 @@ REVISION_APPROVER = 'REVISION_APPROVER'
 REVISION_DATE = 'REVISION_DATE'
 REPORT_DOCUMENT_INFO = 'REPORT_DOCUMENT_INFO'
 REPORT_REVISION_HISTORY = 'REPORT_REVISION_HISTORY'
+REPORT_MONTE_CARLO = 'REPORT_MONTE_CARLO'
+REPORT_MONTE_CARLO_CONDITIONS = 'REPORT_MONTE_CARLO_CONDITIONS'
+REPORT_MONTE_CARLO_INTERVAL = 'REPORT_MONTE_CARLO_INTERVAL'
+REPORT_MONTE_CARLO_SHORTEST_INTERVAL = 'REPORT_MONTE_CARLO_SHORTEST_INTERVAL'
 REPORT_REGRESSION_MODELS = 'REPORT_REGRESSION_MODELS'
 REPORT_REGRESSION_DATA_COUNT = 'REPORT_REGRESSION_DATA_COUNT'
 REPORT_REGRESSION_SLOPE = 'REPORT_REGRESSION_SLOPE'
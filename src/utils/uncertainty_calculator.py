@@ -1,6 +1,7 @@
 import traceback
 import numpy as np
-from .config_loader import ConfigLoader
+from .correlation_matrix import CorrelationMatrix, get_correlation_matrix
+from .coverage_factor import t_coverage_factor, t_coverage_factors
 from .app_logger import log_error
 
 class UncertaintyCalculator:
@@ -41,40 +42,16 @@ class UncertaintyCalculator:
 
         contributions: list of u(x_i) * c_i (same order as variables)
         variables: list of variable names (x_i)
-        correlation_coefficients: dict-like matrix [var_i][var_j] = r_ij
+        correlation_coefficients: dict-like matrix [var_i][var_j] = r_ij, or a CorrelationMatrix
         """
         try:
             if not contributions or not variables or len(contributions) != len(variables):
                 return self.calculate_combined_uncertainty(contributions)
 
-            matrix = correlation_coefficients if isinstance(correlation_coefficients, dict) else {}
-
-            variance = 0.0
-            for c in contributions:
-                if c:
-                    variance += float(c) ** 2
-
-            for i, var_i in enumerate(variables):
-                ci = contributions[i]
-                if not ci:
-                    continue
-                for j in range(i + 1, len(variables)):
-                    cj = contributions[j]
-                    if not cj:
-                        continue
-                    var_j = variables[j]
-                    r = 0.0
-                    try:
-                        row = matrix.get(var_i, {})
-                        if isinstance(row, dict) and var_j in row:
-                            r = float(row.get(var_j, 0.0))
-                        else:
-                            row_rev = matrix.get(var_j, {})
-                            if isinstance(row_rev, dict):
-                                r = float(row_rev.get(var_i, 0.0))
-                    except (TypeError, ValueError):
-                        r = 0.0
-                    variance += 2.0 * float(ci) * float(cj) * r
+            correlation = self._get_correlation_matrix(correlation_coefficients)
+            variance = correlation.combined_variance(
+                [float(c) if c else 0.0 for c in contributions], variables
+            )
 
             return (variance ** 0.5) if variance > 0 else 0
         except Exception as e:
@@ -105,6 +82,69 @@ class UncertaintyCalculator:
             log_error(f"有効自由度計算エラー: {str(e)}", details=traceback.format_exc())
             return self._inf_replacement
 
+    def _get_correlation_matrix(self, correlation_coefficients):
+        """相関係数（辞書または CorrelationMatrix）を CorrelationMatrix として取得"""
+        if isinstance(correlation_coefficients, CorrelationMatrix):
+            return correlation_coefficients
+        if correlation_coefficients is getattr(self.main_window, 'correlation_coefficients', None):
+            return get_correlation_matrix(self.main_window)
+        return CorrelationMatrix.from_mapping(correlation_coefficients)
+
+    def calculate_combined_uncertainties(self, contributions, variables, correlation_coefficients):
+        """
+        Calculate combined standard uncertainties for many points at once.
+
+        contributions: array (points x variables) of u(x_i) * c_i
+        Returns an array with one combined standard uncertainty per point.
+        """
+        contributions = np.nan_to_num(np.atleast_2d(np.asarray(contributions, dtype=float)))
+        try:
+            correlation = self._get_correlation_matrix(correlation_coefficients)
+            return correlation.combined_standard_uncertainty(contributions, list(variables))
+        except Exception as e:
+            log_error(f"合成標準不確かさ（一括）計算エラー: {str(e)}", details=traceback.format_exc())
+            return np.zeros(contributions.shape[0])
+
+    def calculate_contribution_rates_batch(self, contributions):
+        """寄与率を全校正点について一括計算（%）"""
+        contributions = np.nan_to_num(np.atleast_2d(np.asarray(contributions, dtype=float)))
+        squared = contributions ** 2
+        total = squared.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(total > 0, squared / total * 100, 0.0)
+        return rates
+
+    def normalize_degrees_of_freedom_array(self, degrees_of_freedom):
+        """自由度の入力値（文字列可）を配列に正規化（無効値はNaN）"""
+        values = np.asarray(degrees_of_freedom, dtype=object)
+        normalized = [self._normalize_degrees_of_freedom(df) for df in values.ravel()]
+        return np.array(
+            [np.nan if df is None else df for df in normalized], dtype=float
+        ).reshape(values.shape)
+
+    def calculate_effective_degrees_of_freedom_batch(self, result_standard_uncertainties, contributions, degrees_of_freedom):
+        """有効自由度を全校正点について一括計算（Welch-Satterthwaiteの式）"""
+        u = np.asarray(result_standard_uncertainties, dtype=float)
+        contributions = np.nan_to_num(np.atleast_2d(np.asarray(contributions, dtype=float)))
+        dof = np.atleast_2d(np.asarray(degrees_of_freedom, dtype=float))
+        # 単一点の計算と同様に、正の寄与かつ正の自由度の項だけを数える
+        used = (contributions > 0) & np.isfinite(dof) & (dof > 0)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            terms = np.where(used, contributions ** 4 / np.where(used, dof, 1.0), 0.0)
+            denominator = terms.sum(axis=1)
+            effective = np.where(denominator > 0, u ** 4 / np.where(denominator > 0, denominator, 1.0), self._inf_replacement)
+        return np.where(u > 0, effective, self._inf_replacement)
+
+    def get_coverage_factors(self, effective_dfs):
+        """包含係数を全校正点について一括取得"""
+        effective_dfs = np.asarray(effective_dfs, dtype=float)
+        factors = np.full(effective_dfs.shape, 2.0)
+        small = effective_dfs < 10
+        if np.any(small):
+            t_values = t_coverage_factors(effective_dfs[small])
+            factors[small] = np.where(np.isnan(t_values), 2.0, t_values)
+        return factors
+
     def get_coverage_factor(self, effective_df):
         """包含係数を取得"""
         try:
@@ -116,29 +156,9 @@ class UncertaintyCalculator:
             return 2.0
 
     def get_t_value(self, degrees_of_freedom):
-        """t分布表から95%信頼区間のt値を取得"""
-        # t分布表を設定ファイルから取得
-        config = ConfigLoader()
-        t_table = config.get_t_values()
-        
+        """95%包含確率のt値（自由度は小数可）"""
         try:
-            df = float(degrees_of_freedom)
-            # 完全一致する自由度がある場合
-            if df in t_table:
-                return t_table[df]
-            
-            # 最も近い値を探す
-            keys = sorted(t_table.keys())
-            for i in range(len(keys) - 1):
-                if keys[i] <= df < keys[i + 1]:
-                    # 線形補間
-                    x1, x2 = keys[i], keys[i + 1]
-                    y1, y2 = t_table[x1], t_table[x2]
-                    return y1 + (y2 - y1) * (df - x1) / (x2 - x1)
-            
-            # 範囲外の場合は無限大の値を使用
-            return t_table.get(float('inf'), 1.960)
-            
+            return t_coverage_factor(float(degrees_of_freedom))
         except Exception as e:
             log_error(f"t値取得エラー: {str(e)}", details=traceback.format_exc())
             return 2.0  # エラー時はデフォルト値として2.0を返す
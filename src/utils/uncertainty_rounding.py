@@ -1,11 +1,11 @@
 from decimal import Decimal, ROUND_HALF_UP, ROUND_DOWN
-from .config_loader import ConfigLoader
+from .config_loader import get_config
 import traceback
 from .app_logger import log_error
 
 def get_uncertainty_rounding_settings():
     """不確かさの丸め設定を取得"""
-    config = ConfigLoader()
+    config = get_config()
     return {
         'significant_digits': int(config.config.get('UncertaintyRounding', 'significant_digits', fallback='2')),
         'rounding_mode': config.config.get('UncertaintyRounding', 'rounding_mode', fallback='5_percent')
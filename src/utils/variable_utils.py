@@ -1,11 +1,14 @@
-from PySide6.QtCore import Qt
 import traceback
 from decimal import Decimal, getcontext
-from .config_loader import ConfigLoader
+from .config_loader import get_config
 from .app_logger import log_error
+from .distributions import distribution_divisor, get_distribution, has_shape_parameter
 from .translation_keys import (
+    CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION,
+    LOGNORMAL_DISTRIBUTION,
     NORMAL_DISTRIBUTION,
     RECTANGULAR_DISTRIBUTION,
+    TRAPEZOIDAL_DISTRIBUTION,
     TRIANGULAR_DISTRIBUTION,
     U_DISTRIBUTION,
 )
@@ -52,7 +55,7 @@ def calculate_type_b_uncertainty(half_width_str, divisor_str):
             return None, None
 
         # 精度設定を反映
-        config = ConfigLoader()
+        config = get_config()
         getcontext().prec = config.get_precision()
 
         # 文字列を Decimal に変換
@@ -72,13 +75,19 @@ def calculate_type_b_uncertainty(half_width_str, divisor_str):
         return None, None
 
 
-def get_distribution_divisor(distribution):
-    """分布に対応する除数を返す。"""
-    config = ConfigLoader()
+def get_distribution_divisor(distribution, parameter=None):
+    """分布に対応する除数を返す（台形分布などは形状パラメータから求める）。"""
+    config = get_config()
     divisors = config.get_distribution_divisors()
     distribution_key = get_distribution_translation_key(distribution)
     if not distribution_key:
         distribution_key = distribution
+    if has_shape_parameter(distribution_key):
+        try:
+            divisor = distribution_divisor(distribution_key, float(parameter))
+        except (TypeError, ValueError):
+            return ""
+        return "" if divisor is None else f"{divisor:.10g}"
     return {
         NORMAL_DISTRIBUTION: "",  # 正規分布
         RECTANGULAR_DISTRIBUTION: divisors["rectangular"],  # 一様（矩形）分布
@@ -91,6 +100,12 @@ def get_distribution_divisor(distribution):
     }.get(distribution_key, "")
 
 
+def is_divisor_editable(distribution):
+    """除数を手入力する分布か（正規分布・対数正規分布）"""
+    distribution_key = get_distribution_translation_key(distribution) or distribution
+    return get_distribution(distribution_key).divisor is None
+
+
 def get_distribution_translation_key(distribution):
     """分布名（表示名/翻訳キー）を翻訳キーに正規化して返す。"""
     distribution_map = {
@@ -98,6 +113,9 @@ def get_distribution_translation_key(distribution):
         "Rectangular Distribution": RECTANGULAR_DISTRIBUTION,
         "Triangular Distribution": TRIANGULAR_DISTRIBUTION,
         "U-shaped Distribution": U_DISTRIBUTION,
+        "Trapezoidal Distribution": TRAPEZOIDAL_DISTRIBUTION,
+        "Curvilinear Trapezoidal Distribution": CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION,
+        "Lognormal Distribution": LOGNORMAL_DISTRIBUTION,
     }
     if distribution in distribution_map:
         return distribution_map[distribution]
@@ -122,6 +140,9 @@ def create_empty_value_dict():
 
 def find_variable_item(variable_list, variable_name):
     """変数リストから variable_name に一致する項目を探す。"""
+    # バジェット計算をQtなしで使えるよう、Qtへの依存はここだけに限定する
+    from PySide6.QtCore import Qt
+
     for i in range(variable_list.count()):
         item = variable_list.item(i)
         if item.data(Qt.UserRole) == variable_name:
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+try:
+    from PySide6.QtCore import QCoreApplication
+    from PySide6.QtWidgets import QApplication
+    from src.tabs.uncertainty_calculation_tab import UncertaintyCalculationTab
+    from src.utils.background_jobs import BackgroundJobRunner
+except ImportError:
+    pytest.skip("PySide6 is not available", allow_module_level=True)
+
+from tests.test_uncertainty_calculation_tab_stale_display import _DummyParent
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def _wait(runner):
+    runner.wait()
+    QCoreApplication.processEvents()
+
+
+def test_newer_job_cancels_older_one(qapp):
+    runner = BackgroundJobRunner()
+    delivered = []
+    finished = []
+    runner.item_ready.connect(lambda item, value: delivered.append((item, value)))
+    runner.finished.connect(lambda: finished.append(True))
+
+    gate = threading.Event()
+
+    def slow(item):
+        gate.wait(5)
+        return item * 10
+
+    runner.submit([1, 2, 3], slow)
+    runner.submit([4, 5], lambda item: item * 100)
+    gate.set()
+    _wait(runner)
+
+    assert delivered == [(4, 400), (5, 500)]
+    assert finished == [True]
+    assert not runner.is_running()
+
+
+def test_failed_item_is_reported_and_job_continues(qapp):
+    runner = BackgroundJobRunner()
+    delivered = []
+    failures = []
+    progress = []
+    runner.item_ready.connect(lambda item, value: delivered.append(item))
+    runner.item_failed.connect(lambda item, message: failures.append((item, message)))
+    runner.progress.connect(lambda done, total: progress.append((done, total)))
+
+    runner.submit([1, 0, 2], lambda item: 1 / item)
+    _wait(runner)
+
+    assert delivered == [1, 2]
+    assert failures and failures[0][0] == 0
+    assert progress[-1] == (3, 3)
+
+
+def test_context_reports_partial_results_and_cancellation(qapp):
+    runner = BackgroundJobRunner()
+    partial = []
+    delivered = []
+    runner.item_partial.connect(lambda item, value: partial.append((item, value)))
+    runner.item_ready.connect(lambda item, value: delivered.append((item, value)))
+
+    def count_up(item, context):
+        for step in range(3):
+            context.report(step)
+        return context.is_cancelled()
+
+    runner.submit(["a"], count_up, with_context=True)
+    _wait(runner)
+
+    assert partial == [("a", 0), ("a", 1), ("a", 2)]
+    assert delivered == [("a", False)]
+
+
+def test_tab_displays_background_result_for_current_point(qapp):
+    parent = _DummyParent()
+    tab = UncertaintyCalculationTab(parent)
+    tab.run_in_background = True
+
+    tab.value_handler.current_value_index = 0
+    tab.calculate_sensitivity_coefficients("Y = A*B")
+    tab.wait_for_calculation()
+    assert tab.central_value_label.text() != "--"
+    assert tab.calibration_table.rowCount() == 2
+    assert tab.progress_bar.isHidden()
+
+    # 中心値が欠けている校正点に切り替えると前の結果は残らない
+    tab.value_handler.current_value_index = 1
+    tab.calculate_sensitivity_coefficients("Y = A*B")
+    tab.wait_for_calculation()
+    assert tab.central_value_label.text() == "--"
+
+
+def test_synchronous_calculation_restores_background_mode(qapp):
+    parent = _DummyParent()
+    tab = UncertaintyCalculationTab(parent)
+    tab.run_in_background = True
+
+    with tab.synchronous_calculation():
+        tab.value_handler.current_value_index = 0
+        tab.calculate_sensitivity_coefficients("Y = A*B")
+        # 同期計算なのでその場で表示される
+        assert tab.central_value_label.text() != "--"
+
+    assert tab.run_in_background is True
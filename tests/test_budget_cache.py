@@ -0,0 +1,163 @@
+import pytest
+
+from src.utils.budget_cache import BudgetCache
+from src.utils.budget_engine import BudgetEngine
+from src.utils.config_loader import get_config, reload_config
+
+
+def _project_data():
+    return {
+        "last_equation": "Y = A*B + C",
+        "value_count": 2,
+        "value_names": ["P1", "P2"],
+        "variables": ["Y", "A", "B", "C"],
+        "result_variables": ["Y"],
+        "correlation_coefficients": {},
+        "variable_values": {
+            "Y": {"type": "result", "values": [{}, {}]},
+            "A": {
+                "type": "A",
+                "values": [
+                    {"central_value": "2", "standard_uncertainty": "0.1", "degrees_of_freedom": "10"},
+                    {"central_value": "3", "standard_uncertainty": "0.1", "degrees_of_freedom": "10"},
+                ],
+            },
+            "B": {
+                "type": "B",
+                "distribution": "RECTANGULAR_DISTRIBUTION",
+                "values": [
+                    {"central_value": "5", "standard_uncertainty": "0.2", "degrees_of_freedom": "inf"},
+                    {"central_value": "4", "standard_uncertainty": "0.2", "degrees_of_freedom": "inf"},
+                ],
+            },
+            "C": {
+                "type": "A",
+                "values": [
+                    {"central_value": "1", "standard_uncertainty": "0.05", "degrees_of_freedom": "4"},
+                    {"central_value": "1", "standard_uncertainty": "0.05", "degrees_of_freedom": "4"},
+                ],
+            },
+        },
+    }
+
+
+def _assert_same_budget(actual, expected):
+    assert actual.central_value == pytest.approx(expected.central_value)
+    assert actual.standard_uncertainty == pytest.approx(expected.standard_uncertainty)
+    assert actual.effective_degrees_of_freedom == pytest.approx(expected.effective_degrees_of_freedom)
+    assert actual.coverage_factor == pytest.approx(expected.coverage_factor)
+    for actual_row, expected_row in zip(actual.rows, expected.rows):
+        assert actual_row.contribution == pytest.approx(expected_row.contribution)
+        assert actual_row.contribution_rate == pytest.approx(expected_row.contribution_rate)
+        assert actual_row.standard_uncertainty_text == expected_row.standard_uncertainty_text
+
+
+def test_uncertainty_edit_updates_one_row_and_reaggregates():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    equation = engine.equation_handler.get_target_equation("Y")
+    cache.get(equation, 0)
+    cache.get(equation, 1)
+
+    assert cache.affected("B", 0) == {(equation, 0)}
+    engine.project.variable_values["B"]["values"][0]["standard_uncertainty"] = "0.4"
+    cache.invalidate("B", 0, "standard_uncertainty")
+    updated = cache.get(equation, 0)
+
+    assert cache.full_calculations == 2
+    assert cache.row_updates == 1
+    _assert_same_budget(updated, engine.calculate_equation(equation, 0))
+    # 別の校正点は影響を受けない
+    _assert_same_budget(cache.get(equation, 1), cache.get(equation, 1))
+    assert cache.full_calculations == 2
+    assert cache.row_updates == 1
+
+
+def test_changes_made_elsewhere_are_detected():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    equation = engine.equation_handler.get_target_equation("Y")
+    cache.get(equation, 0)
+
+    engine.project.variable_values["C"]["values"][0]["degrees_of_freedom"] = "2"
+    _assert_same_budget(cache.get(equation, 0), engine.calculate_equation(equation, 0))
+    assert cache.full_calculations == 1
+
+    engine.project.variable_values["A"]["values"][0]["central_value"] = "7"
+    _assert_same_budget(cache.get(equation, 0), engine.calculate_equation(equation, 0))
+    assert cache.full_calculations == 2
+
+
+def test_correlation_change_only_reaggregates():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    equation = engine.equation_handler.get_target_equation("Y")
+    cache.get(equation, 0)
+
+    engine.project.correlation_coefficients = {"A": {"B": 0.5}, "B": {"A": 0.5}}
+    engine.project.correlation_version += 1
+    updated = cache.get(equation, 0)
+
+    assert cache.full_calculations == 1
+    _assert_same_budget(updated, engine.calculate_equation(equation, 0))
+
+
+def test_equation_change_discards_cache():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    cache.get(engine.equation_handler.get_target_equation("Y"), 0)
+
+    engine.project.last_equation = "Y = A*B - C"
+    result = cache.get(engine.equation_handler.get_target_equation("Y"), 0)
+
+    assert cache.full_calculations == 2
+    assert len(cache) == 1
+    assert result.central_value == pytest.approx(9.0)
+
+
+def test_config_reload_discards_cache():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    equation = engine.equation_handler.get_target_equation("Y")
+    cache.get(equation, 0)
+
+    reload_config(get_config().config_path)
+    cache.get(equation, 0)
+
+    assert cache.full_calculations == 2
+
+
+def test_edit_during_calculation_is_not_cached_as_new_inputs():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    equation = engine.equation_handler.get_target_equation("Y")
+    calculate = engine.calculate_equation
+
+    def calculate_while_editing(*args, **kwargs):
+        result = calculate(*args, **kwargs)
+        # 計算中に中心値が編集された
+        engine.project.variable_values["A"]["values"][0]["central_value"] = "20"
+        return result
+
+    engine.calculate_equation = calculate_while_editing
+    assert cache.get(equation, 0).central_value == pytest.approx(11.0)
+    engine.calculate_equation = calculate
+
+    assert cache.get(equation, 0).central_value == pytest.approx(101.0)
+    assert cache.full_calculations == 2
+
+
+def test_returned_results_are_copies():
+    engine = BudgetEngine.from_project_data(_project_data())
+    cache = BudgetCache(engine)
+    equation = engine.equation_handler.get_target_equation("Y")
+    first = cache.get(equation, 0)
+    first.rows[0].contribution = -1.0
+
+    engine.project.variable_values["B"]["values"][0]["standard_uncertainty"] = "0.4"
+    cache.invalidate("B", 0, "standard_uncertainty")
+    second = cache.get(equation, 0)
+
+    assert second is not first
+    assert second.rows[0].contribution != -1.0
+    assert first.rows[1].standard_uncertainty_text == "0.2"
@@ -0,0 +1,165 @@
+import math
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.utils.budget_engine import BudgetEngine, calculate_project_budgets
+from src.utils.compiled_model import CompiledModel
+
+
+def _project_data():
+    return {
+        "last_equation": "Y = A*B, Z = Y + C",
+        "value_count": 2,
+        "value_names": ["P1", "P2"],
+        "variables": ["Y", "Z", "A", "B", "C"],
+        "result_variables": ["Y", "Z"],
+        "correlation_coefficients": {},
+        "variable_values": {
+            "Y": {"type": "result", "values": [{}, {}]},
+            "Z": {"type": "result", "values": [{}, {}]},
+            "A": {
+                "type": "A",
+                "values": [
+                    {"central_value": "2", "standard_uncertainty": "0.1", "degrees_of_freedom": "10"},
+                    {"central_value": "3", "standard_uncertainty": "0.1", "degrees_of_freedom": "10"},
+                ],
+            },
+            "B": {
+                "type": "B",
+                "distribution": "RECTANGULAR_DISTRIBUTION",
+                "values": [
+                    {"central_value": "5", "standard_uncertainty": "0.2", "degrees_of_freedom": "inf"},
+                    {"central_value": "", "standard_uncertainty": "0.2", "degrees_of_freedom": "inf"},
+                ],
+            },
+            "C": {
+                "type": "fixed",
+                "values": [{"central_value": "1"}, {"central_value": "1"}],
+            },
+        },
+    }
+
+
+def test_engine_calculates_budget_without_qt():
+    engine = BudgetEngine.from_project_data(_project_data())
+    result = engine.calculate("Y", 0)
+
+    assert result.is_valid
+    assert result.point_name == "P1"
+    assert [row.variable for row in result.rows] == ["A", "B"]
+    assert result.rows[0].sensitivity == pytest.approx(5.0)
+    assert result.rows[1].sensitivity == pytest.approx(2.0)
+    assert result.rows[1].distribution == "RECTANGULAR_DISTRIBUTION"
+    assert result.central_value == pytest.approx(10.0)
+    assert result.standard_uncertainty == pytest.approx(math.hypot(0.5, 0.4))
+    assert result.expanded_uncertainty == pytest.approx(result.coverage_factor * result.standard_uncertainty)
+
+
+def test_engine_resolves_chained_equations_and_all_points():
+    results = calculate_project_budgets(_project_data())
+
+    assert list(results.keys()) == ["Y", "Z"]
+    assert len(results["Z"]) == 2
+    z_first = results["Z"][0]
+    assert z_first.central_value == pytest.approx(11.0)
+    assert [row.variable for row in z_first.rows] == ["A", "B", "C"]
+
+    # P2 has a missing central value for B: the result is reported as invalid with issues
+    assert not results["Y"][1].is_valid
+    assert results["Y"][1].issues
+
+
+def test_engine_applies_correlation_coefficients():
+    data = _project_data()
+    data["correlation_coefficients"] = {"A": {"B": 1.0}, "B": {"A": 1.0}}
+    result = BudgetEngine.from_project_data(data).calculate("Y", 0)
+
+    assert result.standard_uncertainty == pytest.approx(0.9)
+
+
+def test_engine_module_does_not_import_qt():
+    root = Path(__file__).resolve().parents[1]
+    code = "import sys, src.utils.budget_engine; print('PySide6' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert output == "False"
+
+
+def test_batched_points_match_point_by_point_calculation():
+    data = _project_data()
+    point_count = 200
+    data["value_count"] = point_count
+    data["value_names"] = [f"P{i + 1}" for i in range(point_count)]
+    data["correlation_coefficients"] = {"A": {"B": 0.3}, "B": {"A": 0.3}}
+    for var in ("Y", "Z"):
+        data["variable_values"][var]["values"] = [{} for _ in range(point_count)]
+    data["variable_values"]["A"]["values"] = [
+        {"central_value": str(1 + i), "standard_uncertainty": "0.1", "degrees_of_freedom": str(2 + i % 5)}
+        for i in range(point_count)
+    ]
+    data["variable_values"]["B"]["values"] = [
+        {"central_value": str(0.5 * i), "standard_uncertainty": "0.2", "degrees_of_freedom": "inf"}
+        for i in range(point_count)
+    ]
+    data["variable_values"]["C"]["values"] = [{"central_value": "1"} for _ in range(point_count)]
+    data["last_equation"] = "Y = A/B, Z = Y + C"
+
+    engine = BudgetEngine.from_project_data(data)
+    equation = engine.equation_handler.get_target_equation("Z")
+    batched = engine.calculate_equation_points(equation, range(point_count))
+
+    # B = 0 at the first point: division by zero is reported by the exact path
+    assert not batched[0].is_valid
+    assert batched[0].issues
+    for index in (1, 7, 199):
+        expected = engine.calculate_equation(equation, index)
+        actual = batched[index]
+        assert actual.is_valid
+        assert actual.central_value == pytest.approx(expected.central_value)
+        assert actual.standard_uncertainty == pytest.approx(expected.standard_uncertainty)
+        assert actual.effective_degrees_of_freedom == pytest.approx(expected.effective_degrees_of_freedom)
+        assert actual.coverage_factor == pytest.approx(expected.coverage_factor)
+        assert [row.sensitivity for row in actual.rows] == pytest.approx([row.sensitivity for row in expected.rows])
+        assert [row.contribution_rate for row in actual.rows] == pytest.approx(
+            [row.contribution_rate for row in expected.rows]
+        )
+
+
+def test_output_covariance_between_results_sharing_inputs():
+    data = _project_data()
+    data["last_equation"] = "Y = A*B, Z = A + C"
+    covariances = BudgetEngine.from_project_data(data).calculate_output_covariances()
+
+    first = covariances[0]
+    assert first.is_valid
+    assert first.result_variables == ["Y", "Z"]
+    assert first.input_variables == ["A", "B", "C"]
+    np.testing.assert_allclose(first.jacobian, [[5.0, 2.0, 0.0], [1.0, 0.0, 1.0]])
+    np.testing.assert_allclose(first.central_values, [10.0, 3.0])
+
+    # u(Y)^2 = (5*0.1)^2 + (2*0.2)^2, u(Z) = 0.1, cov(Y, Z) = 5*0.1^2
+    expected = np.array([[0.25 + 0.16, 0.05], [0.05, 0.01]])
+    np.testing.assert_allclose(first.covariance, expected)
+    assert first.correlation[0, 1] == pytest.approx(0.05 / (math.sqrt(0.41) * 0.1))
+
+    # B is missing at the second point, so Y cannot be evaluated there
+    assert not covariances[1].is_valid
+
+
+def test_output_covariance_uses_numeric_backend_without_symbolic_derivatives(monkeypatch):
+    def fail(self):
+        raise AssertionError("symbolic derivatives requested")
+
+    data = _project_data()
+    data["last_equation"] = "Y = A*B, Z = A + C"
+    data["derivative_backend"] = "complex_step"
+    monkeypatch.setattr(CompiledModel, "gradient_function", property(fail))
+    first = BudgetEngine.from_project_data(data).calculate_output_covariances()[0]
+
+    np.testing.assert_allclose(first.jacobian, [[5.0, 2.0, 0.0], [1.0, 0.0, 1.0]])
+    np.testing.assert_allclose(first.covariance, [[0.41, 0.05], [0.05, 0.01]])
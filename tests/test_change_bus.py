@@ -0,0 +1,130 @@
+import pytest
+
+try:
+    from PySide6.QtCore import QCoreApplication
+    from PySide6.QtWidgets import QApplication
+
+    from src.main_window import MainWindow
+    from src.utils.change_bus import (
+        ChangeBus,
+        CORRELATION_CHANGED,
+        POINTS_CHANGED,
+        VALUES_CHANGED,
+        VARIABLES_CHANGED,
+    )
+    from src.utils.language_manager import LanguageManager
+except ImportError:
+    pytest.skip("PySide6 is not available", allow_module_level=True)
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+def test_events_in_one_tick_run_each_refresh_once(qapp):
+    bus = ChangeBus()
+    calls = []
+    bus.subscribe('matrix', (VARIABLES_CHANGED, CORRELATION_CHANGED), lambda events: calls.append(('matrix', len(events))))
+    bus.subscribe('points', (POINTS_CHANGED,), lambda events: calls.append(('points', len(events))))
+
+    bus.post(VARIABLES_CHANGED)
+    bus.post(CORRELATION_CHANGED)
+    bus.post(VARIABLES_CHANGED, variable='A')
+    assert calls == []
+
+    # イベントループの次の周回でまとめて実行される
+    QCoreApplication.processEvents()
+
+    assert calls == [('matrix', 3)]
+    assert bus.batches == 1
+    assert not bus.has_pending()
+
+
+def test_events_posted_during_refresh_form_next_batch(qapp):
+    bus = ChangeBus()
+    calls = []
+
+    def on_values(events):
+        calls.append('values')
+        bus.post(POINTS_CHANGED)
+
+    bus.subscribe('values', (VALUES_CHANGED,), on_values)
+    bus.subscribe('points', (POINTS_CHANGED,), lambda events: calls.append('points'))
+
+    bus.post(VALUES_CHANGED, variable='A', point_index=0)
+    bus.flush()
+
+    assert calls == ['values', 'points']
+    assert bus.batches == 2
+
+
+def test_load_data_refreshes_dependent_tabs_once(qapp):
+    window = MainWindow(LanguageManager())
+    try:
+        counts = {'matrix': 0, 'monte_carlo': 0}
+        original_refresh_matrix = window.correlation_tab.refresh_matrix
+        original_refresh_controls = window.monte_carlo_tab.refresh_controls
+
+        def refresh_matrix():
+            counts['matrix'] += 1
+            original_refresh_matrix()
+
+        def refresh_controls():
+            counts['monte_carlo'] += 1
+            original_refresh_controls()
+
+        window.correlation_tab.refresh_matrix = refresh_matrix
+        window.monte_carlo_tab.refresh_controls = refresh_controls
+
+        window.load_data(
+            {
+                "last_equation": "Y = A + B",
+                "value_count": 1,
+                "value_names": ["P1"],
+                "variables": ["Y", "A", "B"],
+                "result_variables": ["Y"],
+                "correlation_coefficients": {},
+                "variable_values": {},
+            },
+            show_message=False,
+        )
+
+        # 読み込み完了時点で更新は済んでいる
+        assert not window.change_bus.has_pending()
+        assert counts == {'matrix': 1, 'monte_carlo': 1}
+        assert window.correlation_tab.matrix_table.rowCount() == 2
+    finally:
+        window.close()
+
+
+def test_editing_a_correlation_cell_runs_subscribers(qapp):
+    window = MainWindow(LanguageManager())
+    try:
+        window.load_data(
+            {
+                "last_equation": "Y = A + B",
+                "value_count": 1,
+                "value_names": ["P1"],
+                "variables": ["Y", "A", "B"],
+                "result_variables": ["Y"],
+                "correlation_coefficients": {"A": {"A": 1.0, "B": 0.0}, "B": {"A": 0.0, "B": 1.0}},
+                "variable_values": {},
+            },
+            show_message=False,
+        )
+        window.monte_carlo_tab.batch_results = [("Y", "P1", None)]
+        before = window.change_bus.refresh_counts.get('monte_carlo_tab', 0)
+
+        window.correlation_tab.matrix_table.item(0, 1).setText("0.5")
+        window.change_bus.flush()
+
+        assert window.correlation_coefficients["A"]["B"] == 0.5
+        assert window.change_bus.refresh_counts['monte_carlo_tab'] == before + 1
+        assert window.monte_carlo_tab.batch_results == []
+        assert not window.change_bus.has_pending()
+    finally:
+        window.close()
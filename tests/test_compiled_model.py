@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+import sympy as sp
+
+from src.utils.compiled_model import CompiledModelCache, get_model_cache
+from src.utils.equation_handler import EquationHandler
+from src.utils.value_handler import ValueHandler
+
+
+class DummyWindow:
+    def __init__(self, equation="Y = A / B"):
+        self.last_equation = equation
+        self.variable_values = {
+            "A": {"type": "A", "values": [{"central_value": "6"}]},
+            "B": {"type": "A", "values": [{"central_value": "3"}]},
+        }
+
+
+def test_cache_reuses_model_for_normalized_text():
+    cache = CompiledModelCache()
+    cache.sync_source("Y = A^2")
+    first = cache.get("A^2", ["A"])
+    second = cache.get(" A**2 ", ["A"])
+
+    assert first is second
+    assert first.derivative("A") is first.derivative("A")
+    assert len(cache) == 1
+
+
+def test_cache_is_invalidated_only_when_equation_changes():
+    cache = CompiledModelCache()
+    cache.sync_source("Y = A*B")
+    model = cache.get("A*B", ["A", "B"])
+
+    cache.sync_source("Y = A*B")
+    assert cache.get("A*B", ["A", "B"]) is model
+
+    cache.sync_source("Y = A + B")
+    assert len(cache) == 0
+    assert cache.get("A*B", ["A", "B"]) is not model
+
+
+def test_numeric_evaluators_match_symbolic_results():
+    model = CompiledModelCache().get("A/B", ["A", "B"])
+    values = model.evaluate_values(np.array([6.0, 8.0]), np.array([3.0, 4.0]))
+    gradient = model.evaluate_gradient(np.array([6.0, 8.0]), np.array([3.0, 4.0]))
+
+    assert values == pytest.approx([2.0, 2.0])
+    assert gradient.shape == (2, 2)
+    assert gradient[0] == pytest.approx([1 / 3, 1 / 4])
+    assert gradient[1] == pytest.approx([-6 / 9, -8 / 16])
+    assert model.denominator_variables() == frozenset({"B"})
+
+
+def test_equation_handler_uses_shared_cache():
+    window = DummyWindow()
+    handler = EquationHandler(window)
+    value_handler = ValueHandler(window, 0)
+
+    sensitivities = handler.calculate_sensitivities("Y = A / B", ["A", "B"], ["A", "B"], value_handler)
+    assert float(sensitivities["A"]) == pytest.approx(1 / 3)
+    assert float(sensitivities["B"]) == pytest.approx(-6 / 9)
+    assert float(handler.calculate_sensitivity("Y = A / B", "B", ["A", "B"], value_handler)) == pytest.approx(-6 / 9)
+    assert float(handler.calculate_result_central_value("Y = A / B", ["A", "B"], value_handler)) == pytest.approx(2.0)
+
+    cache = get_model_cache()
+    assert cache.source_equation == "Y = A / B"
+    assert cache.get("A / B", ["A", "B"]) is handler.get_compiled_model("Y = A / B", ["A", "B"])
+
+
+def test_zero_denominator_evaluates_to_complex_infinity():
+    window = DummyWindow()
+    window.variable_values["B"]["values"][0]["central_value"] = "0"
+    handler = EquationHandler(window)
+    value = handler.calculate_result_central_value("Y = A / B", ["A", "B"], ValueHandler(window, 0))
+
+    assert value is sp.zoo
+
+
+def test_float64_path_returns_plain_floats_for_well_conditioned_models():
+    window = DummyWindow()
+    handler = EquationHandler(window)
+    value = handler.calculate_result_central_value("Y = A / B", ["A", "B"], ValueHandler(window, 0))
+
+    assert isinstance(value, float)
+    assert value == pytest.approx(2.0)
+
+
+def test_cancellation_reruns_point_at_configured_precision():
+    window = DummyWindow("Y = A - B")
+    window.variable_values["A"]["values"][0]["central_value"] = "1.00000000000000012345"
+    window.variable_values["B"]["values"][0]["central_value"] = "1"
+    handler = EquationHandler(window)
+    value = handler.calculate_result_central_value("Y = A - B", ["A", "B"], ValueHandler(window, 0))
+
+    assert isinstance(value, sp.Float)
+    assert float(value) == pytest.approx(1.2345e-16)
+
+
+def test_high_precision_engine_skips_float64(monkeypatch):
+    from src.utils.config_loader import ConfigLoader
+
+    monkeypatch.setattr(ConfigLoader, "get_numeric_engine", lambda self: "high_precision")
+    window = DummyWindow()
+    handler = EquationHandler(window)
+    value = handler.calculate_sensitivity("Y = A / B", "A", ["A", "B"], ValueHandler(window, 0))
+
+    assert isinstance(value, sp.Float)
+    assert float(value) == pytest.approx(1 / 3)
+
+
+def test_lost_digits_estimate_flags_cancellation():
+    model = CompiledModelCache().get("A - B", ["A", "B"])
+    _, _, digits = model.evaluate_float64(np.array([2.0, 1.0]), np.array([1.0, 1.0 - 1e-12]))
+
+    assert digits[0] < 1
+    assert digits[1] > 11
+
+
+@pytest.mark.parametrize("equation", ["Y = 1/(A - B)", "Y = (A - B)**-2", "Y = A/sqrt(A - B)"])
+def test_cancellation_in_denominator_is_not_hidden(equation):
+    window = DummyWindow(equation)
+    window.variable_values["A"]["values"][0]["central_value"] = "1.000000000001"
+    window.variable_values["B"]["values"][0]["central_value"] = "1"
+    handler = EquationHandler(window)
+    model = handler.get_compiled_model(equation.split("=", 1)[1], ["A", "B"])
+
+    # 分母の桁落ちで float64 の値は4桁程度しか合わないので、高精度でやり直させる
+    assert handler.evaluate_float64(model, ValueHandler(window, 0)) is None
+
+
+def test_symbolic_time_budget_does_not_wait_for_slow_derivative(monkeypatch):
+    import threading
+    import time
+
+    from src.utils.compiled_model import CompiledModel
+
+    release = threading.Event()
+    original_diff = sp.diff
+    calls = []
+
+    def slow_diff(*args, **kwargs):
+        calls.append(args)
+        release.wait(5)
+        return original_diff(*args, **kwargs)
+
+    monkeypatch.setattr(sp, "diff", slow_diff)
+    model = CompiledModel("A * B", ["A", "B"])
+    outcome = []
+    try:
+        waiting = threading.Thread(target=lambda: outcome.append(model.prepare_symbolic_derivatives(0.5)))
+        waiting.start()
+        time.sleep(0.1)
+        # 待っている間はロックを放している
+        assert model._lock.acquire(timeout=0.1)
+        model._lock.release()
+        waiting.join()
+        assert outcome == [False] and model.symbolic_timed_out
+
+        # 打ち切った後は偏微分のスレッドを増やさない
+        assert model.prepare_symbolic_derivatives(0.05) is False
+        assert len(calls) == 1
+    finally:
+        release.set()
+
+    fast = CompiledModel("A * B", ["A", "B"])
+    assert fast.prepare_symbolic_derivatives(5.0) is True
+    assert fast.derivative("A") == sp.Symbol("B")
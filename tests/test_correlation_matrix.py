@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from src.utils.correlation_matrix import (
+    CorrelationMatrix,
+    factorize_correlation,
+    get_correlation_matrix,
+    nearest_correlation_matrix,
+)
+from src.utils.uncertainty_calculator import UncertaintyCalculator
+
+
+class Owner:
+    def __init__(self, mapping):
+        self.correlation_coefficients = mapping
+        self.correlation_version = 0
+
+
+def test_from_mapping_reads_both_directions():
+    matrix = CorrelationMatrix.from_mapping({"A": {"B": 0.5}, "C": {"A": "-0.25", "B": "bad"}})
+
+    assert matrix.variables == ["A", "B", "C"]
+    assert matrix.get("A", "B") == pytest.approx(0.5)
+    assert matrix.get("B", "A") == pytest.approx(0.5)
+    assert matrix.get("A", "C") == pytest.approx(-0.25)
+    assert matrix.get("B", "C") == 0.0
+    assert matrix.get("A", "A") == 1.0
+
+
+def test_set_is_symmetric_and_bumps_version():
+    matrix = CorrelationMatrix(["A", "B"])
+    matrix.set("A", "D", 0.3)
+
+    assert matrix.version == 1
+    assert matrix.get("D", "A") == pytest.approx(0.3)
+    assert matrix.to_mapping(["A", "D"]) == {"A": {"A": 1.0, "D": 0.3}, "D": {"A": 0.3, "D": 1.0}}
+    np.testing.assert_allclose(matrix.submatrix(["D", "X", "A"]), [[1, 0, 0.3], [0, 1, 0], [0.3, 0, 1]])
+
+
+def test_combined_variance_is_batched_quadratic_form():
+    matrix = CorrelationMatrix.from_mapping({"A": {"B": 0.5}})
+    contributions = np.array([[1.0, 2.0], [3.0, 0.0]])
+
+    np.testing.assert_allclose(matrix.combined_variance(contributions, ["A", "B"]), [1 + 4 + 2, 9])
+    assert matrix.combined_variance([1.0, 2.0], ["B", "A"]) == pytest.approx(7.0)
+
+
+def test_owner_cache_follows_version_stamp():
+    owner = Owner({"A": {"B": 0.5}})
+    first = get_correlation_matrix(owner)
+    assert get_correlation_matrix(owner) is first
+
+    owner.correlation_coefficients["A"]["B"] = 0.9
+    owner.correlation_version += 1
+    second = get_correlation_matrix(owner)
+    assert second is not first
+    assert second.get("A", "B") == pytest.approx(0.9)
+
+
+def test_calculator_uses_matrix_form():
+    owner = Owner({"A": {"B": -1.0}})
+    calculator = UncertaintyCalculator(owner)
+
+    assert calculator.calculate_combined_uncertainty_with_correlation(
+        [0.3, 0.4], ["A", "B"], owner.correlation_coefficients
+    ) == pytest.approx(0.1)
+    np.testing.assert_allclose(
+        calculator.calculate_combined_uncertainties([[0.3, 0.4], [0.3, 0.0]], ["A", "B"], owner.correlation_coefficients),
+        [0.1, 0.3],
+    )
+
+
+def test_nearest_correlation_matrix_matches_higham_example():
+    # Higham (2002) の例
+    matrix = np.array([[1.0, 1.0, 0.0], [1.0, 1.0, 1.0], [0.0, 1.0, 1.0]])
+    nearest = nearest_correlation_matrix(matrix)
+
+    expected = np.array([[1.0, 0.7607, 0.1573], [0.7607, 1.0, 0.7607], [0.1573, 0.7607, 1.0]])
+    np.testing.assert_allclose(nearest, expected, atol=1e-4)
+    np.testing.assert_array_equal(np.diag(nearest), 1.0)
+    assert np.linalg.eigvalsh(nearest)[0] > -1e-9
+
+
+def test_factorization_is_cached_and_reports_repair():
+    valid = np.array([[1.0, 0.5], [0.5, 1.0]])
+    first = factorize_correlation(valid)
+    assert factorize_correlation(valid.copy()) is first
+    assert not first.repaired
+    np.testing.assert_allclose(first.factor @ first.factor.T, valid)
+
+    invalid = np.array([[1.0, 0.9, -0.9], [0.9, 1.0, 0.9], [-0.9, 0.9, 1.0]])
+    repaired = factorize_correlation(invalid)
+    assert repaired.repaired
+    assert repaired.distance == pytest.approx(np.linalg.norm(repaired.matrix - invalid))
+    assert 0.0 < repaired.max_deviation <= repaired.distance
+    np.testing.assert_allclose(repaired.factor @ repaired.factor.T, repaired.matrix, atol=1e-10)
+    with pytest.raises(ValueError):
+        repaired.factor[0, 0] = 0.0
@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.coverage_factor import t_coverage_factor, t_coverage_factors
+from src.utils.special_functions import betainc, betaincinv, ndtri
+from src.utils.uncertainty_calculator import UncertaintyCalculator
+
+
+@pytest.mark.parametrize(
+    "dof, expected",
+    [
+        (1, 12.706204736),
+        (2, 4.302652730),
+        (5, 2.570581836),
+        (9, 2.262157163),
+        (30, 2.042272456),
+        (math.inf, 1.959963985),
+    ],
+)
+def test_t_coverage_factor_matches_reference_quantiles(dof, expected):
+    assert t_coverage_factor(dof) == pytest.approx(expected, rel=1e-9)
+
+
+def test_t_coverage_factor_other_coverage_probabilities():
+    assert t_coverage_factor(1, 0.99) == pytest.approx(63.656741163, rel=1e-9)
+    assert t_coverage_factor(math.inf, 0.9973) == pytest.approx(3.0, rel=1e-3)
+    # t分布の分位点は自由度について単調減少し、大きい自由度で正規分布に滑らかにつながる
+    dofs = [1.5, 2.5, 7.25, 100.0, 9999.0, 10001.0, 1e6]
+    factors = [t_coverage_factor(df) for df in dofs]
+    assert all(a > b for a, b in zip(factors, factors[1:]))
+    assert factors[4] == pytest.approx(factors[5], rel=1e-6)
+    assert t_coverage_factor(1e12) == pytest.approx(1.959963985, rel=1e-9)
+
+
+def test_incomplete_beta_inverse_round_trip():
+    for a, b in [(0.25, 0.5), (2.5, 0.5), (3.0, 4.0), (50.0, 0.5)]:
+        for p in [1e-6, 0.05, 0.5, 0.95]:
+            x = betaincinv(a, b, p)
+            assert float(betainc(a, b, x)) == pytest.approx(p, rel=1e-10)
+    assert float(ndtri(0.975)) == pytest.approx(1.959963984540054, rel=1e-14)
+
+
+def test_t_coverage_factors_accepts_arrays():
+    dofs = np.array([[1.0, 4.5], [4.5, np.nan], [-1.0, np.inf]])
+
+    factors = t_coverage_factors(dofs)
+
+    assert factors.shape == dofs.shape
+    assert factors[0, 1] == factors[1, 0] == pytest.approx(t_coverage_factor(4.5))
+    assert np.isnan(factors[1, 1]) and np.isnan(factors[2, 0])
+    assert factors[2, 1] == pytest.approx(1.959963985)
+
+
+def test_calculator_keeps_k2_for_large_dof_and_uses_exact_t_below():
+    calculator = UncertaintyCalculator(None)
+
+    factors = calculator.get_coverage_factors([3.5, 10.0, 1e100, np.nan])
+
+    assert factors[0] == pytest.approx(t_coverage_factor(3.5))
+    assert factors[1:].tolist() == [2.0, 2.0, 2.0]
+    assert calculator.get_coverage_factor(3.5) == pytest.approx(factors[0])
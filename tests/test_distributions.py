@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.distributions import DISTRIBUTIONS, distribution_divisor, get_distribution
+from src.utils.monte_carlo import (
+    MonteCarloInput,
+    MonteCarloModel,
+    marginal_correlation,
+    run_monte_carlo,
+    transform_from_normal_scores,
+    transform_from_uniform,
+)
+
+# 逆累積分布関数を細かい中点則で積分して平均と標準偏差を求める
+_PROBABILITIES = (np.arange(400000) + 0.5) / 400000
+
+
+def _moments(key, central, standard_uncertainty, parameter=None):
+    values = transform_from_uniform(_PROBABILITIES, central, standard_uncertainty, key, parameter)
+    return float(np.mean(values)), float(np.std(values))
+
+
+@pytest.mark.parametrize(
+    "key, parameter",
+    [
+        ("NORMAL_DISTRIBUTION", None),
+        ("RECTANGULAR_DISTRIBUTION", None),
+        ("TRIANGULAR_DISTRIBUTION", None),
+        ("U_DISTRIBUTION", None),
+        ("TRAPEZOIDAL_DISTRIBUTION", 0.3),
+        ("CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION", 0.4),
+        ("CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION", 1.0),
+        ("LOGNORMAL_DISTRIBUTION", None),
+    ],
+)
+def test_distributions_match_central_value_and_standard_uncertainty(key, parameter):
+    mean, deviation = _moments(key, 5.0, 0.4, parameter)
+    assert mean == pytest.approx(5.0, abs=1e-4)
+    assert deviation == pytest.approx(0.4, rel=2e-3)
+
+
+def test_student_t_uses_standard_uncertainty_as_scale():
+    mean, deviation = _moments("STUDENT_T_DISTRIBUTION", 1.0, 0.2, 8)
+    assert mean == pytest.approx(1.0, abs=1e-6)
+    assert deviation == pytest.approx(0.2 * math.sqrt(8 / 6), rel=5e-3)
+    assert get_distribution("STUDENT_T_DISTRIBUTION").variance_ratio(2) == math.inf
+
+
+def test_trapezoid_and_curvilinear_limits_reduce_to_known_shapes():
+    probabilities = np.linspace(0.001, 0.999, 101)
+    np.testing.assert_allclose(
+        transform_from_uniform(probabilities, 0.0, 1.0, "TRAPEZOIDAL_DISTRIBUTION", 0.0),
+        transform_from_uniform(probabilities, 0.0, 1.0, "TRIANGULAR_DISTRIBUTION"),
+        atol=1e-12,
+    )
+    np.testing.assert_allclose(
+        transform_from_uniform(probabilities, 0.0, 1.0, "TRAPEZOIDAL_DISTRIBUTION", 1.0),
+        transform_from_uniform(probabilities, 0.0, 1.0, "RECTANGULAR_DISTRIBUTION"),
+        atol=1e-12,
+    )
+    np.testing.assert_allclose(
+        transform_from_uniform(probabilities, 0.0, 1.0, "CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION", 0.0),
+        transform_from_uniform(probabilities, 0.0, 1.0, "RECTANGULAR_DISTRIBUTION"),
+        atol=1e-12,
+    )
+    # 曲線台形分布は GUM-S1 6.4.3 の抽出（半値幅を一様に選んでから矩形分布）と一致する
+    rng = np.random.default_rng(4)
+    half_width = distribution_divisor("CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION", 0.5)
+    widths = rng.uniform(0.5 * half_width, 1.5 * half_width, 400000)
+    sampled = np.sort(widths * rng.uniform(-1.0, 1.0, widths.size))
+    quantiles = transform_from_uniform(np.array([0.05, 0.25, 0.75, 0.95]), 0.0, 1.0,
+                                       "CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION", 0.5)
+    np.testing.assert_allclose(np.quantile(sampled, [0.05, 0.25, 0.75, 0.95]), quantiles, atol=0.01)
+
+
+def test_shape_parameters_and_divisors_are_checked():
+    assert distribution_divisor("TRAPEZOIDAL_DISTRIBUTION", 0.5) == pytest.approx(math.sqrt(6.0 / 1.25))
+    assert distribution_divisor("TRAPEZOIDAL_DISTRIBUTION", 1.5) is None
+    assert distribution_divisor("LOGNORMAL_DISTRIBUTION") is None
+    with pytest.raises(ValueError):
+        get_distribution("LOGNORMAL_DISTRIBUTION").check_parameter(None, central=-1.0)
+    with pytest.raises(ValueError):
+        get_distribution("CURVILINEAR_TRAPEZOIDAL_DISTRIBUTION").check_parameter(None)
+    assert set(DISTRIBUTIONS) >= {"STUDENT_T_DISTRIBUTION", "LOGNORMAL_DISTRIBUTION"}
+
+
+def test_new_distributions_work_with_the_gaussian_copula():
+    inputs = (
+        MonteCarloInput("A", 2.0, 0.1, "STUDENT_T_DISTRIBUTION", 6.0),
+        MonteCarloInput("B", 5.0, 0.2, "TRAPEZOIDAL_DISTRIBUTION", 0.5),
+        MonteCarloInput("C", 1.0, 0.05, "LOGNORMAL_DISTRIBUTION"),
+    )
+    correlation = np.array([[1.0, 0.6, 0.0], [0.6, 1.0, -0.4], [0.0, -0.4, 1.0]])
+    model = MonteCarloModel("A + B + C", ("A", "B", "C"), inputs, correlation=correlation, control_variate=True)
+    summary = run_monte_carlo(model, 200000, seed=8).summary()
+
+    _, variance = model.control_expectation()
+    # 線形モデルでは制御変量の分散がそのまま出力の分散
+    assert summary.standard_deviation == pytest.approx(math.sqrt(variance), rel=0.01)
+    assert summary.controlled_standard_deviation == pytest.approx(math.sqrt(variance), rel=1e-6)
+    scores = np.random.default_rng(2).standard_normal(1000)
+    assert np.all(transform_from_normal_scores(scores, 1.0, 0.05, "LOGNORMAL_DISTRIBUTION") > 0.0)
+    assert marginal_correlation(inputs[0], inputs[1], 0.6) < 0.6
@@ -0,0 +1,86 @@
+import pytest
+
+from src.utils.equation_graph import EquationCycleError, EquationGraph
+from src.utils.equation_handler import EquationHandler
+from src.utils.value_handler import ValueHandler
+
+
+class DummyWindow:
+    def __init__(self, equation, values):
+        self.last_equation = equation
+        self.variable_values = {
+            name: {"type": "A", "values": [{"central_value": value}]} for name, value in values.items()
+        }
+
+
+def _diamond_equation(levels):
+    # X1 = X0*X0 + X0, X2 = X1*X1 + X1, ...: string expansion doubles at every level
+    parts = [f"X{i} = X{i - 1}*X{i - 1} + X{i - 1}" for i in range(1, levels + 1)]
+    parts.append("X0 = A + B")
+    return ", ".join(parts)
+
+
+def test_cycles_are_detected_up_front():
+    with pytest.raises(EquationCycleError) as error:
+        EquationGraph.from_text("Y = Z + A, Z = 2*Y")
+    assert error.value.cycle[0] == error.value.cycle[-1]
+
+
+def test_expansion_matches_previous_string_format():
+    graph = EquationGraph.from_text("W = V * I, V = V_MEAS + V_CAL")
+    assert graph.expand("W") == "(V_MEAS+V_CAL)*I"
+    assert graph.evaluation_order("W") == ["V", "W"]
+
+
+def test_chain_rule_matches_expanded_expression():
+    window = DummyWindow("W = V * I, V = A / B", {"A": "6", "B": "3", "I": "2"})
+    handler = EquationHandler(window)
+    equation = handler.get_target_equation("W")
+    variables = handler.get_variables_from_equation(equation.split("=", 1)[1])
+    value_handler = ValueHandler(window, 0)
+
+    sensitivities = handler.calculate_sensitivities(equation, variables, variables, value_handler)
+    assert float(sensitivities["A"]) == pytest.approx(2 / 3)
+    assert float(sensitivities["B"]) == pytest.approx(-6 * 2 / 9)
+    assert float(sensitivities["I"]) == pytest.approx(2.0)
+    assert float(handler.calculate_result_central_value(equation, variables, value_handler)) == pytest.approx(4.0)
+
+    model = handler.get_compiled_model(equation, variables)
+    gradient = model.evaluate_gradient(*[[6.0, 8.0] if var == "A" else [3.0, 4.0] if var == "B" else [2.0, 2.0] for var in variables])
+    assert gradient[variables.index("A")].tolist() == pytest.approx([2 / 3, 2 / 4])
+
+
+def test_deep_diamond_chain_evaluates_each_intermediate_once():
+    window = DummyWindow(_diamond_equation(12), {"A": "0.5", "B": "0.25"})
+    handler = EquationHandler(window)
+    equation = handler.get_target_equation("X12")
+    variables = ["A", "B"]
+    value_handler = ValueHandler(window, 0)
+
+    model = handler.get_compiled_model(equation, variables)
+    assert [name for name, _ in model.nodes][-1] == "X12"
+    assert len(model.nodes) == 13
+
+    x = 0.75
+    derivative = 1.0
+    for _ in range(12):
+        derivative *= 2 * x + 1
+        x = x * x + x
+    sensitivities = handler.calculate_sensitivities(equation, variables, variables, value_handler)
+    assert float(sensitivities["A"]) == pytest.approx(derivative)
+    assert float(handler.calculate_result_central_value(equation, variables, value_handler)) == pytest.approx(x)
+
+
+def test_result_model_is_looked_up_without_expanding():
+    window = DummyWindow(_diamond_equation(12), {"A": "0.5", "B": "0.25"})
+    handler = EquationHandler(window)
+    equation = handler.get_target_equation("X12")
+    assert equation == "X12 = X11*X11 + X11"
+    assert handler.get_variables_from_equation(equation.split("=", 1)[1]) == ["A", "B"]
+
+    model, variables = handler.get_result_model("X12")
+    assert variables == ["A", "B"]
+    assert model is handler.get_compiled_model(equation, variables)
+    assert len(model.nodes) == 13
+    # 展開した文字列（12段で数MB）は作らない
+    assert handler.get_equation_graph()._expanded == {}
@@ -0,0 +1,264 @@
+import numpy as np
+import pytest
+
+from src.utils.monte_carlo import (
+    MonteCarloAccumulator,
+    QuantileDigest,
+    RunningMoments,
+    MonteCarloInput,
+    MonteCarloModel,
+    StreamingHistogram,
+    block_ranges,
+    marginal_correlation,
+    numerical_tolerance,
+    run_adaptive_monte_carlo,
+    run_monte_carlo,
+    run_monte_carlo_batch,
+    sample_statistics,
+)
+
+
+def _chunks(values, size):
+    return [values[i:i + size] for i in range(0, values.size, size)]
+
+
+def test_running_moments_match_two_pass_statistics():
+    values = np.random.default_rng(1).normal(1e6, 1e-3, 200001)
+    moments = RunningMoments()
+    for chunk in _chunks(values, 7777):
+        moments.update(chunk)
+
+    assert moments.count == values.size
+    assert moments.mean == pytest.approx(np.mean(values), rel=1e-15)
+    assert moments.standard_deviation == pytest.approx(np.std(values, ddof=1), rel=1e-9)
+    assert (moments.minimum, moments.maximum) == (values.min(), values.max())
+
+
+def test_quantile_digest_tracks_tails_with_bounded_size():
+    rng = np.random.default_rng(2)
+    values = np.exp(1.5 * rng.standard_normal(1000000))
+    digest = QuantileDigest()
+    for chunk in _chunks(values, 65536):
+        digest.add(chunk)
+
+    probabilities = [0.025, 0.5, 0.975]
+    expected = np.quantile(values, probabilities)
+    assert len(digest) < 5000
+    assert digest.count == values.size
+    np.testing.assert_allclose(digest.quantile(probabilities), expected, rtol=2e-3)
+    assert digest.quantile(0.0) == values.min()
+    assert digest.quantile(1.0) == values.max()
+
+
+def test_histogram_merge_does_not_depend_on_order():
+    rng = np.random.default_rng(3)
+    parts = [rng.normal(0.0, 1.0, 1000), rng.normal(50.0, 0.01, 1000), rng.uniform(-3e3, 1.0, 10)]
+
+    forward = StreamingHistogram(256)
+    for part in parts:
+        forward.add(part)
+    backward = StreamingHistogram(256)
+    for part in reversed(parts):
+        backward.merge(StreamingHistogram.from_values(part, 256))
+
+    assert forward.exponent == backward.exponent
+    assert forward.offset == backward.offset
+    np.testing.assert_array_equal(forward.counts, backward.counts)
+    assert forward.total == 2010
+    assert forward.counts.size <= 256
+
+
+def _model(correlation=None):
+    return MonteCarloModel(
+        expression="A*B + C",
+        variables=("A", "B", "C"),
+        inputs=(
+            MonteCarloInput("A", 2.0, 0.1),
+            MonteCarloInput("B", 5.0, 0.2, "RECTANGULAR_DISTRIBUTION"),
+            MonteCarloInput("C", 1.0, 0.05, "TRIANGULAR_DISTRIBUTION"),
+        ),
+        correlation=correlation,
+    )
+
+
+def test_run_monte_carlo_summary_and_progress():
+    progress = []
+    run = run_monte_carlo(_model(), 100000, seed=12345, chunk_size=5000,
+                          progress=lambda done, total: progress.append((done, total)))
+    summary = run.summary(0.95)
+
+    assert run.seed == 12345 and run.completed_count == 100000 and not run.cancelled
+    # 20チャンクしかないので1チャンクずつのブロックごとに通知される
+    assert progress == [(5000 * (i + 1), 100000) for i in range(20)]
+    assert summary.count == 100000
+    expected_u = np.sqrt((5.0 * 0.1) ** 2 + (2.0 * 0.2) ** 2 + 0.05 ** 2)
+    assert summary.mean == pytest.approx(11.0, abs=0.01)
+    assert summary.standard_deviation == pytest.approx(expected_u, rel=0.02)
+    counts, edges = run.accumulator.display_histogram(80)
+    assert counts.sum() == pytest.approx(summary.count)
+    assert edges[0] == summary.minimum and edges[-1] == summary.maximum
+
+
+def test_same_seed_gives_identical_results_for_any_worker_count():
+    correlation = np.array([[1.0, 0.5, 0.0], [0.5, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    serial = run_monte_carlo(_model(correlation), 50000, seed=7, chunk_size=1000)
+    parallel = run_monte_carlo(_model(correlation), 50000, seed=7, chunk_size=1000, workers=2)
+    other = run_monte_carlo(_model(correlation), 50000, seed=8, chunk_size=1000)
+
+    assert parallel.workers == 2
+    assert parallel.summary() == serial.summary()
+    assert other.summary().mean != serial.summary().mean
+
+
+def test_run_monte_carlo_cancellation_keeps_completed_blocks():
+    calls = []
+
+    def is_cancelled():
+        calls.append(True)
+        return len(calls) > 2
+
+    run = run_monte_carlo(_model(), 100000, seed=1, chunk_size=1000, is_cancelled=is_cancelled)
+
+    # 100チャンクは2チャンクずつ50ブロックに分かれる
+    assert run.cancelled
+    assert run.completed_count == 4000
+    assert run.accumulator.count == 4000
+
+
+def test_block_ranges_leave_work_for_many_cores():
+    ten_million = block_ranges(10000000, 65536)
+    assert len(ten_million) >= 50
+    assert ten_million[0] == (0, 3)
+    assert ten_million[-1][1] == 153
+
+    huge = block_ranges(10**9, 65536)
+    assert all(last - first <= 16 for first, last in huge)
+    assert block_ranges(1000, 65536) == [(0, 1)]
+
+
+def test_accumulator_merge_equals_sequential_statistics():
+    values = np.random.default_rng(5).gamma(2.0, 1.0, 50000)
+    whole = MonteCarloAccumulator()
+    whole.add(values)
+    left, right = MonteCarloAccumulator(), MonteCarloAccumulator()
+    left.add(values[:20000])
+    right.add(values[20000:])
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert left.moments.mean == pytest.approx(whole.moments.mean, rel=1e-12)
+    assert left.summary().interval == pytest.approx(whole.summary().interval, rel=1e-3)
+
+
+def test_numerical_tolerance_follows_significant_digits():
+    assert numerical_tolerance(0.0234, 2) == pytest.approx(0.0005)
+    assert numerical_tolerance(0.0234, 1) == pytest.approx(0.005)
+    assert numerical_tolerance(3.1, 2) == pytest.approx(0.05)
+    assert numerical_tolerance(0.0, 2) == 0.0
+
+
+def test_adaptive_run_stops_at_tolerance():
+    run = run_adaptive_monte_carlo(_model(), significant_digits=1, seed=3)
+    summary = run.summary()
+
+    assert run.converged and not run.cancelled
+    assert run.batch_count >= 2
+    assert run.completed_count == run.batch_count * 10000 == summary.count
+    assert run.tolerance == pytest.approx(0.05)
+    assert summary.standard_deviation == pytest.approx(0.64, abs=0.05)
+    # 桁数を増やすと必要な試行回数も増える
+    finer = run_adaptive_monte_carlo(_model(), significant_digits=2, seed=3)
+    assert finer.converged and finer.completed_count > run.completed_count
+
+
+def test_adaptive_run_respects_trial_limit():
+    run = run_adaptive_monte_carlo(_model(), significant_digits=4, seed=3, max_sample_count=30000)
+
+    assert run.batch_count == 3
+    assert run.converged is False
+
+
+def test_batch_uses_common_random_numbers_across_points():
+    def linear_model(offset):
+        return MonteCarloModel(
+            expression="A + B",
+            variables=("A", "B"),
+            inputs=(MonteCarloInput("A", 1.0 + offset, 0.1), MonteCarloInput("B", 2.0, 0.3, "RECTANGULAR_DISTRIBUTION")),
+        )
+
+    batch = run_monte_carlo_batch({"P1": linear_model(0.0), "P2": linear_model(0.5)}, 20000, seed=11)
+
+    assert list(batch.runs) == ["P1", "P2"]
+    assert all(run.seed == 11 for run in batch.runs.values())
+    low, high = batch.runs["P1"].summary(), batch.runs["P2"].summary()
+    # 同じ乱数を使うので、校正点間の差には抽出のばらつきが入らない
+    assert high.mean - low.mean == pytest.approx(0.5, abs=1e-9)
+    assert high.standard_deviation == pytest.approx(low.standard_deviation, rel=1e-9)
+
+
+def _variance_reduced_model(**options):
+    model = _model()
+    return MonteCarloModel(model.expression, model.variables, model.inputs, **options)
+
+
+def test_control_variate_reduces_spread_of_standard_uncertainty():
+    # y = A*B + C の厳密な標準不確かさ（積の2次の項を含む）
+    exact_u = np.sqrt(25.0 * 0.01 + 4.0 * 0.04 + 0.01 * 0.04 + 0.05 ** 2)
+    raw, controlled = [], []
+    for seed in range(6):
+        summary = run_monte_carlo(_variance_reduced_model(control_variate=True), 20000, seed=seed).summary()
+        raw.append(summary.standard_deviation)
+        controlled.append(summary.controlled_standard_deviation)
+
+    assert np.mean(controlled) == pytest.approx(exact_u, rel=0.003)
+    assert np.std(controlled) < np.std(raw) / 4
+
+
+def test_antithetic_pairs_and_workers_keep_results_reproducible():
+    model = _variance_reduced_model(control_variate=True, antithetic=True)
+    single = run_monte_carlo(model, 20000, seed=5, workers=1, chunk_size=2000).summary()
+    parallel = run_monte_carlo(model, 20000, seed=5, workers=2, chunk_size=2000).summary()
+
+    assert single.controlled_standard_deviation == parallel.controlled_standard_deviation
+    assert single.controlled_mean == pytest.approx(11.0, abs=1e-3)
+    assert run_monte_carlo(_model(), 1000, seed=5).summary().controlled_mean is None
+
+
+def test_marginal_correlation_matches_closed_forms():
+    r = 0.6
+    assert marginal_correlation("RECTANGULAR_DISTRIBUTION", "RECTANGULAR_DISTRIBUTION", r) == pytest.approx(
+        6.0 / np.pi * np.arcsin(r / 2.0), abs=1e-6)
+    assert marginal_correlation("NORMAL_DISTRIBUTION", "RECTANGULAR_DISTRIBUTION", r) == pytest.approx(
+        r * np.sqrt(3.0 / np.pi), abs=1e-6)
+
+
+def test_sample_statistics_follow_gum_supplement_definitions():
+    values = np.arange(1.0, 101.0) ** 2
+    statistics = sample_statistics(np.random.default_rng(0).permutation(values), 0.9)
+
+    # q = 90, r = 5（1始まり）: [y_(5), y_(95)]、最短区間は先頭から q 個ぶんの窓
+    assert statistics.interval == (25.0, 95.0 ** 2)
+    assert statistics.shortest_interval == (1.0, 91.0 ** 2)
+    assert statistics.median == pytest.approx(0.5 * (50.0 ** 2 + 51.0 ** 2))
+    assert (statistics.minimum, statistics.maximum) == (1.0, 10000.0)
+    assert sample_statistics([1.0, np.nan]) is None
+
+
+def test_shortest_interval_for_skewed_output():
+    values = np.random.default_rng(3).exponential(size=1000000)
+    exact = sample_statistics(values, 0.95)
+    accumulator = MonteCarloAccumulator()
+    for chunk in _chunks(values, 65536):
+        accumulator.add(chunk)
+    summary = accumulator.summary(0.95)
+
+    # 指数分布の最短 95% 区間は [0, -ln 0.05]
+    assert exact.shortest_interval[0] == pytest.approx(0.0, abs=1e-4)
+    assert exact.shortest_interval[1] == pytest.approx(-np.log(0.05), rel=5e-3)
+    assert summary.shortest_interval == pytest.approx(exact.shortest_interval, abs=2e-3)
+    assert summary.interval == pytest.approx(exact.interval, rel=1e-3)
+    # 対称な出力では2つの区間がほぼ一致する
+    symmetric = MonteCarloAccumulator()
+    symmetric.add(np.random.default_rng(4).standard_normal(200000))
+    summary = symmetric.summary(0.99)
+    assert summary.shortest_interval == pytest.approx(summary.interval, abs=0.03)
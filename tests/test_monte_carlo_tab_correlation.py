@@ -1,12 +1,17 @@
+import gc
+
 import numpy as np
 import pytest
 
 try:
     from PySide6.QtWidgets import QApplication, QWidget
     from src.tabs.monte_carlo_tab import MonteCarloTab
+    from src.tabs.report_tab import ReportTab
 except ImportError:
     pytest.skip("PySide6 is not available", allow_module_level=True)
 
+from src.utils.config_loader import get_config
+
 
 @pytest.fixture(scope="module")
 def qapp():
@@ -16,6 +21,13 @@ def qapp():
     return app
 
 
+@pytest.fixture(autouse=True)
+def collect_tabs():
+    yield
+    # 前のテストのタブが次のテストのイベント処理の途中で回収されるとクラッシュするので、ここで回収する
+    gc.collect()
+
+
 class _DummyParent(QWidget):
     def __init__(self):
         super().__init__()
@@ -65,3 +77,253 @@ def test_monte_carlo_uses_correlation_coefficients_for_joint_sampling(qapp):
     assert abs(std_uncorrelated - np.sqrt(2.0)) < 0.08
     assert abs(std_correlated - np.sqrt(0.2)) < 0.05
     assert std_correlated < std_uncorrelated * 0.5
+
+
+def test_run_simulation_streams_large_trial_counts(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.samples_spin.setValue(300000)
+    assert tab.samples_spin.value() == 300000
+
+    tab.run_simulation()
+
+    assert float(tab.std_text.text()) == pytest.approx(np.sqrt(2.0), rel=0.02)
+    assert tab.histogram_widget._total_count == pytest.approx(300000)
+
+
+def test_adaptive_mode_reports_trials_and_time(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.adaptive_check.setChecked(True)
+    tab.digits_spin.setValue(1)
+    assert not tab.samples_spin.isEnabled()
+
+    tab.run_simulation()
+
+    assert tab.last_run.converged
+    assert tab.trials_text.text() == f"{tab.last_run.completed_count:,}"
+    assert tab.elapsed_text.text().endswith(" s")
+    assert tab.tolerance_text.text() != "--"
+
+
+def test_run_all_points_fills_table_and_report_section(qapp):
+    parent = _DummyParent()
+    parent.value_names = ["P1", "P2"]
+    parent.variable_values["Y"]["values"].append({})
+    parent.variable_values["A"]["values"].append({"central_value": "10", "standard_uncertainty": "1"})
+    parent.variable_values["B"]["values"].append({"central_value": "", "standard_uncertainty": "1"})
+    tab = MonteCarloTab(parent)
+    parent.monte_carlo_tab = tab
+    tab.refresh_controls()
+    tab.samples_spin.setValue(20000)
+    tab.seed_edit.setText("5")
+
+    tab.run_all_simulations()
+
+    assert tab.last_batch.seed == 5
+    assert [row[:2] for row in tab.batch_results] == [("Y", "P1"), ("Y", "P2")]
+    assert tab.batch_results[0][2].count == 20000
+    # 中心値の欠けた校正点は空欄になる
+    assert tab.batch_results[1][2] is None
+    assert tab.batch_table.rowCount() == 2
+    assert tab.batch_table.item(1, 2).text() == "--"
+    assert tab.batch_failed == {("Y", 1)}
+    assert tab.batch_table.item(1, 2).toolTip() and not tab.batch_table.item(0, 2).toolTip()
+
+    report = ReportTab(parent)
+    html = report._build_monte_carlo_html()
+    assert "P1" in html and "P2" in html
+    assert html.count("<th>") == 6
+
+    tab.on_inputs_changed()
+    assert tab.batch_results == [] and report._build_monte_carlo_html() == ""
+
+
+def test_run_all_points_in_background_reports_progress(qapp):
+    parent = _DummyParent()
+    parent.value_names = ["P1", "P2"]
+    parent.variable_values["Y"]["values"].append({})
+    parent.variable_values["A"]["values"].append({"central_value": "12", "standard_uncertainty": "1"})
+    parent.variable_values["B"]["values"].append({"central_value": "3", "standard_uncertainty": "1"})
+    tab = MonteCarloTab(parent)
+    tab.run_in_background = True
+    tab.refresh_controls()
+    tab.samples_spin.setValue(300000)
+    tab.seed_edit.setText("5")
+    progress = []
+    tab.simulation_runner.item_partial.connect(lambda request, update: progress.append(update))
+
+    tab.run_all_simulations()
+    assert tab.cancel_button.isVisibleTo(tab)
+    tab.wait_for_simulation()
+
+    assert progress and progress[-1][1] == 600000
+    assert [row[:2] for row in tab.batch_results] == [("Y", "P1"), ("Y", "P2")]
+    assert all(row[2].count == 300000 for row in tab.batch_results)
+    assert not tab.cancel_button.isVisibleTo(tab)
+
+
+def test_background_run_streams_partial_results(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.run_in_background = True
+    tab.refresh_controls()
+    tab.samples_spin.setValue(300000)
+    partial_counts = []
+    tab.simulation_runner.item_partial.connect(lambda request, update: partial_counts.append(update[0]))
+
+    tab.run_simulation()
+    assert tab.progress_bar.isVisibleTo(tab) and tab.cancel_button.isVisibleTo(tab)
+    tab.wait_for_simulation()
+
+    assert partial_counts and partial_counts[0] < 300000
+    assert tab.last_run.completed_count == 300000
+    assert tab.histogram_widget._total_count == pytest.approx(300000)
+    assert not tab.progress_bar.isVisibleTo(tab)
+
+
+def test_cancelled_run_is_not_kept_as_result(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.run_in_background = True
+    tab.refresh_controls()
+
+    tab.run_simulation()
+    tab.cancel_simulation()
+    tab.wait_for_simulation()
+
+    assert tab.last_run is None
+    assert not tab._has_simulation_result
+    assert not tab.cancel_button.isVisibleTo(tab)
+
+
+def test_auto_run_reuses_result_until_inputs_change(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.samples_spin.setValue(1000)
+
+    tab._run_if_stale()
+    first = tab.last_run
+    tab._run_if_stale()
+    assert tab.last_run is first
+
+    parent.variable_values["A"]["values"][0]["standard_uncertainty"] = "2"
+    tab._run_if_stale()
+    assert tab.last_run is not first
+
+    tab.auto_run_check.setChecked(False)
+    tab._invalidate_results()
+    tab.show()
+    assert tab.mean_text.text() == "--"
+    tab.hide()
+
+
+def test_sobol_replicates_report_standard_error(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.samples_spin.setValue(8192)
+    tab.sampling_combo.setCurrentIndex(tab.sampling_combo.findData("sobol"))
+    tab.replicates_spin.setValue(4)
+
+    tab.run_simulation()
+
+    assert tab.last_run.replicates == 4
+    assert tab.standard_error_text.text() != "--"
+    assert float(tab.std_text.text()) == pytest.approx(np.sqrt(2.0), rel=0.01)
+
+
+
+def test_control_variate_row_shows_variance_reduced_estimate(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.samples_spin.setValue(20000)
+    tab.run_simulation()
+    assert tab.controlled_text.text() == "--"
+
+    tab.control_variate_check.setChecked(True)
+    tab.antithetic_check.setChecked(True)
+    tab.run_simulation()
+
+    mean_text, u_text = tab.controlled_text.text().split(" / ")
+    # 線形モデルなので制御変量で分散が消える
+    assert float(u_text) == pytest.approx(np.sqrt(2.0), rel=1e-5)
+    assert float(mean_text) == pytest.approx(0.0, abs=1e-5)
+
+    tab.sampling_combo.setCurrentIndex(tab.sampling_combo.findData("sobol"))
+    assert not tab.antithetic_check.isEnabled()
+
+
+def test_coverage_probability_change_reuses_run(qapp):
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.samples_spin.setValue(50000)
+    tab.seed_edit.setText("3")
+    tab.run_simulation()
+    run = tab.last_run
+    width95 = tab.last_run.summary(0.95).interval
+
+    tab.coverage_spin.setValue(99.0)
+
+    # 集計済みの結果から区間だけを求め直す
+    assert tab.last_run is run
+    assert tab._coverage_probability() == 0.99
+    low, high = (float(text) for text in tab.shortest_interval_text.text().strip("[]").split(", "))
+    assert high - low > width95[1] - width95[0]
+    assert high - low == pytest.approx(2 * 2.5758 * np.sqrt(2.0), rel=0.03)
+
+
+def test_repaired_correlation_matrix_distance_is_shown(qapp):
+    tab = MonteCarloTab(_DummyParent())
+    invalid = np.array([[1.0, 0.9, -0.9], [0.9, 1.0, 0.9], [-0.9, 0.9, 1.0]])
+
+    assert tab._format_correlation_adjustment(None) == "--"
+    assert tab._format_correlation_adjustment(np.eye(3)) == "--"
+    assert tab._format_correlation_adjustment(invalid).startswith("‖ΔR‖F = ")
+
+
+def test_kept_samples_enable_export(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_config(), "get_monte_carlo_sample_directory", lambda: str(tmp_path))
+    parent = _DummyParent()
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+    tab.samples_spin.setValue(5000)
+    tab.seed_edit.setText("2")
+    tab.run_simulation()
+    assert not tab.export_samples_button.isEnabled()
+
+    tab.keep_samples_check.setChecked(True)
+    tab.run_simulation()
+
+    store = tab.last_run.sample_store
+    assert store.is_complete() and store.directory.startswith(str(tmp_path))
+    assert store.outputs.shape == (5000,)
+    assert tab.export_samples_button.isEnabled()
+
+    tab.replicates_spin.setValue(2)
+    assert not tab.keep_samples_check.isEnabled()
+
+
+def test_type_a_inputs_use_t_distribution_and_type_b_shape_parameters(qapp):
+    parent = _DummyParent()
+    parent.variable_values["A"] = {
+        "type": "A",
+        "values": [{"central_value": "0", "standard_uncertainty": "1", "degrees_of_freedom": "4"}],
+    }
+    parent.variable_values["B"]["distribution"] = "TRAPEZOIDAL_DISTRIBUTION"
+    parent.variable_values["B"]["distribution_parameter"] = "0.5"
+    tab = MonteCarloTab(parent)
+    tab.refresh_controls()
+
+    first, second = tab._build_model("Y").inputs
+    assert (first.distribution, first.parameter) == ("STUDENT_T_DISTRIBUTION", 4.0)
+    assert (second.distribution, second.parameter) == ("TRAPEZOIDAL_DISTRIBUTION", 0.5)
+
+    parent.variable_values["B"]["distribution_parameter"] = "2"
+    with pytest.raises(ValueError):
+        tab._build_model("Y")
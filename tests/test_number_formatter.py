@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+import numpy as np
+
+from src.utils.number_formatter import (
+    BatchNumberFormatter,
+    _format_with_exponent,
+    format_central_value,
+    format_central_value_with_uncertainty,
+    format_expanded_uncertainty,
+    format_number_str,
+    format_standard_uncertainty,
+)
+
+
+def test_engineering_exponent_from_adjusted():
+    assert _format_with_exponent(Decimal("1.00E+3"), 3) == "1.00 E3"
+    assert _format_with_exponent(Decimal("999"), 3) == "999.00"
+    assert _format_with_exponent(Decimal("-0.00123"), 3) == "-1.23 E-3"
+    assert _format_with_exponent(Decimal("1.2E-20"), 2) == "12.0 E-21"
+    assert _format_with_exponent(Decimal("0"), 2) == "0.0"
+
+
+def test_batch_formatter_matches_single_value_helpers():
+    values = np.array([0.0, 1.0, -0.000123456, 288.6, 999.96, 5e30, 1234567.0])
+    uncertainties = np.abs(values) * 0.013 + 1e-6
+    formatter = BatchNumberFormatter()
+
+    assert formatter.central_values(values) == [format_central_value(v) for v in values]
+    assert formatter.standard_uncertainties(values) == [format_standard_uncertainty(v) for v in values]
+    assert formatter.expanded_uncertainties(values) == [format_expanded_uncertainty(v) for v in values]
+    assert formatter.numbers(values) == [format_number_str(v) for v in values]
+    assert formatter.central_values_with_uncertainty(values, uncertainties) == [
+        format_central_value_with_uncertainty(v, u) for v, u in zip(values, uncertainties)
+    ]
+
+
+def test_batch_formatter_uses_given_settings_snapshot():
+    formatter = BatchNumberFormatter((3, "round_up"))
+
+    assert formatter.expanded_uncertainties([0.012301, 288.61]) == ["12.40 E-3", "289.00"]
+    assert formatter.central_values_with_uncertainty([1.234567], [0.012301]) == ["1.2346"]
+    assert formatter.numbers(["nan"]) == ["0"]
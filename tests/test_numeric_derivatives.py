@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from src.utils.budget_engine import BudgetEngine
+from src.utils.compiled_model import CompiledModel
+from src.utils.numeric_derivatives import (
+    COMPLEX_STEP,
+    RICHARDSON,
+    SYMBOLIC,
+    complex_step_gradient,
+    normalize_derivative_backend,
+    numeric_gradient,
+    richardson_gradient,
+)
+
+
+def _func(a, b, c):
+    return a * b / c + np.exp(a / 10)
+
+
+def _analytic_gradient(x):
+    a, b, c = x[:, 0], x[:, 1], x[:, 2]
+    return np.stack([b / c + np.exp(a / 10) / 10, a / c, -a * b / c**2], axis=1)
+
+
+def test_complex_step_matches_analytic_gradient_for_all_points():
+    x = np.array([[2.0, 5.0, 1.5], [3.0, -4.0, 0.25], [1e3, 1e-3, 7.0]])
+
+    result = complex_step_gradient(_func, x)
+
+    assert result.method == COMPLEX_STEP
+    assert result.gradient.shape == (3, 3)
+    np.testing.assert_allclose(result.values, _func(*x.T))
+    np.testing.assert_allclose(result.gradient, _analytic_gradient(x), rtol=1e-14)
+    assert np.all(result.error >= 0)
+
+
+def test_complex_step_recomputes_invalid_points_only():
+    x = np.array([[2.0, 5.0, 1.5], [np.nan, 5.0, 1.5]])
+
+    result = numeric_gradient(_func, x)
+
+    np.testing.assert_allclose(result.values[0], _func(*x[0]))
+    np.testing.assert_allclose(result.gradient[0], _analytic_gradient(x[:1])[0], rtol=1e-14)
+    assert np.all(np.isnan(result.gradient[1]))
+
+
+def test_richardson_error_estimate_bounds_actual_error():
+    x = np.array([[2.0, 5.0, 1.5], [3.0, -4.0, 0.25]])
+
+    result = richardson_gradient(_func, x)
+    actual_error = np.abs(result.gradient - _analytic_gradient(x))
+
+    assert result.method == RICHARDSON
+    np.testing.assert_allclose(result.gradient, _analytic_gradient(x), rtol=1e-8)
+    assert np.all(actual_error <= 10 * result.error + 1e-12)
+
+
+def test_non_analytic_model_uses_richardson():
+    model = CompiledModel("Abs(A - B) * C", ["A", "B", "C"])
+
+    result = model.evaluate_numeric_gradient(np.array([3.0, 1.0]), np.array([1.0, 2.0]), 2.0)
+
+    assert not model.is_analytic
+    assert result.method == RICHARDSON
+    np.testing.assert_allclose(result.gradient, [[2.0, -2.0, 2.0], [-2.0, 2.0, 1.0]], rtol=1e-8)
+
+
+def test_unknown_backend_falls_back_to_symbolic():
+    assert normalize_derivative_backend("Complex_Step") == COMPLEX_STEP
+    assert normalize_derivative_backend("unknown") == SYMBOLIC
+    assert normalize_derivative_backend(None) == SYMBOLIC
+
+
+@pytest.mark.parametrize("backend", [COMPLEX_STEP, RICHARDSON])
+def test_engine_numeric_backend_matches_symbolic(backend):
+    data = {
+        "last_equation": "Y = A*B/C",
+        "value_count": 1,
+        "value_names": ["P1"],
+        "variables": ["Y", "A", "B", "C"],
+        "result_variables": ["Y"],
+        "variable_values": {
+            "Y": {"type": "result", "values": [{}]},
+            "A": {"type": "A", "values": [{"central_value": "2", "standard_uncertainty": "0.1", "degrees_of_freedom": "10"}]},
+            "B": {"type": "A", "values": [{"central_value": "5", "standard_uncertainty": "0.2", "degrees_of_freedom": "10"}]},
+            "C": {"type": "A", "values": [{"central_value": "4", "standard_uncertainty": "0.1", "degrees_of_freedom": "10"}]},
+        },
+    }
+    symbolic = BudgetEngine.from_project_data(data).calculate_all()["Y"][0]
+    numeric_engine = BudgetEngine.from_project_data(dict(data, derivative_backend=backend))
+    numeric_results = [numeric_engine.calculate_all()["Y"][0], numeric_engine.calculate("Y", 0)]
+
+    for numeric in numeric_results:
+        assert numeric.is_valid
+        for expected, row in zip(symbolic.rows, numeric.rows):
+            assert row.sensitivity == pytest.approx(expected.sensitivity, rel=1e-8)
+            assert row.sensitivity_error is not None
+            assert expected.sensitivity_error is None
+        assert numeric.standard_uncertainty == pytest.approx(symbolic.standard_uncertainty, rel=1e-8)
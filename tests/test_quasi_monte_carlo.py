@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.monte_carlo import (
+    MonteCarloInput,
+    MonteCarloModel,
+    SAMPLING_LATIN_HYPERCUBE,
+    SAMPLING_RANDOM,
+    SAMPLING_SOBOL,
+    run_monte_carlo,
+    run_replicated_monte_carlo,
+)
+from src.utils.quasi_monte_carlo import (
+    MAX_SOBOL_DIMENSION,
+    ScrambledSobol,
+    latin_hypercube,
+)
+
+
+def test_scrambled_sobol_is_stratified_and_continues_across_chunks():
+    sobol = ScrambledSobol(MAX_SOBOL_DIMENSION, seed=7)
+    points = sobol.points(0, 1024)
+
+    assert np.all((points > 0.0) & (points < 1.0))
+    # 2^10 点なら各次元で 1/1024 の区間に1点ずつ入る
+    for dimension in range(MAX_SOBOL_DIMENSION):
+        cells = np.floor(points[:, dimension] * 1024).astype(int)
+        assert np.array_equal(np.sort(cells), np.arange(1024))
+    np.testing.assert_array_equal(sobol.points(300, 500), points[300:800])
+    np.testing.assert_array_equal(ScrambledSobol(3, seed=7).points(0, 8), ScrambledSobol(3, seed=7).points(0, 8))
+    assert not np.array_equal(ScrambledSobol(3, seed=8).points(0, 8), ScrambledSobol(3, seed=7).points(0, 8))
+    with pytest.raises(ValueError):
+        ScrambledSobol(MAX_SOBOL_DIMENSION + 1, seed=1)
+
+
+def test_latin_hypercube_has_one_point_per_stratum():
+    points = latin_hypercube(np.random.default_rng(1), 500, 4)
+    for dimension in range(4):
+        assert np.array_equal(np.sort(np.floor(points[:, dimension] * 500).astype(int)), np.arange(500))
+
+
+def _model(sampling, correlation=None):
+    return MonteCarloModel(
+        expression="A*B + C",
+        variables=("A", "B", "C"),
+        inputs=(
+            MonteCarloInput("A", 2.0, 0.1),
+            MonteCarloInput("B", 5.0, 0.2, "RECTANGULAR_DISTRIBUTION"),
+            MonteCarloInput("C", 1.0, 0.05, "U_DISTRIBUTION"),
+        ),
+        correlation=correlation,
+        sampling=sampling,
+    )
+
+
+def test_quasi_random_replicates_have_smaller_error_than_random():
+    errors = {
+        sampling: run_replicated_monte_carlo(_model(sampling), 2 ** 14, 8, seed=2).standard_errors
+        for sampling in (SAMPLING_RANDOM, SAMPLING_SOBOL, SAMPLING_LATIN_HYPERCUBE)
+    }
+
+    # 平均と標準不確かさの標準誤差で比べる
+    assert errors[SAMPLING_SOBOL][0] < errors[SAMPLING_RANDOM][0] / 10
+    assert errors[SAMPLING_SOBOL][1] < errors[SAMPLING_RANDOM][1] / 10
+    assert errors[SAMPLING_LATIN_HYPERCUBE][0] < errors[SAMPLING_RANDOM][0] / 10
+
+
+def test_sobol_respects_correlation_and_worker_count():
+    correlation = np.array([[1.0, 0.5, 0.0], [0.5, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    serial = run_monte_carlo(_model(SAMPLING_SOBOL, correlation), 2 ** 15, seed=4, chunk_size=1024)
+    parallel = run_monte_carlo(_model(SAMPLING_SOBOL, correlation), 2 ** 15, seed=4, chunk_size=1024, workers=2)
+
+    expected_u = math.sqrt(0.5 ** 2 + 0.4 ** 2 + 2 * 0.5 * 0.5 * 0.4 + 0.05 ** 2)
+    assert serial.summary().standard_deviation == pytest.approx(expected_u, rel=5e-3)
+    assert parallel.summary() == serial.summary()
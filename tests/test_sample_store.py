@@ -0,0 +1,119 @@
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from src.utils.monte_carlo import (
+    MonteCarloInput,
+    MonteCarloModel,
+    run_monte_carlo,
+    sample_statistics,
+)
+from src.utils.sample_store import SampleStore, prune_sample_stores
+
+
+def _model(**options):
+    return MonteCarloModel(
+        expression="exp(A) + B",
+        variables=("A", "B"),
+        inputs=(MonteCarloInput("A", 0.0, 0.5), MonteCarloInput("B", 1.0, 0.1)),
+        correlation=np.array([[1.0, 0.3], [0.3, 1.0]]),
+        **options,
+    )
+
+
+def test_stored_run_matches_plain_run_and_keeps_inputs(tmp_path):
+    model = _model()
+    stored = run_monte_carlo(model, 50000, seed=4, chunk_size=4096, store_root=tmp_path)
+    plain = run_monte_carlo(model, 50000, seed=4, chunk_size=4096)
+
+    store = stored.sample_store
+    assert store.is_complete()
+    assert store.inputs.shape == (50000, 2)
+    np.testing.assert_allclose(np.exp(store.inputs[:, 0]) + store.inputs[:, 1], store.outputs)
+    assert stored.accumulator.moments.mean == plain.accumulator.moments.mean
+    # 保存した標本からは分位点を並べ替えで正確に求める
+    exact = sample_statistics(store.outputs, 0.9)
+    summary = stored.summary(0.9)
+    assert summary.interval == exact.interval
+    assert summary.shortest_interval == exact.shortest_interval
+    assert summary.interval == pytest.approx(plain.summary(0.9).interval, rel=1e-3)
+    counts, bins = stored.display_histogram(40)
+    assert counts.sum() == 50000 and bins.size == 41
+
+
+def test_saved_samples_are_reused_without_evaluating(tmp_path, monkeypatch):
+    model = _model(control_variate=True)
+    first = run_monte_carlo(model, 20000, seed=7, chunk_size=4096, store_root=tmp_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("model evaluated")
+
+    monkeypatch.setattr(MonteCarloModel, "evaluate_sampled", fail)
+    second = run_monte_carlo(model, 20000, seed=7, chunk_size=4096, store_root=tmp_path)
+
+    assert second.completed_count == 20000
+    assert second.sample_store.directory == first.sample_store.directory
+    assert np.array_equal(second.accumulator.digest.means, first.accumulator.digest.means)
+    assert second.summary().controlled_standard_deviation == first.summary().controlled_standard_deviation
+
+
+def test_cancelled_run_is_not_reused_and_export_writes_rows(tmp_path):
+    model = _model()
+    cancelled = run_monte_carlo(model, 20000, seed=1, chunk_size=1024, store_root=tmp_path,
+                                is_cancelled=lambda: True)
+    assert cancelled.cancelled
+    assert not SampleStore.for_run(tmp_path, model, 1, 20000, 1024).is_complete()
+
+    run = run_monte_carlo(model, 3000, seed=1, chunk_size=1024, store_root=tmp_path)
+    export_path = tmp_path / "samples.csv"
+    run.sample_store.export_csv(export_path, "Y")
+    with open(export_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["A", "B", "Y"]
+    assert len(rows) == 3001
+    assert float(rows[1][2]) == run.sample_store.outputs[0]
+
+
+def test_prune_keeps_newest_runs(tmp_path):
+    model = _model()
+    runs = [run_monte_carlo(model, 1000, seed=seed, store_root=tmp_path) for seed in range(3)]
+    for age, run in enumerate(reversed(runs)):
+        meta_path = os.path.join(run.sample_store.directory, "meta.json")
+        os.utime(meta_path, (1e9 - age, 1e9 - age))
+
+    prune_sample_stores(tmp_path, 1)
+
+    assert [run.sample_store.is_complete() for run in runs] == [False, False, True]
+
+
+def test_sorted_outputs_merge_small_runs_out_of_core(tmp_path):
+    store = SampleStore(tmp_path / "store")
+    store.allocate(["A"], 10007)
+    values = np.random.default_rng(3).normal(size=10007)
+    values[::97] = np.nan
+    values[5::331] = 0.25
+    store.write(0, [values], values)
+    store.finish(10007)
+
+    ordered = store.sorted_outputs(run_size=1000, chunk_size=64)
+    expected = np.sort(values[np.isfinite(values)])
+    assert np.array_equal(np.asarray(ordered), expected)
+    assert not os.path.exists(os.path.join(store.directory, "sorted_runs.tmp.npy"))
+
+
+def test_prepared_results_are_not_read_again(tmp_path, monkeypatch):
+    run = run_monte_carlo(_model(), 20000, seed=2, chunk_size=4096, store_root=tmp_path)
+    run.prepare_stored_results(0.95, 40)
+    summary = run.summary(0.95)
+    counts, _ = run.display_histogram(40)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("samples read again")
+
+    monkeypatch.setattr(SampleStore, "sorted_outputs", fail)
+    monkeypatch.setattr(SampleStore, "histogram", fail)
+    assert run.summary(0.95).shortest_interval == summary.shortest_interval
+    assert np.array_equal(run.display_histogram(40)[0], counts)
+    assert summary.interval == sample_statistics(run.sample_store.outputs, 0.95).interval
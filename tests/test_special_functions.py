@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils.coverage_factor import t_coverage_factor
+from src.utils.special_functions import (
+    beta_ppf,
+    betainc,
+    erf,
+    erfc,
+    ndtr,
+    ndtri,
+    t_cdf,
+    t_ppf,
+)
+
+
+def test_erf_and_erfc_match_math_module():
+    values = np.linspace(-10.0, 10.0, 4001)
+    np.testing.assert_allclose(erf(values), [math.erf(v) for v in values], rtol=0, atol=1e-15)
+    expected = np.array([math.erfc(v) for v in values])
+    np.testing.assert_allclose(erfc(values), expected, rtol=1e-13)
+    # 形状を保つ
+    assert erf(np.zeros((2, 3))).shape == (2, 3)
+
+
+def test_ndtri_inverts_the_cdf_in_both_tails():
+    probabilities = np.array([1e-300, 1e-9, 1e-4, 0.02, 0.3, 0.5, 0.8, 0.999, 1.0 - 1e-9])
+    scores = ndtri(probabilities)
+    recovered = np.array([0.5 * math.erfc(-value / math.sqrt(2.0)) for value in scores])
+    np.testing.assert_allclose(recovered, probabilities, rtol=1e-12)
+    np.testing.assert_allclose(ndtr(scores[:-1]), probabilities[:-1], rtol=1e-12)
+    assert ndtri(0.5) == 0.0
+    assert np.isneginf(ndtri(0.0)) and np.isposinf(ndtri(1.0)) and np.isnan(ndtri(1.5))
+
+
+@pytest.mark.parametrize("degrees_of_freedom", [1, 2, 3.5, 9, 60])
+def test_t_quantiles_match_coverage_factor_and_invert_the_cdf(degrees_of_freedom):
+    probabilities = np.array([1e-8, 0.001, 0.025, 0.2, 0.5, 0.6, 0.975, 0.9999])
+    quantiles = t_ppf(probabilities, degrees_of_freedom)
+
+    assert quantiles[6] == pytest.approx(t_coverage_factor(degrees_of_freedom, 0.95), rel=1e-12)
+    np.testing.assert_allclose(t_cdf(quantiles, degrees_of_freedom), probabilities, rtol=1e-11)
+    assert quantiles[4] == 0.0
+
+
+def test_t_ppf_is_antisymmetric_and_rejects_invalid_degrees_of_freedom():
+    probabilities = np.array([0.01, 0.3, 0.45])
+    np.testing.assert_allclose(t_ppf(probabilities, 4), -t_ppf(1.0 - probabilities, 4), rtol=1e-12)
+    with pytest.raises(ValueError):
+        t_ppf(0.5, 0)
+
+
+def test_beta_quantiles_invert_the_incomplete_beta_function():
+    probabilities = np.linspace(0.001, 0.999, 41)
+    for a, b in [(0.5, 0.5), (2.0, 3.0), (0.3, 7.0), (20.0, 40.0)]:
+        np.testing.assert_allclose(betainc(a, b, beta_ppf(probabilities, a, b)), probabilities, atol=1e-13)
+    # Beta(1/2, 1/2) は逆正弦分布
+    x = np.linspace(0.01, 0.99, 9)
+    np.testing.assert_allclose(betainc(0.5, 0.5, x), 2.0 / np.pi * np.arcsin(np.sqrt(x)), rtol=1e-13)
@@ -6,7 +6,13 @@ import uuid
 from pathlib import Path
 
 import src.utils.number_formatter as number_formatter
-from src.utils.config_loader import ConfigLoader
+from src.utils.config_loader import (
+    ConfigLoader,
+    add_config_listener,
+    get_config,
+    reload_config,
+    remove_config_listener,
+)
 
 
 class TestUncertaintyRoundingConfig(unittest.TestCase):
@@ -30,15 +36,61 @@ class TestUncertaintyRoundingConfig(unittest.TestCase):
             loader = ConfigLoader(str(config_path))
             self.assertEqual(loader.config.get("UncertaintyRounding", "rounding_mode"), "round_up")
 
-            original = number_formatter.ConfigLoader
+            original_path = get_config().config_path
             try:
-                number_formatter.ConfigLoader = lambda: ConfigLoader(str(config_path))
+                reload_config(str(config_path))
                 self.assertEqual(number_formatter.format_expanded_uncertainty(288.6), "290.0")
             finally:
-                number_formatter.ConfigLoader = original
+                reload_config(original_path)
         finally:
             shutil.rmtree(test_dir, ignore_errors=True)
 
+    def test_shared_config_reloads_on_save_and_notifies_listeners(self):
+        test_dir = Path(__file__).resolve().parent / f"tmp_shared_config_{uuid.uuid4().hex}"
+        test_dir.mkdir(parents=True, exist_ok=False)
+        original_path = get_config().config_path
+        notified = []
+        listener = lambda config: notified.append(config.get_precision())
+        try:
+            config_path = test_dir / "config.ini"
+            config_path.write_text("[Calculation]\nprecision = 30\n", encoding="utf-8")
+            shared = reload_config(str(config_path))
+            self.assertIs(get_config(), shared)
+
+            add_config_listener(listener)
+            loader = ConfigLoader(str(config_path))
+            loader.config.set("Calculation", "precision", "40")
+            self.assertTrue(loader.save_config())
+
+            self.assertEqual(notified, [40])
+            self.assertIsNot(get_config(), shared)
+            self.assertEqual(get_config().get_precision(), 40)
+            self.assertEqual(shared.get_precision(), 30)
+        finally:
+            remove_config_listener(listener)
+            reload_config(original_path)
+            shutil.rmtree(test_dir, ignore_errors=True)
+
+    def test_shared_config_is_read_only_and_versioned(self):
+        shared = get_config()
+
+        with self.assertRaises(TypeError):
+            shared.config.set("Calculation", "precision", "40")
+        with self.assertRaises(TypeError):
+            shared.config["Calculation"]["precision"] = "40"
+        with self.assertRaises(TypeError):
+            shared.config.add_section("Extra")
+        with self.assertRaises(TypeError):
+            shared.save_config()
+
+        reloaded = reload_config(shared.config_path)
+        self.assertGreater(reloaded.version, shared.version)
+        self.assertEqual(reloaded.get_precision(), shared.get_precision())
+
+        loader = ConfigLoader(shared.config_path)
+        loader.config.set("Calculation", "precision", "40")
+        self.assertEqual(loader.get_precision(), 40)
+
 
 if __name__ == "__main__":
     unittest.main()
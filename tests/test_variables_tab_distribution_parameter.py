@@ -0,0 +1,65 @@
+import pytest
+
+try:
+    from PySide6.QtWidgets import QApplication, QWidget
+    from src.tabs.variables_tab import VariablesTab
+    from src.utils.variable_utils import find_variable_item
+except ImportError:
+    pytest.skip("PySide6 is not available", allow_module_level=True)
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication([])
+    return app
+
+
+class _DummyParent(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.variables = ["Y", "B"]
+        self.result_variables = ["Y"]
+        self.value_names = ["P1"]
+        self.current_value_index = 0
+        self.variable_values = {
+            "Y": {"type": "result", "values": [{}]},
+            "B": {
+                "type": "B",
+                "distribution": "NORMAL_DISTRIBUTION",
+                "values": [{
+                    "central_value": "1",
+                    "half_width": "0.3",
+                    "divisor": "2",
+                    "standard_uncertainty": "0.15",
+                    "degrees_of_freedom": "inf",
+                }],
+            },
+        }
+
+
+def test_shape_parameter_sets_divisor_of_trapezoidal_distribution(qapp):
+    parent = _DummyParent()
+    tab = VariablesTab(parent)
+    tab.restore_selection_state()
+    tab.variable_list.setCurrentItem(find_variable_item(tab.variable_list, "B"))
+    tab.display_common_settings()
+    tab.display_current_value()
+    parameter = tab.type_b_widgets['distribution_parameter']
+    assert parameter.isHidden()
+
+    combo = tab.type_b_widgets['distribution']
+    combo.setCurrentIndex(combo.findData("TRAPEZOIDAL_DISTRIBUTION"))
+    parameter.setText("0.5")
+
+    var_info = parent.variable_values["B"]
+    assert not parameter.isHidden()
+    assert var_info["distribution_parameter"] == "0.5"
+    assert var_info["divisor"] == "2.19089023"
+    assert float(var_info["values"][0]["standard_uncertainty"]) == pytest.approx(0.3 / 2.19089023)
+
+    # 対数正規分布は正規分布と同じく除数を手入力する
+    combo.setCurrentIndex(combo.findData("LOGNORMAL_DISTRIBUTION"))
+    assert parameter.isHidden()
+    assert not tab.type_b_widgets['divisor'].isReadOnly()